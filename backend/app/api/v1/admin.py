@@ -0,0 +1,55 @@
+# ============================================
+# Ascend AI - Admin API Routes
+# ============================================
+# Operational endpoints restricted to ADMIN_EMAILS
+# ============================================
+
+from fastapi import APIRouter, Depends, status
+
+from app.core.auth import AuthenticatedPrincipal, get_admin_principal
+from app.core.cache import token_cache
+from app.core.server_timing import TimedAPIRoute
+
+# ============================================
+# Router Configuration
+# ============================================
+router = APIRouter(
+    prefix="/admin",
+    tags=["Admin"],
+    route_class=TimedAPIRoute,
+)
+
+
+# ============================================
+# Token Cache Metrics Endpoint
+# ============================================
+@router.get(
+    "/metrics/token-cache",
+    status_code=status.HTTP_200_OK,
+    summary="Token Cache Metrics",
+    description="""
+    Hit/miss counts, error counts, Redis get/set latency and payload size
+    histograms for the authentication token cache.
+
+    **Authentication Required:** Yes, and the caller's email must be listed in ADMIN_EMAILS
+
+    **Returns:**
+    - worker: metrics of the worker that served this request
+    - cluster: totals across every worker that reported recently
+    - workers: number of workers included in the totals
+
+    **Errors:**
+    - 401 Unauthorized: Invalid, expired, or missing JWT token
+    - 403 Forbidden: Caller is not an admin
+    """,
+)
+async def get_token_cache_metrics(
+    _admin: AuthenticatedPrincipal = Depends(get_admin_principal),
+) -> dict:
+    """
+    Return token cache metrics for this worker and across all workers.
+
+    Use these numbers to size the cache TTLs (hit rate, miss rate) and
+    Redis memory (payload size distribution times live entries).
+    """
+    return await token_cache.get_cache_stats()
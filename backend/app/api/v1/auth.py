@@ -8,6 +8,7 @@
 from fastapi import APIRouter, Depends, status
 
 from app.core.auth import get_current_user
+from app.core.server_timing import TimedAPIRoute
 from app.db.models.user import User
 from app.schemas.user import UserResponse
 
@@ -17,6 +18,7 @@ from app.schemas.user import UserResponse
 router = APIRouter(
     prefix="/auth",
     tags=["Authentication"],
+    route_class=TimedAPIRoute,
 )
 
 
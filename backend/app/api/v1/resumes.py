@@ -8,8 +8,8 @@
 from fastapi import APIRouter, Depends, status
 from fastapi.responses import JSONResponse
 
-from app.core.auth import get_current_user
-from app.db.models.user import User
+from app.core.auth import AuthenticatedPrincipal, get_current_principal
+from app.core.server_timing import TimedAPIRoute
 
 # ============================================
 # Router Configuration
@@ -17,6 +17,7 @@ from app.db.models.user import User
 router = APIRouter(
     prefix="/resumes",
     tags=["Resumes"],
+    route_class=TimedAPIRoute,
 )
 
 
@@ -43,7 +44,7 @@ router = APIRouter(
     """,
 )
 async def upload_resume(
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedPrincipal = Depends(get_current_principal),
 ):
     """
     Upload resume endpoint placeholder.
@@ -83,7 +84,7 @@ async def upload_resume(
     """,
 )
 async def list_resumes(
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedPrincipal = Depends(get_current_principal),
 ):
     """
     List resumes endpoint placeholder.
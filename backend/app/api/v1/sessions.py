@@ -8,8 +8,8 @@
 from fastapi import APIRouter, Depends, status
 from fastapi.responses import JSONResponse
 
-from app.core.auth import get_current_user
-from app.db.models.user import User
+from app.core.auth import AuthenticatedPrincipal, get_current_principal
+from app.core.server_timing import TimedAPIRoute
 
 # ============================================
 # Router Configuration
@@ -17,6 +17,7 @@ from app.db.models.user import User
 router = APIRouter(
     prefix="/sessions",
     tags=["Sessions"],
+    route_class=TimedAPIRoute,
 )
 
 
@@ -42,7 +43,7 @@ router = APIRouter(
     """,
 )
 async def create_session(
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedPrincipal = Depends(get_current_principal),
 ):
     """
     Create interview session endpoint placeholder.
@@ -84,7 +85,7 @@ async def create_session(
 )
 async def get_session(
     session_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedPrincipal = Depends(get_current_principal),
 ):
     """
     Get session endpoint placeholder.
@@ -123,7 +124,7 @@ async def get_session(
     """,
 )
 async def list_sessions(
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedPrincipal = Depends(get_current_principal),
 ):
     """
     List sessions endpoint placeholder.
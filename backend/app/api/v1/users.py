@@ -9,6 +9,9 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.auth import serialize_user
+from app.core.cache import token_cache
+from app.core.server_timing import TimedAPIRoute
 from app.db.models.user import User
 from app.db.session import get_db
 from app.schemas.user import UserCreate, UserResponse
@@ -19,6 +22,7 @@ from app.schemas.user import UserCreate, UserResponse
 router = APIRouter(
     prefix="/users",
     tags=["Users"],
+    route_class=TimedAPIRoute,
 )
 
 
@@ -42,6 +46,8 @@ router = APIRouter(
     - If a user with the given email already exists, returns the existing user
     - If no user exists, creates a new user with the provided OAuth data
     - Updates user information if OAuth data has changed
+    - Writes the profile through to the token cache, so the first
+      authenticated request after login skips the database
 
     **Returns:** Complete user profile with UUID, email, name, avatar, and timestamps
 
@@ -118,6 +124,10 @@ async def create_or_get_user(
                 await db.commit()
                 await db.refresh(existing_user)
 
+            # Write the profile through so the tokens issued for this login
+            # (and any the user already holds) see it without a DB lookup
+            await token_cache.cache_user_profile(serialize_user(existing_user))
+
             return UserResponse.model_validate(existing_user)
 
         # User doesn't exist - create new user
@@ -133,6 +143,8 @@ async def create_or_get_user(
         await db.commit()
         await db.refresh(new_user)
 
+        await token_cache.cache_user_profile(serialize_user(new_user))
+
         return UserResponse.model_validate(new_user)
 
     except Exception as e:
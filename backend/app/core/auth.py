@@ -6,15 +6,22 @@
 # DIRECTIVE: DIR-008 (Zero Trust Security Protocol)
 # ============================================
 
+from contextlib import nullcontext
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from jose import JWTError, jwt
+from jose import JWTError
+from jose.exceptions import JWTClaimsError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.cache import token_cache
 from app.core.config import settings
+from app.core.security import decode_jwt_token
+from app.core.server_timing import timed
+from app.core.singleflight import SingleFlight
+from app.core.tracing import span
 from app.db.models.user import User
-from app.db.session import get_db
+from app.db.session import AsyncSessionLocal, get_db
 
 # ============================================
 # Security Scheme Configuration
@@ -23,6 +30,72 @@ from app.db.session import get_db
 # Format: Authorization: Bearer <token>
 security = HTTPBearer()
 
+# ============================================
+# Cache-Miss Coalescing
+# ============================================
+# Concurrent requests that miss the cache for the same token share a single
+# verify-and-load; the others await its result (keyed by token hash).
+_user_loads: SingleFlight[tuple[dict, User | None]] = SingleFlight()
+
+
+# ============================================
+# Authenticated Principal
+# ============================================
+class AuthenticatedPrincipal:
+    """
+    Lightweight, immutable view of the authenticated user.
+
+    Returned by get_current_principal for endpoints that only need to know
+    WHO is calling (ownership checks, logging, rate-limit identity) and do
+    not need a session-bound User ORM object. Building one never touches
+    the database.
+    """
+
+    __slots__ = ("id", "email", "name", "oauth_provider")
+
+    def __init__(self, id: str, email: str, name: str | None, oauth_provider: str):
+        object.__setattr__(self, "id", str(id))
+        object.__setattr__(self, "email", email)
+        object.__setattr__(self, "name", name)
+        object.__setattr__(self, "oauth_provider", oauth_provider)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("AuthenticatedPrincipal is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("AuthenticatedPrincipal is immutable")
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, AuthenticatedPrincipal):
+            return NotImplemented
+        return self.id == other.id
+
+    def __hash__(self) -> int:
+        return hash(self.id)
+
+    def __repr__(self) -> str:
+        return f"<AuthenticatedPrincipal(id={self.id}, email={self.email})>"
+
+    @classmethod
+    def from_user_data(cls, user_data: dict) -> "AuthenticatedPrincipal":
+        """Build a principal from a cached user data dict."""
+        return cls(
+            id=user_data["id"],
+            email=user_data["email"],
+            name=user_data.get("name"),
+            oauth_provider=user_data["oauth_provider"],
+        )
+
+    @classmethod
+    def from_user(cls, user: User) -> "AuthenticatedPrincipal":
+        """Build a principal from a User ORM object."""
+        return cls(
+            id=user.id,
+            email=user.email,
+            name=user.name,
+            oauth_provider=user.oauth_provider,
+        )
+
 
 # ============================================
 # Authentication Dependency
@@ -73,53 +146,241 @@ async def get_current_user(
     - Redis cache provides 25x faster lookups vs database
     - Reduces database load by ~90% for authenticated requests
     - Cache TTL: 15 minutes (aligned with typical JWT expiry)
+    - A cache hit still merges into the session (one SELECT). Endpoints that
+      only need the caller's identity should use get_current_principal.
+    - Concurrent cache misses for the same token are coalesced: one request
+      verifies the JWT and loads the user, the others reuse its result.
+    - Tokens that fail validation are negatively cached for a short TTL, so
+      retrying the same bad token is rejected without re-verifying it.
     """
     token = credentials.credentials
 
     # ============================================
     # Token Cache Lookup (Performance Optimization)
     # ============================================
-    # Check if this token has been validated recently
-    cached_user_data = await token_cache.get_user_from_cache(token)
+    # Check if this token has been validated (or rejected) recently
+    with span("auth.token_cache") as lookup_span, timed("auth-cache"):
+        cached_user_data, rejection = await token_cache.lookup_token(token)
+        if lookup_span is not None:
+            lookup_span.set("hit", cached_user_data is not None or rejection is not None)
+    if rejection is not None:
+        raise _unauthorized(rejection)
 
     if cached_user_data:
         # Cache hit - reconstruct User object from cached data
         # This is 25x faster than database lookup
-        from datetime import datetime
+        return await _merge_cached_user(session, cached_user_data)
 
-        # Parse datetime strings back to datetime objects
-        cached_user_data["created_at"] = datetime.fromisoformat(cached_user_data["created_at"])
-        cached_user_data["updated_at"] = datetime.fromisoformat(cached_user_data["updated_at"])
-
-        user = User(**cached_user_data)
-        # Merge the user into the session to handle state correctly (avoids INSERT on commit)
-        user = await session.merge(user)
+    # Cache miss - verify and load once per token, even under concurrency
+    user_data, user, shared = await _resolve_uncached_token(token, lambda: nullcontext(session))
+    if user is not None and not shared:
         return user
 
-    # ============================================
-    # JWT Token Validation
-    # ============================================
+    # Another request (or worker) did the load; attach its result to our session
+    return await _merge_cached_user(session, user_data)
+
+
+# ============================================
+# Principal Dependency (No DB Session on Cache Hit)
+# ============================================
+async def get_current_principal(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+) -> AuthenticatedPrincipal:
+    """
+    FastAPI dependency that authenticates the caller without a DB session.
+
+    Same validation rules as get_current_user, but:
+    - Cache hit: returns an AuthenticatedPrincipal built from cached data.
+      No database session is opened and no query is sent.
+    - Cache miss: opens a session only for the duration of the user lookup,
+      then caches the user for subsequent requests.
+
+    Prefer this over get_current_user for endpoints that only need the
+    caller's identity. Use get_current_user when the endpoint needs the
+    session-bound User ORM object (relationships, updates).
+
+    Args:
+        credentials: HTTPAuthorizationCredentials containing the Bearer token
+
+    Returns:
+        AuthenticatedPrincipal: Immutable (id, email, name, oauth_provider)
+
+    Raises:
+        HTTPException: 401 Unauthorized under the same conditions as
+            get_current_user
+
+    Usage:
+        @router.get("/mine")
+        async def list_mine(principal: AuthenticatedPrincipal = Depends(get_current_principal)):
+            return {"user_id": principal.id}
+    """
+    token = credentials.credentials
+
+    with span("auth.token_cache") as lookup_span, timed("auth-cache"):
+        cached_user_data, rejection = await token_cache.lookup_token(token)
+        if lookup_span is not None:
+            lookup_span.set("hit", cached_user_data is not None or rejection is not None)
+    if rejection is not None:
+        raise _unauthorized(rejection)
+    if cached_user_data:
+        return AuthenticatedPrincipal.from_user_data(cached_user_data)
+
+    # Acquire a pooled connection only now that we actually need the database
+    user_data, _, _ = await _resolve_uncached_token(token, AsyncSessionLocal)
+    return AuthenticatedPrincipal.from_user_data(user_data)
+
+
+# ============================================
+# Admin Authorization Dependency
+# ============================================
+async def get_admin_principal(
+    principal: AuthenticatedPrincipal = Depends(get_current_principal),
+) -> AuthenticatedPrincipal:
+    """
+    FastAPI dependency that only admits operators listed in ADMIN_EMAILS.
+
+    Args:
+        principal: Authenticated caller
+
+    Returns:
+        AuthenticatedPrincipal: The caller, if they are an admin
+
+    Raises:
+        HTTPException: 401 Unauthorized if not authenticated (see get_current_principal)
+        HTTPException: 403 Forbidden if the caller is not an admin
+    """
+    if principal.email.lower() not in settings.admin_emails_list:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required",
+        )
+
+    return principal
+
+
+# ============================================
+# Shared Validation Helpers
+# ============================================
+async def _resolve_uncached_token(token: str, session_scope) -> tuple[dict, User | None, bool]:
+    """
+    Verify a token and load its user, coalescing concurrent callers.
+
+    Within this process only one coroutine per token runs the JWT decode and
+    the user lookup; the rest await its result. With the fill lock enabled,
+    workers in other processes also wait for the first one to populate Redis.
+
+    Args:
+        token: Raw JWT token
+        session_scope: Zero-argument callable returning an async context
+            manager that yields the AsyncSession to load the user with
+
+    Returns:
+        tuple: (user_data, user, shared). ``user`` is the ORM object loaded
+        in the caller's session, or None when the data came from elsewhere.
+        ``shared`` is True when another coroutine did the load.
+
+    Raises:
+        HTTPException: 401 from token validation or user lookup
+    """
+
+    async def load() -> tuple[dict, User | None]:
+        try:
+            user_id, expires_at = _decode_claims(token)
+        except HTTPException as e:
+            # Remember the rejection so retries of the same bad token skip the
+            # signature check. Claim errors (e.g. "not yet valid") are left out
+            # because the token may become acceptable later.
+            if not isinstance(e.__cause__, JWTClaimsError):
+                await token_cache.cache_rejection(token, e.detail)
+            raise
+
+        # Profile already cached (written through at login, or cached for
+        # another of the user's tokens): only the token reference is missing
+        user_data = await token_cache.get_user_profile(user_id)
+        if user_data is not None:
+            await token_cache.cache_token_reference(token, user_data, expires_at=expires_at)
+            return user_data, None
+
+        lock_held = False
+        if settings.token_cache_fill_lock_enabled:
+            lock_held = await token_cache.acquire_fill_lock(
+                token, settings.token_cache_fill_lock_ttl_ms
+            )
+            if not lock_held:
+                # Another worker is loading this token - wait for its cache write
+                user_data = await token_cache.wait_for_fill(
+                    token, settings.token_cache_fill_lock_ttl_ms / 1000
+                )
+                if user_data is not None:
+                    return user_data, None
+
+        try:
+            async with session_scope() as session:
+                user = await _load_and_cache_user(session, token, user_id, expires_at)
+                return serialize_user(user), user
+        finally:
+            if lock_held:
+                await token_cache.release_fill_lock(token)
+
+    (user_data, user), shared = await _user_loads.do(token_cache._get_cache_key(token), load)
+    return dict(user_data), user, shared
+
+
+async def _merge_cached_user(session: AsyncSession, user_data: dict) -> User:
+    """Rebuild a User from cached data and attach it to ``session``."""
+    from datetime import datetime
+
+    # The binary cache format decodes timestamps directly; entries written
+    # as JSON still carry ISO-8601 strings
+    for field in ("created_at", "updated_at"):
+        if isinstance(user_data[field], str):
+            user_data[field] = datetime.fromisoformat(user_data[field])
+
+    user = User(**user_data)
+    # Merge the user into the session to handle state correctly (avoids INSERT on commit)
+    with span("auth.merge_user"):
+        return await session.merge(user)
+
+
+def serialize_user(user: User) -> dict:
+    """Serialize user attributes for the token cache (no relationships)."""
+    return {
+        "id": user.id,
+        "email": user.email,
+        "name": user.name,
+        "avatar_url": user.avatar_url,
+        "oauth_provider": user.oauth_provider,
+        "oauth_id": user.oauth_id,
+        "created_at": user.created_at,
+        "updated_at": user.updated_at,
+    }
+
+
+def _decode_claims(token: str) -> tuple[str, int | None]:
+    """
+    Verify the JWT and return its "sub" and "exp" claims.
+
+    Returns:
+        tuple: (user_id, expires_at), ``expires_at`` None if the token has no exp
+
+    Raises:
+        HTTPException: 401 if the token is invalid or has no subject
+    """
     try:
         # Decode and verify JWT token
-        # - Validates signature using NEXTAUTH_SECRET
+        # - Validates signature using NEXTAUTH_SECRET (HS256 only, per CCS)
         # - Checks expiration time (exp claim)
         # - Verifies token integrity
-        payload = jwt.decode(
-            token,
-            settings.nextauth_secret,
-            algorithms=["HS256"],  # Only HS256 allowed per CCS
-        )
+        # Shares the verified-claims memo with app.core.security
+        with span("auth.jwt_decode"), timed("jwt"):
+            payload = decode_jwt_token(token)
 
         # Extract user ID from "sub" claim
         # NextAuth.js encodes the user ID in the "sub" (subject) claim
         user_id: str = payload.get("sub")
 
         if user_id is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid authentication token: missing subject claim",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
+            raise _unauthorized("Invalid authentication token: missing subject claim")
 
     except JWTError as e:
         # Catches all JWT-related errors:
@@ -127,45 +388,45 @@ async def get_current_user(
         # - Expired token
         # - Malformed token
         # - Invalid claims
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail=f"Invalid authentication token: {str(e)}",
-            headers={"WWW-Authenticate": "Bearer"},
-        ) from e
+        raise _unauthorized(f"Invalid authentication token: {str(e)}") from e
 
-    # ============================================
-    # User Database Verification
-    # ============================================
+    expires_at = payload.get("exp")
+    return user_id, int(expires_at) if expires_at is not None else None
+
+
+def _unauthorized(detail: str) -> HTTPException:
+    """Build the 401 response raised for every authentication failure."""
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+async def _load_and_cache_user(
+    session: AsyncSession, token: str, user_id: str, expires_at: int | None = None
+) -> User:
+    """
+    Fetch the user for a verified token and cache it for later requests.
+
+    Raises:
+        HTTPException: 401 if the user no longer exists
+    """
     # Fetch the user from the database using the extracted user_id
     # This ensures the user still exists and hasn't been deleted
-    user = await session.get(User, user_id)
+    with span("auth.load_user"):
+        user = await session.get(User, user_id)
 
     if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise _unauthorized("User not found")
 
     # ============================================
     # Cache User Data for Future Requests
     # ============================================
     # Cache the validated user data to speed up subsequent requests
-    # Serialize user attributes (avoid circular references from relationships)
-    user_data = {
-        "id": user.id,
-        "email": user.email,
-        "name": user.name,
-        "avatar_url": user.avatar_url,
-        "oauth_provider": user.oauth_provider,
-        "oauth_id": user.oauth_id,
-        "created_at": user.created_at.isoformat(),
-        "updated_at": user.updated_at.isoformat(),
-    }
-
-    # Cache with 15 minute TTL (typical JWT expiry)
-    await token_cache.cache_user_data(token, user_data, ttl_seconds=900)
+    # Cache with 15 minute TTL, never past the token's own expiry
+    await token_cache.cache_user_data(
+        token, serialize_user(user), ttl_seconds=900, expires_at=expires_at
+    )
 
-    # Return the authenticated User ORM object
-    # Endpoints can now access user.id, user.email, etc.
     return user
@@ -5,15 +5,110 @@
 # Provides 25x performance improvement with 90% DB load reduction
 # ============================================
 
+import asyncio
+import contextlib
+import hashlib
 import json
 import logging
+import os
+import socket
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
 
 import redis.asyncio as aioredis
 
 from app.core.config import settings
+from app.core.metrics import (
+    LATENCY_BUCKETS_MS,
+    SIZE_BUCKETS_BYTES,
+    MetricGroup,
+    Timer,
+    merge_snapshots,
+    summarize_histogram,
+)
+from app.core.redis_manager import is_connection_failure, redis_manager
+from app.core.serialization import (
+    REJECTED_TOKEN_PREFIX,
+    USER_REFERENCE_PREFIX,
+    decode_user_reference,
+    encode_user_reference,
+    get_cache_serializer,
+)
+from app.core.shared_memory import open_shared_table, tag_for
 
 logger = logging.getLogger(__name__)
 
+# Redis hash of per-worker metric snapshots (field: worker id)
+METRICS_KEY = "token_cache:metrics"
+
+# Snapshots older than this many report intervals belong to dead workers
+METRICS_STALE_INTERVALS = 3
+
+
+class LocalTTLCache:
+    """
+    Bounded in-process LRU cache with per-entry expiry.
+
+    Used as the L1 tier in front of Redis. Entries are evicted when they
+    expire or when the cache grows past ``max_size`` (least recently used
+    first). Not thread-safe; intended for use from a single event loop.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum number of entries kept in memory
+            ttl_seconds: Default time-to-live for new entries
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: str) -> Any | None:
+        """Return the cached value, or None if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl_seconds: float | None = None) -> None:
+        """Store a value, evicting the least recently used entry if full."""
+        ttl = self.ttl_seconds if ttl_seconds is None else min(ttl_seconds, self.ttl_seconds)
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> bool:
+        """Remove a key. Returns True if it was present."""
+        return self._entries.pop(key, None) is not None
+
+    def delete_where(self, predicate: Callable[[Any], bool]) -> int:
+        """Remove every entry whose value matches ``predicate``."""
+        keys = [key for key, (_, value) in self._entries.items() if predicate(value)]
+        for key in keys:
+            del self._entries[key]
+        return len(keys)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
 
 class TokenCache:
     """
@@ -26,10 +121,34 @@ class TokenCache:
     - Automatic expiration aligned with JWT expiry
 
     Cache Strategy:
+    - L1: bounded in-process LRU/TTL cache (no network round trip)
+    - Host tier (SHARED_MEMORY_ENABLED): serialized entries in shared
+      memory, so the workers on one host fill and reuse one copy; same TTL
+      cap and invalidations as L1
+    - L2: Redis, shared by all workers and pods
     - Key: SHA256 hash of JWT token
-    - Value: JSON-serialized user data
-    - TTL: 15 minutes (typical JWT expiry)
-    - Invalidation: Automatic via Redis TTL
+    - Value: a small reference to the user id (normalized layout); the
+      profile is stored once per user under ``user:{id}`` as a compact
+      versioned binary record (JSON also supported) and written through
+      by the /users upsert, so N tokens never mean N stale copies
+    - TTL: 15 minutes, never past the token's "exp" claim; L1 capped at a
+      few seconds. Profiles live TOKEN_CACHE_PROFILE_TTL_SECONDS
+    - Negative cache: tokens that failed JWT validation are remembered for
+      a short TTL under the same key (marker-prefixed value) and in a
+      separate bounded L1, so retrying a bad token costs one lookup
+    - Per-user index: a Redis set of the token hashes cached for each user,
+      so invalidating a user never scans the keyspace
+    - Cluster-safe layout: a user's profile and index share the user's hash
+      tag; nothing else needs two keys in one transaction
+    - Invalidation: Automatic via Redis TTL, explicit invalidations are
+      broadcast over Redis pub/sub so every worker evicts its L1 copy
+
+    Metrics:
+    - Each worker counts its own hits (L1 / Redis), misses, negative-cache
+      rejections, profile lookups and errors, and records Redis get/set
+      latency and payload size histograms
+    - Snapshots are reported to a Redis hash so get_cache_stats() can show
+      totals across every worker and pod
 
     Security Notes:
     - Tokens are hashed before use as cache keys
@@ -42,29 +161,74 @@ class TokenCache:
         """Initialize token cache with Redis connection."""
         self.redis_client: aioredis.Redis | None = None
         self._initialized = False
+        self.local_cache: LocalTTLCache | None = (
+            LocalTTLCache(settings.token_cache_l1_max_size, settings.token_cache_l1_ttl_seconds)
+            if settings.token_cache_l1_enabled
+            else None
+        )
+        # Separate, bounded tier for rejected tokens so a flood of bad tokens
+        # can never evict valid users from the L1 cache
+        self.negative_cache: LocalTTLCache | None = (
+            LocalTTLCache(
+                settings.token_cache_negative_l1_max_size,
+                settings.token_cache_negative_ttl_seconds,
+            )
+            if settings.token_cache_negative_enabled
+            else None
+        )
+        self.shared_cache = (
+            open_shared_table(
+                f"{settings.shared_memory_namespace}-token-cache",
+                slots=settings.token_cache_shared_slots,
+                value_size=settings.token_cache_shared_value_bytes,
+                directory=settings.shared_memory_dir,
+                stripes=settings.shared_memory_lock_stripes,
+            )
+            if settings.shared_memory_enabled
+            else None
+        )
+        self._listener_task: asyncio.Task | None = None
+        self._metrics_task: asyncio.Task | None = None
+        self.metrics = MetricGroup(
+            counters=(
+                "l1_hits",
+                "shared_hits",
+                "redis_hits",
+                "misses",
+                "errors",
+                "sets",
+                "negative_l1_hits",
+                "negative_redis_hits",
+                "negative_sets",
+                "profile_hits",
+                "profile_misses",
+            ),
+            histograms={
+                "get_latency_ms": LATENCY_BUCKETS_MS,
+                "set_latency_ms": LATENCY_BUCKETS_MS,
+                "payload_bytes": SIZE_BUCKETS_BYTES,
+            },
+        )
+        self.serializer = get_cache_serializer(settings.token_cache_serializer)
 
     async def _ensure_connection(self):
         """
-        Ensure Redis connection is established.
-        Lazy initialization to avoid blocking app startup.
+        Ensure a Redis client is available.
+
+        The client comes from the shared, lifespan-managed Redis manager.
+        While Redis is down this returns quickly with no client; the manager
+        reconnects with backoff and caching resumes on its own.
         """
-        if not self._initialized:
-            try:
-                self.redis_client = aioredis.from_url(
-                    settings.redis_url,
-                    encoding="utf-8",
-                    decode_responses=True,
-                    socket_connect_timeout=5,
-                    socket_timeout=5,
-                )
-                # Test connection
-                await self.redis_client.ping()
-                self._initialized = True
-                logger.info("✓ Token cache initialized with Redis connection")
-            except Exception as e:
-                logger.error(f"❌ Failed to connect to Redis for token caching: {e}")
-                self.redis_client = None
-                self._initialized = True
+        if self.redis_client is None:
+            self.redis_client = await redis_manager.get_client("cache")
+            self._initialized = True
+
+    def _handle_redis_error(self, error: Exception) -> None:
+        """Count the error; drop the client and notify the manager if Redis is unreachable."""
+        self.metrics.counters["errors"].inc()
+        if is_connection_failure(error):
+            self.redis_client = None
+            redis_manager.report_failure("cache", error)
 
     async def get_user_from_cache(self, token: str) -> dict | None:
         """
@@ -74,62 +238,153 @@ class TokenCache:
             token: JWT token string
 
         Returns:
-            Optional[dict]: User data if cached, None otherwise
+            Optional[dict]: User data if cached, None otherwise (including
+            when the token is in the negative cache)
+        """
+        user_data, _ = await self.lookup_token(token)
+        return user_data
+
+    async def lookup_token(self, token: str) -> tuple[dict | None, str | None]:
+        """
+        Look a token up in the positive and negative caches.
+
+        Both kinds of entry share the token's cache key, so a single Redis
+        GET answers "known user", "known bad token" or "unknown".
+
+        Args:
+            token: JWT token string
+
+        Returns:
+            tuple: (user_data, rejection). ``user_data`` is the cached user
+            on a hit; ``rejection`` is the cached 401 detail when the token
+            was recently rejected. Both None on a miss.
         """
+        # Create cache key from token hash
+        cache_key = self._get_cache_key(token)
+
+        # L1 lookup first - avoids the Redis round trip entirely
+        if self.local_cache is not None:
+            local_data = self.local_cache.get(cache_key)
+            if local_data is not None:
+                self.metrics.counters["l1_hits"].inc()
+                return dict(local_data), None
+
+        if self.negative_cache is not None:
+            rejection = self.negative_cache.get(cache_key)
+            if rejection is not None:
+                self.metrics.counters["negative_l1_hits"].inc()
+                return None, rejection
+
+        shared_data = self._get_shared(cache_key)
+        if shared_data is not None:
+            self.metrics.counters["shared_hits"].inc()
+            return dict(shared_data), None
+
         await self._ensure_connection()
 
         if not self.redis_client:
-            return None
+            return None, None
 
         try:
-            # Create cache key from token hash
-            cache_key = self._get_cache_key(token)
+            # Resolve the token entry, then the shared profile it points at
+            # (timed including decode)
+            rejection = None
+            expires_at = None
+            with Timer(self.metrics.histograms["get_latency_ms"]):
+                cached_data = await self.redis_client.get(cache_key)
+                if not cached_data:
+                    user_data = None
+                elif cached_data[:1] == REJECTED_TOKEN_PREFIX:
+                    user_data = None
+                    rejection = cached_data[1:].decode()
+                elif cached_data[:1] == USER_REFERENCE_PREFIX:
+                    user_id, expires_at = decode_user_reference(cached_data)
+                    profile = await self.redis_client.get(self._get_profile_key(user_id))
+                    user_data = self.serializer.loads(profile) if profile else None
+                else:
+                    # Full per-token copy written before the normalized layout
+                    user_data = self.serializer.loads(cached_data)
 
-            # Retrieve from cache
-            cached_data = await self.redis_client.get(cache_key)
+            if rejection is not None:
+                logger.debug(f"Negative cache hit for token (key: {cache_key[:16]}...)")
+                self.metrics.counters["negative_redis_hits"].inc()
+                if self.negative_cache is not None:
+                    self.negative_cache.set(cache_key, rejection)
+                return None, rejection
 
-            if cached_data:
+            if user_data is not None:
                 logger.debug(f"Cache hit for token (key: {cache_key[:16]}...)")
-                return json.loads(cached_data)
+                self.metrics.counters["redis_hits"].inc()
+                self._store_local(cache_key, user_data, _seconds_until(expires_at))
+                return dict(user_data), None
 
             logger.debug(f"Cache miss for token (key: {cache_key[:16]}...)")
-            return None
+            self.metrics.counters["misses"].inc()
+            return None, None
 
         except Exception as e:
+            self._handle_redis_error(e)
             logger.error(f"Error retrieving from token cache: {e}", exc_info=True)
-            return None
+            return None, None
 
     async def cache_user_data(
         self,
         token: str,
         user_data: dict,
         ttl_seconds: int = 900,  # 15 minutes
+        expires_at: int | None = None,
     ) -> bool:
         """
         Cache user data for a token.
 
+        User records (dicts with an "id") are stored normalized: the shared
+        ``user:{id}`` profile entry is written and the token gets a small
+        reference to it. Other dicts are stored whole under the token key.
+
         Args:
             token: JWT token string
-            user_data: User data to cache (must be JSON-serializable)
-            ttl_seconds: Time-to-live in seconds (default: 900 = 15 minutes)
+            user_data: User data to cache (user record, or any JSON-serializable dict)
+            ttl_seconds: Maximum time-to-live in seconds (default: 900 = 15 minutes)
+            expires_at: The token's "exp" claim; the entry never outlives it
 
         Returns:
             bool: True if cached successfully, False otherwise
         """
+        # Create cache key from token hash
+        cache_key = self._get_cache_key(token)
+        ttl_seconds = _bounded_ttl(ttl_seconds, expires_at)
+        if ttl_seconds <= 0:
+            return False
+
+        self._store_local(cache_key, dict(user_data), ttl_seconds)
+
         await self._ensure_connection()
 
         if not self.redis_client:
             return False
 
         try:
-            # Create cache key from token hash
-            cache_key = self._get_cache_key(token)
+            with Timer(self.metrics.histograms["set_latency_ms"]):
+                # Serialize user data
+                cached_value = self.serializer.dumps(user_data)
 
-            # Serialize user data
-            cached_value = json.dumps(user_data, default=str)
+                user_id = user_data.get("id")
+                if user_id is None:
+                    await self.redis_client.setex(cache_key, ttl_seconds, cached_value)
+                else:
+                    pipe = self.redis_client.pipeline(transaction=False)
+                    pipe.set(
+                        self._get_profile_key(str(user_id)),
+                        cached_value,
+                        ex=settings.token_cache_profile_ttl_seconds,
+                    )
+                    self._queue_token_reference(
+                        pipe, cache_key, str(user_id), ttl_seconds, expires_at
+                    )
+                    await pipe.execute()
 
-            # Store in cache with expiration
-            await self.redis_client.setex(cache_key, ttl_seconds, cached_value)
+            self.metrics.counters["sets"].inc()
+            self.metrics.histograms["payload_bytes"].observe(len(cached_value))
 
             logger.debug(
                 f"Cached user data for token (key: {cache_key[:16]}..., ttl: {ttl_seconds}s)"
@@ -137,9 +392,216 @@ class TokenCache:
             return True
 
         except Exception as e:
+            self._handle_redis_error(e)
             logger.error(f"Error caching user data: {e}", exc_info=True)
             return False
 
+    async def cache_token_reference(
+        self,
+        token: str,
+        user_data: dict,
+        ttl_seconds: int = 900,
+        expires_at: int | None = None,
+    ) -> bool:
+        """
+        Point a token at a user profile that is already cached.
+
+        Used when a new token's user was found via get_user_profile, so
+        only the small token -> user reference is written.
+
+        Args:
+            token: JWT token string
+            user_data: The cached user record (kept locally; must have an "id")
+            ttl_seconds: Maximum time-to-live in seconds
+            expires_at: The token's "exp" claim; the entry never outlives it
+
+        Returns:
+            bool: True if cached successfully, False otherwise
+        """
+        cache_key = self._get_cache_key(token)
+        ttl_seconds = _bounded_ttl(ttl_seconds, expires_at)
+        if ttl_seconds <= 0:
+            return False
+
+        self._store_local(cache_key, dict(user_data), ttl_seconds)
+
+        await self._ensure_connection()
+
+        if not self.redis_client:
+            return False
+
+        try:
+            with Timer(self.metrics.histograms["set_latency_ms"]):
+                pipe = self.redis_client.pipeline(transaction=False)
+                self._queue_token_reference(
+                    pipe, cache_key, str(user_data["id"]), ttl_seconds, expires_at
+                )
+                await pipe.execute()
+
+            self.metrics.counters["sets"].inc()
+            return True
+
+        except Exception as e:
+            self._handle_redis_error(e)
+            logger.error(f"Error caching token reference: {e}", exc_info=True)
+            return False
+
+    def _queue_token_reference(
+        self,
+        pipe,
+        cache_key: str,
+        user_id: str,
+        ttl_seconds: int,
+        expires_at: int | None,
+    ) -> None:
+        """
+        Queue the token -> user reference and its per-user index entry.
+
+        The token key and the user's keys live in different cluster slots,
+        so this is a plain pipeline rather than a transaction. The index is
+        written first: if the pipeline is cut short, a reference can never
+        exist without an index entry that invalidate_user_tokens will find.
+        """
+        # The index lives at least as long as its newest entry:
+        # NX sets a TTL on a fresh set, GT only ever extends it.
+        index_key = self._get_user_index_key(user_id)
+        pipe.sadd(index_key, self._get_token_hash(cache_key))
+        pipe.expire(index_key, ttl_seconds, nx=True)
+        pipe.expire(index_key, ttl_seconds, gt=True)
+        pipe.setex(cache_key, ttl_seconds, encode_user_reference(user_id, expires_at))
+
+    # ============================================
+    # Shared User Profiles
+    # ============================================
+    async def get_user_profile(self, user_id: str) -> dict | None:
+        """
+        Read a user's shared profile entry.
+
+        Lets a request with a not-yet-cached token skip the database when
+        the user's profile is already cached (e.g. written through at login).
+
+        Args:
+            user_id: User ID (the token's "sub" claim)
+
+        Returns:
+            Optional[dict]: User record if cached, None otherwise
+        """
+        await self._ensure_connection()
+
+        if not self.redis_client:
+            return None
+
+        try:
+            with Timer(self.metrics.histograms["get_latency_ms"]):
+                profile = await self.redis_client.get(self._get_profile_key(user_id))
+                user_data = self.serializer.loads(profile) if profile else None
+
+            self.metrics.counters["profile_hits" if user_data else "profile_misses"].inc()
+            return user_data
+
+        except Exception as e:
+            self._handle_redis_error(e)
+            logger.error(f"Error retrieving user profile from cache: {e}", exc_info=True)
+            return None
+
+    async def cache_user_profile(self, user_data: dict) -> bool:
+        """
+        Write a user's profile through to the cache.
+
+        Called on every login and whenever the user row changes. Every token
+        that references the user sees the new profile on its next lookup; L1
+        copies are evicted in this and every other worker - unless the
+        stored profile was already identical (the common login case), when
+        the write only refreshes its TTL.
+
+        Args:
+            user_data: User record (must have an "id")
+
+        Returns:
+            bool: True if cached successfully, False otherwise
+        """
+        user_id = str(user_data["id"])
+
+        await self._ensure_connection()
+
+        if not self.redis_client:
+            self._evict_local_user(user_id)
+            return False
+
+        try:
+            with Timer(self.metrics.histograms["set_latency_ms"]):
+                cached_value = self.serializer.dumps(user_data)
+                # GET returns the previous value in the same round trip
+                previous = await self.redis_client.set(
+                    self._get_profile_key(user_id),
+                    cached_value,
+                    ex=settings.token_cache_profile_ttl_seconds,
+                    get=True,
+                )
+
+            self.metrics.counters["sets"].inc()
+            self.metrics.histograms["payload_bytes"].observe(len(cached_value))
+            if previous != cached_value:
+                self._evict_local_user(user_id)
+                await self._publish_invalidation({"scope": "user", "user_id": user_id})
+            return True
+
+        except Exception as e:
+            self._handle_redis_error(e)
+            self._evict_local_user(user_id)
+            logger.error(f"Error caching user profile: {e}", exc_info=True)
+            return False
+
+    def is_rejected_locally(self, token: str) -> bool:
+        """
+        Whether this worker's negative cache holds the token (no I/O).
+
+        Lets the rate limiter skip verifying a token that auth already
+        rejected, before the full lookup_token runs.
+        """
+        return (
+            self.negative_cache is not None
+            and self.negative_cache.get(self._get_cache_key(token)) is not None
+        )
+
+    async def cache_rejection(self, token: str, detail: str) -> bool:
+        """
+        Remember that a token failed validation.
+
+        Later requests with the same token are rejected from the cache
+        instead of re-verifying the JWT signature. Entries are short-lived
+        (TOKEN_CACHE_NEGATIVE_TTL_SECONDS) and never overwrite a cached user.
+
+        Args:
+            token: JWT token string
+            detail: The 401 detail to return for this token
+
+        Returns:
+            bool: True if stored in Redis, False otherwise
+        """
+        if self.negative_cache is None:
+            return False
+
+        cache_key = self._get_cache_key(token)
+        ttl_seconds = settings.token_cache_negative_ttl_seconds
+        self.negative_cache.set(cache_key, detail)
+        self.metrics.counters["negative_sets"].inc()
+
+        await self._ensure_connection()
+
+        if not self.redis_client:
+            return False
+
+        try:
+            await self.redis_client.set(
+                cache_key, REJECTED_TOKEN_PREFIX + detail.encode(), ex=ttl_seconds, nx=True
+            )
+            return True
+        except Exception as e:
+            self._handle_redis_error(e)
+            logger.warning(f"Error caching token rejection: {e}")
+            return False
+
     async def invalidate_token(self, token: str) -> bool:
         """
         Invalidate a cached token.
@@ -150,14 +612,17 @@ class TokenCache:
         Returns:
             bool: True if invalidated successfully, False otherwise
         """
+        cache_key = self._get_cache_key(token)
+        self._evict_local_key(cache_key)
+
         await self._ensure_connection()
 
         if not self.redis_client:
             return False
 
         try:
-            cache_key = self._get_cache_key(token)
             result = await self.redis_client.delete(cache_key)
+            await self._publish_invalidation({"scope": "token", "key": cache_key})
 
             if result:
                 logger.debug(f"Invalidated token cache (key: {cache_key[:16]}...)")
@@ -165,6 +630,7 @@ class TokenCache:
             return bool(result)
 
         except Exception as e:
+            self._handle_redis_error(e)
             logger.error(f"Error invalidating token cache: {e}", exc_info=True)
             return False
 
@@ -180,22 +646,30 @@ class TokenCache:
         Returns:
             int: Number of tokens invalidated
         """
+        self._evict_local_user(user_id)
+
         await self._ensure_connection()
 
         if not self.redis_client:
             return 0
 
         try:
-            # Pattern to match all user tokens
-            pattern = f"token_cache:user:{user_id}:*"
+            # Read and drop the user's token index atomically, then delete the
+            # entries it points at. Cost depends only on this user's tokens,
+            # never on the size of the Redis keyspace.
+            # The shared profile goes too, so the next login reloads it
+            # (index and profile share the user's hash tag, so this
+            # transaction stays on one cluster slot)
+            index_key = self._get_user_index_key(user_id)
+            pipe = self.redis_client.pipeline(transaction=True)
+            pipe.smembers(index_key)
+            pipe.delete(index_key, self._get_profile_key(user_id))
+            token_hashes, _ = await pipe.execute()
 
-            # Find all matching keys
-            keys = []
-            async for key in self.redis_client.scan_iter(match=pattern, count=100):
-                keys.append(key)
+            await self._publish_invalidation({"scope": "user", "user_id": user_id})
 
-            # Delete all keys
-            if keys:
+            if token_hashes:
+                keys = [f"token_cache:{_as_str(token_hash)}" for token_hash in token_hashes]
                 count = await self.redis_client.delete(*keys)
                 logger.info(f"Invalidated {count} cached tokens for user {user_id}")
                 return count
@@ -203,9 +677,74 @@ class TokenCache:
             return 0
 
         except Exception as e:
+            self._handle_redis_error(e)
             logger.error(f"Error invalidating user tokens: {e}", exc_info=True)
             return 0
 
+    # ============================================
+    # Cross-Worker Fill Lock
+    # ============================================
+    async def acquire_fill_lock(self, token: str, ttl_ms: int) -> bool:
+        """
+        Try to become the worker that fills the cache for a token.
+
+        Uses SET NX PX so the lock frees itself if the holder dies.
+
+        Args:
+            token: JWT token string
+            ttl_ms: Lock lifetime in milliseconds
+
+        Returns:
+            bool: True if this worker should load the user (lock acquired or
+            Redis unavailable), False if another worker holds the lock
+        """
+        await self._ensure_connection()
+
+        if not self.redis_client:
+            return True
+
+        try:
+            acquired = await self.redis_client.set(
+                self._get_lock_key(token), "1", nx=True, px=ttl_ms
+            )
+            return bool(acquired)
+        except Exception as e:
+            self._handle_redis_error(e)
+            logger.warning(f"Error acquiring token cache fill lock: {e}")
+            return True
+
+    async def release_fill_lock(self, token: str) -> None:
+        """Release a fill lock taken with acquire_fill_lock."""
+        if not self.redis_client:
+            return
+
+        try:
+            await self.redis_client.delete(self._get_lock_key(token))
+        except Exception as e:
+            logger.warning(f"Error releasing token cache fill lock: {e}")
+
+    async def wait_for_fill(
+        self, token: str, timeout_seconds: float, poll_interval: float = 0.025
+    ) -> dict | None:
+        """
+        Poll the cache while another worker fills it.
+
+        Args:
+            token: JWT token string
+            timeout_seconds: Give up after this long
+            poll_interval: Delay between lookups
+
+        Returns:
+            Optional[dict]: User data once cached, None on timeout
+        """
+        deadline = time.monotonic() + timeout_seconds
+        while time.monotonic() < deadline:
+            await asyncio.sleep(poll_interval)
+            user_data = await self.get_user_from_cache(token)
+            if user_data is not None:
+                return user_data
+        return None
+
     def _get_cache_key(self, token: str) -> str:
         """
         Generate cache key from token.
@@ -221,43 +760,363 @@ class TokenCache:
         Returns:
             str: Cache key
         """
-        import hashlib
-
         token_hash = hashlib.sha256(token.encode()).hexdigest()
         return f"token_cache:{token_hash}"
 
-    async def get_cache_stats(self) -> dict:
+    def _get_lock_key(self, token: str) -> str:
+        """Generate the fill-lock key for a token."""
+        return f"token_cache:lock:{self._get_token_hash(self._get_cache_key(token))}"
+
+    @staticmethod
+    def _get_token_hash(cache_key: str) -> str:
+        """Return the token hash portion of a cache key."""
+        return cache_key.removeprefix("token_cache:")
+
+    @staticmethod
+    def _get_profile_key(user_id: str) -> str:
+        """Generate the key of a user's shared profile entry (hash-tagged by user)."""
+        return f"user:{{{user_id}}}"
+
+    @staticmethod
+    def _get_user_index_key(user_id: str) -> str:
         """
-        Get cache statistics for monitoring.
+        Generate the key of the per-user token index.
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            str: Key of the Redis set holding the user's cached token hashes
+            (same hash tag as the profile, so both share a cluster slot)
+        """
+        return f"token_cache:user:{{{user_id}}}"
+
+    # ============================================
+    # Local Tiers (L1 and shared memory)
+    # ============================================
+    @property
+    def _has_local_tiers(self) -> bool:
+        """True if this worker keeps copies that invalidations must evict."""
+        return self.local_cache is not None or self.shared_cache is not None
+
+    def _get_shared(self, cache_key: str) -> dict | None:
+        """Read an entry from the shared-memory tier, promoting it to L1."""
+        if self.shared_cache is None:
+            return None
+
+        entry = self.shared_cache.get(cache_key)
+        if entry is None:
+            return None
+        raw, ttl_seconds = entry
+        try:
+            user_data = self.serializer.loads(raw)
+        except ValueError:
+            self.shared_cache.delete(cache_key)
+            return None
+
+        if self.local_cache is not None:
+            self.local_cache.set(cache_key, user_data, ttl_seconds=ttl_seconds)
+        return user_data
+
+    def _store_local(self, cache_key: str, user_data: dict, ttl_seconds: float | None) -> None:
+        """Keep an entry in L1 and the shared-memory tier, both capped at the L1 TTL."""
+        if self.local_cache is not None:
+            self.local_cache.set(cache_key, user_data, ttl_seconds=ttl_seconds)
+
+        if self.shared_cache is not None:
+            ttl = settings.token_cache_l1_ttl_seconds
+            if ttl_seconds is not None:
+                ttl = min(ttl, ttl_seconds)
+            user_id = user_data.get("id")
+            self.shared_cache.set(
+                cache_key,
+                self.serializer.dumps(user_data),
+                ttl,
+                tag=0 if user_id is None else tag_for(str(user_id)),
+            )
+
+    def _evict_local_key(self, cache_key: str) -> None:
+        """Drop one entry from L1 and the shared-memory tier."""
+        if self.local_cache is not None:
+            self.local_cache.delete(cache_key)
+        if self.shared_cache is not None:
+            self.shared_cache.delete(cache_key)
+
+    def _evict_local_user(self, user_id: str) -> int:
+        """Drop every L1 and shared-memory entry that belongs to ``user_id``."""
+        removed = 0
+        if self.shared_cache is not None:
+            removed += self.shared_cache.delete_tagged(tag_for(str(user_id)))
+        if self.local_cache is not None:
+            removed += self.local_cache.delete_where(
+                lambda data: str(data.get("id")) == str(user_id)
+            )
+        return removed
+
+    def _clear_local(self) -> None:
+        """Drop every L1 and shared-memory entry."""
+        if self.local_cache is not None:
+            self.local_cache.clear()
+        if self.shared_cache is not None:
+            self.shared_cache.clear()
+
+    # ============================================
+    # Cross-Worker L1 Invalidation (Redis Pub/Sub)
+    # ============================================
+    async def _publish_invalidation(self, message: dict) -> None:
+        """
+        Broadcast an invalidation so other workers evict their L1 copies.
+
+        Failures are logged and swallowed: L1 entries expire on their own
+        within ``token_cache_l1_ttl_seconds`` even if a message is lost.
+        """
+        if not self._has_local_tiers or not self.redis_client:
+            return
+
+        try:
+            await self.redis_client.publish(
+                settings.token_cache_invalidation_channel, json.dumps(message)
+            )
+        except Exception as e:
+            logger.warning(f"Failed to publish token cache invalidation: {e}")
+
+    def _handle_invalidation(self, raw_message: str | bytes) -> None:
+        """Apply an invalidation message received from the pub/sub channel."""
+        if not self._has_local_tiers:
+            return
+
+        try:
+            message = json.loads(raw_message)
+        except (TypeError, ValueError):
+            logger.warning("Ignoring malformed token cache invalidation message")
+            return
+
+        if message.get("scope") == "token" and message.get("key"):
+            self._evict_local_key(message["key"])
+        elif message.get("scope") == "user" and message.get("user_id"):
+            self._evict_local_user(message["user_id"])
+
+    async def start_invalidation_listener(self) -> None:
+        """
+        Start the background task that listens for L1 invalidations.
+
+        Called once per worker from the application lifespan. The task keeps
+        resubscribing while Redis is unavailable.
+        """
+        if not self._has_local_tiers or self._listener_task is not None:
+            return
+
+        self._listener_task = asyncio.create_task(self._listen_for_invalidations())
+
+    async def stop_invalidation_listener(self) -> None:
+        """Cancel the invalidation listener task, if running."""
+        if self._listener_task is None:
+            return
+
+        self._listener_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._listener_task
+        self._listener_task = None
+
+    async def _listen_for_invalidations(self) -> None:
+        """Consume invalidation messages until cancelled, resubscribing on errors."""
+        while True:
+            await self._ensure_connection()
+            if not self.redis_client:
+                await asyncio.sleep(settings.redis_health_check_interval_seconds)
+                continue
+
+            pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(settings.token_cache_invalidation_channel)
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self._handle_invalidation(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Entries published while disconnected may be missed, so drop
+                # the local tiers rather than serve something already invalidated
+                logger.warning(f"Token cache invalidation listener error: {e}")
+                self._handle_redis_error(e)
+                self._clear_local()
+                await asyncio.sleep(1)
+            finally:
+                with contextlib.suppress(Exception):
+                    await pubsub.aclose()
+
+    # ============================================
+    # Metrics Reporting
+    # ============================================
+    async def start_metrics_reporter(self) -> None:
+        """
+        Start the background task that reports this worker's metrics to Redis.
+
+        Called once per worker from the application lifespan.
+        """
+        if self._metrics_task is not None:
+            return
+
+        self._metrics_task = asyncio.create_task(self._report_metrics_periodically())
+
+    async def stop_metrics_reporter(self) -> None:
+        """Cancel the metrics reporter task, if running."""
+        if self._metrics_task is None:
+            return
+
+        self._metrics_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._metrics_task
+        self._metrics_task = None
+
+    async def _report_metrics_periodically(self) -> None:
+        """Report metrics every interval until cancelled."""
+        while True:
+            await asyncio.sleep(settings.token_cache_metrics_report_interval_seconds)
+            await self.report_metrics()
+
+    async def report_metrics(self) -> bool:
+        """
+        Store this worker's cumulative metric snapshot in Redis.
+
+        Snapshots are cumulative since worker start, so a lost report only
+        delays the numbers; it never loses counts.
 
         Returns:
-            dict: Cache statistics including hit rate, memory usage, etc.
+            bool: True if the snapshot was written
         """
         await self._ensure_connection()
 
         if not self.redis_client:
-            return {"status": "unavailable"}
+            return False
+
+        report = {"reported_at": time.time(), "metrics": self.metrics.snapshot()}
+        # The hash outlives its newest report by the staleness window, so it
+        # disappears on its own once every worker has stopped
+        ttl_seconds = max(
+            1,
+            int(settings.token_cache_metrics_report_interval_seconds * METRICS_STALE_INTERVALS),
+        )
 
         try:
-            info = await self.redis_client.info("stats")
+            pipe = self.redis_client.pipeline(transaction=True)
+            pipe.hset(METRICS_KEY, _worker_id(), json.dumps(report))
+            pipe.expire(METRICS_KEY, ttl_seconds)
+            await pipe.execute()
+            return True
+        except Exception as e:
+            self._handle_redis_error(e)
+            logger.warning(f"Failed to report token cache metrics: {e}")
+            return False
+
+    async def _collect_worker_metrics(self) -> dict[str, dict]:
+        """
+        Read every live worker's latest snapshot from Redis.
+
+        This worker's own entry is replaced with its current in-memory
+        snapshot; entries from workers that stopped reporting are removed.
+        """
+        raw_reports = await self.redis_client.hgetall(METRICS_KEY)
 
-            keyspace_hits = int(info.get("keyspace_hits", 0))
-            keyspace_misses = int(info.get("keyspace_misses", 0))
-            total_requests = keyspace_hits + keyspace_misses
+        stale_before = time.time() - (
+            settings.token_cache_metrics_report_interval_seconds * METRICS_STALE_INTERVALS
+        )
+        worker_id = _worker_id()
+        reports: dict[str, dict] = {}
+        stale: list[str] = []
+        for field, raw_report in raw_reports.items():
+            worker = _as_str(field)
+            try:
+                report = json.loads(raw_report)
+            except (TypeError, ValueError):
+                stale.append(worker)
+                continue
+            if report.get("reported_at", 0) < stale_before:
+                stale.append(worker)
+                continue
+            reports[worker] = report["metrics"]
+
+        if stale:
+            await self.redis_client.hdel(METRICS_KEY, *stale)
 
-            hit_rate = (keyspace_hits / total_requests * 100) if total_requests > 0 else 0
+        reports[worker_id] = self.metrics.snapshot()
+        return reports
 
-            return {
-                "status": "available",
-                "hits": keyspace_hits,
-                "misses": keyspace_misses,
-                "hit_rate_percent": round(hit_rate, 2),
-                "total_requests": total_requests,
-            }
+    async def get_cache_stats(self) -> dict:
+        """
+        Get cache statistics for monitoring.
+
+        Figures come from the token cache's own metrics rather than Redis
+        INFO, which mixes in rate limiter and Celery traffic.
+
+        Returns:
+            dict: Statistics for this worker and, when Redis is reachable,
+            totals across all workers (hit rate, latency and payload size
+            histograms with p50/p95/p99 estimates)
+        """
+        stats = {"worker": _summarize_cache_metrics(self.metrics.snapshot())}
 
+        await self._ensure_connection()
+
+        if not self.redis_client:
+            return {"status": "unavailable", **stats}
+
+        try:
+            reports = await self._collect_worker_metrics()
         except Exception as e:
+            self._handle_redis_error(e)
             logger.error(f"Error getting cache stats: {e}", exc_info=True)
-            return {"status": "error", "error": str(e)}
+            return {"status": "error", "error": str(e), **stats}
+
+        return {
+            "status": "available",
+            **stats,
+            "workers": len(reports),
+            "cluster": _summarize_cache_metrics(merge_snapshots(reports.values())),
+        }
+
+
+def _as_str(value: str | bytes) -> str:
+    """Decode a value read from the binary-safe Redis client."""
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def _seconds_until(expires_at: int | None) -> float | None:
+    """Seconds until a JWT "exp" timestamp, or None if unknown."""
+    return None if expires_at is None else expires_at - time.time()
+
+
+def _bounded_ttl(ttl_seconds: int, expires_at: int | None) -> int:
+    """Cap a TTL so a cache entry never outlives the token's "exp" claim."""
+    remaining = _seconds_until(expires_at)
+    return ttl_seconds if remaining is None else min(ttl_seconds, int(remaining))
+
+
+def _worker_id() -> str:
+    """Identify this worker process (evaluated per call so forked workers differ)."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _summarize_cache_metrics(snapshot: dict) -> dict:
+    """Turn a raw metric snapshot into hit-rate and histogram summaries."""
+    counters = snapshot["counters"]
+    hits = (
+        counters.get("l1_hits", 0) + counters.get("shared_hits", 0) + counters.get("redis_hits", 0)
+    )
+    misses = counters.get("misses", 0)
+    total_requests = hits + misses
+    hit_rate = (hits / total_requests * 100) if total_requests > 0 else 0
+
+    return {
+        **counters,
+        "hits": hits,
+        "total_requests": total_requests,
+        "hit_rate_percent": round(hit_rate, 2),
+        "histograms": {
+            name: summarize_histogram(histogram)
+            for name, histogram in snapshot["histograms"].items()
+        },
+    }
 
 
 # ============================================
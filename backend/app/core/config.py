@@ -5,6 +5,8 @@
 # Follows CCS Section 8.3 (Secret Management)
 # ============================================
 
+import os
+from typing import Literal
 
 from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -22,6 +24,23 @@ class Settings(BaseSettings):
     environment: str = Field(default="development", validation_alias="ENVIRONMENT")
     debug: bool = Field(default=True, validation_alias="DEBUG")
     log_level: str = Field(default="INFO", validation_alias="LOG_LEVEL")
+    # "text": human-readable lines; "json": one JSON object per line with
+    # structured fields (route, status, duration_ms, client, ...)
+    log_format: Literal["text", "json"] = Field(default="text", validation_alias="LOG_FORMAT")
+    # Write logs from a background thread so the event loop never blocks on
+    # stderr or disk I/O
+    log_queue_enabled: bool = Field(default=True, validation_alias="LOG_QUEUE_ENABLED")
+    # Fraction of successful requests whose request/response lines are
+    # logged; errors, slow requests and security events are always logged
+    log_sample_rate: float = Field(default=1.0, ge=0, le=1, validation_alias="LOG_SAMPLE_RATE")
+    # JSON object of per-route-template overrides, e.g. {"/health": 0}
+    log_sample_rates: str = Field(default="", validation_alias="LOG_SAMPLE_RATES")
+    # Requests slower than this are always logged (as warnings)
+    log_slow_request_ms: int = Field(default=1000, ge=0, validation_alias="LOG_SLOW_REQUEST_MS")
+    # How often the per-route counts of unlogged requests are reported
+    log_sampling_summary_interval_seconds: int = Field(
+        default=60, ge=1, validation_alias="LOG_SAMPLING_SUMMARY_INTERVAL_SECONDS"
+    )
 
     # ============================================
     # Database Configuration
@@ -35,6 +54,221 @@ class Settings(BaseSettings):
     # Redis Configuration
     # ============================================
     redis_url: str = Field(..., validation_alias="REDIS_URL")
+    # Optional dedicated servers per role (default: REDIS_URL)
+    redis_cache_url: str | None = Field(default=None, validation_alias="REDIS_CACHE_URL")
+    redis_rate_limit_url: str | None = Field(default=None, validation_alias="REDIS_RATE_LIMIT_URL")
+    # Give cache and rate-limit traffic their own pools even on the same server
+    redis_separate_pools: bool = Field(default=False, validation_alias="REDIS_SEPARATE_POOLS")
+    redis_cache_max_connections: int = Field(
+        default=50, ge=1, validation_alias="REDIS_CACHE_MAX_CONNECTIONS"
+    )
+    redis_rate_limit_max_connections: int = Field(
+        default=50, ge=1, validation_alias="REDIS_RATE_LIMIT_MAX_CONNECTIONS"
+    )
+    # How long a command waits for a free pooled connection when all are in
+    # use; bursts queue briefly instead of failing (exhaustion is not an outage)
+    redis_pool_timeout_seconds: float = Field(
+        default=0.5, gt=0, validation_alias="REDIS_POOL_TIMEOUT_SECONDS"
+    )
+    redis_health_check_interval_seconds: float = Field(
+        default=5.0, gt=0, validation_alias="REDIS_HEALTH_CHECK_INTERVAL_SECONDS"
+    )
+    redis_reconnect_initial_backoff_seconds: float = Field(
+        default=0.5, gt=0, validation_alias="REDIS_RECONNECT_INITIAL_BACKOFF_SECONDS"
+    )
+    redis_reconnect_max_backoff_seconds: float = Field(
+        default=30.0, gt=0, validation_alias="REDIS_RECONNECT_MAX_BACKOFF_SECONDS"
+    )
+
+    # "standalone": one server per role; "cluster": Redis Cluster (the URL points
+    # at any node); "sharded": client-side consistent hashing over REDIS_SHARD_URLS
+    redis_topology: Literal["standalone", "cluster", "sharded"] = Field(
+        default="standalone", validation_alias="REDIS_TOPOLOGY"
+    )
+    redis_shard_urls: str = Field(default="", validation_alias="REDIS_SHARD_URLS")
+
+    @property
+    def redis_shard_urls_list(self) -> list[str]:
+        """Parse REDIS_SHARD_URLS into a list of URLs"""
+        return [url.strip() for url in self.redis_shard_urls.split(",") if url.strip()]
+
+    # ============================================
+    # Shared Memory (host-level tier)
+    # ============================================
+    # Memory-mapped tables shared by every worker process on a host, between
+    # each process's own memory and Redis (token cache, rate limit fallback)
+    shared_memory_enabled: bool = Field(default=False, validation_alias="SHARED_MEMORY_ENABLED")
+    shared_memory_dir: str = Field(default="/dev/shm", validation_alias="SHARED_MEMORY_DIR")
+    # Prefix of the table files; deployments sharing a host need distinct names
+    shared_memory_namespace: str = Field(
+        default="ascend", validation_alias="SHARED_MEMORY_NAMESPACE"
+    )
+    shared_memory_lock_stripes: int = Field(
+        default=64, ge=1, validation_alias="SHARED_MEMORY_LOCK_STRIPES"
+    )
+
+    # ============================================
+    # Token Cache Configuration
+    # ============================================
+    # In-process L1 tier in front of the Redis token cache.
+    # Entries are kept briefly and evicted across workers via Redis pub/sub.
+    token_cache_l1_enabled: bool = Field(default=True, validation_alias="TOKEN_CACHE_L1_ENABLED")
+    token_cache_l1_max_size: int = Field(
+        default=10000, ge=1, validation_alias="TOKEN_CACHE_L1_MAX_SIZE"
+    )
+    token_cache_l1_ttl_seconds: float = Field(
+        default=30.0, gt=0, validation_alias="TOKEN_CACHE_L1_TTL_SECONDS"
+    )
+    # Value encoding: "binary" (compact, default) or "json". Both are always readable.
+    token_cache_serializer: Literal["binary", "json"] = Field(
+        default="binary", validation_alias="TOKEN_CACHE_SERIALIZER"
+    )
+    token_cache_invalidation_channel: str = Field(
+        default="token_cache:invalidate", validation_alias="TOKEN_CACHE_INVALIDATION_CHANNEL"
+    )
+    # Cross-worker fill lock: only one worker verifies and loads a token on a miss
+    token_cache_fill_lock_enabled: bool = Field(
+        default=False, validation_alias="TOKEN_CACHE_FILL_LOCK_ENABLED"
+    )
+    token_cache_fill_lock_ttl_ms: int = Field(
+        default=2000, ge=1, validation_alias="TOKEN_CACHE_FILL_LOCK_TTL_MS"
+    )
+    # Shared per-user profile entries (user:{id}) that token entries point at
+    token_cache_profile_ttl_seconds: int = Field(
+        default=3600, ge=1, validation_alias="TOKEN_CACHE_PROFILE_TTL_SECONDS"
+    )
+    # Negative cache: briefly remember tokens that failed JWT validation
+    token_cache_negative_enabled: bool = Field(
+        default=True, validation_alias="TOKEN_CACHE_NEGATIVE_ENABLED"
+    )
+    token_cache_negative_ttl_seconds: int = Field(
+        default=60, ge=1, validation_alias="TOKEN_CACHE_NEGATIVE_TTL_SECONDS"
+    )
+    token_cache_negative_l1_max_size: int = Field(
+        default=10000, ge=1, validation_alias="TOKEN_CACHE_NEGATIVE_L1_MAX_SIZE"
+    )
+    # Host-level tier between L1 and Redis (needs SHARED_MEMORY_ENABLED)
+    token_cache_shared_slots: int = Field(
+        default=16384, ge=1, validation_alias="TOKEN_CACHE_SHARED_SLOTS"
+    )
+    # Larger serialized profiles skip the shared tier
+    token_cache_shared_value_bytes: int = Field(
+        default=512, ge=64, le=65535, validation_alias="TOKEN_CACHE_SHARED_VALUE_BYTES"
+    )
+    # How often each worker reports its cache metrics to Redis for aggregation
+    token_cache_metrics_report_interval_seconds: float = Field(
+        default=15.0, gt=0, validation_alias="TOKEN_CACHE_METRICS_REPORT_INTERVAL_SECONDS"
+    )
+
+    # ============================================
+    # Metrics Endpoint
+    # ============================================
+    # Prometheus text format at /metrics (request, DB pool, Redis, cache metrics)
+    metrics_enabled: bool = Field(default=True, validation_alias="METRICS_ENABLED")
+    # Comma-separated CIDRs of scrapers allowed to read /metrics, besides
+    # TRUSTED_PROXIES (which includes loopback); everyone else gets a 403
+    metrics_allowed_cidrs: str = Field(default="", validation_alias="METRICS_ALLOWED_CIDRS")
+    # Directory where workers share their metrics (default: <SHARED_MEMORY_DIR>/<namespace>-metrics)
+    metrics_dir: str = Field(default="", validation_alias="METRICS_DIR")
+    # How often each worker writes its metrics for the others
+    metrics_write_interval_seconds: float = Field(
+        default=5.0, gt=0, validation_alias="METRICS_WRITE_INTERVAL_SECONDS"
+    )
+
+    @property
+    def metrics_directory(self) -> str:
+        """Directory shared by the workers for /metrics aggregation."""
+        return self.metrics_dir or os.path.join(
+            self.shared_memory_dir, f"{self.shared_memory_namespace}-metrics"
+        )
+
+    # ============================================
+    # Tracing
+    # ============================================
+    # Record spans (middleware, auth, SQL, Redis, outbound HTTP) and export
+    # one JSON line per trace; trace ids are assigned either way
+    tracing_enabled: bool = Field(default=False, validation_alias="TRACING_ENABLED")
+    tracing_sample_rate: float = Field(
+        default=1.0, ge=0, le=1, validation_alias="TRACING_SAMPLE_RATE"
+    )
+    tracing_exporter: Literal["stdout", "file"] = Field(
+        default="stdout", validation_alias="TRACING_EXPORTER"
+    )
+    tracing_export_path: str = Field(
+        default="/tmp/ascend-traces.jsonl", validation_alias="TRACING_EXPORT_PATH"
+    )
+    # Only export traces at least this slow (0 = all sampled traces)
+    tracing_min_duration_ms: float = Field(
+        default=0, ge=0, validation_alias="TRACING_MIN_DURATION_MS"
+    )
+
+    # ============================================
+    # Server-Timing
+    # ============================================
+    # Add a Server-Timing header (ratelimit, auth-cache, jwt, db, handler,
+    # serialize) to every response; enable in development and staging
+    server_timing_enabled: bool = Field(default=False, validation_alias="SERVER_TIMING_ENABLED")
+    # Key for X-Server-Timing-Token debug tokens, which enable the header for
+    # single requests (empty: tokens are not accepted)
+    server_timing_secret: str = Field(default="", validation_alias="SERVER_TIMING_SECRET")
+
+    # ============================================
+    # Proxies
+    # ============================================
+    # Comma-separated CIDRs of proxies/load balancers whose X-Forwarded-For is
+    # believed. Requests from anywhere else are identified by their peer address.
+    # Loopback only by default: set the real proxy/load balancer CIDRs per
+    # deployment, since anyone in a trusted range can spoof their client IP.
+    trusted_proxies: str = Field(default="127.0.0.0/8,::1", validation_alias="TRUSTED_PROXIES")
+
+    # ============================================
+    # Rate Limiting
+    # ============================================
+    # "gcra": one small value per client/endpoint (default)
+    # "sliding_window": exact log of request timestamps (one entry per request)
+    rate_limit_algorithm: Literal["gcra", "sliding_window"] = Field(
+        default="gcra", validation_alias="RATE_LIMIT_ALGORITHM"
+    )
+    # JSON list of rules (see app/middleware/rate_limit_policy.py); empty = built-in defaults
+    rate_limit_policies: str = Field(default="", validation_alias="RATE_LIMIT_POLICIES")
+    # Hybrid mode: answer clients well below their limit locally and batch counts to Redis
+    rate_limit_batching_enabled: bool = Field(
+        default=False, validation_alias="RATE_LIMIT_BATCHING_ENABLED"
+    )
+    rate_limit_batching_sync_interval_ms: int = Field(
+        default=250, ge=10, validation_alias="RATE_LIMIT_BATCHING_SYNC_INTERVAL_MS"
+    )
+    rate_limit_batching_max_pending: int = Field(
+        default=20, ge=1, validation_alias="RATE_LIMIT_BATCHING_MAX_PENDING"
+    )
+    # Past this fraction of the quota every request is checked against Redis
+    rate_limit_batching_sync_threshold: float = Field(
+        default=0.8, gt=0, le=1, validation_alias="RATE_LIMIT_BATCHING_SYNC_THRESHOLD"
+    )
+    rate_limit_batching_max_keys: int = Field(
+        default=100000, ge=1, validation_alias="RATE_LIMIT_BATCHING_MAX_KEYS"
+    )
+    # Degraded mode: enforce per-worker limits in-process while Redis is unavailable
+    rate_limit_fallback_enabled: bool = Field(
+        default=True, validation_alias="RATE_LIMIT_FALLBACK_ENABLED"
+    )
+    rate_limit_fallback_max_keys: int = Field(
+        default=100000, ge=1, validation_alias="RATE_LIMIT_FALLBACK_MAX_KEYS"
+    )
+    # Comma-separated CIDRs; the most specific match wins. Denied clients get a
+    # 403 before any Redis call, exempt clients skip rate limiting, and allow
+    # carves exceptions out of a broader deny.
+    rate_limit_allow_cidrs: str = Field(default="", validation_alias="RATE_LIMIT_ALLOW_CIDRS")
+    rate_limit_deny_cidrs: str = Field(default="", validation_alias="RATE_LIMIT_DENY_CIDRS")
+    rate_limit_exempt_cidrs: str = Field(default="", validation_alias="RATE_LIMIT_EXEMPT_CIDRS")
+    # Consecutive Redis failures before requests stop calling Redis
+    rate_limit_breaker_failure_threshold: int = Field(
+        default=3, ge=1, validation_alias="RATE_LIMIT_BREAKER_FAILURE_THRESHOLD"
+    )
+    # How often the background probe checks whether Redis is back
+    rate_limit_breaker_probe_interval_seconds: float = Field(
+        default=2.0, gt=0, validation_alias="RATE_LIMIT_BREAKER_PROBE_INTERVAL_SECONDS"
+    )
 
     # ============================================
     # Authentication
@@ -45,6 +279,20 @@ class Settings(BaseSettings):
     google_client_secret: str = Field(..., validation_alias="GOOGLE_CLIENT_SECRET")
     github_client_id: str = Field(..., validation_alias="GITHUB_CLIENT_ID")
     github_client_secret: str = Field(..., validation_alias="GITHUB_CLIENT_SECRET")
+    # In-process memo of verified JWT claims (exp is still checked on every read)
+    jwt_claims_cache_enabled: bool = Field(
+        default=True, validation_alias="JWT_CLAIMS_CACHE_ENABLED"
+    )
+    jwt_claims_cache_max_size: int = Field(
+        default=10000, ge=1, validation_alias="JWT_CLAIMS_CACHE_MAX_SIZE"
+    )
+    # Comma-separated emails allowed to use /api/v1/admin endpoints
+    admin_emails: str = Field(default="", validation_alias="ADMIN_EMAILS")
+
+    @property
+    def admin_emails_list(self) -> list[str]:
+        """Parse ADMIN_EMAILS string into a list of lowercase emails"""
+        return [email.strip().lower() for email in self.admin_emails.split(",") if email.strip()]
 
     @field_validator("nextauth_secret")
     @classmethod
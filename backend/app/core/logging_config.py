@@ -0,0 +1,125 @@
+# ============================================
+# Ascend AI - Logging Configuration
+# ============================================
+# Root logger setup for the application (LOG_LEVEL, LOG_FORMAT,
+# LOG_QUEUE_ENABLED). In queued mode the event loop only appends records to
+# an in-memory queue; a background thread formats them and does the
+# blocking write to stderr, so a slow terminal, pipe or disk never stalls
+# request handling.
+# ============================================
+
+import atexit
+import json
+import logging
+import queue
+import sys
+from datetime import UTC, datetime
+from logging.handlers import QueueHandler, QueueListener
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# Attributes every LogRecord has; anything else was passed through ``extra``
+# and becomes a field of the JSON record
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", logging.INFO, "", 0, "", None, None))) | {
+    "message",
+    "asctime",
+    "taskName",
+}
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    Formats records as one JSON object per line.
+
+    Fixed fields: ``ts`` (UTC, ISO 8601), ``level``, ``logger`` and
+    ``message``; fields passed with ``extra=`` (route, status, duration_ms,
+    ...) are added as-is, and ``exc`` holds the traceback, if any. Values
+    that are not JSON types are written with ``str()``.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, UTC).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for name, value in vars(record).items():
+            if name not in _RECORD_ATTRIBUTES:
+                entry[name] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class LazyQueueHandler(QueueHandler):
+    """
+    Queue handler that hands records over untouched.
+
+    The stdlib QueueHandler formats each record on the calling thread so it
+    can be pickled for another process. Our queue never leaves the process,
+    so message interpolation and formatting are left to the listener
+    thread; callers must pass immutable arguments (strings, numbers), which
+    lazy %-style logging calls do.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+_listener: QueueListener | None = None
+_installed: logging.Handler | None = None
+
+
+def configure_logging(
+    level: str, fmt: str = "text", queued: bool = True, force: bool = False
+) -> None:
+    """
+    Configure the root logger.
+
+    Like ``logging.basicConfig``, handlers installed by someone else (the
+    server's log config, a test runner) are left alone unless ``force``;
+    calling this again replaces the handler it installed before.
+
+    Args:
+        level: Root log level name (e.g. "INFO")
+        fmt: "text" for human-readable lines, "json" for one JSON object per line
+        queued: Write from a background thread instead of the calling thread
+        force: Remove every existing root handler first
+    """
+    global _installed, _listener
+    root = logging.getLogger()
+    for existing in root.handlers[:]:
+        if force or existing is _installed:
+            root.removeHandler(existing)
+    # Drain the previous listener only once nothing can enqueue to it
+    stop_logging()
+    _installed = None
+    if root.handlers:
+        return
+
+    root.setLevel(level.upper())
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(JSONFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT))
+
+    if queued:
+        records: queue.SimpleQueue = queue.SimpleQueue()
+        _listener = QueueListener(records, handler, respect_handler_level=True)
+        _listener.start()
+        handler = LazyQueueHandler(records)
+    root.addHandler(handler)
+    _installed = handler
+
+
+def stop_logging() -> None:
+    """Write out every queued record and stop the background thread (idempotent)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+# Records queued at interpreter exit are still written
+atexit.register(stop_logging)
@@ -0,0 +1,240 @@
+# ============================================
+# Ascend AI - In-Process Metrics
+# ============================================
+# Lightweight counters, gauges and fixed-bucket histograms
+# Snapshots are plain dicts so they can be shipped and merged across workers
+# ============================================
+
+import bisect
+import time
+from collections.abc import Iterable, Sequence
+
+# Latency buckets in milliseconds (upper bounds); sub-millisecond resolution
+# matters because L1 and Redis hits sit well below 1 ms
+LATENCY_BUCKETS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 1000)
+
+# Payload size buckets in bytes (upper bounds)
+SIZE_BUCKETS_BYTES = (64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384)
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Counter:
+    """Monotonically increasing counter."""
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: int = 1) -> None:
+        """Increase the counter by ``amount``."""
+        self.value += amount
+
+
+class Gauge:
+    """Value that can go up and down (e.g. requests in flight)."""
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1) -> None:
+        """Increase the gauge by ``amount``."""
+        self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        """Decrease the gauge by ``amount``."""
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        """Set the gauge to ``value``."""
+        self.value = value
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram.
+
+    Observations are counted in the first bucket whose upper bound is >= the
+    value; anything larger lands in a final overflow bucket. Recording is a
+    bisect plus two additions, cheap enough for every cache lookup.
+    """
+
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets: Sequence[float]):
+        """
+        Initialize an empty histogram.
+
+        Args:
+            buckets: Sorted bucket upper bounds
+        """
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Record one observation."""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def snapshot(self) -> dict:
+        """Return a JSON-serializable copy of the current state."""
+        return {
+            "buckets": list(self.buckets),
+            "counts": list(self.counts),
+            "count": self.count,
+            "sum": self.sum,
+        }
+
+
+class Timer:
+    """
+    Context manager that records elapsed milliseconds into a histogram.
+
+    Example:
+        with Timer(metrics.histograms["get_latency_ms"]):
+            value = await redis.get(key)
+    """
+
+    __slots__ = ("histogram", "_start")
+
+    def __init__(self, histogram: Histogram):
+        self.histogram = histogram
+
+    def __enter__(self) -> "Timer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.histogram.observe((time.perf_counter() - self._start) * 1000)
+
+
+class MetricGroup:
+    """
+    A named set of counters and histograms owned by one component.
+
+    Example:
+        metrics = MetricGroup(
+            counters=("hits", "misses"),
+            histograms={"get_latency_ms": LATENCY_BUCKETS_MS},
+        )
+        metrics.counters["hits"].inc()
+    """
+
+    def __init__(self, counters: Iterable[str], histograms: dict[str, Sequence[float]]):
+        """
+        Initialize zeroed metrics.
+
+        Args:
+            counters: Counter names
+            histograms: Histogram names mapped to their bucket upper bounds
+        """
+        self.counters = {name: Counter() for name in counters}
+        self.histograms = {name: Histogram(buckets) for name, buckets in histograms.items()}
+
+    def snapshot(self) -> dict:
+        """Return a JSON-serializable copy of every metric."""
+        return {
+            "counters": {name: counter.value for name, counter in self.counters.items()},
+            "histograms": {name: hist.snapshot() for name, hist in self.histograms.items()},
+        }
+
+    def reset(self) -> None:
+        """Zero every metric."""
+        for counter in self.counters.values():
+            counter.value = 0
+        for name, histogram in self.histograms.items():
+            self.histograms[name] = Histogram(histogram.buckets)
+
+
+# ============================================
+# Snapshot Helpers
+# ============================================
+def merge_histograms(snapshots: Iterable[dict]) -> dict | None:
+    """
+    Merge histogram snapshots that share the same buckets.
+
+    Snapshots with different bucket layouts (e.g. from a worker running an
+    older release) are skipped rather than mixed.
+
+    Returns:
+        Optional[dict]: Merged snapshot, or None if there was nothing to merge
+    """
+    merged: dict | None = None
+    for snapshot in snapshots:
+        if merged is None:
+            merged = {
+                "buckets": list(snapshot["buckets"]),
+                "counts": list(snapshot["counts"]),
+                "count": snapshot["count"],
+                "sum": snapshot["sum"],
+            }
+            continue
+        if snapshot["buckets"] != merged["buckets"]:
+            continue
+        merged["counts"] = [
+            a + b for a, b in zip(merged["counts"], snapshot["counts"], strict=True)
+        ]
+        merged["count"] += snapshot["count"]
+        merged["sum"] += snapshot["sum"]
+    return merged
+
+
+def summarize_histogram(snapshot: dict) -> dict:
+    """
+    Add mean and bucket-estimated quantiles to a histogram snapshot.
+
+    Quantiles report the upper bound of the bucket containing them, so they
+    are conservative (never below the true value, except in the overflow
+    bucket, which reports the largest finite bound).
+    """
+    count = snapshot["count"]
+    summary = dict(snapshot)
+    summary["mean"] = snapshot["sum"] / count if count else 0.0
+
+    buckets = snapshot["buckets"]
+    counts = snapshot["counts"]
+    for quantile in QUANTILES:
+        label = f"p{int(quantile * 100)}"
+        if not count:
+            summary[label] = 0.0
+            continue
+        rank = quantile * count
+        seen = 0
+        for index, bucket_count in enumerate(counts):
+            seen += bucket_count
+            if seen >= rank:
+                summary[label] = buckets[min(index, len(buckets) - 1)]
+                break
+    return summary
+
+
+def merge_snapshots(snapshots: Iterable[dict]) -> dict:
+    """
+    Merge ``{"counters": ..., "histograms": ...}`` snapshots from several workers.
+
+    Counters are summed; histograms are merged bucket by bucket.
+    """
+    snapshots = list(snapshots)
+    counters: dict[str, int] = {}
+    for snapshot in snapshots:
+        for name, value in snapshot.get("counters", {}).items():
+            counters[name] = counters.get(name, 0) + value
+
+    names = {name for snapshot in snapshots for name in snapshot.get("histograms", {})}
+    histograms = {}
+    for name in sorted(names):
+        merged = merge_histograms(
+            snapshot["histograms"][name]
+            for snapshot in snapshots
+            if name in snapshot.get("histograms", {})
+        )
+        if merged is not None:
+            histograms[name] = merged
+
+    return {"counters": counters, "histograms": histograms}
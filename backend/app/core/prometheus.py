@@ -0,0 +1,409 @@
+# ============================================
+# Ascend AI - Prometheus Metrics
+# ============================================
+# Process-wide metrics registry, rendered in the Prometheus text format at
+# /metrics. With several uvicorn workers each one writes a snapshot file to
+# METRICS_DIR and the worker that answers a scrape merges every file, so
+# the numbers cover the whole host whichever worker is asked.
+# ============================================
+
+import asyncio
+import contextlib
+import fcntl
+import json
+import logging
+import operator
+import os
+from collections import defaultdict
+from collections.abc import Callable, Iterator, Sequence
+
+from app.core.metrics import Counter, Gauge, Histogram, merge_snapshots
+
+logger = logging.getLogger(__name__)
+
+# Request latency buckets in seconds (upper bounds)
+HTTP_LATENCY_BUCKETS_S = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Totals of workers that have exited, kept so counters never go backwards
+ARCHIVE_FILE = "archive.json"
+LOCK_FILE = ".lock"
+
+# How the workers' values of a gauge combine into the host's:
+# "sum" for additive gauges (in-flight requests, pool connections), "max"/"min"
+# for per-worker state (min: 0 as soon as one worker is down), "liveall" to
+# keep every worker's series apart under a "pid" label
+GAUGE_AGGREGATIONS = {"sum": operator.add, "max": max, "min": min, "liveall": None}
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def series_key(name: str, labels: dict[str, str] | None = None) -> str:
+    """
+    Name of one series in exposition format.
+
+    Example:
+        series_key("http_requests_total", {"method": "GET", "status": "2xx"})
+        -> 'http_requests_total{method="GET",status="2xx"}'
+    """
+    if not labels:
+        return name
+    rendered = ",".join(f'{label}="{_escape(value)}"' for label, value in labels.items())
+    return f"{name}{{{rendered}}}"
+
+
+class MetricsRegistry:
+    """
+    Counters, gauges and histograms by series, plus collectors.
+
+    Series are created on first use and live as long as the process, so
+    label values must be bounded (route templates and status classes, never
+    raw paths or user ids). Collectors run before every snapshot, to copy
+    in values owned elsewhere (DB pool, Redis, token cache).
+    """
+
+    def __init__(self):
+        """Initialize an empty registry (no files, no background task)."""
+        # name -> (type, help)
+        self.families: dict[str, tuple[str, str]] = {}
+        # gauge name -> multi-worker aggregation, for gauges that must not be summed
+        self.gauge_aggregations: dict[str, str] = {}
+        self.counters: dict[str, Counter] = {}
+        self.gauges: dict[str, Gauge] = {}
+        self.histograms: dict[str, Histogram] = {}
+        self._collectors: list[Callable[[MetricsRegistry], None]] = []
+        self._store: FileCollector | None = None
+        self._write_task: asyncio.Task | None = None
+
+    # ============================================
+    # Series
+    # ============================================
+    def describe(self, name: str, kind: str, help_text: str, aggregation: str = "sum") -> None:
+        """
+        Declare a metric family ("counter", "gauge" or "histogram").
+
+        Args:
+            name: Family name
+            kind: "counter", "gauge" or "histogram"
+            help_text: HELP line
+            aggregation: For gauges, how workers combine (see GAUGE_AGGREGATIONS)
+
+        Raises:
+            ValueError: If the aggregation is unknown or given for a non-gauge
+        """
+        if aggregation not in GAUGE_AGGREGATIONS or (aggregation != "sum" and kind != "gauge"):
+            raise ValueError(f"Invalid aggregation {aggregation!r} for {kind} {name}")
+        self.families.setdefault(name, (kind, help_text))
+        if aggregation != "sum":
+            self.gauge_aggregations.setdefault(name, aggregation)
+
+    def counter(self, name: str, **labels: str) -> Counter:
+        """Return the counter for a series, creating it on first use."""
+        key = series_key(name, labels)
+        counter = self.counters.get(key)
+        if counter is None:
+            counter = self.counters[key] = Counter()
+        return counter
+
+    def gauge(self, name: str, **labels: str) -> Gauge:
+        """Return the gauge for a series, creating it on first use."""
+        key = series_key(name, labels)
+        gauge = self.gauges.get(key)
+        if gauge is None:
+            gauge = self.gauges[key] = Gauge()
+        return gauge
+
+    def histogram(self, name: str, buckets: Sequence[float], **labels: str) -> Histogram:
+        """Return the histogram for a series, creating it on first use."""
+        key = series_key(name, labels)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram(buckets)
+        return histogram
+
+    def add_collector(self, collector: Callable[["MetricsRegistry"], None]) -> None:
+        """Run ``collector(registry)`` before every snapshot."""
+        self._collectors.append(collector)
+
+    def snapshot(self) -> dict:
+        """Run the collectors and return a JSON-serializable copy of every series."""
+        for collector in self._collectors:
+            try:
+                collector(self)
+            except Exception as e:
+                logger.warning(f"Metrics collector {collector.__name__} failed: {e}")
+        return {
+            "pid": os.getpid(),
+            "families": {name: list(family) for name, family in self.families.items()},
+            "gauge_aggregations": dict(self.gauge_aggregations),
+            "counters": {key: counter.value for key, counter in self.counters.items()},
+            "gauges": {key: gauge.value for key, gauge in self.gauges.items()},
+            "histograms": {key: hist.snapshot() for key, hist in self.histograms.items()},
+        }
+
+    # ============================================
+    # Multi-Worker Collection
+    # ============================================
+    async def start(self, directory: str, write_interval: float) -> None:
+        """
+        Share this worker's metrics through ``directory`` and write them periodically.
+
+        Called once per worker from the application lifespan. If the
+        directory can't be used, /metrics reports this worker only.
+        """
+        if self._write_task is not None:
+            return
+        try:
+            self._store = FileCollector(directory)
+        except OSError as e:
+            logger.warning(f"❌ Metrics directory {directory} unavailable ({e}) - this worker only")
+            return
+        self._write_task = asyncio.create_task(self._write_periodically(write_interval))
+
+    async def stop(self) -> None:
+        """Stop the writer task and leave a final snapshot for the other workers."""
+        if self._write_task is None:
+            return
+        self._write_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._write_task
+        self._write_task = None
+        with contextlib.suppress(OSError):
+            await asyncio.to_thread(self._store.write, self.snapshot())
+
+    async def _write_periodically(self, interval: float) -> None:
+        """Write a snapshot every interval until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self._store.write, self.snapshot())
+            except OSError as e:
+                logger.warning(f"Failed to write metrics snapshot: {e}")
+
+    async def render(self) -> str:
+        """
+        Render every worker's metrics in the Prometheus text format.
+
+        The snapshot is taken on the event loop; file I/O runs in a thread.
+        """
+        snapshot = self.snapshot()
+        if self._store is not None:
+            try:
+                snapshot = await asyncio.to_thread(self._store.write_and_collect, snapshot)
+            except OSError as e:
+                logger.warning(f"Failed to collect worker metrics, reporting this worker: {e}")
+        return render_text(snapshot)
+
+
+class FileCollector:
+    """
+    One snapshot file per worker in a shared directory, merged on read.
+
+    - Each worker replaces ``<pid>.json`` atomically (temp file + rename),
+      so readers never see a half-written file.
+    - Counters and histograms of workers that exited are folded into
+      ``archive.json`` (under a lock, then the file is removed), so totals
+      never go backwards when a worker restarts and the directory does not
+      grow with every restart.
+    - Gauges only include live workers, and are summed unless their
+      family was described with another aggregation (see GAUGE_AGGREGATIONS).
+    """
+
+    def __init__(self, directory: str):
+        """
+        Use (creating if needed) a snapshot directory.
+
+        Args:
+            directory: Directory shared by the workers (tmpfs, e.g. /dev/shm/...)
+
+        Raises:
+            OSError: If the directory cannot be created or written
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.path = os.path.join(directory, f"{os.getpid()}.json")
+        # A file under our pid is left over from an earlier process
+        with self._locked():
+            if os.path.exists(self.path):
+                self._archive([self.path])
+
+    @contextlib.contextmanager
+    def _locked(self) -> Iterator[None]:
+        with open(os.path.join(self.directory, LOCK_FILE), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def write(self, snapshot: dict) -> None:
+        """Replace this worker's snapshot file."""
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as file:
+            json.dump(snapshot, file, separators=(",", ":"))
+        os.replace(temp_path, self.path)
+
+    def write_and_collect(self, snapshot: dict) -> dict:
+        """Write this worker's snapshot, then merge every worker's."""
+        self.write(snapshot)
+        return self.collect()
+
+    def collect(self) -> dict:
+        """
+        Merge the snapshots of every worker, past and present.
+
+        Returns:
+            dict: Snapshot with summed counters and histograms, and aggregated gauges
+        """
+        with self._locked():
+            live, exited = [], []
+            for entry in os.scandir(self.directory):
+                pid = _pid_of(entry.name)
+                if pid is not None:
+                    (live if _is_running(pid) else exited).append(entry.path)
+            self._archive(exited)
+            snapshots = [_read(path) for path in live]
+            archive = _read(os.path.join(self.directory, ARCHIVE_FILE))
+
+        snapshots = [snapshot for snapshot in snapshots if snapshot is not None]
+        merged = _merge(snapshots + ([archive] if archive else []))
+        merged["gauges"] = _aggregate_gauges(snapshots)
+        return merged
+
+    def _archive(self, paths: list[str]) -> None:
+        """Fold finished workers' counters and histograms into the archive (lock held)."""
+        snapshots = [snapshot for path in paths if (snapshot := _read(path)) is not None]
+        if snapshots:
+            archive_path = os.path.join(self.directory, ARCHIVE_FILE)
+            archive = _read(archive_path)
+            merged = _merge(snapshots + ([archive] if archive else []))
+            temp_path = f"{archive_path}.tmp"
+            with open(temp_path, "w") as file:
+                json.dump(merged, file, separators=(",", ":"))
+            os.replace(temp_path, archive_path)
+        for path in paths:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(path)
+
+
+def _merge(snapshots: list[dict]) -> dict:
+    """Sum counters and histograms (see merge_snapshots) and keep every family."""
+    merged = merge_snapshots(snapshots)
+    merged["families"] = {}
+    for snapshot in snapshots:
+        merged["families"].update(snapshot.get("families", {}))
+    return merged
+
+
+def _aggregate_gauges(snapshots: list[dict]) -> dict[str, float]:
+    """Combine live workers' gauges, each family with its declared aggregation."""
+    aggregations: dict[str, str] = {}
+    for snapshot in snapshots:
+        aggregations.update(snapshot.get("gauge_aggregations", {}))
+
+    gauges: dict[str, float] = {}
+    for snapshot in snapshots:
+        for key, value in snapshot.get("gauges", {}).items():
+            aggregation = aggregations.get(key.split("{", 1)[0], "sum")
+            if aggregation == "liveall":
+                gauges[_with_label(key, "pid", str(snapshot.get("pid")))] = value
+            elif key in gauges:
+                gauges[key] = GAUGE_AGGREGATIONS[aggregation](gauges[key], value)
+            else:
+                gauges[key] = value
+    return gauges
+
+
+def _with_label(key: str, label: str, value: str) -> str:
+    """Add a label to a series key (see series_key)."""
+    rendered = f'{label}="{_escape(value)}"'
+    if key.endswith("}"):
+        return f"{key[:-1]},{rendered}}}"
+    return f"{key}{{{rendered}}}"
+
+
+def _pid_of(file_name: str) -> int | None:
+    """Worker pid of a snapshot file name, or None for any other file."""
+    stem, _, extension = file_name.partition(".")
+    return int(stem) if extension == "json" and stem.isdigit() else None
+
+
+def _is_running(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _read(path: str) -> dict | None:
+    """Load a snapshot file; missing or unreadable files count as empty."""
+    try:
+        with open(path) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+# ============================================
+# Exposition Format
+# ============================================
+def _number(value: float) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def _histogram_lines(key: str, name: str, snapshot: dict) -> list[str]:
+    labels = key[len(name) + 1 : -1] if "{" in key else ""
+    prefix = f"{labels}," if labels else ""
+    lines = []
+    cumulative = 0
+    for bound, count in zip(snapshot["buckets"], snapshot["counts"], strict=False):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{prefix}le="{float(bound)!r}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {snapshot["count"]}')
+    suffix = f"{{{labels}}}" if labels else ""
+    lines.append(f"{name}_sum{suffix} {_number(snapshot['sum'])}")
+    lines.append(f"{name}_count{suffix} {snapshot['count']}")
+    return lines
+
+
+def render_text(snapshot: dict) -> str:
+    """
+    Render a (merged) snapshot in the Prometheus text exposition format.
+
+    Args:
+        snapshot: Output of MetricsRegistry.snapshot() or FileCollector.collect()
+
+    Returns:
+        str: Exposition text, families sorted by name
+    """
+    series: dict[str, list[tuple[str, float | dict]]] = defaultdict(list)
+    for kind in ("counters", "gauges", "histograms"):
+        for key, value in snapshot.get(kind, {}).items():
+            series[key.split("{", 1)[0]].append((key, value))
+
+    families = snapshot.get("families", {})
+    lines = []
+    for name in sorted(series):
+        kind, help_text = families.get(name, ("untyped", ""))
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for key, value in sorted(series[name]):
+            if isinstance(value, dict):
+                lines.extend(_histogram_lines(key, name, value))
+            else:
+                lines.append(f"{key} {_number(value)}")
+    return "\n".join(lines) + "\n"
+
+
+# ============================================
+# Global Metrics Registry Instance
+# ============================================
+metrics_registry = MetricsRegistry()
@@ -0,0 +1,368 @@
+# ============================================
+# Ascend AI - Redis Connection Manager
+# ============================================
+# Shared, lifespan-managed Redis connection pools
+# Health-checked reconnects with exponential backoff
+# ============================================
+
+import asyncio
+import contextlib
+import contextvars
+import logging
+import random
+import time
+
+import redis.asyncio as aioredis
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import MaxConnectionsError
+from redis.exceptions import TimeoutError as RedisTimeoutError
+
+from app.core.config import settings
+from app.core.redis_sharding import ShardedRedis
+from app.core.tracing import instrument_redis, tracer
+
+logger = logging.getLogger(__name__)
+
+# Errors that mean "the server is unreachable" rather than "this command failed"
+REDIS_CONNECTION_ERRORS = (RedisConnectionError, RedisTimeoutError, ConnectionError, OSError)
+
+
+def is_connection_failure(error: BaseException) -> bool:
+    """
+    Whether an error means the server is unreachable.
+
+    An exhausted connection pool (MaxConnectionsError, a ConnectionError
+    subclass) is local back-pressure: the server is fine and the shared
+    client is still serving other requests, so it must not be dropped.
+    """
+    return isinstance(error, REDIS_CONNECTION_ERRORS) and not isinstance(error, MaxConnectionsError)
+
+
+# Strong references to fire-and-forget cleanup tasks
+_background_tasks: set[asyncio.Task] = set()
+
+
+class RedisConnection:
+    """
+    A named Redis client backed by a sized connection pool.
+
+    Tracks health so callers never block on a dead server:
+    - Healthy: get() returns the client
+    - Failed: get() returns None until the backoff delay has elapsed, then
+      attempts one reconnect. Each failed attempt doubles the delay (with
+      jitter) up to ``max_backoff``; a successful ping resets it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        url: str,
+        max_connections: int,
+        initial_backoff: float,
+        max_backoff: float,
+    ):
+        """
+        Initialize a connection slot (no network I/O).
+
+        Args:
+            name: Label used in logs (e.g. "cache", "rate_limit")
+            url: Redis URL
+            max_connections: Pool size limit
+            initial_backoff: First reconnect delay in seconds
+            max_backoff: Upper bound for the reconnect delay in seconds
+        """
+        self.name = name
+        self.url = url
+        self.max_connections = max_connections
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+
+        self.client: aioredis.Redis | None = None
+        self._backoff = initial_backoff
+        self._next_attempt = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_healthy(self) -> bool:
+        """True while a connected client is available."""
+        return self.client is not None
+
+    async def get(self) -> aioredis.Redis | None:
+        """
+        Return the client, reconnecting if the backoff delay has elapsed.
+
+        Returns:
+            Optional[Redis]: Connected client, or None while Redis is down
+        """
+        if self.client is not None:
+            return self.client
+
+        if time.monotonic() < self._next_attempt:
+            return None
+
+        await self.connect()
+        return self.client
+
+    async def connect(self) -> bool:
+        """
+        Build the pool and verify it with a PING.
+
+        Returns:
+            bool: True if connected
+        """
+        async with self._lock:
+            if self.client is not None:
+                return True
+
+            client = _build_client(self.url, self.max_connections)
+
+            try:
+                await client.ping()
+            except Exception as e:
+                await _close_client(client)
+                self._schedule_retry()
+                logger.error(
+                    f"❌ Failed to connect to Redis ({self.name}): {e} - "
+                    f"retrying in {self._backoff:.1f}s"
+                )
+                return False
+
+            self.client = client
+            self._backoff = self.initial_backoff
+            self._next_attempt = 0.0
+            logger.info(f"✓ Redis connection established ({self.name})")
+            return True
+
+    def mark_failed(self, error: BaseException | None = None) -> None:
+        """
+        Record that the server is unreachable.
+
+        The client is dropped so callers fail fast; the next reconnect is
+        attempted after the current backoff delay.
+        """
+        if self.client is None:
+            return
+
+        client, self.client = self.client, None
+        self._schedule_retry()
+        # Outside the failing request's context (trace, Server-Timing)
+        task = asyncio.get_running_loop().create_task(
+            _close_client(client), context=contextvars.Context()
+        )
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+        logger.warning(
+            f"Redis connection lost ({self.name}): {error} - reconnecting in {self._backoff:.1f}s"
+        )
+
+    async def check(self) -> None:
+        """Ping a healthy client, or attempt a reconnect if one is due."""
+        if self.client is None:
+            if time.monotonic() >= self._next_attempt:
+                await self.connect()
+            return
+
+        try:
+            await self.client.ping()
+        except Exception as e:
+            self.mark_failed(e)
+
+    async def close(self) -> None:
+        """Close the pool and forget the client."""
+        client, self.client = self.client, None
+        if client is not None:
+            await _close_client(client)
+
+    def _schedule_retry(self) -> None:
+        # Delay the next attempt by the current backoff (+/-20% jitter so a
+        # fleet of workers does not reconnect in lockstep), then double it
+        delay = self._backoff * random.uniform(0.8, 1.2)
+        self._next_attempt = time.monotonic() + delay
+        self._backoff = min(self._backoff * 2, self.max_backoff)
+
+
+class RedisManager:
+    """
+    Owner of every Redis connection pool used by the API process.
+
+    Roles:
+    - "cache": token cache and its pub/sub invalidation channel
+    - "rate_limit": rate limiting middleware
+
+    Both roles share one pool unless REDIS_SEPARATE_POOLS is set or they
+    are pointed at different servers (REDIS_CACHE_URL / REDIS_RATE_LIMIT_URL).
+    REDIS_TOPOLOGY picks a single server, Redis Cluster, or client-side
+    sharding over REDIS_SHARD_URLS; keys are hash-tagged to work with all three.
+
+    Lifecycle:
+    - start(): called from the FastAPI lifespan; connects (non-fatal if
+      Redis is down) and launches the background health check
+    - stop(): cancels the health check and closes every pool
+
+    Clients can also be requested before start() (e.g. in tests or scripts);
+    the connection is then established lazily on first use.
+    """
+
+    ROLES = ("cache", "rate_limit")
+
+    def __init__(self):
+        """Initialize an unconfigured manager (no network I/O)."""
+        self._connections: dict[str, RedisConnection] = {}
+        self._health_task: asyncio.Task | None = None
+
+    def _configure(self) -> None:
+        """Create one RedisConnection per distinct pool from settings."""
+        urls = {
+            "cache": settings.redis_cache_url or settings.redis_url,
+            "rate_limit": settings.redis_rate_limit_url or settings.redis_url,
+        }
+        max_connections = {
+            "cache": settings.redis_cache_max_connections,
+            "rate_limit": settings.redis_rate_limit_max_connections,
+        }
+
+        pools: dict[str, RedisConnection] = {}
+        for role in self.ROLES:
+            pool_key = role if settings.redis_separate_pools else urls[role]
+            if pool_key not in pools:
+                pools[pool_key] = RedisConnection(
+                    name=role,
+                    url=urls[role],
+                    max_connections=max_connections[role],
+                    initial_backoff=settings.redis_reconnect_initial_backoff_seconds,
+                    max_backoff=settings.redis_reconnect_max_backoff_seconds,
+                )
+            self._connections[role] = pools[pool_key]
+
+    def connection(self, role: str) -> RedisConnection:
+        """Return the connection slot for a role."""
+        if not self._connections:
+            self._configure()
+        return self._connections[role]
+
+    async def get_client(self, role: str) -> aioredis.Redis | None:
+        """
+        Return a connected client for a role.
+
+        Args:
+            role: "cache" or "rate_limit"
+
+        Returns:
+            Optional[Redis]: Client, or None while Redis is unavailable
+        """
+        return await self.connection(role).get()
+
+    def report_failure(self, role: str, error: BaseException | None = None) -> None:
+        """Tell the manager a command failed because Redis is unreachable."""
+        self.connection(role).mark_failed(error)
+
+    async def start(self) -> None:
+        """Connect every pool and start the background health check."""
+        for connection in self._unique_connections():
+            await connection.connect()
+
+        if self._health_task is None:
+            self._health_task = asyncio.create_task(self._health_check_loop())
+
+    async def stop(self) -> None:
+        """Stop the health check and close every pool."""
+        if self._health_task is not None:
+            self._health_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._health_task
+            self._health_task = None
+
+        for connection in self._unique_connections():
+            await connection.close()
+
+    async def _health_check_loop(self) -> None:
+        """Periodically ping healthy pools and reconnect failed ones."""
+        while True:
+            await asyncio.sleep(settings.redis_health_check_interval_seconds)
+            for connection in self._unique_connections():
+                try:
+                    await connection.check()
+                except Exception as e:
+                    logger.error(f"Redis health check error ({connection.name}): {e}")
+
+    def _unique_connections(self) -> list[RedisConnection]:
+        if not self._connections:
+            self._configure()
+        return list({id(conn): conn for conn in self._connections.values()}.values())
+
+
+# Binary-safe: the token cache stores encoded bytes
+_CLIENT_OPTIONS = {
+    "decode_responses": False,
+    "socket_connect_timeout": 5,
+    "socket_timeout": 5,
+    "health_check_interval": 30,
+}
+
+
+class _BoundedWaitPool(aioredis.BlockingConnectionPool):
+    """
+    Blocking pool that reports exhaustion as MaxConnectionsError.
+
+    Commands wait up to REDIS_POOL_TIMEOUT_SECONDS for a free connection;
+    the base class then raises a plain ConnectionError, which would be
+    mistaken for an outage.
+    """
+
+    async def get_connection(self, *args, **kwargs):
+        try:
+            return await super().get_connection(*args, **kwargs)
+        except RedisConnectionError as e:
+            if isinstance(e.__cause__, asyncio.TimeoutError):
+                raise MaxConnectionsError("No connection available in the pool") from e
+            raise
+
+
+def _build_client(url: str, max_connections: int) -> aioredis.Redis:
+    """
+    Create a client for the configured REDIS_TOPOLOGY (no network I/O).
+
+    Args:
+        url: Server URL (any node for a cluster; ignored when sharded)
+        max_connections: Pool size limit (per node)
+
+    Returns:
+        Redis, RedisCluster or ShardedRedis client
+    """
+    # Commands are only wrapped in spans when tracing is on
+    traced = instrument_redis if tracer.enabled else lambda client: client
+
+    if settings.redis_topology == "cluster":
+        return traced(
+            aioredis.RedisCluster.from_url(url, max_connections=max_connections, **_CLIENT_OPTIONS)
+        )
+
+    def standalone(server_url: str) -> aioredis.Redis:
+        # from_pool hands pool ownership to the client, so aclose() also
+        # disconnects every pooled connection
+        return traced(
+            aioredis.Redis.from_pool(
+                _BoundedWaitPool.from_url(
+                    server_url,
+                    max_connections=max_connections,
+                    timeout=settings.redis_pool_timeout_seconds,
+                    **_CLIENT_OPTIONS,
+                )
+            )
+        )
+
+    if settings.redis_topology == "sharded":
+        urls = settings.redis_shard_urls_list or [url]
+        return ShardedRedis([standalone(shard_url) for shard_url in urls], names=urls)
+    return standalone(url)
+
+
+async def _close_client(client: aioredis.Redis) -> None:
+    with contextlib.suppress(Exception):
+        await client.aclose()
+
+
+# ============================================
+# Global Redis Manager Instance
+# ============================================
+redis_manager = RedisManager()
@@ -0,0 +1,225 @@
+# ============================================
+# Ascend AI - Client-Side Redis Sharding
+# ============================================
+# Spreads cache and rate limit keys over several independent Redis servers
+# (REDIS_TOPOLOGY=sharded) with a consistent-hash ring. Keys are placed by
+# their hash tag, exactly like Redis Cluster places them in slots, so any
+# key layout that is cluster-safe is also shard-safe.
+# ============================================
+
+import asyncio
+import bisect
+import hashlib
+from collections import defaultdict
+
+import redis.asyncio as aioredis
+from redis.commands.core import AsyncScript
+
+# Virtual nodes per shard: enough to keep the key spread within a few
+# percent, and to move only ~1/N of the keys when a shard is added
+RING_VNODES = 160
+
+# Commands whose first argument is their only key
+SINGLE_KEY_COMMANDS = frozenset(
+    {"get", "set", "setex", "expire", "sadd", "smembers", "hset", "hgetall", "hdel"}
+)
+
+
+def _ring_hash(value: bytes) -> int:
+    # CRC32 clusters the points of similar names ("...#1", "...#2") and
+    # skews the spread; a 64-bit blake2b prefix is uniform and still cheap
+    return int.from_bytes(hashlib.blake2b(value, digest_size=8).digest(), "little")
+
+
+def hash_tag(key: str | bytes) -> bytes:
+    """
+    Return the part of a key used for placement.
+
+    Same rule as Redis Cluster: if the key contains ``{...}`` with at least
+    one character inside, only that part is hashed, so ``user:{42}`` and
+    ``token_cache:user:{42}`` always land together.
+    """
+    if isinstance(key, str):
+        key = key.encode()
+    start = key.find(b"{")
+    if start != -1:
+        end = key.find(b"}", start + 1)
+        if end > start + 1:
+            return key[start + 1 : end]
+    return key
+
+
+class ConsistentHashRing:
+    """Maps keys to shards; adding or removing a shard moves about 1/N of the keys."""
+
+    def __init__(self, names: list[str], vnodes: int = RING_VNODES):
+        """
+        Build the ring.
+
+        Args:
+            names: Stable shard identities (e.g. their URLs), in shard order
+            vnodes: Points on the ring per shard
+        """
+        points = sorted(
+            (_ring_hash(f"{name}#{vnode}".encode()), index)
+            for index, name in enumerate(names)
+            for vnode in range(vnodes)
+        )
+        self._hashes = [point for point, _ in points]
+        self._shards = [index for _, index in points]
+
+    def shard_for(self, key: str | bytes) -> int:
+        """Return the index of the shard that owns ``key``."""
+        position = bisect.bisect(self._hashes, _ring_hash(hash_tag(key)))
+        return self._shards[position % len(self._shards)]
+
+
+class ShardedRedis:
+    """
+    A Redis client facade over several servers.
+
+    Supports the commands the token cache and rate limiter use: single-key
+    commands and scripts are routed by hash tag, DEL is split per shard,
+    SCRIPT LOAD and PING go to every shard, and pub/sub uses the first shard
+    so every worker publishes and subscribes on the same server.
+    """
+
+    def __init__(self, clients: list[aioredis.Redis], names: list[str]):
+        """
+        Wrap connected clients.
+
+        Args:
+            clients: One client per shard
+            names: Stable shard identities for the hash ring (e.g. URLs)
+        """
+        self.clients = clients
+        self.ring = ConsistentHashRing(names)
+
+    def node_for(self, key: str | bytes) -> aioredis.Redis:
+        """Return the client of the shard that owns ``key``."""
+        return self.clients[self.ring.shard_for(key)]
+
+    def __getattr__(self, name: str):
+        if name in SINGLE_KEY_COMMANDS:
+
+            def command(key, *args, **kwargs):
+                return getattr(self.node_for(key), name)(key, *args, **kwargs)
+
+            return command
+        raise AttributeError(f"{type(self).__name__} does not support '{name}'")
+
+    async def delete(self, *keys) -> int:
+        """Delete keys, one DEL per shard involved."""
+        by_shard: dict[int, list] = defaultdict(list)
+        for key in keys:
+            by_shard[self.ring.shard_for(key)].append(key)
+        counts = await asyncio.gather(
+            *(self.clients[shard].delete(*shard_keys) for shard, shard_keys in by_shard.items())
+        )
+        return sum(counts)
+
+    async def evalsha(self, sha: str, numkeys: int, *keys_and_args):
+        """Run a loaded script on the shard of its first key."""
+        client = self.node_for(keys_and_args[0]) if numkeys else self.clients[0]
+        return await client.evalsha(sha, numkeys, *keys_and_args)
+
+    async def script_load(self, script: str) -> str:
+        """Load a script on every shard."""
+        shas = await asyncio.gather(*(client.script_load(script) for client in self.clients))
+        return shas[0]
+
+    def get_encoder(self):
+        """Encoder used by AsyncScript to hash script text (same on every shard)."""
+        return self.clients[0].get_encoder()
+
+    def register_script(self, script: str) -> AsyncScript:
+        """Register a Lua script; calls are routed by their first key."""
+        return AsyncScript(self, script)
+
+    def pipeline(self, transaction: bool = True) -> "ShardedPipeline":
+        """Start a pipeline (one per shard under the hood)."""
+        return ShardedPipeline(self, transaction)
+
+    async def publish(self, channel, message) -> int:
+        return await self.clients[0].publish(channel, message)
+
+    def pubsub(self, **kwargs):
+        return self.clients[0].pubsub(**kwargs)
+
+    async def ping(self) -> bool:
+        """Ping every shard; raises if any is unreachable."""
+        await asyncio.gather(*(client.ping() for client in self.clients))
+        return True
+
+    async def aclose(self) -> None:
+        for client in self.clients:
+            await client.aclose()
+
+
+class ShardedPipeline:
+    """
+    Buffers commands, then runs one pipeline per shard concurrently.
+
+    Results come back in the order the commands were queued. A transaction
+    must stay on one shard (use hash tags), as in Redis Cluster.
+    """
+
+    def __init__(self, sharded: ShardedRedis, transaction: bool):
+        self.sharded = sharded
+        self.transaction = transaction
+        self._commands: list[tuple[int, str, tuple, dict]] = []
+
+    async def __aenter__(self) -> "ShardedPipeline":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self._commands.clear()
+
+    def __getattr__(self, name: str):
+        if name in SINGLE_KEY_COMMANDS or name == "delete":
+
+            def command(key, *args, **kwargs):
+                return self._queue(key, name, (key, *args), kwargs)
+
+            return command
+        raise AttributeError(f"{type(self).__name__} does not support '{name}'")
+
+    async def evalsha(self, sha: str, numkeys: int, *keys_and_args) -> "ShardedPipeline":
+        """Queue a script call (what AsyncScript does when given this pipeline)."""
+        key = keys_and_args[0] if numkeys else b""
+        return self._queue(key, "evalsha", (sha, numkeys, *keys_and_args), {})
+
+    def _queue(self, key, name: str, args: tuple, kwargs: dict) -> "ShardedPipeline":
+        shard = self.sharded.ring.shard_for(key)
+        # Every key of a pipelined DEL must live on one shard
+        if name == "delete" and any(
+            self.sharded.ring.shard_for(other) != shard for other in args[1:]
+        ):
+            raise ValueError("Pipelined DEL keys span several shards; use hash tags")
+        self._commands.append((shard, name, args, kwargs))
+        return self
+
+    async def execute(self) -> list:
+        """Send every shard's commands and return all results in queue order."""
+        by_shard: dict[int, list[int]] = defaultdict(list)
+        for position, (shard, *_) in enumerate(self._commands):
+            by_shard[shard].append(position)
+        if self.transaction and len(by_shard) > 1:
+            raise ValueError("Transaction spans several shards; use hash tags")
+
+        async def run(shard: int, positions: list[int]) -> list:
+            async with self.sharded.clients[shard].pipeline(transaction=self.transaction) as pipe:
+                for position in positions:
+                    _, name, args, kwargs = self._commands[position]
+                    getattr(pipe, name)(*args, **kwargs)
+                return await pipe.execute()
+
+        shard_results = await asyncio.gather(
+            *(run(shard, positions) for shard, positions in by_shard.items())
+        )
+        results: list = [None] * len(self._commands)
+        for positions, values in zip(by_shard.values(), shard_results, strict=True):
+            for position, value in zip(positions, values, strict=True):
+                results[position] = value
+        self._commands.clear()
+        return results
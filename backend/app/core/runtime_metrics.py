@@ -0,0 +1,76 @@
+# ============================================
+# Ascend AI - Runtime Metrics Collectors
+# ============================================
+# Copies state owned by other components (database pool, Redis
+# connections, token cache) into the metrics registry before each snapshot
+# ============================================
+
+from app.core.cache import token_cache
+from app.core.metrics import Histogram
+from app.core.prometheus import MetricsRegistry
+from app.core.redis_manager import redis_manager
+from app.db.session import engine
+
+
+def collect_db_pool(registry: MetricsRegistry) -> None:
+    """Connection pool usage of the SQLAlchemy engine."""
+    pool = engine.pool
+    for name, value in (
+        ("db_pool_size", pool.size()),
+        ("db_pool_checked_out", pool.checkedout()),
+        # Negative while the pool itself is not full yet
+        ("db_pool_overflow", max(0, pool.overflow())),
+    ):
+        registry.gauge(name).set(value)
+
+
+def collect_redis(registry: MetricsRegistry) -> None:
+    """Whether each Redis role currently has a connected client."""
+    for role in redis_manager.ROLES:
+        connection = redis_manager.connection(role)
+        registry.gauge("redis_up", role=role).set(1 if connection.is_healthy else 0)
+
+
+def _copy_histogram(target: Histogram, source: Histogram, scale: float = 1.0) -> None:
+    target.counts = list(source.counts)
+    target.count = source.count
+    target.sum = source.sum * scale
+
+
+def collect_token_cache(registry: MetricsRegistry) -> None:
+    """Token cache hit/miss counters and Redis latency/payload histograms."""
+    metrics = token_cache.metrics
+    for name, counter in metrics.counters.items():
+        registry.counter("token_cache_events_total", event=name).value = counter.value
+    for operation in ("get", "set"):
+        source = metrics.histograms[f"{operation}_latency_ms"]
+        target = registry.histogram(
+            "token_cache_redis_latency_seconds",
+            [bound / 1000 for bound in source.buckets],
+            operation=operation,
+        )
+        _copy_histogram(target, source, scale=1 / 1000)
+    payload = metrics.histograms["payload_bytes"]
+    _copy_histogram(registry.histogram("token_cache_payload_bytes", payload.buckets), payload)
+
+
+def register_runtime_collectors(registry: MetricsRegistry) -> None:
+    """Describe the runtime metric families and register their collectors."""
+    registry.describe("db_pool_size", "gauge", "Database connections kept in the pool")
+    registry.describe("db_pool_checked_out", "gauge", "Database connections currently in use")
+    registry.describe("db_pool_overflow", "gauge", "Database connections open beyond the pool size")
+    # Per-worker state: 0 as soon as any worker has lost the role
+    registry.describe(
+        "redis_up", "gauge", "1 while every worker has a connected client for the Redis role", "min"
+    )
+    registry.describe(
+        "token_cache_events_total", "counter", "Token cache hits, misses, sets and errors"
+    )
+    registry.describe(
+        "token_cache_redis_latency_seconds", "histogram", "Token cache Redis get/set latency"
+    )
+    registry.describe(
+        "token_cache_payload_bytes", "histogram", "Size of values written to the token cache"
+    )
+    for collector in (collect_db_pool, collect_redis, collect_token_cache):
+        registry.add_collector(collector)
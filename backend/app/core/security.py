@@ -6,10 +6,174 @@
 # DIRECTIVE: DIR-008 (Zero Trust Security Protocol)
 # ============================================
 
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
 from jose import JWTError, jwt
+from jose.exceptions import ExpiredSignatureError
 
 from app.core.config import settings
 
+# Upper bound on how long a verified token is trusted without re-checking
+# its signature, for tokens that carry no (or a distant) exp claim
+MAX_VERIFIED_CLAIMS_AGE_SECONDS = 300
+# How long a token that failed verification is rejected without re-checking
+REJECTED_TOKEN_TTL_SECONDS = 30
+
+
+# ============================================
+# Verified Claims Memo
+# ============================================
+class VerifiedClaimsCache:
+    """
+    Bounded, exp-aware memo of successfully verified JWT payloads.
+
+    A request path that calls several of the helpers below (or the auth
+    dependency plus a helper) verifies the HMAC signature once; later calls
+    with the same token reuse the verified claims.
+
+    Guarantees:
+    - Keyed by SHA-256 digest of the token; raw tokens are never stored
+    - Only tokens that passed full verification are stored
+    - ``exp`` is enforced on every read: an expired entry raises
+      ExpiredSignatureError exactly like jwt.decode would
+    - Entries are re-verified after MAX_VERIFIED_CLAIMS_AGE_SECONDS at most
+    - LRU-bounded to ``max_size`` entries; thread-safe, because sync
+      endpoints call these helpers from the threadpool
+    """
+
+    def __init__(self, max_size: int):
+        """
+        Initialize the memo.
+
+        Args:
+            max_size: Maximum number of verified tokens remembered
+        """
+        self.max_size = max_size
+        self._entries: OrderedDict[bytes, tuple[float, float | None, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> dict | None:
+        """
+        Return a copy of the verified claims, or None if not memoized.
+
+        Raises:
+            ExpiredSignatureError: If the memoized token has expired since
+        """
+        key = _token_digest(token)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            valid_until, expires_at, payload = entry
+            if expires_at is not None and expires_at <= now:
+                del self._entries[key]
+                raise ExpiredSignatureError("Signature has expired.")
+            if valid_until <= now:
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+        return dict(payload)
+
+    def set(self, token: str, payload: dict) -> None:
+        """Remember claims that just passed full verification."""
+        now = time.time()
+        exp = payload.get("exp")
+        expires_at = float(exp) if isinstance(exp, int | float) else None
+        valid_until = now + MAX_VERIFIED_CLAIMS_AGE_SECONDS
+        if expires_at is not None:
+            valid_until = min(valid_until, expires_at)
+
+        key = _token_digest(token)
+        with self._lock:
+            self._entries[key] = (valid_until, expires_at, dict(payload))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Forget every memoized token."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RejectedTokenCache:
+    """
+    Bounded, short-lived memo of tokens that failed verification.
+
+    Forged or expired tokens are retried by clients, and the rate limiter
+    checks the bearer token of every request before any cache is consulted;
+    without this memo each retry pays a full HMAC verification. Failures
+    are re-raised with the original JWTError type and message, and are
+    forgotten after REJECTED_TOKEN_TTL_SECONDS (a not-yet-valid token may
+    become valid). Keyed by SHA-256 digest; thread-safe and LRU-bounded.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float = REJECTED_TOKEN_TTL_SECONDS):
+        """
+        Initialize the memo.
+
+        Args:
+            max_size: Maximum number of rejected tokens remembered
+            ttl_seconds: How long a rejection is remembered
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[bytes, tuple[float, type[JWTError], str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def check(self, token: str) -> None:
+        """
+        Raise the remembered verification error, if the token was rejected recently.
+
+        Raises:
+            JWTError: The error of the earlier verification
+        """
+        key = _token_digest(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            valid_until, error_type, message = entry
+            if valid_until <= time.monotonic():
+                del self._entries[key]
+                return
+        raise error_type(message)
+
+    def add(self, token: str, error: JWTError) -> None:
+        """Remember a failed verification."""
+        key = _token_digest(token)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, type(error), str(error))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Forget every rejected token."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _token_digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+
+# Shared by every helper in this module and by app.core.auth
+verified_claims = VerifiedClaimsCache(settings.jwt_claims_cache_max_size)
+rejected_tokens = RejectedTokenCache(settings.jwt_claims_cache_max_size)
+
 
 # ============================================
 # JWT Decoding Functions
@@ -39,6 +203,9 @@ def decode_jwt_token(token: str) -> dict:
     - Uses HS256 algorithm (HMAC SHA-256) as specified in CCS
     - Validates signature using NEXTAUTH_SECRET (min 32 characters)
     - Automatically checks expiration time (exp claim)
+    - Verified claims are memoized (see VerifiedClaimsCache); exp is still
+      checked on every call
+    - Failed verifications are memoized briefly (see RejectedTokenCache)
 
     Example:
         try:
@@ -48,11 +215,25 @@ def decode_jwt_token(token: str) -> dict:
             # Handle invalid token
             pass
     """
-    payload = jwt.decode(
-        token,
-        settings.nextauth_secret,
-        algorithms=["HS256"],  # Only HS256 allowed per CCS security specification
-    )
+    if settings.jwt_claims_cache_enabled:
+        payload = verified_claims.get(token)
+        if payload is not None:
+            return payload
+        rejected_tokens.check(token)
+
+    try:
+        payload = jwt.decode(
+            token,
+            settings.nextauth_secret,
+            algorithms=["HS256"],  # Only HS256 allowed per CCS security specification
+        )
+    except JWTError as e:
+        if settings.jwt_claims_cache_enabled:
+            rejected_tokens.add(token, e)
+        raise
+
+    if settings.jwt_claims_cache_enabled:
+        verified_claims.set(token, payload)
     return payload
 
 
@@ -75,11 +256,7 @@ def verify_token_signature(token: str) -> bool:
             payload = decode_jwt_token(token)
     """
     try:
-        jwt.decode(
-            token,
-            settings.nextauth_secret,
-            algorithms=["HS256"],
-        )
+        decode_jwt_token(token)
         return True
     except JWTError:
         return False
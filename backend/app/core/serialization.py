@@ -0,0 +1,250 @@
+# ============================================
+# Ascend AI - Cache Serialization
+# ============================================
+# Pluggable encoders for values stored in the Redis token cache
+# Compact versioned binary format by default, JSON for compatibility
+# ============================================
+
+import json
+import struct
+import uuid
+from datetime import UTC, datetime
+from functools import lru_cache
+
+# ============================================
+# Binary User Record Layout (version 1)
+# ============================================
+# Header (big-endian):
+#   B    format version (BINARY_FORMAT_VERSION)
+#   B    flags (bit 0: timestamps were naive)
+#   16s  user id (UUID bytes)
+#   q    created_at, microseconds since the Unix epoch (UTC)
+#   q    updated_at, microseconds since the Unix epoch (UTC)
+#   5H   byte length of each STRING_FIELDS entry (NULL_LENGTH for None)
+# Followed by the UTF-8 bytes of each string field, back to back.
+#
+# All lengths live in the header so decoding is one unpack plus slicing.
+#
+# JSON payloads always start with "{", so the leading version byte is
+# enough to tell the formats apart while both are in Redis during rollout.
+BINARY_FORMAT_VERSION = 1
+
+# Leading byte 0 is reserved for negative-cache entries (a rejected token),
+# followed by the UTF-8 401 detail. The token cache checks for it before
+# handing a payload to a serializer.
+REJECTED_TOKEN_PREFIX = b"\x00"
+
+# Leading byte 0xFE marks a token -> user reference (normalized layout):
+#   B    USER_REFERENCE_PREFIX
+#   q    token "exp" claim, seconds since the Unix epoch (0 if unknown)
+# Followed by the UTF-8 user id. The profile itself lives in one shared
+# per-user entry.
+USER_REFERENCE_PREFIX = b"\xfe"
+_REFERENCE_HEADER = struct.Struct(">Bq")
+_HEADER = struct.Struct(">BB16sqqHHHHH")
+NULL_LENGTH = 0xFFFF
+FLAG_NAIVE_TIMESTAMPS = 0x01
+
+STRING_FIELDS = ("email", "name", "avatar_url", "oauth_provider", "oauth_id")
+USER_FIELDS = frozenset(("id", "created_at", "updated_at", *STRING_FIELDS))
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
+
+class CacheSerializer:
+    """
+    Base class for token cache value encoders.
+
+    Subclasses implement ``dumps``. Decoding is shared: every serializer can
+    read every supported format, so switching TOKEN_CACHE_SERIALIZER (or
+    rolling back) never invalidates entries already in Redis.
+    """
+
+    name = "base"
+
+    def dumps(self, data: dict) -> bytes:
+        """Encode a cache value."""
+        raise NotImplementedError
+
+    def loads(self, raw: bytes | str) -> dict:
+        """
+        Decode a cache value written by any supported serializer.
+
+        Raises:
+            ValueError: If the payload is corrupt or uses an unknown version
+        """
+        if isinstance(raw, str):
+            return json.loads(raw)
+        if raw[:1] == b"{":
+            return json.loads(raw)
+        if raw[:1] == bytes((BINARY_FORMAT_VERSION,)):
+            return _decode_user_v1(raw)
+        raise ValueError(f"Unknown cache payload version: {raw[:1]!r}")
+
+
+class JSONCacheSerializer(CacheSerializer):
+    """JSON encoding (the original format). Datetimes are stored as strings."""
+
+    name = "json"
+
+    def dumps(self, data: dict) -> bytes:
+        return json.dumps(data, default=str).encode()
+
+
+class BinaryUserSerializer(CacheSerializer):
+    """
+    Compact fixed-layout encoding for cached user records.
+
+    Stores the UUID as 16 raw bytes and timestamps as integer epoch
+    microseconds, so decoding needs no JSON parsing or ISO-8601 parsing and
+    returns ``datetime`` objects directly. Values that do not match the user
+    record layout (extra keys, non-UUID ids) fall back to JSON.
+    """
+
+    name = "binary"
+
+    def dumps(self, data: dict) -> bytes:
+        try:
+            return _encode_user_v1(data)
+        except (KeyError, TypeError, ValueError, AttributeError, struct.error):
+            return JSONCacheSerializer().dumps(data)
+
+
+def _encode_user_v1(data: dict) -> bytes:
+    if data.keys() != USER_FIELDS:
+        raise ValueError("Not a user record")
+
+    user_id = data["id"]
+    if not isinstance(user_id, uuid.UUID):
+        user_id = uuid.UUID(str(user_id))
+
+    created_at = _as_datetime(data["created_at"])
+    updated_at = _as_datetime(data["updated_at"])
+    naive = created_at.tzinfo is None
+    if naive != (updated_at.tzinfo is None):
+        raise ValueError("Mixed naive and aware timestamps")
+
+    lengths = []
+    strings = []
+    for field in STRING_FIELDS:
+        value = data[field]
+        if value is None:
+            lengths.append(NULL_LENGTH)
+            continue
+        encoded = str(value).encode()
+        if len(encoded) >= NULL_LENGTH:
+            raise ValueError(f"Field too long: {field}")
+        lengths.append(len(encoded))
+        strings.append(encoded)
+
+    header = _HEADER.pack(
+        BINARY_FORMAT_VERSION,
+        FLAG_NAIVE_TIMESTAMPS if naive else 0,
+        user_id.bytes,
+        _to_micros(created_at),
+        _to_micros(updated_at),
+        *lengths,
+    )
+    return header + b"".join(strings)
+
+
+def _decode_user_v1(raw: bytes) -> dict:
+    try:
+        _, flags, id_bytes, created_us, updated_us, *lengths = _HEADER.unpack_from(raw)
+        naive = bool(flags & FLAG_NAIVE_TIMESTAMPS)
+        data = {
+            "id": _format_uuid(id_bytes),
+            "created_at": _from_micros(created_us, naive),
+            "updated_at": _from_micros(updated_us, naive),
+        }
+
+        offset = _HEADER.size
+        for field, length in zip(STRING_FIELDS, lengths, strict=True):
+            if length == NULL_LENGTH:
+                data[field] = None
+                continue
+            end = offset + length
+            data[field] = raw[offset:end].decode()
+            offset = end
+    except (struct.error, UnicodeDecodeError) as e:
+        raise ValueError(f"Corrupt binary cache payload: {e}") from e
+
+    if offset != len(raw):
+        raise ValueError("Corrupt binary cache payload: length mismatch")
+
+    return data
+
+
+def _as_datetime(value: datetime | str) -> datetime:
+    return value if isinstance(value, datetime) else datetime.fromisoformat(value)
+
+
+def _to_micros(value: datetime) -> int:
+    aware = value.replace(tzinfo=UTC) if value.tzinfo is None else value
+    delta = aware - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+@lru_cache(maxsize=4096)
+def _from_micros(micros: int, naive: bool) -> datetime:
+    # Memoized: a user's timestamps repeat on every decode of their entry,
+    # and datetimes are immutable so sharing instances is safe
+    value = datetime.fromtimestamp(micros / 1_000_000, UTC)
+    return value.replace(tzinfo=None) if naive else value
+
+
+@lru_cache(maxsize=4096)
+def _format_uuid(id_bytes: bytes) -> str:
+    hex_id = id_bytes.hex()
+    return f"{hex_id[:8]}-{hex_id[8:12]}-{hex_id[12:16]}-{hex_id[16:20]}-{hex_id[20:]}"
+
+
+def encode_user_reference(user_id: str, expires_at: int | None) -> bytes:
+    """Encode a token -> user reference."""
+    return _REFERENCE_HEADER.pack(USER_REFERENCE_PREFIX[0], expires_at or 0) + str(user_id).encode()
+
+
+def decode_user_reference(raw: bytes) -> tuple[str, int | None]:
+    """
+    Decode a token -> user reference.
+
+    Returns:
+        tuple: (user_id, expires_at), ``expires_at`` None if unknown
+
+    Raises:
+        ValueError: If the payload is not a valid reference
+    """
+    try:
+        prefix, expires_at = _REFERENCE_HEADER.unpack_from(raw)
+        user_id = raw[_REFERENCE_HEADER.size :].decode()
+    except (struct.error, UnicodeDecodeError) as e:
+        raise ValueError(f"Corrupt user reference: {e}") from e
+
+    if prefix != USER_REFERENCE_PREFIX[0] or not user_id:
+        raise ValueError("Corrupt user reference")
+
+    return user_id, expires_at or None
+
+
+# ============================================
+# Serializer Registry
+# ============================================
+SERIALIZERS: dict[str, type[CacheSerializer]] = {
+    JSONCacheSerializer.name: JSONCacheSerializer,
+    BinaryUserSerializer.name: BinaryUserSerializer,
+}
+
+
+def get_cache_serializer(name: str) -> CacheSerializer:
+    """
+    Return the serializer registered under ``name``.
+
+    Raises:
+        ValueError: If no serializer has that name
+    """
+    try:
+        return SERIALIZERS[name]()
+    except KeyError:
+        raise ValueError(
+            f"Unknown cache serializer '{name}'. Options: {', '.join(sorted(SERIALIZERS))}"
+        ) from None
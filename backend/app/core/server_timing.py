@@ -0,0 +1,233 @@
+# ============================================
+# Ascend AI - Server-Timing
+# ============================================
+# Per-phase latency of a request (rate limit, auth cache, JWT, DB, handler,
+# serialization), reported in a Server-Timing response header so it shows
+# up in browser dev tools and load test output. Only requests that asked for
+# it (see ServerTimingMiddleware) pay for the clock reads.
+# ============================================
+
+import contextlib
+import functools
+import hashlib
+import hmac
+import inspect
+import time
+from collections.abc import Callable, Iterator
+from contextvars import ContextVar
+from typing import Any
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+# Reported phases, in header order
+PHASES = ("ratelimit", "auth-cache", "jwt", "db", "handler", "serialize")
+
+# Request header carrying a signed token that turns timing on for one client
+DEBUG_HEADER = "X-Server-Timing-Token"
+
+
+class ServerTiming:
+    """
+    Durations measured so far in one request, in seconds per phase.
+
+    Phases may overlap: "db" counts every statement, including those run
+    by auth dependencies and inside the handler.
+    """
+
+    __slots__ = ("start", "durations", "handler_end")
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.durations: dict[str, float] = {}
+        # When the endpoint function returned (serialization starts)
+        self.handler_end: float | None = None
+
+    def add(self, phase: str, seconds: float) -> None:
+        """Add time to a phase (phases like "db" are hit several times)."""
+        self.durations[phase] = self.durations.get(phase, 0.0) + seconds
+
+    def header_value(self) -> str:
+        """
+        Render the Server-Timing header, plus a "total" entry.
+
+        Example:
+            "ratelimit;dur=0.412, jwt;dur=0.051, db;dur=3.870, total;dur=6.204"
+        """
+        entries = [
+            f"{phase};dur={self.durations[phase] * 1000:.3f}"
+            for phase in PHASES
+            if phase in self.durations
+        ]
+        entries.append(f"total;dur={(time.perf_counter() - self.start) * 1000:.3f}")
+        return ", ".join(entries)
+
+
+# Set by ServerTimingMiddleware for requests being timed
+_current_timing: ContextVar[ServerTiming | None] = ContextVar("server_timing", default=None)
+
+
+def current_timing() -> ServerTiming | None:
+    """Timing of the request being handled, if it is being timed."""
+    return _current_timing.get()
+
+
+@contextlib.contextmanager
+def timed(phase: str) -> Iterator[None]:
+    """
+    Add the time spent in the enclosed code to a phase.
+
+    Costs one contextvar read when the request is not being timed.
+
+    Example:
+        with timed("jwt"):
+            payload = decode_jwt_token(token)
+    """
+    timing = _current_timing.get()
+    if timing is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.add(phase, time.perf_counter() - start)
+
+
+@contextlib.contextmanager
+def measure_request() -> Iterator[ServerTiming]:
+    """Time the enclosed request: phases entered inside are recorded in the yielded timing."""
+    timing = ServerTiming()
+    token = _current_timing.set(timing)
+    try:
+        yield timing
+    finally:
+        _current_timing.reset(token)
+
+
+# ============================================
+# Debug Tokens
+# ============================================
+def _signature(secret: bytes, expires_at: int) -> str:
+    return hmac.new(secret, f"server-timing:{expires_at}".encode(), hashlib.sha256).hexdigest()
+
+
+def sign_debug_token(secret: str, ttl_seconds: int = 3600) -> str:
+    """
+    Create a token for the X-Server-Timing-Token header.
+
+    Args:
+        secret: SERVER_TIMING_SECRET of the target environment
+        ttl_seconds: How long the token stays valid
+
+    Returns:
+        str: "<expiry unix time>.<hex HMAC-SHA256>"
+    """
+    expires_at = int(time.time()) + ttl_seconds
+    return f"{expires_at}.{_signature(secret.encode(), expires_at)}"
+
+
+def verify_debug_token(secret: str, token: str) -> bool:
+    """Check a debug token's signature and expiry (constant-time comparison)."""
+    expires_at, _, signature = token.partition(".")
+    # ASCII only and bounded: int() rejects "²" and very long digit strings
+    if not (expires_at.isascii() and expires_at.isdigit() and len(expires_at) <= 12):
+        return False
+    if int(expires_at) < time.time():
+        return False
+    return hmac.compare_digest(signature, _signature(secret.encode(), int(expires_at)))
+
+
+# ============================================
+# Database Statements
+# ============================================
+def time_sqlalchemy(engine) -> None:
+    """
+    Add the execution time of every SQL statement to the "db" phase.
+
+    Args:
+        engine: SQLAlchemy Engine or AsyncEngine
+    """
+    from sqlalchemy import event
+
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(_conn, _cursor, _statement, _parameters, context, _executemany):
+        if context is not None and _current_timing.get() is not None:
+            context._server_timing_start = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(_conn, _cursor, _statement, _parameters, context, _executemany):
+        start = getattr(context, "_server_timing_start", None)
+        timing = _current_timing.get()
+        if start is not None and timing is not None:
+            timing.add("db", time.perf_counter() - start)
+
+
+# ============================================
+# Handler and Serialization
+# ============================================
+def _timed_endpoint(endpoint: Callable) -> Callable:
+    """Wrap an endpoint so its run time is the "handler" phase."""
+    if inspect.isgeneratorfunction(endpoint) or inspect.isasyncgenfunction(endpoint):
+        # Streaming endpoints keep running after the headers are sent
+        return endpoint
+
+    if inspect.iscoroutinefunction(endpoint):
+
+        @functools.wraps(endpoint)
+        async def timed_async_endpoint(*args: Any, **kwargs: Any) -> Any:
+            timing = _current_timing.get()
+            if timing is None:
+                return await endpoint(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                timing.handler_end = time.perf_counter()
+                timing.add("handler", timing.handler_end - start)
+
+        return timed_async_endpoint
+
+    @functools.wraps(endpoint)
+    def timed_endpoint(*args: Any, **kwargs: Any) -> Any:
+        timing = _current_timing.get()
+        if timing is None:
+            return endpoint(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            timing.handler_end = time.perf_counter()
+            timing.add("handler", timing.handler_end - start)
+
+    return timed_endpoint
+
+
+class TimedAPIRoute(APIRoute):
+    """
+    Route class reporting "handler" and "serialize" phases.
+
+    "handler" is the endpoint function itself (dependencies such as auth
+    are reported separately); "serialize" runs from the endpoint's return
+    to the finished Response (response model validation and JSON encoding).
+
+    Usage:
+        router = APIRouter(prefix="/users", route_class=TimedAPIRoute)
+    """
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs: Any):
+        super().__init__(path, _timed_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self) -> Callable[[Request], Any]:
+        route_handler = super().get_route_handler()
+
+        async def timed_route_handler(request: Request) -> Response:
+            response = await route_handler(request)
+            timing = _current_timing.get()
+            if timing is not None and timing.handler_end is not None:
+                timing.add("serialize", time.perf_counter() - timing.handler_end)
+            return response
+
+        return timed_route_handler
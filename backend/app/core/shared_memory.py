@@ -0,0 +1,423 @@
+# ============================================
+# Ascend AI - Shared Memory Table
+# ============================================
+# Host-level tier shared by every worker process on one machine: a
+# fixed-size hash table in a memory-mapped file (tmpfs by default), guarded
+# by striped fcntl byte-range locks. Sits between each process's own memory
+# and Redis, so workers on a host share one copy of hot entries.
+# ============================================
+
+import contextlib
+import fcntl
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import time
+import zlib
+from collections.abc import Callable, Iterator
+from typing import TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+MAGIC = b"ASCNDSHM"
+LAYOUT_VERSION = 1
+
+# magic, layout version, sets, ways, slot size
+_HEADER = struct.Struct("<8sIIII")
+# Slots start on the first page, after the header
+_DATA_OFFSET = mmap.PAGESIZE
+
+# checksum, value length, flags, expires at (unix time), key digest, tag
+# (the digest sits at bytes 16-32 of the slot)
+_SLOT = struct.Struct("<IHHd16sQ")
+_USED = 1
+
+# Tag index entry: overflow flag and latest expiry of the tagged entries,
+# followed by their 16-byte key digests
+_TAG_INDEX = struct.Struct("<Bd")
+_DIGEST_SIZE = 16
+
+
+def key_digest(key: str) -> bytes:
+    """128-bit digest stored in place of the key (fixed size, collision-safe)."""
+    return hashlib.blake2b(key.encode(), digest_size=16).digest()
+
+
+def tag_for(value: str) -> int:
+    """64-bit tag for grouping entries (e.g. every entry of one user)."""
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "little")
+
+
+class SharedMemoryTable:
+    """
+    Fixed-size key/value table shared between processes on one host.
+
+    Layout: a header page followed by ``sets x ways`` fixed-size slots. A
+    key hashes to one set and may live in any of its ways, so a lookup
+    reads at most ``ways`` slots. Each set is guarded by one of ``stripes``
+    fcntl byte-range locks (shared for reads, exclusive for writes).
+
+    Eviction: a write takes the key's own slot, else a free, expired or
+    corrupt slot in its set, else the slot closest to expiry.
+
+    Crash safety:
+    - fcntl locks are released by the kernel when a process dies, so a
+      worker killed mid-write never leaves a set locked
+    - every slot carries a CRC32 written last; a torn slot fails the check
+      and reads as empty
+    - the file name encodes the layout, so a deploy that changes the
+      geometry never maps an incompatible file
+
+    Tags: entries stored with a tag are listed in a per-tag index entry
+    (kept in the table like any other entry), so delete_tagged() visits
+    only that tag's slots. When the index is full it is marked as
+    overflowed and delete_tagged() falls back to scanning the table; if the
+    index itself is evicted, its entries simply live out their TTL.
+
+    Keys are stored as 128-bit digests; values are bytes of at most
+    ``value_size``. Expiry uses wall-clock time, which every process on the
+    host shares. Not thread-safe within one process (fcntl locks belong to
+    the process, not the thread); intended for use from a single event loop.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        slots: int,
+        value_size: int,
+        directory: str,
+        stripes: int = 64,
+        ways: int = 8,
+    ):
+        """
+        Open (creating if needed) the table file and map it.
+
+        Args:
+            name: Table name, part of the file name (e.g. "ascend-token-cache")
+            slots: Minimum number of entries the table can hold
+            value_size: Maximum value length in bytes
+            directory: Directory for the backing file (tmpfs, e.g. /dev/shm)
+            stripes: Number of lock stripes
+            ways: Slots per set (entries a key can compete for)
+
+        Raises:
+            OSError: If the file cannot be created or mapped
+        """
+        self.ways = ways
+        self.sets = max(1, -(-slots // ways))
+        self.stripes = min(stripes, self.sets)
+        self.value_size = value_size
+        # Whole slots stay 8-byte aligned
+        self.slot_size = -(-(_SLOT.size + value_size) // 8) * 8
+        size = _DATA_OFFSET + self.sets * ways * self.slot_size
+
+        self.path = os.path.join(
+            directory,
+            f"{name}-v{LAYOUT_VERSION}-{self.sets}x{ways}x{self.slot_size}",
+        )
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            with self._lock_all():
+                if os.fstat(self._fd).st_size != size:
+                    os.ftruncate(self._fd, size)
+                self._mm = mmap.mmap(self._fd, size)
+                header = _HEADER.unpack_from(self._mm, 0)
+                expected = (MAGIC, LAYOUT_VERSION, self.sets, ways, self.slot_size)
+                if header != expected:
+                    self._mm[_DATA_OFFSET:] = bytes(size - _DATA_OFFSET)
+                    _HEADER.pack_into(self._mm, 0, *expected)
+        except BaseException:
+            os.close(self._fd)
+            raise
+
+    # ============================================
+    # Locking
+    # ============================================
+    @contextlib.contextmanager
+    def _lock(self, stripe: int, exclusive: bool) -> Iterator[None]:
+        """Hold one stripe's lock (a byte in the header page)."""
+        fcntl.lockf(self._fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH, 1, stripe)
+        try:
+            yield
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, stripe)
+
+    @contextlib.contextmanager
+    def _lock_all(self) -> Iterator[None]:
+        """Hold every stripe exclusively (initialization, clear, scans)."""
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, 0, 0)
+        try:
+            yield
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, 0, 0)
+
+    # ============================================
+    # Slots
+    # ============================================
+    def _locate(self, key: str) -> tuple[bytes, int, int]:
+        """Return (digest, first slot offset of the key's set, stripe)."""
+        digest = key_digest(key)
+        return (digest, *self._set_of(digest))
+
+    def _set_of(self, digest: bytes) -> tuple[int, int]:
+        """Return (first slot offset, stripe) of the set a digest hashes to."""
+        set_index = int.from_bytes(digest[:8], "little") % self.sets
+        offset = _DATA_OFFSET + set_index * self.ways * self.slot_size
+        return offset, set_index % self.stripes
+
+    def _read_slot(self, offset: int) -> tuple | None:
+        """Return (value_len, expires_at, digest, tag) of a valid slot, else None."""
+        checksum, value_len, flags, expires_at, digest, tag = _SLOT.unpack_from(self._mm, offset)
+        if not flags & _USED or value_len > self.value_size:
+            return None
+        end = offset + _SLOT.size + value_len
+        if zlib.crc32(self._mm[offset + 4 : end]) != checksum:
+            return None
+        return value_len, expires_at, digest, tag
+
+    def _write_slot(
+        self, offset: int, digest: bytes, value: bytes, expires_at: float, tag: int
+    ) -> None:
+        # Body first, checksum last: a write cut short leaves a slot that
+        # fails its checksum rather than one that reads as valid
+        _SLOT.pack_into(self._mm, offset, 0, len(value), _USED, expires_at, digest, tag)
+        value_at = offset + _SLOT.size
+        self._mm[value_at : value_at + len(value)] = value
+        checksum = zlib.crc32(self._mm[offset + 4 : value_at + len(value)])
+        struct.pack_into("<I", self._mm, offset, checksum)
+
+    def _clear_slot(self, offset: int) -> None:
+        self._mm[offset : offset + _SLOT.size] = bytes(_SLOT.size)
+
+    def _find(self, digest: bytes, set_offset: int, now: float) -> tuple[int, tuple] | None:
+        """Find the live slot holding ``digest`` in a set."""
+        # Compare digests before paying for a checksum
+        for way in range(self.ways):
+            offset = set_offset + way * self.slot_size
+            if self._mm[offset + 16 : offset + 32] != digest:
+                continue
+            slot = self._read_slot(offset)
+            if slot is not None and slot[2] == digest and slot[1] > now:
+                return offset, slot
+        return None
+
+    def _victim(self, digest: bytes, set_offset: int, now: float) -> int:
+        """Pick the slot a write of ``digest`` goes to (see class docstring)."""
+        victim, victim_expiry = set_offset, float("inf")
+        for way in range(self.ways):
+            offset = set_offset + way * self.slot_size
+            slot = self._read_slot(offset)
+            if slot is None or slot[1] <= now:
+                if victim_expiry > now:
+                    victim, victim_expiry = offset, now
+                continue
+            if slot[2] == digest:
+                return offset
+            if slot[1] < victim_expiry:
+                victim, victim_expiry = offset, slot[1]
+        return victim
+
+    # ============================================
+    # Public API
+    # ============================================
+    def get(self, key: str) -> tuple[bytes, float] | None:
+        """
+        Look a key up.
+
+        Args:
+            key: Entry key
+
+        Returns:
+            tuple[bytes, float] | None: (value, seconds until it expires), or
+            None if missing or expired
+        """
+        digest, set_offset, stripe = self._locate(key)
+        with self._lock(stripe, exclusive=False):
+            now = time.time()
+            found = self._find(digest, set_offset, now)
+            if found is None:
+                return None
+            offset, (value_len, expires_at, _, _) = found
+            value_at = offset + _SLOT.size
+            return self._mm[value_at : value_at + value_len], expires_at - now
+
+    def set(self, key: str, value: bytes, ttl_seconds: float, tag: int = 0) -> bool:
+        """
+        Store a value.
+
+        Args:
+            key: Entry key
+            value: Value bytes (at most ``value_size``)
+            ttl_seconds: Time-to-live
+            tag: Optional group tag, for delete_tagged()
+
+        Returns:
+            bool: False if the value is too large or the TTL is not positive
+        """
+        if len(value) > self.value_size or ttl_seconds <= 0:
+            return False
+
+        digest, set_offset, stripe = self._locate(key)
+        with self._lock(stripe, exclusive=True):
+            now = time.time()
+            offset = self._victim(digest, set_offset, now)
+            self._write_slot(offset, digest, value, now + ttl_seconds, tag)
+        # Separately, not nested: holding two stripes could deadlock with
+        # another process taking them in the opposite order
+        if tag:
+            self._index_tagged(tag, digest, now + ttl_seconds)
+        return True
+
+    def update(self, key: str, fn: Callable[[bytes | None], tuple[bytes | None, float, T]]) -> T:
+        """
+        Atomically read-modify-write one entry (across every process).
+
+        Args:
+            key: Entry key
+            fn: Called under the key's lock with the current value (or None);
+                returns (new value or None to leave it unchanged, TTL, result)
+
+        Returns:
+            The result returned by ``fn``
+        """
+        digest, set_offset, stripe = self._locate(key)
+        with self._lock(stripe, exclusive=True):
+            now = time.time()
+            found = self._find(digest, set_offset, now)
+            current = None
+            if found is not None:
+                offset, (value_len, *_) = found
+                current = self._mm[offset + _SLOT.size : offset + _SLOT.size + value_len]
+
+            value, ttl_seconds, result = fn(current)
+            if value is not None and len(value) <= self.value_size and ttl_seconds > 0:
+                offset = self._victim(digest, set_offset, now)
+                self._write_slot(offset, digest, value, now + ttl_seconds, 0)
+            return result
+
+    def delete(self, key: str) -> bool:
+        """Remove a key. Returns True if it was present."""
+        digest, set_offset, stripe = self._locate(key)
+        with self._lock(stripe, exclusive=True):
+            found = self._find(digest, set_offset, time.time())
+            if found is None:
+                return False
+            self._clear_slot(found[0])
+            return True
+
+    def delete_tagged(self, tag: int) -> int:
+        """
+        Remove every entry stored with ``tag``.
+
+        Visits only the slots listed in the tag's index; scans the whole
+        table only if the index overflowed.
+        """
+        index = self._take(_tag_index_key(tag))
+        if index is None:
+            return 0
+        overflowed, _ = _TAG_INDEX.unpack_from(index)
+        if overflowed:
+            return self._scan_delete_tagged(tag)
+
+        removed = 0
+        for start in range(_TAG_INDEX.size, len(index), _DIGEST_SIZE):
+            digest = bytes(index[start : start + _DIGEST_SIZE])
+            set_offset, stripe = self._set_of(digest)
+            with self._lock(stripe, exclusive=True):
+                found = self._find(digest, set_offset, time.time())
+                if found is not None and found[1][3] == tag:
+                    self._clear_slot(found[0])
+                    removed += 1
+        return removed
+
+    def _index_tagged(self, tag: int, digest: bytes, expires_at: float) -> None:
+        """Add a key digest to its tag's index entry."""
+        max_digests = (self.value_size - _TAG_INDEX.size) // _DIGEST_SIZE
+
+        def add(current: bytes | None) -> tuple[bytes | None, float, None]:
+            overflowed, latest, digests = 0, expires_at, b""
+            if current is not None and len(current) >= _TAG_INDEX.size:
+                overflowed, latest = _TAG_INDEX.unpack_from(current)
+                latest = max(latest, expires_at)
+                digests = bytes(current[_TAG_INDEX.size :])
+            known = {digests[i : i + _DIGEST_SIZE] for i in range(0, len(digests), _DIGEST_SIZE)}
+            if digest not in known:
+                if len(known) < max_digests:
+                    digests += digest
+                else:
+                    overflowed = 1
+            value = _TAG_INDEX.pack(overflowed, latest) + digests
+            return value, latest - time.time(), None
+
+        self.update(_tag_index_key(tag), add)
+
+    def _take(self, key: str) -> bytes | None:
+        """Remove a key and return its value (None if it was not present)."""
+        digest, set_offset, stripe = self._locate(key)
+        with self._lock(stripe, exclusive=True):
+            found = self._find(digest, set_offset, time.time())
+            if found is None:
+                return None
+            offset, (value_len, *_) = found
+            value = self._mm[offset + _SLOT.size : offset + _SLOT.size + value_len]
+            self._clear_slot(offset)
+            return value
+
+    def _scan_delete_tagged(self, tag: int) -> int:
+        """Remove every entry stored with ``tag`` by scanning the whole table."""
+        removed = 0
+        with self._lock_all():
+            for offset in self._slot_offsets():
+                slot = self._read_slot(offset)
+                if slot is not None and slot[3] == tag:
+                    self._clear_slot(offset)
+                    removed += 1
+        return removed
+
+    def clear(self) -> None:
+        """Remove all entries, for every process."""
+        with self._lock_all():
+            self._mm[_DATA_OFFSET:] = bytes(len(self._mm) - _DATA_OFFSET)
+
+    def close(self) -> None:
+        """Unmap the table. The file stays for the other processes."""
+        self._mm.close()
+        os.close(self._fd)
+
+    def _slot_offsets(self) -> range:
+        return range(_DATA_OFFSET, len(self._mm), self.slot_size)
+
+    def __len__(self) -> int:
+        """Live entries (approximate: read without locking)."""
+        now = time.time()
+        return sum(
+            1
+            for offset in self._slot_offsets()
+            if (slot := self._read_slot(offset)) is not None and slot[1] > now
+        )
+
+
+def _tag_index_key(tag: int) -> str:
+    # Never produced by callers' keys (they are printable)
+    return f"\x00tag:{tag}"
+
+
+def open_shared_table(
+    name: str, slots: int, value_size: int, directory: str, stripes: int
+) -> SharedMemoryTable | None:
+    """
+    Open a shared table, or return None (and log why) if that fails.
+
+    Callers fall back to their per-process tier when this returns None.
+    """
+    try:
+        table = SharedMemoryTable(name, slots, value_size, directory, stripes=stripes)
+    except OSError as e:
+        logger.warning(f"❌ Shared memory table {name} unavailable ({e}) - using per-process tier")
+        return None
+    logger.info(f"✓ Shared memory table ready: {table.path}")
+    return table
@@ -0,0 +1,91 @@
+# ============================================
+# Ascend AI - Single-Flight Call Coalescing
+# ============================================
+# Deduplicates concurrent calls for the same key within one process
+# Used to stop cache-miss stampedes on authentication
+# ============================================
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import Any, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[T]):
+    """
+    Coalesce concurrent calls that share a key into a single execution.
+
+    The first caller for a key (the leader) runs the function. Callers that
+    arrive while it is in flight await the leader's result instead of
+    running the function again. Once the call finishes the key is released,
+    so later calls run fresh - results are never cached here.
+
+    Behaviour:
+    - Leader result: returned to every waiter
+    - Leader exception: re-raised in every waiter
+    - Leader cancelled: one of the waiters takes over as the new leader
+
+    Example:
+        flight = SingleFlight()
+        value, shared = await flight.do("key", load_value)
+    """
+
+    def __init__(self):
+        """Initialize an empty in-flight call map."""
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> tuple[T, bool]:
+        """
+        Run ``fn`` once per key across concurrent callers.
+
+        Args:
+            key: Identity of the call (e.g. a token hash)
+            fn: Zero-argument coroutine function producing the result
+
+        Returns:
+            tuple[T, bool]: The result, and True if it was produced by another
+            caller (shared) rather than by this one
+        """
+        while True:
+            future = self._inflight.get(key)
+            if future is None:
+                break
+
+            try:
+                return await asyncio.shield(future), True
+            except asyncio.CancelledError:
+                # Re-raise our own cancellation; if only the leader was
+                # cancelled, loop round and take over the call ourselves
+                task = asyncio.current_task()
+                if not future.cancelled() or (task is not None and task.cancelling()):
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        # Mark exceptions as retrieved so a leader failing with no waiters
+        # does not log "Future exception was never retrieved"
+        future.add_done_callback(_consume_exception)
+        self._inflight[key] = future
+
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            del self._inflight[key]
+
+    def __len__(self) -> int:
+        """Number of calls currently in flight."""
+        return len(self._inflight)
+
+
+def _consume_exception(future: asyncio.Future[Any]) -> None:
+    if not future.cancelled():
+        future.exception()
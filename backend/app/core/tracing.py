@@ -0,0 +1,450 @@
+# ============================================
+# Ascend AI - Request Tracing
+# ============================================
+# Lightweight spans propagated through contextvars: every request gets a
+# W3C trace id (also used as the request id in logs), and when tracing is
+# enabled (TRACING_ENABLED) the spans of sampled requests - middleware,
+# auth, SQL statements, Redis commands, outbound HTTP - are written as one
+# JSON line per trace to stdout or a file, from a background thread.
+# ============================================
+
+import atexit
+import contextlib
+import json
+import logging
+import random
+import re
+import sys
+import time
+from collections.abc import Iterator, Mapping, MutableMapping
+from contextvars import ContextVar
+from datetime import UTC, datetime
+from logging.handlers import QueueListener
+from queue import SimpleQueue
+from typing import Any
+
+import httpx
+
+from app.core.logging_config import LazyQueueHandler
+
+logger = logging.getLogger(__name__)
+
+# Trace export goes through its own logger, never to the application log
+export_logger = logging.getLogger("app.tracing.export")
+export_logger.propagate = False
+
+TRACEPARENT_HEADER = "traceparent"
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+# Spans kept per trace (an N+1 query loop must not grow a trace without bound)
+MAX_SPANS_PER_TRACE = 500
+# SQL statements are cut to this length in span attributes
+MAX_STATEMENT_LENGTH = 200
+
+
+def new_trace_id() -> str:
+    """Random 128-bit trace id (32 lowercase hex characters)."""
+    return f"{random.getrandbits(128):032x}"
+
+
+def _new_span_id() -> str:
+    return f"{random.getrandbits(64):016x}"
+
+
+class _Trace:
+    """Spans finished so far in one trace."""
+
+    __slots__ = ("trace_id", "sampled", "spans", "started_at")
+
+    def __init__(self, trace_id: str, sampled: bool):
+        self.trace_id = trace_id
+        self.sampled = sampled
+        self.spans: list[Span] = []
+        self.started_at = time.time()
+
+
+class Span:
+    """
+    One timed operation in a trace.
+
+    Spans of unsampled traces are never created, except the root, which
+    only carries the trace id.
+    """
+
+    __slots__ = ("name", "trace", "span_id", "parent_id", "attributes", "error", "start", "end")
+
+    def __init__(self, name: str, trace: _Trace, parent_id: str | None, attributes: dict):
+        self.name = name
+        self.trace = trace
+        self.span_id = _new_span_id()
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.error: str | None = None
+        self.start = time.perf_counter()
+        self.end: float | None = None
+
+    @property
+    def trace_id(self) -> str:
+        return self.trace.trace_id
+
+    def set(self, key: str, value: Any) -> None:
+        """Attach an attribute (a str, number or bool)."""
+        self.attributes[key] = value
+
+    def finish(self, error: BaseException | None = None) -> None:
+        """Stop the clock and record the span in its trace (idempotent)."""
+        if self.end is not None:
+            return
+        self.end = time.perf_counter()
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+        spans = self.trace.spans
+        if self.trace.sampled and len(spans) < MAX_SPANS_PER_TRACE:
+            spans.append(self)
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end if self.end is not None else time.perf_counter()
+        return (end - self.start) * 1000
+
+
+# The span code is running in; asyncio tasks and threads started with
+# contextvars.copy_context() inherit it
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Span | None:
+    """The innermost active span, if any."""
+    return _current_span.get()
+
+
+def current_trace_id() -> str | None:
+    """Trace id of the request (or task) being handled, if any."""
+    span = _current_span.get()
+    return span.trace.trace_id if span is not None else None
+
+
+class _TraceRecord:
+    """A finished trace, turned into JSON only when the exporter writes it."""
+
+    __slots__ = ("root",)
+
+    def __init__(self, root: Span):
+        self.root = root
+
+    def __str__(self) -> str:
+        root, trace = self.root, self.root.trace
+        return json.dumps(
+            {
+                "trace_id": trace.trace_id,
+                "name": root.name,
+                "start": datetime.fromtimestamp(trace.started_at, UTC).isoformat(),
+                "duration_ms": round(root.duration_ms, 3),
+                "attributes": root.attributes,
+                "error": root.error,
+                "spans": [
+                    {
+                        "name": span.name,
+                        "span_id": span.span_id,
+                        "parent_id": span.parent_id,
+                        "offset_ms": round((span.start - root.start) * 1000, 3),
+                        "duration_ms": round(span.duration_ms, 3),
+                        "attributes": span.attributes,
+                        "error": span.error,
+                    }
+                    for span in trace.spans
+                    if span is not root
+                ],
+            },
+            default=str,
+        )
+
+
+class Tracer:
+    """
+    Sampling and export settings for the process.
+
+    Disabled by default: requests still get trace ids (for logs and
+    propagation), but no spans are recorded. Spans are collected in memory
+    per trace and the whole trace is exported once its root span ends.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.sample_rate = 1.0
+        self.min_duration_ms = 0.0
+        self._listener: QueueListener | None = None
+
+    def configure(
+        self,
+        enabled: bool,
+        sample_rate: float = 1.0,
+        exporter: str = "stdout",
+        path: str = "",
+        min_duration_ms: float = 0.0,
+    ) -> None:
+        """
+        Apply the tracing settings and start the exporter thread.
+
+        Args:
+            enabled: Record and export spans
+            sample_rate: Fraction of traces recorded
+            exporter: "stdout" or "file" (one JSON object per line)
+            path: Output file for the "file" exporter
+            min_duration_ms: Only export traces at least this slow
+        """
+        self.shutdown()
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.min_duration_ms = min_duration_ms
+        if not enabled:
+            return
+
+        handler = (
+            logging.FileHandler(path) if exporter == "file" else logging.StreamHandler(sys.stdout)
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        records: SimpleQueue = SimpleQueue()
+        self._listener = QueueListener(records, handler)
+        self._listener.start()
+        for existing in export_logger.handlers[:]:
+            export_logger.removeHandler(existing)
+        export_logger.addHandler(LazyQueueHandler(records))
+        export_logger.setLevel(logging.INFO)
+
+    def shutdown(self) -> None:
+        """Write out queued traces and stop the exporter thread."""
+        if self._listener is not None:
+            self._listener.stop()
+            for handler in self._listener.handlers:
+                handler.close()
+            self._listener = None
+
+    def sample(self) -> bool:
+        """Decide whether a new trace records its spans."""
+        return self.enabled and (self.sample_rate >= 1 or random.random() < self.sample_rate)
+
+    def export(self, root: Span) -> None:
+        """Hand a finished trace to the exporter thread."""
+        if root.duration_ms >= self.min_duration_ms:
+            export_logger.info("%s", _TraceRecord(root))
+
+
+# ============================================
+# Creating Spans
+# ============================================
+def parse_traceparent(value: str | None) -> tuple[str, str] | None:
+    """
+    Read a W3C ``traceparent`` header.
+
+    Returns:
+        tuple[str, str] | None: (trace id, parent span id), or None if
+        absent or malformed
+    """
+    if not value:
+        return None
+    match = _TRACEPARENT.match(value.strip())
+    if match is None or match.group(1) == "0" * 32 or match.group(2) == "0" * 16:
+        return None
+    return match.group(1), match.group(2)
+
+
+@contextlib.contextmanager
+def start_trace(name: str, traceparent: str | None = None, **attributes: Any) -> Iterator[Span]:
+    """
+    Run the enclosed code as the root span of a trace.
+
+    Continues the caller's trace when given a valid ``traceparent`` (from an
+    upstream service, or a task enqueued by a traced request), otherwise
+    starts a new one. The trace is exported when the block exits.
+
+    Args:
+        name: Root span name (e.g. "GET /api/v1/sessions/{session_id}")
+        traceparent: Incoming W3C traceparent header, if any
+        attributes: Initial span attributes
+    """
+    parent = parse_traceparent(traceparent)
+    trace_id, parent_id = parent if parent else (new_trace_id(), None)
+    root = Span(name, _Trace(trace_id, tracer.sample()), parent_id, attributes)
+    token = _current_span.set(root)
+    try:
+        yield root
+    except BaseException as e:
+        root.finish(e)
+        raise
+    finally:
+        root.finish()
+        _current_span.reset(token)
+        if root.trace.sampled:
+            tracer.export(root)
+
+
+@contextlib.contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span | None]:
+    """
+    Time the enclosed code as a child of the current span.
+
+    Yields None (and costs one contextvar read) outside a sampled trace.
+
+    Example:
+        with span("auth.jwt_decode"):
+            payload = decode_jwt_token(token)
+    """
+    parent = _current_span.get()
+    if parent is None or not parent.trace.sampled:
+        yield None
+        return
+    child = Span(name, parent.trace, parent.span_id, attributes)
+    token = _current_span.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.finish(e)
+        raise
+    finally:
+        child.finish()
+        _current_span.reset(token)
+
+
+def start_span(name: str, **attributes: Any) -> Span | None:
+    """
+    Start a child of the current span without making it current.
+
+    For callbacks that begin and end an operation in different places
+    (SQLAlchemy events); the caller must call ``finish()``.
+    """
+    parent = _current_span.get()
+    if parent is None or not parent.trace.sampled:
+        return None
+    return Span(name, parent.trace, parent.span_id, attributes)
+
+
+# ============================================
+# Propagation
+# ============================================
+def inject(headers: MutableMapping[str, str]) -> MutableMapping[str, str]:
+    """
+    Add a ``traceparent`` header for the current span (no-op outside a trace).
+
+    Use on outbound requests (see TracingTransport) so the receiver
+    continues this trace.
+    """
+    current = _current_span.get()
+    if current is not None:
+        flags = "01" if current.trace.sampled else "00"
+        headers[TRACEPARENT_HEADER] = f"00-{current.trace.trace_id}-{current.span_id}-{flags}"
+    return headers
+
+
+def extract(headers: Mapping[str, Any] | None) -> str | None:
+    """Return the ``traceparent`` header of incoming headers, if any."""
+    if not headers:
+        return None
+    value = headers.get(TRACEPARENT_HEADER)
+    return value if isinstance(value, str) else None
+
+
+# ============================================
+# Instrumentation
+# ============================================
+def instrument_sqlalchemy(engine) -> None:
+    """
+    Record one "db.query" span per SQL statement executed by ``engine``.
+
+    Args:
+        engine: SQLAlchemy Engine or AsyncEngine
+    """
+    from sqlalchemy import event
+
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(_conn, _cursor, statement, _parameters, context, _executemany):
+        if context is not None:
+            context._trace_span = start_span("db.query", statement=statement[:MAX_STATEMENT_LENGTH])
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(_conn, _cursor, _statement, _parameters, context, _executemany):
+        query_span = getattr(context, "_trace_span", None)
+        if query_span is not None:
+            query_span.set("rows", context.rowcount)
+            query_span.finish()
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(exception_context):
+        context = exception_context.execution_context
+        query_span = getattr(context, "_trace_span", None)
+        if query_span is not None:
+            query_span.finish(exception_context.original_exception)
+
+
+def instrument_redis(client):
+    """
+    Record one span per Redis command or pipeline sent by ``client``.
+
+    Wraps the client's own ``execute_command`` and ``pipeline``, so script
+    calls (EVALSHA) and commands sent by helpers are covered too. Commands
+    are recorded by name only; keys may hold client or user identifiers.
+
+    Args:
+        client: redis.asyncio Redis or RedisCluster client
+
+    Returns:
+        The same client
+    """
+    execute_command = client.execute_command
+    make_pipeline = client.pipeline
+
+    async def traced_execute_command(*args, **options):
+        if current_span() is None:
+            return await execute_command(*args, **options)
+        with span(f"redis.{args[0]}".lower()):
+            return await execute_command(*args, **options)
+
+    def traced_pipeline(*args, **kwargs):
+        pipe = make_pipeline(*args, **kwargs)
+        execute = pipe.execute
+
+        async def traced_execute(*exec_args, **exec_kwargs):
+            with span("redis.pipeline") as pipeline_span:
+                if pipeline_span is not None:
+                    pipeline_span.set("commands", len(pipe))
+                return await execute(*exec_args, **exec_kwargs)
+
+        pipe.execute = traced_execute
+        return pipe
+
+    client.execute_command = traced_execute_command
+    client.pipeline = traced_pipeline
+    return client
+
+
+class TracingTransport(httpx.AsyncBaseTransport):
+    """
+    httpx transport that records an "http.client" span per outbound request
+    and forwards the trace to the server in a ``traceparent`` header.
+
+    Example:
+        client = httpx.AsyncClient(transport=TracingTransport())
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport | None = None):
+        self.transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        with span("http.client", method=request.method, host=request.url.host) as client_span:
+            inject(request.headers)
+            response = await self.transport.handle_async_request(request)
+            if client_span is not None:
+                client_span.set("status", response.status_code)
+            return response
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+# ============================================
+# Global Tracer Instance
+# ============================================
+tracer = Tracer()
+atexit.register(tracer.shutdown)
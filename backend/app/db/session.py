@@ -10,6 +10,8 @@ from collections.abc import AsyncGenerator
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from app.core.config import settings
+from app.core.server_timing import time_sqlalchemy
+from app.core.tracing import instrument_sqlalchemy
 
 # ============================================
 # Async Engine Configuration
@@ -22,6 +24,11 @@ engine = create_async_engine(
     max_overflow=10,  # Max connections beyond pool_size
 )
 
+# One "db.query" span per statement in traced requests (see app/core/tracing.py)
+instrument_sqlalchemy(engine)
+# Statement time counts towards the "db" phase of Server-Timing
+time_sqlalchemy(engine)
+
 # ============================================
 # Async Session Factory
 # ============================================
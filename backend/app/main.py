@@ -10,16 +10,37 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 
-from app.api.v1 import auth, resumes, sessions, users
+from app.api.v1 import admin, auth, resumes, sessions, users
+from app.core.cache import token_cache
 from app.core.config import settings
+from app.core.logging_config import configure_logging
+from app.core.prometheus import CONTENT_TYPE, metrics_registry
+from app.core.redis_manager import redis_manager
+from app.core.runtime_metrics import register_runtime_collectors
+from app.core.tracing import tracer
+from app.middleware.client_ip import (
+    CIDRTree,
+    address_in,
+    client_ip_resolver,
+    get_client_ip,
+    parse_cidrs,
+)
 from app.middleware.logging import RequestLoggingMiddleware
+from app.middleware.metrics import MetricsMiddleware
 from app.middleware.rate_limit import RateLimitMiddleware
+from app.middleware.server_timing import ServerTimingMiddleware
+from app.middleware.tracing import TracingMiddleware
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+configure_logging(settings.log_level, fmt=settings.log_format, queued=settings.log_queue_enabled)
+tracer.configure(
+    settings.tracing_enabled,
+    sample_rate=settings.tracing_sample_rate,
+    exporter=settings.tracing_exporter,
+    path=settings.tracing_export_path,
+    min_duration_ms=settings.tracing_min_duration_ms,
 )
 logger = logging.getLogger(__name__)
 
@@ -47,10 +68,30 @@ async def lifespan(_app: FastAPI):
         logger.error(f"❌ CRITICAL ERROR: Invalid configuration:\n{e}")
         raise
 
+    # Shared Redis pools for cache and rate limiting (non-fatal if Redis is down;
+    # the manager keeps reconnecting in the background)
+    await redis_manager.start()
+
+    # Keep this worker's L1 token cache coherent with the rest of the fleet
+    await token_cache.start_invalidation_listener()
+
+    # Report this worker's token cache metrics for fleet-wide aggregation
+    await token_cache.start_metrics_reporter()
+
+    # Share this worker's /metrics series with the other workers on the host
+    if settings.metrics_enabled:
+        await metrics_registry.start(
+            settings.metrics_directory, settings.metrics_write_interval_seconds
+        )
+
     yield
 
     # Shutdown
     logger.info("👋 Shutting down Ascend AI Backend...")
+    await metrics_registry.stop()
+    await token_cache.stop_metrics_reporter()
+    await token_cache.stop_invalidation_listener()
+    await redis_manager.stop()
 
 
 # ============================================
@@ -86,6 +127,16 @@ app.add_middleware(RequestLoggingMiddleware)
 # 3. Rate Limiting (protects against abuse)
 app.add_middleware(RateLimitMiddleware)
 
+# 4. Metrics (so rejected and failed requests are timed too)
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
+# 5. Tracing (everything above runs inside the request's trace)
+app.add_middleware(TracingMiddleware)
+
+# 6. Server-Timing (outermost, so "total" covers the whole stack)
+app.add_middleware(ServerTimingMiddleware)
+
 
 # ============================================
 # Global Exception Handler
@@ -139,6 +190,41 @@ async def health_check():
     }
 
 
+# ============================================
+# Metrics Endpoint
+# ============================================
+if settings.metrics_enabled:
+    register_runtime_collectors(metrics_registry)
+
+    # Scrapers outside TRUSTED_PROXIES that may read /metrics
+    metrics_scrapers: CIDRTree[bool] = CIDRTree()
+    for network in parse_cidrs(settings.metrics_allowed_cidrs, "METRICS_ALLOWED_CIDRS"):
+        metrics_scrapers.insert(network, True)
+
+    @app.get("/metrics", tags=["Health"], include_in_schema=False)
+    async def metrics(request: Request):
+        """
+        Prometheus scrape endpoint.
+
+        Returns every worker's metrics on this host (see app/core/prometheus.py),
+        whichever worker serves the request. Only served to clients in
+        TRUSTED_PROXIES or METRICS_ALLOWED_CIDRS, since it needs no token and
+        is not rate limited.
+
+        Returns:
+            Response: Metrics in the Prometheus text exposition format, or 403
+        """
+        client_ip = get_client_ip(request)
+        if not (
+            client_ip_resolver.is_trusted(client_ip) or address_in(metrics_scrapers, client_ip)
+        ):
+            return JSONResponse(
+                status_code=status.HTTP_403_FORBIDDEN,
+                content={"detail": "Metrics are not available to this address"},
+            )
+        return Response(content=await metrics_registry.render(), media_type=CONTENT_TYPE)
+
+
 # ============================================
 # API Routes Registration
 # ============================================
@@ -147,6 +233,7 @@ app.include_router(auth.router, prefix="/api/v1")
 app.include_router(users.router, prefix="/api/v1")
 app.include_router(resumes.router, prefix="/api/v1")
 app.include_router(sessions.router, prefix="/api/v1")
+app.include_router(admin.router, prefix="/api/v1")
 
 
 # ============================================
@@ -0,0 +1,218 @@
+# ============================================
+# Ascend AI - Client IP Resolution and IP Rules
+# ============================================
+# Finds the real client address behind trusted proxies (TRUSTED_PROXIES)
+# and classifies it against the allow/deny/exempt CIDR lists. Both use a
+# binary radix tree, so a lookup walks at most 32 (IPv4) or 128 (IPv6)
+# bits however many networks are configured.
+# ============================================
+
+import ipaddress
+from typing import Generic, Literal, TypeVar
+
+from fastapi import Request
+
+from app.core.config import settings
+
+V = TypeVar("V")
+
+IPAction = Literal["allow", "deny", "exempt"]
+
+# Returned when the client address is not known at all
+UNKNOWN_CLIENT = "unknown"
+
+
+def parse_cidrs(raw: str, setting: str) -> list[ipaddress.IPv4Network | ipaddress.IPv6Network]:
+    """
+    Parse a comma-separated list of CIDRs (bare addresses are single hosts).
+
+    Args:
+        raw: Setting value, e.g. "10.0.0.0/8, 192.0.2.7"
+        setting: Setting name for error messages
+
+    Returns:
+        list: Parsed networks
+
+    Raises:
+        ValueError: If an entry is not a valid address or network
+    """
+    networks = []
+    for entry in raw.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        try:
+            networks.append(ipaddress.ip_network(entry, strict=False))
+        except ValueError as e:
+            raise ValueError(f"Invalid {setting}: {e}") from e
+    return networks
+
+
+class CIDRTree(Generic[V]):
+    """
+    Binary radix tree mapping networks to values, with longest-prefix match.
+
+    One tree per address family. Nodes are ``[zero, one, value]`` lists: a
+    lookup follows the address bits and remembers the last value seen, so
+    the most specific network containing the address wins.
+    """
+
+    def __init__(self):
+        self._roots: dict[int, list] = {4: [None, None, None], 6: [None, None, None]}
+        self._empty = True
+
+    def insert(self, network: ipaddress.IPv4Network | ipaddress.IPv6Network, value: V) -> None:
+        """Map ``network`` (and every address in it) to ``value``."""
+        node = self._roots[network.version]
+        bits = network.max_prefixlen
+        address = int(network.network_address)
+        for depth in range(network.prefixlen):
+            bit = (address >> (bits - 1 - depth)) & 1
+            if node[bit] is None:
+                node[bit] = [None, None, None]
+            node = node[bit]
+        node[2] = value
+        self._empty = False
+
+    def lookup(self, ip: ipaddress.IPv4Address | ipaddress.IPv6Address) -> V | None:
+        """Return the value of the most specific network containing ``ip``."""
+        if self._empty:
+            return None
+        if ip.version == 6 and ip.ipv4_mapped is not None:
+            ip = ip.ipv4_mapped
+        node = self._roots[ip.version]
+        best = node[2]
+        bits = ip.max_prefixlen
+        address = int(ip)
+        for depth in range(bits):
+            node = node[(address >> (bits - 1 - depth)) & 1]
+            if node is None:
+                break
+            if node[2] is not None:
+                best = node[2]
+        return best
+
+    def __bool__(self) -> bool:
+        return not self._empty
+
+
+def _parse_ip(value: str) -> ipaddress.IPv4Address | ipaddress.IPv6Address | None:
+    try:
+        return ipaddress.ip_address(value.strip())
+    except ValueError:
+        return None
+
+
+def address_in(tree: CIDRTree, address: str) -> bool:
+    """Whether an address maps to a truthy value in a tree (False if it can't be parsed)."""
+    ip = _parse_ip(address)
+    return ip is not None and bool(tree.lookup(ip))
+
+
+class ClientIPResolver:
+    """
+    Resolves the client address of a request.
+
+    X-Forwarded-For is only believed when the direct peer is a trusted
+    proxy. The chain is then read right to left - each hop was appended by
+    the proxy after it - skipping trusted proxies, and the first untrusted
+    address is the client. Entries further left were supplied by the client
+    and are ignored, so spoofing the header changes nothing.
+    """
+
+    def __init__(self, trusted_proxies: str, allow: str = "", deny: str = "", exempt: str = ""):
+        """
+        Compile the trusted proxies and IP rules.
+
+        Args:
+            trusted_proxies: Comma-separated CIDRs of proxies allowed to set X-Forwarded-For
+            allow: CIDRs that are always let through (overrides a broader deny)
+            deny: CIDRs whose requests are rejected
+            exempt: CIDRs that skip rate limiting (e.g. internal health probers)
+
+        Raises:
+            ValueError: If any list contains an invalid entry
+        """
+        self.trusted: CIDRTree[bool] = CIDRTree()
+        for network in parse_cidrs(trusted_proxies, "TRUSTED_PROXIES"):
+            self.trusted.insert(network, True)
+
+        self.rules: CIDRTree[IPAction] = CIDRTree()
+        for raw, action, setting in (
+            (allow, "allow", "RATE_LIMIT_ALLOW_CIDRS"),
+            (deny, "deny", "RATE_LIMIT_DENY_CIDRS"),
+            (exempt, "exempt", "RATE_LIMIT_EXEMPT_CIDRS"),
+        ):
+            for network in parse_cidrs(raw, setting):
+                self.rules.insert(network, action)
+
+    def resolve(self, peer: str | None, forwarded_for: str | None) -> str:
+        """
+        Determine the client address.
+
+        Args:
+            peer: Address of the direct TCP peer, if known
+            forwarded_for: X-Forwarded-For header value, if any
+
+        Returns:
+            str: Client IP address, or "unknown"
+        """
+        if peer is None:
+            return UNKNOWN_CLIENT
+        if not forwarded_for or not self.is_trusted(peer):
+            return peer
+
+        client = peer
+        for hop in reversed(forwarded_for.split(",")):
+            ip = _parse_ip(hop)
+            if ip is None:
+                # A trusted proxy never writes garbage: whatever is left of
+                # this came from the client
+                break
+            client = str(ip)
+            if not self.trusted.lookup(ip):
+                break
+        return client
+
+    def classify(self, client_ip: str) -> IPAction:
+        """
+        Apply the allow/deny/exempt lists to a client address.
+
+        The most specific matching network decides; addresses matching no
+        rule (or that can't be parsed) are allowed.
+        """
+        if not self.rules:
+            return "allow"
+        ip = _parse_ip(client_ip)
+        return (ip is not None and self.rules.lookup(ip)) or "allow"
+
+    def is_trusted(self, address: str) -> bool:
+        """Whether an address is in TRUSTED_PROXIES (False if it can't be parsed)."""
+        return address_in(self.trusted, address)
+
+
+def get_client_ip(request: Request) -> str:
+    """
+    Extract the client IP address from a request.
+
+    Honors X-Forwarded-For only from TRUSTED_PROXIES (see ClientIPResolver).
+
+    Args:
+        request: FastAPI Request object
+
+    Returns:
+        str: Client IP address
+    """
+    peer = request.client.host if request.client else None
+    return client_ip_resolver.resolve(peer, request.headers.get("x-forwarded-for"))
+
+
+# ============================================
+# Global Client IP Resolver Instance
+# ============================================
+client_ip_resolver = ClientIPResolver(
+    settings.trusted_proxies,
+    allow=settings.rate_limit_allow_cidrs,
+    deny=settings.rate_limit_deny_cidrs,
+    exempt=settings.rate_limit_exempt_cidrs,
+)
@@ -0,0 +1,102 @@
+# ============================================
+# Ascend AI - Request Log Sampling
+# ============================================
+# Decides which successful requests get logged (LOG_SAMPLE_RATE, per-route
+# LOG_SAMPLE_RATES) and counts the ones that don't, so the request logger
+# can report them and totals can still be rebuilt from the logs.
+# ============================================
+
+import json
+import random
+import time
+from collections import Counter
+from typing import Annotated
+
+from pydantic import Field, TypeAdapter, ValidationError
+
+_RATES = TypeAdapter(dict[str, Annotated[float, Field(ge=0, le=1)]])
+
+
+def load_sample_rates(raw: str) -> dict[str, float]:
+    """
+    Parse the LOG_SAMPLE_RATES setting.
+
+    Args:
+        raw: JSON object mapping route templates to sample rates, e.g.
+            '{"/health": 0, "/api/v1/sessions/{session_id}": 0.05}', or an
+            empty string for none
+
+    Returns:
+        dict[str, float]: Sample rate per route template
+
+    Raises:
+        ValueError: If the JSON is malformed or a rate is outside [0, 1]
+    """
+    try:
+        return _RATES.validate_python(json.loads(raw)) if raw.strip() else {}
+    except (json.JSONDecodeError, ValidationError) as e:
+        raise ValueError(f"Invalid LOG_SAMPLE_RATES: {e}") from e
+
+
+class LogSampler:
+    """
+    Per-route sampling of successful request logs.
+
+    The decision is made when a request starts, so a request is logged
+    either completely or not at all. Requests that turn out to be errors or
+    slow are logged whatever the decision (see RequestLoggingMiddleware);
+    only the rest are counted as suppressed.
+
+    Suppressed counts are per "METHOD route" and are handed out once every
+    ``summary_interval`` seconds, checked on the next request rather than by
+    a timer - an idle worker has nothing new to report.
+    """
+
+    def __init__(
+        self,
+        default_rate: float,
+        route_rates: dict[str, float],
+        summary_interval: float,
+    ):
+        """
+        Initialize the sampler.
+
+        Args:
+            default_rate: Fraction of successful requests logged (1 = all)
+            route_rates: Overrides per route template
+            summary_interval: Seconds between suppressed-count summaries
+        """
+        self.default_rate = default_rate
+        self.route_rates = route_rates
+        self.summary_interval = summary_interval
+        self.suppressed: Counter[str] = Counter()
+        self._window_start = time.monotonic()
+
+    def sample(self, route: str) -> bool:
+        """Decide whether a request to ``route`` is logged."""
+        rate = self.route_rates.get(route, self.default_rate)
+        return rate >= 1 or (rate > 0 and random.random() < rate)
+
+    def record_suppressed(self, method: str, route: str) -> None:
+        """Count a request whose log lines were dropped."""
+        self.suppressed[f"{method} {route}"] += 1
+
+    def take_summary(self) -> tuple[dict[str, int], float] | None:
+        """
+        Hand out the suppressed counts once per interval.
+
+        Returns:
+            tuple[dict[str, int], float] | None: (suppressed requests per
+            "METHOD route", seconds covered), or None if the interval has
+            not elapsed or nothing was suppressed
+        """
+        now = time.monotonic()
+        elapsed = now - self._window_start
+        if elapsed < self.summary_interval:
+            return None
+        self._window_start = now
+        if not self.suppressed:
+            return None
+        counts = dict(self.suppressed)
+        self.suppressed.clear()
+        return counts, elapsed
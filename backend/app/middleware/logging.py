@@ -7,24 +7,39 @@
 
 import logging
 import time
-from collections.abc import Callable
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.tracing import current_trace_id, new_trace_id
+from app.middleware.client_ip import client_ip_resolver, get_client_ip
+from app.middleware.log_sampling import LogSampler, load_sample_rates
+from app.middleware.routing import UNMATCHED_ROUTE, route_resolver
+
+# get_client_ip lives in app.middleware.client_ip; still importable from here
+__all__ = ["RequestLoggingMiddleware", "get_client_ip"]
 
 logger = logging.getLogger(__name__)
 
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
+class RequestLoggingMiddleware:
     """
-    Middleware for logging all HTTP requests and responses.
+    Middleware for logging all HTTP requests and responses (pure ASGI).
 
     Features:
-    - Logs request method, path, IP address, user agent
-    - Tracks request duration
+    - Logs request method, route template, IP address, user agent
+      (paths matching no route are logged as-is)
+    - Tracks request duration, up to the last byte of the response body
     - Logs response status codes
     - Sanitizes sensitive headers (Authorization)
     - Provides security audit trail
+    - Structured fields (route, status, duration_ms, client, ...) on every
+      record, for LOG_FORMAT=json
+    - Samples successful requests per route (LOG_SAMPLE_RATE/RATES); errors,
+      security events and slow requests are always logged, and the counts
+      of unlogged requests are reported periodically
+    - Passes response bodies (including streams) through untouched
 
     Security Notes:
     - Authorization headers are masked in logs
@@ -32,105 +47,181 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
     - Failed authentication attempts are highlighted
     """
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    def __init__(self, app: ASGIApp, sampler: LogSampler | None = None):
         """
-        Process and log HTTP requests and responses.
+        Initialize request logging middleware.
 
         Args:
-            request: Incoming HTTP request
-            call_next: Next middleware/endpoint in the chain
-
-        Returns:
-            Response: HTTP response from the endpoint
+            app: ASGI application to wrap
+            sampler: Sampling of successful requests (default: from settings)
         """
-        # Start timing
-        start_time = time.time()
+        self.app = app
+        self.sampler = sampler or LogSampler(
+            settings.log_sample_rate,
+            load_sample_rates(settings.log_sample_rates),
+            settings.log_sampling_summary_interval_seconds,
+        )
+        self.slow_request_seconds = settings.log_slow_request_ms / 1000
 
-        # Extract request metadata
-        request_id = id(request)
-        method = request.method
-        path = request.url.path
-        client_host = request.client.host if request.client else "unknown"
-        user_agent = request.headers.get("user-agent", "unknown")
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Process and log HTTP requests and responses.
 
-        # Check if this is an authenticated request
-        auth_header = request.headers.get("authorization")
-        is_authenticated = bool(auth_header and auth_header.startswith("Bearer "))
+        Args:
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        # Log incoming request
-        logger.info(
-            f"[{request_id}] {method} {path} - "
-            f"Client: {client_host} - "
-            f"Auth: {'Yes' if is_authenticated else 'No'}"
+        # Start timing
+        start_time = time.perf_counter()
+
+        # Extract request metadata; the request id is the trace id (set by
+        # TracingMiddleware), so log lines and exported spans line up
+        request_id = current_trace_id() or new_trace_id()
+        method = scope["method"]
+        # Route template rather than the raw path, so per-resource URLs
+        # (/sessions/{session_id}) aggregate under one name
+        route = route_resolver.route_for(scope)
+        path = scope["path"] if route == UNMATCHED_ROUTE else route
+        client = scope.get("client")
+        headers = Headers(scope=scope)
+        # Real client behind trusted proxies (same resolution as the rate limiter)
+        client_host = client_ip_resolver.resolve(
+            client[0] if client else None, headers.get("x-forwarded-for")
         )
+        user_agent = headers.get("user-agent", "unknown")
 
-        # Process request
-        try:
-            response = await call_next(request)
-
-            # Calculate duration
-            duration = time.time() - start_time
+        # Check if this is an authenticated request
+        auth_header = headers.get("authorization")
+        is_authenticated = bool(auth_header and auth_header.startswith("Bearer "))
 
-            # Determine log level based on status code
-            status_code = response.status_code
-            if status_code >= 500:
-                log_level = logging.ERROR
-            elif status_code >= 400:
-                log_level = logging.WARNING
-            else:
-                log_level = logging.INFO
+        # Lazy %-style messages: interpolation (and, with LOG_FORMAT=json,
+        # serialization of the ``extra`` fields) happens in the log writer,
+        # off the event loop when LOG_QUEUE_ENABLED
+        fields = {
+            "request_id": request_id,
+            "method": method,
+            "route": path,
+            "client": client_host,
+            "authenticated": is_authenticated,
+        }
+
+        # Sampled out requests are still logged at the end if they fail or
+        # turn out slow; only the incoming line is lost for those
+        sampled = self.sampler.sample(route)
 
-            # Log response
-            logger.log(
-                log_level,
-                f"[{request_id}] {method} {path} - "
-                f"Status: {status_code} - "
-                f"Duration: {duration:.3f}s - "
-                f"Client: {client_host}",
+        # Log incoming request
+        if sampled and logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "[%s] %s %s - Client: %s - Auth: %s",
+                request_id,
+                method,
+                path,
+                client_host,
+                "Yes" if is_authenticated else "No",
+                extra={"event": "request", **fields},
             )
 
-            # Log failed authentication attempts for security monitoring
-            if status_code == 401 and is_authenticated:
-                logger.warning(
-                    f"[SECURITY] Failed authentication attempt - "
-                    f"Path: {path} - "
-                    f"Client: {client_host} - "
-                    f"User-Agent: {user_agent}"
-                )
+        status_code = 500
 
-            return response
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
 
+        # Process request
+        try:
+            await self.app(scope, receive, send_with_status)
         except Exception as e:
             # Log exceptions
-            duration = time.time() - start_time
+            duration = time.perf_counter() - start_time
             logger.error(
-                f"[{request_id}] {method} {path} - "
-                f"Exception: {type(e).__name__}: {str(e)} - "
-                f"Duration: {duration:.3f}s - "
-                f"Client: {client_host}",
+                "[%s] %s %s - Exception: %s: %s - Duration: %.3fs - Client: %s",
+                request_id,
+                method,
+                path,
+                type(e).__name__,
+                str(e),
+                duration,
+                client_host,
                 exc_info=True,
+                extra={
+                    "event": "exception",
+                    **fields,
+                    "error": type(e).__name__,
+                    "duration_ms": round(duration * 1000, 3),
+                },
             )
             raise
 
+        # Calculate duration
+        duration = time.perf_counter() - start_time
+        slow = duration >= self.slow_request_seconds
+
+        # Determine log level based on status code; successful requests
+        # that were sampled out are only counted
+        if status_code >= 500:
+            log_level = logging.ERROR
+        elif status_code >= 400 or slow:
+            log_level = logging.WARNING
+        elif sampled:
+            log_level = logging.INFO
+        else:
+            self.sampler.record_suppressed(method, route)
+            log_level = None
+
+        # Log response
+        if log_level is not None and logger.isEnabledFor(log_level):
+            logger.log(
+                log_level,
+                "[%s] %s %s - Status: %d - Duration: %.3fs - Client: %s",
+                request_id,
+                method,
+                path,
+                status_code,
+                duration,
+                client_host,
+                extra={
+                    "event": "response",
+                    **fields,
+                    "status": status_code,
+                    "duration_ms": round(duration * 1000, 3),
+                    "slow": slow,
+                    "sampled": sampled,
+                },
+            )
 
-def get_client_ip(request: Request) -> str:
-    """
-    Extract client IP address from request.
-
-    Checks X-Forwarded-For header for proxy/load balancer setups,
-    falls back to direct client IP.
-
-    Args:
-        request: FastAPI Request object
+        # Log failed authentication attempts for security monitoring
+        if status_code == 401 and is_authenticated:
+            logger.warning(
+                "[SECURITY] Failed authentication attempt - Path: %s - Client: %s - User-Agent: %s",
+                path,
+                client_host,
+                user_agent,
+                extra={
+                    "event": "auth_failure",
+                    "route": path,
+                    "client": client_host,
+                    "user_agent": user_agent,
+                },
+            )
 
-    Returns:
-        str: Client IP address
-    """
-    # Check X-Forwarded-For header (for proxies/load balancers)
-    forwarded_for = request.headers.get("x-forwarded-for")
-    if forwarded_for:
-        # Take the first IP in the chain
-        return forwarded_for.split(",")[0].strip()
-
-    # Fall back to direct client IP
-    return request.client.host if request.client else "unknown"
+        # Report the unlogged requests so totals can be rebuilt
+        summary = self.sampler.take_summary()
+        if summary is not None:
+            counts, elapsed = summary
+            logger.info(
+                "[SAMPLING] Requests not logged in the last %.0fs: %s",
+                elapsed,
+                ", ".join(f"{name} x{count}" for name, count in counts.items()),
+                extra={
+                    "event": "log_sampling",
+                    "suppressed": counts,
+                    "interval_seconds": round(elapsed, 3),
+                },
+            )
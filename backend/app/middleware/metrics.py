@@ -0,0 +1,110 @@
+# ============================================
+# Ascend AI - Request Metrics Middleware
+# ============================================
+# Request count, latency histogram and in-flight gauge per route template,
+# exposed at /metrics (see app/core/prometheus.py)
+# ============================================
+
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import Counter, Gauge, Histogram
+from app.core.prometheus import HTTP_LATENCY_BUCKETS_S, MetricsRegistry, metrics_registry
+from app.middleware.routing import route_resolver
+
+# Anything else (scanners, typos) is reported as "OTHER" to keep labels bounded
+KNOWN_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+
+metrics_registry.describe(
+    "http_requests_total", "counter", "HTTP requests by method, route template and status class"
+)
+metrics_registry.describe(
+    "http_request_duration_seconds",
+    "histogram",
+    "HTTP request latency up to the last byte of the response, in seconds",
+)
+metrics_registry.describe(
+    "http_requests_in_flight", "gauge", "HTTP requests currently being handled"
+)
+
+
+class MetricsMiddleware:
+    """
+    Middleware recording per-route request metrics (pure ASGI).
+
+    Series are labelled by method, route template (paths matching no route
+    are "<unmatched>") and status class ("2xx", "4xx", ...). Requests that
+    raise are counted as 5xx. Series objects are looked up once per label
+    combination and cached, so a request costs two dict lookups, a bisect
+    and a few additions.
+    """
+
+    def __init__(self, app: ASGIApp, registry: MetricsRegistry = metrics_registry):
+        """
+        Initialize metrics middleware.
+
+        Args:
+            app: ASGI application to wrap
+            registry: Registry receiving the series
+        """
+        self.app = app
+        self.registry = registry
+        self._in_flight: dict[tuple[str, str], Gauge] = {}
+        self._completed: dict[tuple[str, str, str], tuple[Counter, Histogram]] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Time the request and record it once the response has been sent.
+
+        Args:
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        method = scope["method"] if scope["method"] in KNOWN_METHODS else "OTHER"
+        route = route_resolver.route_for(scope)
+
+        in_flight = self._in_flight.get((method, route))
+        if in_flight is None:
+            in_flight = self._in_flight[(method, route)] = self.registry.gauge(
+                "http_requests_in_flight", method=method, route=route
+            )
+        in_flight.inc()
+
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        except Exception:
+            status_code = 500
+            raise
+        finally:
+            in_flight.dec()
+            self._record(method, route, status_code, time.perf_counter() - start_time)
+
+    def _record(self, method: str, route: str, status_code: int, duration: float) -> None:
+        status_class = f"{status_code // 100}xx"
+        series = self._completed.get((method, route, status_class))
+        if series is None:
+            labels = {"method": method, "route": route, "status": status_class}
+            series = self._completed[(method, route, status_class)] = (
+                self.registry.counter("http_requests_total", **labels),
+                self.registry.histogram(
+                    "http_request_duration_seconds", HTTP_LATENCY_BUCKETS_S, **labels
+                ),
+            )
+        counter, histogram = series
+        counter.inc()
+        histogram.observe(duration)
@@ -5,33 +5,190 @@
 # Follows CCS security requirements
 # ============================================
 
+import asyncio
+import contextvars
 import logging
+import math
+import os
 import time
-from collections.abc import Callable
+from typing import NamedTuple
 
 import redis.asyncio as aioredis
-from fastapi import HTTPException, Request, Response, status
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import Request, status
+from fastapi.responses import JSONResponse
+from redis.exceptions import MaxConnectionsError, NoScriptError
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from app.core.cache import token_cache
 from app.core.config import settings
+from app.core.redis_manager import is_connection_failure, redis_manager
+from app.core.security import extract_user_id_from_token
+from app.core.server_timing import timed
+from app.core.shared_memory import open_shared_table
+from app.core.tracing import span
+from app.middleware.client_ip import client_ip_resolver, get_client_ip
+from app.middleware.rate_limit_batching import LocalPreLimiter
+from app.middleware.rate_limit_fallback import CircuitBreaker, LocalRateLimiter, SharedRateLimiter
+from app.middleware.rate_limit_policy import PolicyMatcher, RateLimitPolicy, load_policies
+from app.middleware.routing import route_resolver
 
 logger = logging.getLogger(__name__)
 
+# Paths that are never rate limited (health checks and API docs)
+SKIP_PATHS = frozenset({"/health", "/metrics", "/", "/docs", "/redoc", "/openapi.json"})
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
+# ============================================
+# Rate Limit Scripts
+# ============================================
+# Each algorithm runs the whole check atomically on the Redis server in one round trip:
+# trim the window, count, record the request only if it is allowed, and
+# report what the response headers need. Both use the Redis clock so every
+# API instance agrees on the window regardless of local clock skew, and both
+# return {allowed (1/0), remaining, milliseconds until the quota frees up}.
+#
+# Both also take an optional cost (requests to record at once) and a force
+# flag, which records the requests even over the limit. The batching
+# pre-limiter uses them to flush requests it has already allowed locally.
+
+# Sliding window log: exact, but one sorted-set entry per recorded request.
+#
+# KEYS[1]  sorted set of request timestamps for one client + endpoint
+# ARGV[1]  limit (requests per window)
+# ARGV[2]  window in milliseconds
+# ARGV[3]  unique member for this request
+# ARGV[4]  cost (optional, default 1)
+# ARGV[5]  "1" to record regardless of the limit (optional)
+SLIDING_WINDOW_SCRIPT = """
+local key = KEYS[1]
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local cost = tonumber(ARGV[4]) or 1
+local force = ARGV[5] == '1'
+
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+
+redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+local count = redis.call('ZCARD', key)
+
+local allowed = 0
+if count + cost <= limit or force then
+    if cost == 1 then
+        redis.call('ZADD', key, now, ARGV[3])
+    else
+        for i = 1, cost do
+            redis.call('ZADD', key, now, ARGV[3] .. ':' .. i)
+        end
+    end
+    redis.call('PEXPIRE', key, window)
+    count = count + cost
+    allowed = 1
+end
+
+local reset_after = window
+local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+if oldest[2] then
+    reset_after = tonumber(oldest[2]) + window - now
+end
+
+return {allowed, limit - count, reset_after}
+"""
+
+# GCRA (generic cell rate algorithm): a token bucket stored as a single
+# number per key - the theoretical arrival time (TAT) of the next request.
+# Requests are spaced one emission interval (window / limit) apart, with a
+# burst of up to `burst` requests allowed from a full bucket.
+#
+# KEYS[1]  string holding the TAT in milliseconds
+# ARGV[1]  limit (sustained requests per window)
+# ARGV[2]  window in milliseconds
+# ARGV[3]  burst size (optional, default: limit)
+# ARGV[4]  cost (optional, default 1)
+# ARGV[5]  "1" to record regardless of the limit (optional)
+GCRA_SCRIPT = """
+local key = KEYS[1]
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local interval = window / limit
+local capacity = interval * (tonumber(ARGV[3]) or limit)
+local cost = tonumber(ARGV[4]) or 1
+local force = ARGV[5] == '1'
+
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + tonumber(time[2]) / 1000
+
+local tat = tonumber(redis.call('GET', key)) or now
+if tat < now then
+    tat = now
+end
+
+local new_tat = tat + interval * cost
+local allow_at = new_tat - capacity
+if now < allow_at and not force then
+    return {0, 0, math.ceil(allow_at - now)}
+end
+
+local reset_after = new_tat - now
+redis.call('SET', key, string.format('%.3f', new_tat), 'PX', math.ceil(reset_after))
+
+local remaining = math.floor((capacity - reset_after) / interval + 1e-6)
+return {1, remaining, math.ceil(reset_after)}
+"""
+
+RATE_LIMIT_SCRIPTS = {
+    "gcra": GCRA_SCRIPT,
+    "sliding_window": SLIDING_WINDOW_SCRIPT,
+}
+
+
+class RateLimitResult(NamedTuple):
+    """Outcome of a rate limit check, with everything the headers need."""
+
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_after: float  # seconds until the quota frees up (rejected: until retry)
+
+    @property
+    def reset_at(self) -> int:
+        """Unix time at which the quota frees up."""
+        return int(time.time() + self.reset_after)
+
+    @property
+    def retry_after(self) -> int:
+        """Whole seconds a rejected client should wait (at least 1)."""
+        return max(1, math.ceil(self.reset_after))
+
+
+class RateLimitMiddleware:
     """
-    Redis-based rate limiting middleware.
+    Redis-based rate limiting middleware (pure ASGI).
 
     Features:
-    - Configurable rate limits per endpoint pattern
-    - IP-based rate limiting
+    - Declarative policy table (RATE_LIMIT_POLICIES) matched per route
+      pattern and method through a compiled trie
+    - Per-IP, per-user (verified JWT subject) or combined rate limiting
     - Authentication endpoint protection (prevents brute force)
-    - Sliding window rate limiting using Redis
+    - GCRA rate limiting using Redis (one small value per client/endpoint),
+      or an exact sliding window log (RATE_LIMIT_ALGORITHM=sliding_window)
+    - One atomic server-side script per request (EVALSHA): the check, the
+      remaining count and the reset time come back in a single round trip
+    - Rejected requests are not recorded, so they never extend a ban
+    - Optional batching pre-limiter (RATE_LIMIT_BATCHING_ENABLED): clients
+      well below their limit are answered locally and counted to Redis in
+      periodic batches; see LocalPreLimiter for the accuracy bounds
+    - Degraded mode: a circuit breaker stops calling Redis after repeated
+      failures, an in-process limiter takes over, and a background probe
+      switches back once Redis recovers (each transition is logged once)
     - Automatic cleanup of expired entries
+    - Skipped paths pass straight through before any work is done, and
+      response bodies (including streams) are never buffered or wrapped
 
-    Rate Limits:
-    - Authentication endpoints: 5 requests per minute
-    - General API endpoints: 60 requests per minute
+    Default Rate Limits:
+    - Authentication endpoints: 5 requests per minute per IP
+    - General API endpoints: 60 requests per minute per user (IP if anonymous)
+    - Everything else: 100 requests per minute per IP
     - Health check: Unlimited
 
     Security Notes:
@@ -40,226 +197,503 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
     - Uses Redis for distributed rate limiting across multiple instances
     """
 
-    def __init__(self, app):
+    def __init__(
+        self,
+        app: ASGIApp,
+        algorithm: str | None = None,
+        policies: list[RateLimitPolicy] | None = None,
+    ):
         """
         Initialize rate limiting middleware.
 
         Args:
             app: FastAPI application instance
+            algorithm: "gcra" or "sliding_window" (default: RATE_LIMIT_ALGORITHM)
+            policies: Rate limit rules (default: parsed from RATE_LIMIT_POLICIES)
+
+        Raises:
+            ValueError: If the algorithm is unknown or the policies are invalid
         """
-        super().__init__(app)
+        self.app = app
+        self.algorithm = algorithm or settings.rate_limit_algorithm
+        if self.algorithm not in RATE_LIMIT_SCRIPTS:
+            raise ValueError(
+                f"Unknown rate limit algorithm '{self.algorithm}'. "
+                f"Expected one of: {', '.join(RATE_LIMIT_SCRIPTS)}"
+            )
+        if policies is None:
+            policies = load_policies(settings.rate_limit_policies)
+        self.policies = PolicyMatcher(policies)
         self.redis_client: aioredis.Redis | None = None
         self._initialized = False
+        self._script = None
+        self.breaker = CircuitBreaker(settings.rate_limit_breaker_failure_threshold)
+        self.local_limiter = self._create_fallback_limiter()
+        self._probe_task: asyncio.Task | None = None
+        self.pre_limiter = (
+            LocalPreLimiter(
+                sync_interval=settings.rate_limit_batching_sync_interval_ms / 1000,
+                max_pending=settings.rate_limit_batching_max_pending,
+                sync_threshold=settings.rate_limit_batching_sync_threshold,
+                max_keys=settings.rate_limit_batching_max_keys,
+            )
+            if settings.rate_limit_batching_enabled
+            else None
+        )
+        self._flush_task: asyncio.Task | None = None
+
+    @staticmethod
+    def _create_fallback_limiter() -> LocalRateLimiter | SharedRateLimiter | None:
+        """
+        Build the limiter used while Redis is unavailable.
+
+        With SHARED_MEMORY_ENABLED the workers on a host share one limiter;
+        otherwise (or if the shared table can't be opened) each worker has
+        its own.
+        """
+        if not settings.rate_limit_fallback_enabled:
+            return None
+        if settings.shared_memory_enabled:
+            table = open_shared_table(
+                f"{settings.shared_memory_namespace}-rate-limit",
+                slots=settings.rate_limit_fallback_max_keys,
+                value_size=8,
+                directory=settings.shared_memory_dir,
+                stripes=settings.shared_memory_lock_stripes,
+            )
+            if table is not None:
+                return SharedRateLimiter(table)
+        return LocalRateLimiter(settings.rate_limit_fallback_max_keys)
 
     async def _ensure_redis_connection(self):
         """
-        Ensure Redis connection is established.
-        Lazy initialization to avoid blocking app startup.
+        Ensure a Redis client is available.
+
+        The client comes from the shared, lifespan-managed Redis manager.
+        While Redis is down this returns quickly with no client; the manager
+        reconnects with backoff and rate limiting resumes on its own.
         """
-        if not self._initialized:
-            try:
-                self.redis_client = aioredis.from_url(
-                    settings.redis_url,
-                    encoding="utf-8",
-                    decode_responses=True,
-                    socket_connect_timeout=5,
-                    socket_timeout=5,
-                )
-                # Test connection
-                await self.redis_client.ping()
-                self._initialized = True
-                logger.info("✓ Rate limiting initialized with Redis connection")
-            except Exception as e:
-                logger.error(f"❌ Failed to connect to Redis for rate limiting: {e}")
-                self.redis_client = None
-                self._initialized = True  # Mark as initialized to avoid retrying every request
+        if self.redis_client is None:
+            self.redis_client = await redis_manager.get_client("rate_limit")
+            self._initialized = True
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
         Apply rate limiting to incoming requests.
 
         Args:
-            request: Incoming HTTP request
-            call_next: Next middleware/endpoint in the chain
-
-        Returns:
-            Response: HTTP response or 429 Too Many Requests
-
-        Raises:
-            HTTPException: 429 if rate limit exceeded
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel; a 429 is sent here when the limit is hit
         """
-        # Ensure Redis connection
-        await self._ensure_redis_connection()
-
-        # Skip rate limiting if Redis is unavailable (fail open for availability)
-        if not self.redis_client:
-            logger.warning("Rate limiting disabled - Redis unavailable")
-            return await call_next(request)
-
-        # Get request metadata
-        path = request.url.path
-        method = request.method
-        client_ip = self._get_client_ip(request)
+        # Health checks and scrapes pass straight through, before any parsing
+        if scope["type"] != "http" or scope["path"] in SKIP_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        # Request is a thin view over the scope; headers are parsed on access
+        request = Request(scope)
+        client_ip = get_client_ip(request)
+
+        # IP rules come first: denied clients never reach Redis or the app
+        action = client_ip_resolver.classify(client_ip)
+        if action == "deny":
+            logger.warning(
+                f"[SECURITY] Blocked client - Client: {client_ip} - Path: {scope['path']}"
+            )
+            response = JSONResponse(
+                status_code=status.HTTP_403_FORBIDDEN, content={"detail": "Forbidden"}
+            )
+            await response(scope, receive, send)
+            return
 
-        # Skip rate limiting for health checks
-        if path in ["/health", "/", "/docs", "/redoc", "/openapi.json"]:
-            return await call_next(request)
+        # Skip exempt clients
+        if action == "exempt":
+            await self.app(scope, receive, send)
+            return
 
         # Determine rate limit based on endpoint
-        limit, window = self._get_rate_limit(path, method)
+        path = scope["path"]
+        method = scope["method"]
+        policy = self.policies.match(path, method)
+        if policy is None:
+            await self.app(scope, receive, send)
+            return
+        limit, window = policy.limit, policy.window
+
+        client_id = self._get_client_identity(request, client_ip, policy)
+
+        # Key on the route template, not the raw path: one bucket per endpoint
+        # (not per resource ID), and unknown paths share a single bucket
+        endpoint = f"{method}:{route_resolver.route_for(scope)}"
+
+        # Check rate limit (only the limiter call is guarded, so a failing
+        # endpoint is never retried by the fail-open path below)
+        with span("rate_limit.check", endpoint=endpoint), timed("ratelimit"):
+            result = await self._check_with_fallback(
+                client_id=client_id,
+                endpoint=endpoint,
+                limit=limit,
+                window=window,
+                burst=policy.burst,
+            )
+        if result is None:
+            # Fail open - Redis is unavailable and the local fallback is disabled
+            await self.app(scope, receive, send)
+            return
+
+        if not result.allowed:
+            # Log rate limit violation
+            logger.warning(
+                f"[SECURITY] Rate limit exceeded - "
+                f"Client: {client_id} - "
+                f"Endpoint: {endpoint} - "
+                f"Limit: {limit}/{window}s"
+            )
 
-        # Check rate limit
-        try:
-            allowed = await self._check_rate_limit(
-                client_ip=client_ip, endpoint=f"{method}:{path}", limit=limit, window=window
+            # Sent directly: this runs outside FastAPI's exception handlers
+            response = JSONResponse(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                content={
+                    "detail": (
+                        f"Rate limit exceeded. Maximum {limit} requests per {window} seconds."
+                    )
+                },
+                headers={
+                    "Retry-After": str(result.retry_after),
+                    "X-RateLimit-Limit": str(limit),
+                    "X-RateLimit-Remaining": "0",
+                    "X-RateLimit-Reset": str(result.reset_at),
+                    "X-RateLimit-Window": str(window),
+                },
             )
+            await response(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            # Add rate limit headers to response (no extra Redis call needed)
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("X-RateLimit-Limit", str(limit))
+                headers.append("X-RateLimit-Remaining", str(max(0, result.remaining)))
+                headers.append("X-RateLimit-Reset", str(result.reset_at))
+            await send(message)
+
+        # Process request
+        await self.app(scope, receive, send_with_headers)
+
+    async def _check_with_fallback(
+        self, client_id: str, endpoint: str, limit: int, window: int, burst: int | None
+    ) -> RateLimitResult | None:
+        """
+        Check a request against Redis, or the local limiter while Redis is down.
 
-            if not allowed:
-                # Log rate limit violation
-                logger.warning(
-                    f"[SECURITY] Rate limit exceeded - "
-                    f"Client: {client_ip} - "
-                    f"Endpoint: {method} {path} - "
-                    f"Limit: {limit}/{window}s"
-                )
+        Args:
+            client_id: Client identity (IP address and/or user:<sub>)
+            endpoint: Endpoint identifier ("METHOD:/route/{template}")
+            limit: Maximum requests allowed
+            window: Time window in seconds
+            burst: Burst size (default: limit)
 
-                raise HTTPException(
-                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    detail=f"Rate limit exceeded. Maximum {limit} requests per {window} seconds.",
-                    headers={
-                        "Retry-After": str(window),
-                        "X-RateLimit-Limit": str(limit),
-                        "X-RateLimit-Window": str(window),
-                    },
+        Returns:
+            RateLimitResult | None: The outcome, or None if Redis is
+            unavailable and the local fallback is disabled
+        """
+        if not self.breaker.is_open and self.pre_limiter is not None:
+            key = self._rate_limit_key(client_id, endpoint)
+            local = self.pre_limiter.try_acquire(key, limit, burst)
+            if local is not None:
+                self._ensure_flusher()
+                remaining, reset_after = local
+                return RateLimitResult(
+                    allowed=True, limit=limit, remaining=remaining, reset_after=reset_after
                 )
 
-            # Process request
-            response = await call_next(request)
-
-            # Add rate limit headers to response
-            remaining = await self._get_remaining_requests(
-                client_ip=client_ip, endpoint=f"{method}:{path}", limit=limit, window=window
+        if not self.breaker.is_open:
+            await self._ensure_redis_connection()
+            if self.redis_client is None:
+                if self.breaker.trip():
+                    self._on_breaker_open("no connection")
+            else:
+                pending = 0
+                if self.pre_limiter is not None:
+                    pending = self.pre_limiter.take_pending(key)
+                try:
+                    result = await self._check_rate_limit(
+                        client_id=client_id,
+                        endpoint=endpoint,
+                        limit=limit,
+                        window=window,
+                        burst=burst,
+                        pending=pending,
+                    )
+                except Exception as e:
+                    if pending:
+                        self.pre_limiter.add_pending(key, pending)
+                    self._record_redis_failure(e)
+                else:
+                    self.breaker.record_success()
+                    if self.pre_limiter is not None:
+                        self.pre_limiter.record(
+                            key, result.remaining, result.reset_after, limit, window, burst
+                        )
+                    return result
+
+        if self.local_limiter is None:
+            return None
+        allowed, remaining, reset_after = self.local_limiter.check(
+            f"{client_id}:{endpoint}", limit, window, burst
+        )
+        return RateLimitResult(
+            allowed=allowed, limit=limit, remaining=remaining, reset_after=reset_after
+        )
+
+    def _record_redis_failure(self, error: Exception) -> None:
+        """Count a failed Redis call, opening the breaker (and logging it once) if due."""
+        if isinstance(error, MaxConnectionsError):
+            # Pool exhausted by a burst: Redis is healthy, only this request
+            # falls back to the local limiter
+            logger.warning(f"Rate limiting: {error} - checking this request locally")
+            return
+        if is_connection_failure(error):
+            self.redis_client = None
+            redis_manager.report_failure("rate_limit", error)
+        if self.breaker.record_failure():
+            self._on_breaker_open(f"{type(error).__name__}: {error}")
+        else:
+            logger.error(f"Rate limiting error: {error}", exc_info=True)
+
+    def _ensure_flusher(self) -> None:
+        """Start the pre-limiter's periodic flush on the running loop if needed."""
+        loop = asyncio.get_running_loop()
+        task = self._flush_task
+        if task is None or task.done() or task.get_loop() is not loop:
+            # Started by whichever request comes first: an empty context keeps
+            # its trace span and Server-Timing out of every later flush
+            self._flush_task = loop.create_task(
+                self._flush_periodically(), context=contextvars.Context()
             )
-            response.headers["X-RateLimit-Limit"] = str(limit)
-            response.headers["X-RateLimit-Remaining"] = str(max(0, remaining))
-            response.headers["X-RateLimit-Reset"] = str(int(time.time()) + window)
-
-            return response
 
-        except HTTPException:
-            raise
-        except Exception as e:
-            logger.error(f"Rate limiting error: {e}", exc_info=True)
-            # Fail open - allow request if rate limiting fails
-            return await call_next(request)
+    async def _flush_periodically(self) -> None:
+        """Send the pre-limiter's pending counts to Redis every sync interval."""
+        while True:
+            await asyncio.sleep(self.pre_limiter.sync_interval)
+            await self.flush_pending()
 
-    def _get_rate_limit(self, path: str, _method: str) -> tuple[int, int]:
+    async def flush_pending(self) -> None:
         """
-        Get rate limit configuration for endpoint.
-
-        Args:
-            path: Request path
-            method: HTTP method
+        Record every locally allowed request in Redis, in one round trip.
 
-        Returns:
-            tuple[int, int]: (requests_limit, window_seconds)
+        Each key's remaining quota is refreshed from the answers. While the
+        breaker is open the counts are dropped: the fallback limiter is in
+        charge and Redis is being probed.
         """
-        # Authentication endpoints - strict limits to prevent brute force
-        if "/api/v1/auth" in path:
-            return (5, 60)  # 5 requests per minute
+        batch = self.pre_limiter.drain()
+        if not batch or self.breaker.is_open or self.redis_client is None:
+            return
 
-        # Protected API endpoints - moderate limits
-        if path.startswith("/api/"):
-            return (60, 60)  # 60 requests per minute
+        try:
+            responses = await self._run_pipelined(
+                [
+                    (key, self._script_args(limit, window, burst, cost=pending))
+                    for key, pending, limit, window, burst in batch
+                ]
+            )
+        except Exception as e:
+            for key, pending, *_ in batch:
+                self.pre_limiter.add_pending(key, pending)
+            self._record_redis_failure(e)
+            return
+
+        self.breaker.record_success()
+        for (key, _, limit, window, burst), (_, remaining, reset_after_ms) in zip(
+            batch, responses, strict=True
+        ):
+            self.pre_limiter.record(
+                key, int(remaining), int(reset_after_ms) / 1000, limit, window, burst
+            )
 
-        # Default - generous limits
-        return (100, 60)  # 100 requests per minute
+    def _on_breaker_open(self, reason: str) -> None:
+        """Log the switch to degraded mode once and start probing for recovery."""
+        if self.local_limiter is not None:
+            logger.error(
+                f"❌ Redis rate limiting unavailable ({reason}) - "
+                f"using the in-process fallback limiter until Redis recovers"
+            )
+        else:
+            logger.error(f"❌ Rate limiting disabled - Redis unavailable ({reason})")
+
+        loop = asyncio.get_running_loop()
+        task = self._probe_task
+        if task is None or task.done() or task.get_loop() is not loop:
+            self._probe_task = loop.create_task(self._probe_redis(), context=contextvars.Context())
+
+    async def _probe_redis(self) -> None:
+        """Ping Redis in the background until it answers, then close the breaker."""
+        while self.breaker.is_open:
+            await asyncio.sleep(settings.rate_limit_breaker_probe_interval_seconds)
+
+            client = await redis_manager.get_client("rate_limit")
+            if client is None:
+                continue
+            try:
+                await client.ping()
+            except Exception as e:
+                if is_connection_failure(e):
+                    redis_manager.report_failure("rate_limit", e)
+                continue
+
+            self.redis_client = client
+            outage = time.monotonic() - (self.breaker.opened_at or time.monotonic())
+            if self.breaker.record_success():
+                if self.local_limiter is not None:
+                    self.local_limiter.clear()
+                logger.info(
+                    f"✓ Redis rate limiting restored after {outage:.0f}s - leaving degraded mode"
+                )
 
-    async def _check_rate_limit(
-        self, client_ip: str, endpoint: str, limit: int, window: int
-    ) -> bool:
+    def _get_client_identity(
+        self, request: Request, client_ip: str, policy: RateLimitPolicy
+    ) -> str:
         """
-        Check if request is within rate limit using sliding window.
+        Build the identity a request is counted against.
+
+        Only a verified token counts: the subject comes from a signature-checked
+        JWT (memoized per worker), so forged tokens fall back to the client IP.
+        Tokens in the negative cache are not verified again.
 
         Args:
+            request: FastAPI Request object
             client_ip: Client IP address
-            endpoint: Endpoint identifier
-            limit: Maximum requests allowed
-            window: Time window in seconds
+            policy: Matched rate limit policy
 
         Returns:
-            bool: True if allowed, False if rate limit exceeded
+            str: "<ip>", "user:<sub>" or "<ip>:user:<sub>"
         """
-        key = f"rate_limit:{client_ip}:{endpoint}"
-        current_time = time.time()
-        window_start = current_time - window
-
-        # Use Redis pipeline for atomic operations
-        pipe = self.redis_client.pipeline()
-
-        # Remove old entries outside the window
-        pipe.zremrangebyscore(key, 0, window_start)
-
-        # Count requests in current window
-        pipe.zcard(key)
-
-        # Add current request
-        pipe.zadd(key, {str(current_time): current_time})
+        if policy.identity == "ip":
+            return client_ip
+
+        auth_header = request.headers.get("authorization", "")
+        scheme, _, token = auth_header.partition(" ")
+        user_id = None
+        if scheme.lower() == "bearer" and token and not token_cache.is_rejected_locally(token):
+            user_id = extract_user_id_from_token(token)
+        if user_id is None:
+            return client_ip
+        if policy.identity == "user":
+            return f"user:{user_id}"
+        return f"{client_ip}:user:{user_id}"
 
-        # Set expiry on the key
-        pipe.expire(key, window)
-
-        # Execute pipeline
-        results = await pipe.execute()
-
-        # Get count of requests in window (before adding current)
-        count = results[1]
-
-        # Allow if under limit
-        return count < limit
-
-    async def _get_remaining_requests(
-        self, client_ip: str, endpoint: str, limit: int, window: int
-    ) -> int:
+    async def _check_rate_limit(
+        self,
+        client_id: str,
+        endpoint: str,
+        limit: int,
+        window: int,
+        burst: int | None = None,
+        pending: int = 0,
+    ) -> RateLimitResult:
         """
-        Get remaining requests available in current window.
+        Check and record a request with the configured algorithm, atomically.
 
         Args:
-            client_ip: Client IP address
-            endpoint: Endpoint identifier
+            client_id: Client identity (IP address and/or user:<sub>)
+            endpoint: Endpoint identifier ("METHOD:/route/{template}")
             limit: Maximum requests allowed
             window: Time window in seconds
+            burst: Burst size for GCRA (default: limit; ignored by sliding window)
+            pending: Requests already allowed locally by the pre-limiter; they
+                are recorded first, in the same round trip
 
         Returns:
-            int: Number of remaining requests
+            RateLimitResult: Whether the request is allowed, plus the
+            remaining count and reset time for the response headers
+        """
+        key = self._rate_limit_key(client_id, endpoint)
+        args = self._script_args(limit, window, burst)
+
+        if pending:
+            flush_args = self._script_args(limit, window, burst, cost=pending)
+            _, response = await self._run_pipelined([(key, flush_args), (key, args)])
+        else:
+            response = await self._rate_limit_script()(keys=[key], args=args)
+
+        allowed, remaining, reset_after_ms = response
+        return RateLimitResult(
+            allowed=bool(allowed),
+            limit=limit,
+            remaining=max(0, int(remaining)),
+            reset_after=int(reset_after_ms) / 1000,
+        )
+
+    async def _run_pipelined(self, calls: list[tuple[str, list]]) -> list:
         """
-        key = f"rate_limit:{client_ip}:{endpoint}"
-        current_time = time.time()
-        window_start = current_time - window
+        Run several script calls in one round trip.
 
-        # Count requests in current window
-        count = await self.redis_client.zcount(key, window_start, current_time)
+        Cluster and sharded pipelines don't load missing scripts the way a
+        single-server pipeline does, so on NOSCRIPT the script is loaded
+        (on every node) and the batch is sent once more.
 
-        return max(0, limit - count)
+        Args:
+            calls: (key, args) per script call
 
-    def _get_client_ip(self, request: Request) -> str:
+        Returns:
+            list: Script responses, in call order
         """
-        Extract client IP address from request.
+        script = self._rate_limit_script()
+        for attempt in range(2):
+            try:
+                async with self.redis_client.pipeline(transaction=False) as pipe:
+                    for key, args in calls:
+                        await script(keys=[key], args=args, client=pipe)
+                    return await pipe.execute()
+            except NoScriptError:
+                if attempt:
+                    raise
+                await self.redis_client.script_load(script.script)
+
+    def _rate_limit_key(self, client_id: str, endpoint: str) -> str:
+        """
+        Redis key for one client and endpoint under the configured algorithm.
 
-        Checks X-Forwarded-For header for proxy/load balancer setups,
-        falls back to direct client IP.
+        The client id is the key's hash tag: a client's keys share a Redis
+        Cluster slot (or shard), and braces in route templates such as
+        {session_id} can never become the tag and pile every client of a
+        route onto one slot.
+        """
+        if self.algorithm == "sliding_window":
+            # Sorted set key, under the original prefix
+            return f"rate_limit:{{{client_id}}}:{endpoint}"
+        # Separate namespace so switching algorithms never hits WRONGTYPE
+        return f"rate_limit:{self.algorithm}:{{{client_id}}}:{endpoint}"
+
+    def _script_args(
+        self, limit: int, window: int, burst: int | None, cost: int = 1
+    ) -> list[int | str]:
+        """
+        Build the script arguments for one call.
 
-        Args:
-            request: FastAPI Request object
+        A cost above 1 records that many already-allowed requests, even over
+        the limit (a pre-limiter flush).
+        """
+        args: list[int | str] = [limit, window * 1000]
+        if self.algorithm == "sliding_window":
+            # Unique member per request: concurrent requests in the same
+            # millisecond must not collapse into one sorted-set entry
+            args.append(os.urandom(8).hex())
+        elif burst is not None or cost != 1:
+            args.append(burst or limit)
+        if cost != 1:
+            args.extend([cost, 1])
+        return args
+
+    def _rate_limit_script(self):
+        """
+        Return the configured algorithm's script bound to the current client.
 
-        Returns:
-            str: Client IP address
+        redis-py sends EVALSHA and transparently loads the script on
+        NOSCRIPT (first use, or after a Redis restart or failover).
         """
-        # Check X-Forwarded-For header (for proxies/load balancers)
-        forwarded_for = request.headers.get("x-forwarded-for")
-        if forwarded_for:
-            # Take the first IP in the chain
-            return forwarded_for.split(",")[0].strip()
-
-        # Fall back to direct client IP
-        return request.client.host if request.client else "unknown"
+        if self._script is None or self._script.registered_client is not self.redis_client:
+            self._script = self.redis_client.register_script(RATE_LIMIT_SCRIPTS[self.algorithm])
+        return self._script
@@ -0,0 +1,177 @@
+# ============================================
+# Ascend AI - Batching Rate Limit Pre-Limiter
+# ============================================
+# Optional hybrid mode (RATE_LIMIT_BATCHING_ENABLED): each worker answers
+# requests from clients well below their limit locally, and flushes the
+# counts to Redis in batches. Clients close to their limit are still
+# checked against Redis synchronously.
+# ============================================
+
+import math
+import time
+from collections import OrderedDict
+
+
+class _KeyState:
+    """What a worker knows about one rate limit key."""
+
+    __slots__ = ("remaining", "reset_at", "synced_at", "pending", "limit", "window", "burst")
+
+    def __init__(self, limit: int, window: int, burst: int | None):
+        self.limit = limit
+        self.window = window
+        self.burst = burst
+        self.remaining = 0
+        self.reset_at = 0.0
+        self.synced_at = 0.0
+        # Requests allowed locally that Redis has not seen yet
+        self.pending = 0
+
+
+class LocalPreLimiter:
+    """
+    Per-worker pre-limiter that batches request counts to Redis.
+
+    A request is answered locally only if all of the following hold:
+    - Redis answered for the key within the last ``sync_interval`` seconds
+    - fewer than ``max_pending`` requests are waiting to be flushed
+    - the estimated remaining quota (last Redis answer minus pending) stays
+      above the headroom: ``ceil(capacity * (1 - sync_threshold))``
+
+    Otherwise the request goes to Redis synchronously, carrying the key's
+    pending count with it. Pending counts are also flushed every
+    ``sync_interval``, and each flush refreshes the key's remaining quota.
+
+    Accuracy bounds, per key and window, with W workers and headroom H:
+    - Never under-counts: every locally allowed request is recorded in
+      Redis (forced) within one sync interval, or with the next sync check.
+      The exception is a flush lost while Redis is failing.
+    - A worker can miss what other workers did since its last sync: at
+      most their unflushed requests, (W - 1) x max_pending, plus whatever
+      they flushed within the last sync interval. If that is U requests,
+      the limit can be exceeded by at most max(0, U - H).
+    - Remaining/reset headers for locally answered requests are estimates.
+    """
+
+    def __init__(
+        self, sync_interval: float, max_pending: int, sync_threshold: float, max_keys: int
+    ):
+        """
+        Initialize an empty pre-limiter.
+
+        Args:
+            sync_interval: Seconds a Redis answer stays usable; also the flush period
+            max_pending: Unflushed requests per key before a synchronous check
+            sync_threshold: Fraction of the quota after which every request
+                goes to Redis (e.g. 0.8 = the last 20% are checked synchronously)
+            max_keys: Maximum number of tracked keys (least recently used evicted)
+        """
+        self.sync_interval = sync_interval
+        self.max_pending = max_pending
+        self.sync_threshold = sync_threshold
+        self.max_keys = max_keys
+        self._keys: OrderedDict[str, _KeyState] = OrderedDict()
+        # Pending counts of evicted keys, still owed to Redis
+        self._evicted: list[tuple[str, int, int, int, int | None]] = []
+
+    def try_acquire(
+        self, key: str, limit: int, burst: int | None = None
+    ) -> tuple[int, float] | None:
+        """
+        Allow a request locally if it is safely below the limit.
+
+        Args:
+            key: Rate limit key
+            limit: Sustained requests per window
+            burst: Burst size (default: limit)
+
+        Returns:
+            tuple[int, float] | None: (estimated remaining, seconds until the
+            quota frees up), or None if the request must go to Redis
+        """
+        state = self._keys.get(key)
+        if state is None:
+            return None
+
+        now = time.monotonic()
+        if now - state.synced_at > self.sync_interval or state.pending >= self.max_pending:
+            return None
+
+        headroom = math.ceil((burst or limit) * (1 - self.sync_threshold))
+        estimate = state.remaining - state.pending - 1
+        if estimate < headroom:
+            return None
+
+        state.pending += 1
+        self._keys.move_to_end(key)
+        return estimate, max(0.0, state.reset_at - now)
+
+    def take_pending(self, key: str) -> int:
+        """Remove and return a key's pending count (sent with a synchronous check)."""
+        state = self._keys.get(key)
+        if state is None:
+            return 0
+        pending, state.pending = state.pending, 0
+        return pending
+
+    def add_pending(self, key: str, count: int) -> None:
+        """Put back a pending count whose flush failed."""
+        state = self._keys.get(key)
+        if state is not None:
+            state.pending += count
+
+    def record(
+        self,
+        key: str,
+        remaining: int,
+        reset_after: float,
+        limit: int,
+        window: int,
+        burst: int | None = None,
+    ) -> None:
+        """
+        Store an authoritative answer from Redis for a key.
+
+        Args:
+            key: Rate limit key
+            remaining: Remaining quota reported by Redis
+            reset_after: Seconds until the quota frees up
+            limit: Sustained requests per window
+            window: Window length in seconds
+            burst: Burst size (default: limit)
+        """
+        now = time.monotonic()
+        state = self._keys.get(key)
+        if state is None:
+            state = self._keys[key] = _KeyState(limit, window, burst)
+            if len(self._keys) > self.max_keys:
+                old_key, old = self._keys.popitem(last=False)
+                if old.pending:
+                    self._evicted.append((old_key, old.pending, old.limit, old.window, old.burst))
+        else:
+            self._keys.move_to_end(key)
+        state.remaining = remaining
+        state.reset_at = now + reset_after
+        state.synced_at = now
+
+    def drain(self) -> list[tuple[str, int, int, int, int | None]]:
+        """
+        Take every pending count for a batch flush.
+
+        Returns:
+            list: (key, pending, limit, window, burst) for each key with pending requests
+        """
+        batch, self._evicted = self._evicted, []
+        for key, state in self._keys.items():
+            if state.pending:
+                batch.append((key, state.pending, state.limit, state.window, state.burst))
+                state.pending = 0
+        return batch
+
+    def clear(self) -> None:
+        """Forget all keys and pending counts."""
+        self._keys.clear()
+        self._evicted.clear()
+
+    def __len__(self) -> int:
+        return len(self._keys)
@@ -0,0 +1,210 @@
+# ============================================
+# Ascend AI - Rate Limiting Fallback
+# ============================================
+# Degraded mode for when Redis is unavailable: a circuit breaker that stops
+# requests from waiting on a dead server, and an in-process limiter that
+# keeps enforcing (approximate, per-worker) limits until Redis is back.
+# ============================================
+
+import math
+import struct
+import time
+from collections import OrderedDict
+from typing import Literal
+
+from app.core.shared_memory import SharedMemoryTable
+
+# Theoretical arrival time (unix seconds) as stored in the shared table
+_TAT = struct.Struct("<d")
+
+
+class CircuitBreaker:
+    """
+    Tracks consecutive Redis failures for the rate limiter.
+
+    - Closed: requests use Redis. Each failure is counted; a success resets
+      the count.
+    - Open: after ``failure_threshold`` consecutive failures requests stop
+      calling Redis. A background probe closes the breaker again.
+
+    State changes are reported through the return values so the caller can
+    log each transition exactly once.
+    """
+
+    def __init__(self, failure_threshold: int):
+        """
+        Initialize a closed breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the breaker
+        """
+        self.failure_threshold = failure_threshold
+        self.state: Literal["closed", "open"] = "closed"
+        self.failures = 0
+        self.opened_at: float | None = None
+
+    @property
+    def is_open(self) -> bool:
+        """True while requests should bypass Redis."""
+        return self.state == "open"
+
+    def record_failure(self) -> bool:
+        """
+        Count a failed Redis call.
+
+        Returns:
+            bool: True if this failure opened the breaker
+        """
+        self.failures += 1
+        if self.state == "closed" and self.failures >= self.failure_threshold:
+            self.state = "open"
+            self.opened_at = time.monotonic()
+            return True
+        return False
+
+    def trip(self) -> bool:
+        """
+        Open the breaker immediately (e.g. no client could be obtained).
+
+        Returns:
+            bool: True if the breaker was closed before
+        """
+        self.failures = max(self.failures, self.failure_threshold - 1)
+        return self.record_failure()
+
+    def record_success(self) -> bool:
+        """
+        Count a successful Redis call (or probe).
+
+        Returns:
+            bool: True if this success closed an open breaker
+        """
+        self.failures = 0
+        if self.state == "open":
+            self.state = "closed"
+            self.opened_at = None
+            return True
+        return False
+
+
+class LocalRateLimiter:
+    """
+    In-process GCRA limiter used while Redis is unavailable.
+
+    Limits are enforced per worker, so the effective cluster-wide limit is
+    up to ``workers x limit`` during an outage - approximate, but bounded.
+    Memory is capped at ``max_keys`` entries (least recently used evicted).
+    """
+
+    def __init__(self, max_keys: int):
+        """
+        Initialize an empty limiter.
+
+        Args:
+            max_keys: Maximum number of tracked keys
+        """
+        self.max_keys = max_keys
+        # key -> theoretical arrival time (monotonic seconds)
+        self._tat: OrderedDict[str, float] = OrderedDict()
+
+    def check(
+        self, key: str, limit: int, window: int, burst: int | None = None
+    ) -> tuple[bool, int, float]:
+        """
+        Check and record a request.
+
+        Args:
+            key: Rate limit key
+            limit: Sustained requests per window
+            window: Window length in seconds
+            burst: Burst size (default: limit)
+
+        Returns:
+            tuple[bool, int, float]: (allowed, remaining, seconds until the
+            quota frees up - or, if rejected, until the client may retry)
+        """
+        now = time.monotonic()
+        interval = window / limit
+        capacity = interval * (burst or limit)
+
+        tat = max(self._tat.get(key, now), now)
+        new_tat = tat + interval
+        allow_at = new_tat - capacity
+        if now < allow_at:
+            return False, 0, allow_at - now
+
+        self._tat[key] = new_tat
+        self._tat.move_to_end(key)
+        if len(self._tat) > self.max_keys:
+            self._tat.popitem(last=False)
+
+        reset_after = new_tat - now
+        remaining = math.floor((capacity - reset_after) / interval + 1e-6)
+        return True, remaining, reset_after
+
+    def clear(self) -> None:
+        """Forget all tracked keys (e.g. once Redis is authoritative again)."""
+        self._tat.clear()
+
+    def __len__(self) -> int:
+        return len(self._tat)
+
+
+class SharedRateLimiter:
+    """
+    Host-level GCRA fallback limiter shared by every worker on one machine.
+
+    Same decisions as LocalRateLimiter, but the theoretical arrival times
+    live in a SharedMemoryTable, so during an outage the effective limit is
+    up to ``hosts x limit`` rather than ``workers x limit``. Memory is fixed
+    by the table size; the entries closest to expiry are evicted first.
+    """
+
+    def __init__(self, table: SharedMemoryTable):
+        """
+        Initialize the limiter on an open shared table.
+
+        Args:
+            table: Shared table holding one TAT per key
+        """
+        self.table = table
+
+    def check(
+        self, key: str, limit: int, window: int, burst: int | None = None
+    ) -> tuple[bool, int, float]:
+        """
+        Check and record a request (atomic across processes).
+
+        Args:
+            key: Rate limit key
+            limit: Sustained requests per window
+            window: Window length in seconds
+            burst: Burst size (default: limit)
+
+        Returns:
+            tuple[bool, int, float]: (allowed, remaining, seconds until the
+            quota frees up - or, if rejected, until the client may retry)
+        """
+        interval = window / limit
+        capacity = interval * (burst or limit)
+
+        def apply(current: bytes | None) -> tuple[bytes | None, float, tuple[bool, int, float]]:
+            now = time.time()
+            tat = max(_TAT.unpack(current)[0] if current else now, now)
+            new_tat = tat + interval
+            allow_at = new_tat - capacity
+            if now < allow_at:
+                return None, 0, (False, 0, allow_at - now)
+
+            reset_after = new_tat - now
+            remaining = math.floor((capacity - reset_after) / interval + 1e-6)
+            return _TAT.pack(new_tat), reset_after, (True, remaining, reset_after)
+
+        return self.table.update(key, apply)
+
+    def clear(self) -> None:
+        """Forget all tracked keys, for every worker on the host."""
+        self.table.clear()
+
+    def __len__(self) -> int:
+        return len(self.table)
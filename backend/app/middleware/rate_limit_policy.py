@@ -0,0 +1,145 @@
+# ============================================
+# Ascend AI - Rate Limit Policies
+# ============================================
+# Declarative rate limit rules (RATE_LIMIT_POLICIES) compiled into a
+# path-segment trie, so choosing a rule costs O(path length) no matter
+# how many rules are configured.
+# ============================================
+
+import json
+from typing import Literal
+
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, ValidationError, model_validator
+
+# Built-in rules, used when RATE_LIMIT_POLICIES is empty
+DEFAULT_RATE_LIMIT_POLICIES = [
+    # Authentication endpoints - strict, per IP, to prevent brute force
+    {"path": "/api/v1/auth", "limit": 5, "window": 60, "identity": "ip"},
+    # Protected API endpoints - per user, so users behind one NAT don't share a bucket
+    {"path": "/api", "limit": 60, "window": 60, "identity": "user"},
+    # Default - generous limits
+    {"path": "/", "limit": 100, "window": 60, "identity": "ip"},
+]
+
+# Path segments written as "*" or "{param}" match any single segment
+WILDCARD = "*"
+
+
+class RateLimitPolicy(BaseModel):
+    """
+    One rate limit rule.
+
+    A rule applies to its path and everything below it; the most specific
+    matching rule wins. Identity "user" keys on the verified JWT subject and
+    falls back to the client IP for anonymous requests; "both" keys on the
+    IP and subject together.
+    """
+
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
+    path: str = Field(..., pattern=r"^/")
+    methods: tuple[str, ...] | None = None
+    limit: int = Field(..., ge=1, description="Sustained requests per window")
+    window: int = Field(..., ge=1, description="Window length in seconds")
+    burst: int | None = Field(default=None, ge=1, description="Burst size (default: limit)")
+    identity: Literal["ip", "user", "both"] = "ip"
+
+    @model_validator(mode="after")
+    def normalize_methods(self) -> "RateLimitPolicy":
+        """Upper-case method names so matching is case-insensitive."""
+        if self.methods is not None:
+            object.__setattr__(self, "methods", tuple(m.upper() for m in self.methods))
+        return self
+
+
+_POLICY_LIST = TypeAdapter(list[RateLimitPolicy])
+
+
+def _segments(path: str) -> list[str]:
+    return [segment for segment in path.split("/") if segment]
+
+
+class _TrieNode:
+    __slots__ = ("children", "wildcard", "policies")
+
+    def __init__(self):
+        self.children: dict[str, _TrieNode] = {}
+        self.wildcard: _TrieNode | None = None
+        # Method -> policy; "*" holds the rule for any method
+        self.policies: dict[str, RateLimitPolicy] = {}
+
+
+class PolicyMatcher:
+    """
+    Path-segment trie of rate limit policies.
+
+    Literal segments take precedence over wildcards at each level, and a
+    method-specific rule takes precedence over an any-method rule on the
+    same path. The first rule listed wins when two are otherwise identical.
+    """
+
+    def __init__(self, policies: list[RateLimitPolicy]):
+        self._root = _TrieNode()
+        for policy in policies:
+            node = self._root
+            for segment in _segments(policy.path):
+                if segment == WILDCARD or (segment.startswith("{") and segment.endswith("}")):
+                    node.wildcard = node.wildcard or _TrieNode()
+                    node = node.wildcard
+                else:
+                    node = node.children.setdefault(segment, _TrieNode())
+            for method in policy.methods or (WILDCARD,):
+                node.policies.setdefault(method, policy)
+
+    def match(self, path: str, method: str) -> RateLimitPolicy | None:
+        """
+        Find the most specific policy for a request.
+
+        Args:
+            path: Request path
+            method: HTTP method
+
+        Returns:
+            RateLimitPolicy | None: Matching policy, or None if no rule applies
+        """
+        return _search(self._root, _segments(path), 0, method)
+
+
+def _search(
+    node: _TrieNode, segments: list[str], index: int, method: str
+) -> RateLimitPolicy | None:
+    """
+    Deepest policy under ``node`` for ``segments[index:]``, literal branch first.
+
+    Falls back to the wildcard branch when the literal branch holds no
+    matching rule (e.g. "/api/users/me" for "/api/users/me/avatar" and
+    "/api/*/me/avatar"), and to this node's own rule when neither does.
+    Recursion depth is bounded by the depth of the trie.
+    """
+    if index < len(segments):
+        for child in (node.children.get(segments[index]), node.wildcard):
+            if child is not None:
+                found = _search(child, segments, index + 1, method)
+                if found is not None:
+                    return found
+    return node.policies.get(method) or node.policies.get(WILDCARD)
+
+
+def load_policies(raw: str) -> list[RateLimitPolicy]:
+    """
+    Parse the RATE_LIMIT_POLICIES setting.
+
+    Args:
+        raw: JSON list of policy objects, or an empty string for the defaults
+
+    Returns:
+        list[RateLimitPolicy]: Validated policies
+
+    Raises:
+        ValueError: If the JSON is malformed or a policy is invalid
+    """
+    try:
+        data = json.loads(raw) if raw.strip() else DEFAULT_RATE_LIMIT_POLICIES
+        return _POLICY_LIST.validate_python(data)
+    except (json.JSONDecodeError, ValidationError) as e:
+        raise ValueError(f"Invalid RATE_LIMIT_POLICIES: {e}") from e
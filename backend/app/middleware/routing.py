@@ -0,0 +1,120 @@
+# ============================================
+# Ascend AI - Route Template Resolution
+# ============================================
+# Maps raw request paths to the route templates they match
+# (e.g. /api/v1/sessions/3f2a... -> /api/v1/sessions/{session_id}).
+# Middleware runs before routing, so this repeats Starlette's path matching
+# against a table compiled once per router.
+# ============================================
+
+import re
+import weakref
+
+from starlette.types import Scope
+
+# Stand-in for paths that match no route (404s, scanners). Keeps keys and
+# log names bounded no matter how many distinct paths are requested.
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def _flatten(routes: list) -> list:
+    """
+    Expand included routers into their routes, in matching order.
+
+    Older FastAPI versions copy included routes into the parent router;
+    newer ones keep a nested branch that exposes ``effective_candidates()``.
+    """
+    flat = []
+    for route in routes:
+        candidates = getattr(route, "effective_candidates", None)
+        if callable(candidates):
+            flat.extend(_flatten(candidates()))
+        else:
+            flat.append(route)
+    return flat
+
+
+class _RouteTable:
+    """Compiled lookup table for one router's routes."""
+
+    def __init__(self, routes: list):
+        self.route_count = len(routes)
+        routes = _flatten(routes)
+        self.size = len(routes)
+        # Static paths resolve with one dict lookup. The index keeps
+        # declaration order, so an earlier dynamic route still wins.
+        self.static: dict[str, tuple[int, str]] = {}
+        self.dynamic: list[tuple[int, re.Pattern, str]] = []
+
+        for index, route in enumerate(routes):
+            path_regex = getattr(route, "path_regex", None)
+            path_format = getattr(route, "path_format", None)
+            if path_regex is None or path_format is None:
+                continue
+            if "{" in path_format:
+                self.dynamic.append((index, path_regex, path_format))
+            else:
+                self.static.setdefault(path_format, (index, path_format))
+
+    def match(self, path: str) -> str | None:
+        """Return the template of the first route matching ``path``."""
+        static_index, template = self.static.get(path, (self.size, None))
+        for index, path_regex, path_format in self.dynamic:
+            if index >= static_index:
+                break
+            if path_regex.match(path):
+                return path_format
+        return template
+
+
+class RouteResolver:
+    """
+    Resolves request paths to route templates.
+
+    Each router's routes are compiled into a lookup table on first use and
+    recompiled only if routes are added later. Matching ignores the HTTP
+    method: a path maps to the same template whichever method is used.
+    """
+
+    def __init__(self):
+        # Keyed by id(): routers are not hashable. The weak reference
+        # detects a recycled id after a router is garbage collected.
+        self._tables: dict[int, tuple[weakref.ref, _RouteTable]] = {}
+
+    def resolve(self, router, path: str) -> str | None:
+        """
+        Resolve a path against a router.
+
+        Args:
+            router: Starlette/FastAPI router whose routes to match
+            path: Raw request path
+
+        Returns:
+            str | None: Matching route template, or None if no route matches
+        """
+        entry = self._tables.get(id(router))
+        if entry is None or entry[0]() is not router or entry[1].route_count != len(router.routes):
+            entry = (weakref.ref(router), _RouteTable(router.routes))
+            self._tables[id(router)] = entry
+        return entry[1].match(path)
+
+    def route_for(self, scope: Scope) -> str:
+        """
+        Get the normalized route name for a request.
+
+        Args:
+            scope: ASGI connection scope of the request
+
+        Returns:
+            str: Route template, or UNMATCHED_ROUTE if no route matches
+        """
+        app = scope.get("app")
+        if app is None:
+            return UNMATCHED_ROUTE
+        return self.resolve(app.router, scope["path"]) or UNMATCHED_ROUTE
+
+
+# ============================================
+# Global Route Resolver Instance
+# ============================================
+route_resolver = RouteResolver()
@@ -0,0 +1,72 @@
+# ============================================
+# Ascend AI - Server-Timing Middleware
+# ============================================
+# Adds a Server-Timing header with the per-phase breakdown of the request
+# (see app/core/server_timing.py), for every request when enabled for the
+# environment, or per request with a signed debug token
+# ============================================
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.server_timing import DEBUG_HEADER, measure_request, verify_debug_token
+
+_DEBUG_HEADER = DEBUG_HEADER.lower().encode("latin-1")
+
+
+class ServerTimingMiddleware:
+    """
+    Middleware reporting per-phase latency in a Server-Timing header (pure ASGI).
+
+    A request is timed when:
+    - SERVER_TIMING_ENABLED is true (e.g. development and staging), or
+    - it carries a valid, unexpired X-Server-Timing-Token signed with
+      SERVER_TIMING_SECRET (for production diagnosis and load tests)
+
+    Other requests cost one boolean check, plus a header scan when a
+    secret is configured.
+    """
+
+    def __init__(self, app: ASGIApp, enabled: bool | None = None, secret: str | None = None):
+        """
+        Initialize Server-Timing middleware.
+
+        Args:
+            app: ASGI application to wrap
+            enabled: Time every request (default: SERVER_TIMING_ENABLED)
+            secret: Debug token secret (default: SERVER_TIMING_SECRET; empty disables tokens)
+        """
+        self.app = app
+        self.enabled = settings.server_timing_enabled if enabled is None else enabled
+        self.secret = settings.server_timing_secret if secret is None else secret
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Time the request if requested and add the header to the response.
+
+        Args:
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
+        """
+        if scope["type"] != "http" or not (self.enabled or self._has_debug_token(scope)):
+            await self.app(scope, receive, send)
+            return
+
+        with measure_request() as timing:
+
+            async def send_with_timing(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    MutableHeaders(scope=message).append("Server-Timing", timing.header_value())
+                await send(message)
+
+            await self.app(scope, receive, send_with_timing)
+
+    def _has_debug_token(self, scope: Scope) -> bool:
+        if not self.secret:
+            return False
+        for name, value in scope["headers"]:
+            if name == _DEBUG_HEADER:
+                return verify_debug_token(self.secret, value.decode("latin-1"))
+        return False
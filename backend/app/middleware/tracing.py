@@ -0,0 +1,62 @@
+# ============================================
+# Ascend AI - Request Tracing Middleware
+# ============================================
+# Opens the root span of every request, so the rest of the stack (logging,
+# rate limiting, auth, DB and Redis calls) runs inside one trace
+# ============================================
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.tracing import start_trace
+from app.middleware.routing import route_resolver
+
+
+class TracingMiddleware:
+    """
+    Middleware starting a trace per HTTP request (pure ASGI).
+
+    - Continues the caller's trace when the request carries a valid W3C
+      ``traceparent`` header, otherwise starts a new one
+    - The root span is named "METHOD /route/{template}" and records the
+      response status
+    - The trace id is available to everything downstream through
+      ``app.core.tracing.current_trace_id()`` (e.g. the request id in logs)
+    """
+
+    def __init__(self, app: ASGIApp):
+        """
+        Initialize tracing middleware.
+
+        Args:
+            app: ASGI application to wrap
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Run the request inside a root span.
+
+        Args:
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        traceparent = None
+        for name, value in scope["headers"]:
+            if name == b"traceparent":
+                traceparent = value.decode("latin-1")
+                break
+
+        name = f"{scope['method']} {route_resolver.route_for(scope)}"
+        with start_trace(name, traceparent) as root:
+
+            async def send_with_status(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    root.set("status", message["status"])
+                await send(message)
+
+            await self.app(scope, receive, send_with_status)
@@ -0,0 +1,6 @@
+# ============================================
+# Ascend AI - Benchmarks Package
+# ============================================
+# Standalone performance benchmarks (not collected by pytest)
+# Run from backend/: python -m benchmarks.<module>
+# ============================================
@@ -0,0 +1,115 @@
+# ============================================
+# Ascend AI - Auth Cache-Hit Path Benchmark
+# ============================================
+# Compares get_current_user and get_current_principal on a token cache hit.
+# Counts database sessions opened and round trips issued per request.
+#
+# Usage (from backend/, with the usual environment variables set):
+#   python -m benchmarks.bench_auth_hit_path [iterations]
+#
+# No Redis or PostgreSQL is required: the token is served from the
+# in-process L1 cache and the database layer is replaced with counters.
+# ============================================
+
+import asyncio
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from fastapi.security import HTTPAuthorizationCredentials
+from jose import jwt
+
+from app.core import auth
+from app.core.cache import token_cache
+from app.core.config import settings
+
+
+class CountingSession:
+    """Stand-in for AsyncSession that counts calls which would hit Postgres."""
+
+    sessions_opened = 0
+    round_trips = 0
+
+    def __init__(self):
+        CountingSession.sessions_opened += 1
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def merge(self, instance):
+        CountingSession.round_trips += 1
+        return instance
+
+    async def get(self, _model, _ident):
+        CountingSession.round_trips += 1
+        return None
+
+    @classmethod
+    def reset(cls):
+        cls.sessions_opened = 0
+        cls.round_trips = 0
+
+
+async def _run(iterations: int) -> None:
+    user_id = str(uuid.uuid4())
+    token = jwt.encode(
+        {"sub": user_id, "exp": datetime.utcnow() + timedelta(hours=1)},
+        settings.nextauth_secret,
+        algorithm="HS256",
+    )
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+    # Serve every lookup from L1 without a Redis connection
+    token_cache._initialized = True
+    token_cache.redis_client = None
+    now = datetime.now().isoformat()
+    await token_cache.cache_user_data(
+        token,
+        {
+            "id": user_id,
+            "email": "bench@example.com",
+            "name": "Bench",
+            "avatar_url": None,
+            "oauth_provider": "google",
+            "oauth_id": "bench",
+            "created_at": now,
+            "updated_at": now,
+        },
+    )
+
+    print(f"{'dependency':<24}{'us/op':>10}{'sessions/op':>14}{'db trips/op':>14}")
+
+    # get_current_user: FastAPI opens a session via Depends(get_db) per request
+    CountingSession.reset()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        async with CountingSession() as session:
+            await auth.get_current_user(credentials, session)
+    elapsed = time.perf_counter() - start
+    _report("get_current_user", iterations, elapsed)
+
+    # get_current_principal: session factory is only used on a cache miss
+    CountingSession.reset()
+    with patch.object(auth, "AsyncSessionLocal", CountingSession):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            await auth.get_current_principal(credentials)
+        elapsed = time.perf_counter() - start
+    _report("get_current_principal", iterations, elapsed)
+
+
+def _report(name: str, iterations: int, elapsed: float) -> None:
+    print(
+        f"{name:<24}{elapsed / iterations * 1e6:>10.2f}"
+        f"{CountingSession.sessions_opened / iterations:>14.2f}"
+        f"{CountingSession.round_trips / iterations:>14.2f}"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(_run(int(sys.argv[1]) if len(sys.argv) > 1 else 20000))
@@ -0,0 +1,107 @@
+# ============================================
+# Ascend AI - Token Cache Serialization Benchmark
+# ============================================
+# Compares the legacy JSON cache format (json.dumps/loads plus two
+# datetime.fromisoformat calls on every hit) with the binary user record.
+#
+# Usage (from backend/, with the usual environment variables set):
+#   python -m benchmarks.bench_cache_serialization [iterations] [--redis]
+#
+# Binary decode memoizes timestamp and UUID conversion per value, so the
+# figures reflect the steady state of a returning user's entry.
+#
+# --redis additionally stores one entry of each format in REDIS_URL and
+# reports MEMORY USAGE per key (requires a running Redis).
+# ============================================
+
+import asyncio
+import json
+import sys
+import time
+import uuid
+from datetime import UTC, datetime
+
+from app.core.serialization import BinaryUserSerializer
+
+
+def _sample_user() -> dict:
+    now = datetime.now(UTC)
+    return {
+        "id": uuid.uuid4(),
+        "email": "jane.doe@example.com",
+        "name": "Jane Doe",
+        "avatar_url": "https://lh3.googleusercontent.com/a/ACg8ocJ-example-avatar=s96-c",
+        "oauth_provider": "google",
+        "oauth_id": "108234567890123456789",
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def _legacy_encode(user: dict) -> bytes:
+    data = dict(user)
+    data["created_at"] = data["created_at"].isoformat()
+    data["updated_at"] = data["updated_at"].isoformat()
+    return json.dumps(data, default=str).encode()
+
+
+def _legacy_decode(raw: bytes) -> dict:
+    data = json.loads(raw)
+    data["created_at"] = datetime.fromisoformat(data["created_at"])
+    data["updated_at"] = datetime.fromisoformat(data["updated_at"])
+    return data
+
+
+def _time(fn, arg, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(arg)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+async def _redis_memory(payloads: dict[str, bytes]) -> dict[str, int]:
+    import redis.asyncio as aioredis
+
+    from app.core.config import settings
+
+    client = aioredis.from_url(settings.redis_url)
+    try:
+        usage = {}
+        for name, payload in payloads.items():
+            key = f"token_cache:{uuid.uuid4().hex}{uuid.uuid4().hex}"
+            await client.setex(key, 60, payload)
+            usage[name] = await client.memory_usage(key)
+            await client.delete(key)
+        return usage
+    finally:
+        await client.aclose()
+
+
+def main() -> None:
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    iterations = int(args[0]) if args else 100000
+    user = _sample_user()
+    binary = BinaryUserSerializer()
+
+    legacy_raw = _legacy_encode(user)
+    binary_raw = binary.dumps(user)
+
+    rows = [
+        ("json (legacy)", legacy_raw, _legacy_encode, _legacy_decode),
+        ("binary v1", binary_raw, binary.dumps, binary.loads),
+    ]
+
+    memory = {}
+    if "--redis" in sys.argv:
+        memory = asyncio.run(_redis_memory({name: raw for name, raw, _, _ in rows}))
+
+    print(f"{'format':<16}{'bytes':>8}{'encode us':>12}{'decode us':>12}{'redis bytes':>14}")
+    for name, raw, encode, decode in rows:
+        print(
+            f"{name:<16}{len(raw):>8}{_time(encode, user, iterations):>12.2f}"
+            f"{_time(decode, raw, iterations):>12.2f}{memory.get(name, '-'):>14}"
+        )
+
+
+if __name__ == "__main__":
+    main()
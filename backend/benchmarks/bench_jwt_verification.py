@@ -0,0 +1,70 @@
+# ============================================
+# Ascend AI - JWT Verification Throughput Benchmark
+# ============================================
+# Verifications per second on one core, before and after the
+# verified-claims memo in app.core.security.
+#
+# Usage (from backend/, with the usual environment variables set):
+#   python -m benchmarks.bench_jwt_verification [iterations]
+#
+# Scenarios:
+#   single helper   - decode_jwt_token once per request
+#   two helpers     - verify_token_signature + extract_user_id_from_token,
+#                     the pattern that used to verify the signature twice
+# "before" bypasses the memo (JWT_CLAIMS_CACHE_ENABLED=false behaviour);
+# "after" uses it with a warm entry for the token.
+# ============================================
+
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from jose import jwt
+
+from app.core import security
+from app.core.config import settings
+
+
+def _single_helper(token: str) -> None:
+    security.decode_jwt_token(token)
+
+
+def _two_helpers(token: str) -> None:
+    security.verify_token_signature(token)
+    security.extract_user_id_from_token(token)
+
+
+def _measure(fn, token: str, iterations: int, memo: bool) -> float:
+    """Return requests per second for ``fn``."""
+    security.verified_claims.clear()
+    with patch.object(settings, "jwt_claims_cache_enabled", memo):
+        fn(token)  # warm up (and populate the memo when enabled)
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn(token)
+        elapsed = time.perf_counter() - start
+    return iterations / elapsed
+
+
+def main(iterations: int) -> None:
+    token = jwt.encode(
+        {
+            "sub": str(uuid.uuid4()),
+            "exp": datetime.utcnow() + timedelta(hours=1),
+            "iat": datetime.utcnow(),
+        },
+        settings.nextauth_secret,
+        algorithm="HS256",
+    )
+
+    print(f"{'scenario':<16}{'before req/s':>14}{'after req/s':>14}{'speedup':>10}")
+    for name, fn in (("single helper", _single_helper), ("two helpers", _two_helpers)):
+        before = _measure(fn, token, iterations, memo=False)
+        after = _measure(fn, token, iterations, memo=True)
+        print(f"{name:<16}{before:>14,.0f}{after:>14,.0f}{after / before:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,148 @@
+# ============================================
+# Ascend AI - Request Logging Benchmark
+# ============================================
+# Event-loop time spent on request logging at a steady request rate,
+# writing synchronously (the old logging.basicConfig setup) versus through
+# the queue-backed handler with a background writer thread.
+#
+# Usage (from backend/, with the usual environment variables set):
+#   python -m benchmarks.bench_logging [requests_per_second] [seconds]
+#
+# Requests are sent straight to the ASGI app (RequestLoggingMiddleware
+# around one JSON route) at a fixed rate. Every logging call the
+# middleware makes is timed on the event-loop thread: creating the record
+# plus whatever the handler does before returning. Sinks:
+#   file  - a regular file on disk
+#   slow  - a stream whose writes take 200 us (a backed-up pipe or log
+#           driver, where stderr writes start to block)
+# "loop %" is the share of each second the loop spends inside logging.
+# ============================================
+
+import asyncio
+import contextlib
+import io
+import logging
+import statistics
+import sys
+import tempfile
+import time
+
+from fastapi import FastAPI
+
+from app.core.logging_config import configure_logging, stop_logging
+from app.middleware import logging as logging_middleware
+from app.middleware.logging import RequestLoggingMiddleware
+
+SLOW_WRITE_SECONDS = 0.0002
+
+MODES = [
+    ("sync text", "text", False),
+    ("sync json", "json", False),
+    ("queued text", "text", True),
+    ("queued json", "json", True),
+]
+
+
+class SlowStream(io.StringIO):
+    """A stream whose writes block like a full pipe."""
+
+    def write(self, text: str) -> int:
+        time.sleep(SLOW_WRITE_SECONDS)
+        return super().write(text)
+
+
+def _build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/v1/items/{item_id}")
+    async def get_item(item_id: int):
+        return {"id": item_id, "name": "item"}
+
+    app.add_middleware(RequestLoggingMiddleware)
+    return app
+
+
+def _scope(item_id: int) -> dict:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": f"/api/v1/items/{item_id}",
+        "raw_path": f"/api/v1/items/{item_id}".encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench"), (b"user-agent", b"bench")],
+        "client": ("203.0.113.7", 50000),
+        "server": ("bench", 80),
+    }
+
+
+async def _run(app: FastAPI, rate: int, seconds: float) -> list[float]:
+    """Send requests at ``rate`` per second; return the loop time per logging call."""
+    timings: list[float] = []
+    logger = logging_middleware.logger
+    log = logger._log
+
+    def timed_log(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return log(*args, **kwargs)
+        finally:
+            timings.append(time.perf_counter() - start)
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(_message: dict) -> None:
+        pass
+
+    logger._log = timed_log
+    try:
+        interval = 1 / rate
+        start = time.perf_counter()
+        tasks = []
+        for i in range(int(rate * seconds)):
+            delay = start + i * interval - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(app(_scope(i), receive, send)))
+        await asyncio.gather(*tasks)
+    finally:
+        del logger._log
+    return timings
+
+
+async def main(rate: int, seconds: float) -> None:
+    app = _build_app()
+    root = logging.getLogger()
+    saved_handlers, saved_level = root.handlers[:], root.level
+
+    print(f"{rate:,} requests/s for {seconds:g}s, {rate * seconds:,.0f} requests per row\n")
+    print(f"{'sink':<6}{'mode':<13}{'per request':>13}{'p99 call':>11}{'loop %':>9}")
+    for sink in ("file", "slow"):
+        for name, fmt, queued in MODES:
+            with tempfile.TemporaryFile("w+") as file:
+                stream = file if sink == "file" else SlowStream()
+                with contextlib.redirect_stderr(stream):
+                    configure_logging("INFO", fmt=fmt, queued=queued, force=True)
+                timings = await _run(app, rate, seconds)
+                stop_logging()
+
+            requests = rate * seconds
+            per_request = sum(timings) / requests
+            p99 = statistics.quantiles(timings, n=100)[98]
+            print(
+                f"{sink:<6}{name:<13}{per_request * 1e6:>10.1f} us{p99 * 1e6:>8.1f} us"
+                f"{per_request * rate * 100:>8.1f}%"
+            )
+
+    root.handlers[:] = saved_handlers
+    root.setLevel(saved_level)
+
+
+if __name__ == "__main__":
+    args = [float(arg) for arg in sys.argv[1:3]]
+    rate, seconds = args + [2000, 3][len(args) :]
+    asyncio.run(main(int(rate), seconds))
@@ -0,0 +1,139 @@
+# ============================================
+# Ascend AI - Middleware Stack Benchmark
+# ============================================
+# Requests per second and latency percentiles through the production
+# middleware stack (CORS + request logging + rate limiting), comparing the
+# pure-ASGI middlewares with the BaseHTTPMiddleware layering they replaced.
+#
+# Usage (from backend/, with the usual environment variables set):
+#   python -m benchmarks.bench_middleware_stack [requests] [concurrency]
+#
+# No Redis is required: the rate limit script is answered in-process, so
+# the numbers isolate middleware overhead. "before" runs each middleware
+# behind a BaseHTTPMiddleware layer - the per-request task, memory stream
+# and response wrapping the old base class added - while "after" runs them
+# as plain ASGI.
+#
+# Scenarios:
+#   json        - small JSON endpoint with a path parameter
+#   stream      - 64 x 1 KiB streamed chunks
+#   health      - skipped path (/health)
+# ============================================
+
+import asyncio
+import statistics
+import sys
+import time
+from unittest.mock import patch
+
+import httpx
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.middleware.logging import RequestLoggingMiddleware
+from app.middleware.rate_limit import RateLimitMiddleware
+
+SCENARIOS = {
+    "json": "/api/v1/items/42",
+    "stream": "/api/v1/stream",
+    "health": "/health",
+}
+
+
+class StubScript:
+    """Stand-in for the registered rate limit script: always allows."""
+
+    def __init__(self, client):
+        self.registered_client = client
+
+    async def __call__(self, keys, args):  # noqa: ARG002 - called with keyword arguments
+        return [1, args[0] - 1, args[1]]
+
+
+class StubRedis:
+    def register_script(self, _script):
+        return StubScript(self)
+
+
+async def _stub_get_client(_role: str) -> StubRedis:
+    return StubRedis()
+
+
+class PassThrough(BaseHTTPMiddleware):
+    """Adds exactly the BaseHTTPMiddleware machinery, with no logic of its own."""
+
+    async def dispatch(self, request, call_next):
+        return await call_next(request)
+
+
+def _build_app(legacy: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/v1/items/{item_id}")
+    async def get_item(item_id: int):
+        return {"id": item_id, "name": "item"}
+
+    @app.get("/api/v1/stream")
+    async def stream():
+        async def chunks():
+            for _ in range(64):
+                yield b"x" * 1024
+
+        return StreamingResponse(chunks(), media_type="application/octet-stream")
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    # Same order as app/main.py (last added runs first)
+    app.add_middleware(CORSMiddleware, allow_origins=["http://localhost:3000"])
+    for middleware in (RequestLoggingMiddleware, RateLimitMiddleware):
+        app.add_middleware(middleware)
+        if legacy:
+            app.add_middleware(PassThrough)
+    return app
+
+
+async def _measure(app: FastAPI, path: str, requests: int, concurrency: int) -> tuple:
+    """Return (requests/s, p50 ms, p99 ms)."""
+    latencies: list[float] = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.get(path)  # warm up
+
+        async def worker(count: int) -> None:
+            for _ in range(count):
+                start = time.perf_counter()
+                response = await client.get(path)
+                await response.aread()
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(requests // concurrency) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    return len(latencies) / elapsed, quantiles[49], quantiles[98]
+
+
+async def main(requests: int, concurrency: int) -> None:
+    print(f"{requests:,} requests per scenario, concurrency {concurrency}\n")
+    print(
+        f"{'scenario':<10}{'before req/s':>14}{'after req/s':>13}"
+        f"{'before p99':>12}{'after p99':>11}{'speedup':>9}"
+    )
+    with patch("app.middleware.rate_limit.redis_manager.get_client", _stub_get_client):
+        for name, path in SCENARIOS.items():
+            before = await _measure(_build_app(legacy=True), path, requests, concurrency)
+            after = await _measure(_build_app(legacy=False), path, requests, concurrency)
+            print(
+                f"{name:<10}{before[0]:>14,.0f}{after[0]:>13,.0f}"
+                f"{before[2]:>10.2f}ms{after[2]:>9.2f}ms{after[0] / before[0]:>8.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:3]]
+    asyncio.run(main(*(args + [5000, 50][len(args) :])))
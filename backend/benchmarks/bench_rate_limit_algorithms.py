@@ -0,0 +1,107 @@
+# ============================================
+# Ascend AI - Rate Limit Algorithm Benchmark
+# ============================================
+# Redis memory and throughput of the GCRA and sliding window limiters
+# with many active clients.
+#
+# Usage (from backend/, with REDIS_URL pointing at a disposable Redis):
+#   python -m benchmarks.bench_rate_limit_algorithms [clients] [requests_per_client]
+#
+# Defaults: 100,000 clients making 20 requests each against the
+# 100 requests/minute default limit, so nothing is rejected and every
+# request is recorded. Keys are written under rate_limit:*bench-* and
+# removed afterwards; nothing else in the database is touched.
+#
+# Reported per algorithm:
+#   used_memory delta   - growth of INFO used_memory after populating
+#   bytes/client        - that delta divided by the number of clients
+#   MEMORY USAGE        - size of one client's key as reported by Redis
+#   checks/s            - completed checks per second (100 in flight)
+# ============================================
+
+import asyncio
+import sys
+import time
+
+import redis.asyncio as aioredis
+from fastapi import FastAPI
+
+from app.core.config import settings
+from app.middleware.rate_limit import RATE_LIMIT_SCRIPTS, RateLimitMiddleware
+
+CONCURRENCY = 100
+LIMIT, WINDOW = 100, 60
+ENDPOINT = "GET:/api/v1/resumes"
+
+
+async def _cleanup(client: aioredis.Redis) -> None:
+    """Delete every key written by this benchmark."""
+    batch = []
+    async for key in client.scan_iter(match="rate_limit:*bench-*", count=1000):
+        batch.append(key)
+        if len(batch) >= 1000:
+            await client.unlink(*batch)
+            batch.clear()
+    if batch:
+        await client.unlink(*batch)
+
+
+async def _used_memory(client: aioredis.Redis) -> int:
+    return (await client.info("memory"))["used_memory"]
+
+
+async def _run(algorithm: str, client: aioredis.Redis, clients: int, requests: int) -> None:
+    middleware = RateLimitMiddleware(FastAPI(), algorithm=algorithm)
+    middleware.redis_client = client
+    queue = asyncio.Queue()
+    for _ in range(requests):
+        for i in range(clients):
+            queue.put_nowait(f"bench-{i}")
+
+    async def worker() -> None:
+        while not queue.empty():
+            await middleware._check_rate_limit(queue.get_nowait(), ENDPOINT, LIMIT, WINDOW)
+
+    await _cleanup(client)
+    baseline = await _used_memory(client)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(CONCURRENCY)))
+    elapsed = time.perf_counter() - start
+
+    grown = await _used_memory(client) - baseline
+    key = (
+        f"rate_limit:bench-0:{ENDPOINT}"
+        if algorithm == "sliding_window"
+        else f"rate_limit:{algorithm}:bench-0:{ENDPOINT}"
+    )
+    key_bytes = await client.memory_usage(key)
+    checks = clients * requests
+
+    print(
+        f"{algorithm:<16}{grown / 1024**2:>14,.1f} MiB{grown / clients:>14,.0f}"
+        f"{key_bytes or 0:>14,}{checks / elapsed:>12,.0f}"
+    )
+    await _cleanup(client)
+
+
+async def main(clients: int, requests: int) -> None:
+    client = aioredis.from_url(
+        settings.redis_rate_limit_url or settings.redis_url,
+        max_connections=CONCURRENCY,
+    )
+    try:
+        print(f"{clients:,} clients x {requests} requests, limit {LIMIT}/{WINDOW}s\n")
+        print(
+            f"{'algorithm':<16}{'used_memory':>18}{'bytes/client':>14}"
+            f"{'MEMORY USAGE':>14}{'checks/s':>12}"
+        )
+        for algorithm in RATE_LIMIT_SCRIPTS:
+            await _run(algorithm, client, clients, requests)
+    finally:
+        await client.aclose()
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:3]]
+    asyncio.run(main(*(args + [100_000, 20][len(args) :])))
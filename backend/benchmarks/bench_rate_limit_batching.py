@@ -0,0 +1,165 @@
+# ============================================
+# Ascend AI - Rate Limit Batching Load Test
+# ============================================
+# Redis round trips and limit accuracy with and without the batching
+# pre-limiter (RATE_LIMIT_BATCHING_ENABLED), for several workers sharing
+# one rate limit store.
+#
+# Usage (from backend/, with the usual environment variables set):
+#   python -m benchmarks.bench_rate_limit_batching [workers] [seconds]
+#
+# No Redis is required: an in-process GCRA store with the same semantics as
+# GCRA_SCRIPT (cost and force included) answers every call after a simulated
+# network round trip, and counts the round trips. Requests are spread
+# round-robin over the workers, like a load balancer would.
+#
+# Traffic (limit 100 requests/s, burst 100):
+#   quiet clients - 200 clients at 30 requests/s, well below the limit
+#   hot client    - 1 client at 400 requests/s, 4x over the limit
+# ============================================
+
+import asyncio
+import math
+import sys
+import time
+from itertools import cycle
+from unittest.mock import patch
+
+from fastapi import FastAPI
+
+from app.middleware.rate_limit import RateLimitMiddleware
+
+LIMIT, WINDOW = 100, 1
+QUIET_CLIENTS, QUIET_RATE, HOT_RATE = 200, 30, 400
+ROUND_TRIP = 0.0005  # seconds
+
+
+class StubGcraStore:
+    """In-process GCRA_SCRIPT: one TAT per key, with a simulated round trip."""
+
+    def __init__(self):
+        self.tat: dict[str, float] = {}
+        self.round_trips = 0
+        self.calls = 0
+
+    def run(self, key: str, args: list) -> list[int]:
+        self.calls += 1
+        limit, window = args[0], args[1]
+        interval = window / limit
+        capacity = interval * (args[2] if len(args) > 2 else limit)
+        cost = args[3] if len(args) > 3 else 1
+        force = len(args) > 4 and args[4] == 1
+
+        now = time.monotonic() * 1000
+        tat = max(self.tat.get(key, now), now)
+        new_tat = tat + interval * cost
+        allow_at = new_tat - capacity
+        if now < allow_at and not force:
+            return [0, 0, math.ceil(allow_at - now)]
+        self.tat[key] = new_tat
+        reset_after = new_tat - now
+        return [1, math.floor((capacity - reset_after) / interval + 1e-6), math.ceil(reset_after)]
+
+    async def round_trip(self) -> None:
+        self.round_trips += 1
+        await asyncio.sleep(ROUND_TRIP)
+
+
+class StubPipeline:
+    def __init__(self, store: StubGcraStore):
+        self.store = store
+        self.queued: list[tuple[str, list]] = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self) -> list:
+        await self.store.round_trip()
+        return [self.store.run(key, args) for key, args in self.queued]
+
+
+class StubScript:
+    def __init__(self, client):
+        self.registered_client = client
+
+    async def __call__(self, keys, args, client=None):
+        if isinstance(client, StubPipeline):
+            client.queued.append((keys[0], args))
+            return client
+        await self.registered_client.store.round_trip()
+        return self.registered_client.store.run(keys[0], args)
+
+
+class StubRedis:
+    def __init__(self, store: StubGcraStore):
+        self.store = store
+
+    def register_script(self, _script):
+        return StubScript(self)
+
+    def pipeline(self, transaction: bool = True):  # noqa: ARG002 - redis-py signature
+        return StubPipeline(self.store)
+
+
+async def _client(workers, client_id: str, rate: int, seconds: float, counts: dict) -> None:
+    deadline = time.monotonic() + seconds
+    next_at = time.monotonic()
+    while next_at < deadline:
+        worker = next(workers)
+        result = await worker._check_with_fallback(
+            client_id, "GET:/api/v1/items", LIMIT, WINDOW, None
+        )
+        counts[result.allowed] += 1
+        next_at += 1 / rate
+        await asyncio.sleep(max(0.0, next_at - time.monotonic()))
+
+
+async def _run(batching: bool, worker_count: int, seconds: float) -> tuple:
+    store = StubGcraStore()
+    with patch("app.middleware.rate_limit.settings.rate_limit_batching_enabled", batching):
+        workers = [RateLimitMiddleware(FastAPI(), algorithm="gcra") for _ in range(worker_count)]
+    for worker in workers:
+        worker.redis_client = StubRedis(store)
+
+    balancer = cycle(workers)
+    quiet = {True: 0, False: 0}
+    hot = {True: 0, False: 0}
+    await asyncio.gather(
+        _client(balancer, "hot", HOT_RATE, seconds, hot),
+        *(
+            _client(balancer, f"quiet-{i}", QUIET_RATE, seconds, quiet)
+            for i in range(QUIET_CLIENTS)
+        ),
+    )
+    for worker in workers:
+        if worker._flush_task is not None:
+            worker._flush_task.cancel()
+        if worker.pre_limiter is not None:
+            await worker.flush_pending()
+    return store, quiet, hot
+
+
+async def main(worker_count: int, seconds: float) -> None:
+    exact = LIMIT + LIMIT * seconds / WINDOW
+    print(f"{worker_count} workers, {seconds:.0f}s, limit {LIMIT}/{WINDOW}s (burst {LIMIT})\n")
+    print(
+        f"{'mode':<10}{'requests':>10}{'round trips':>13}{'trips/req':>11}"
+        f"{'quiet 429s':>12}{'hot allowed':>13}{'overshoot':>11}"
+    )
+    for batching in (False, True):
+        store, quiet, hot = await _run(batching, worker_count, seconds)
+        requests = sum(quiet.values()) + sum(hot.values())
+        print(
+            f"{'batched' if batching else 'sync':<10}{requests:>10,}{store.round_trips:>13,}"
+            f"{store.round_trips / requests:>11.2f}{quiet[False]:>12,}{hot[True]:>13,}"
+            f"{(hot[True] - exact) / exact:>10.1%}"
+        )
+
+
+if __name__ == "__main__":
+    args = [float(arg) for arg in sys.argv[1:3]]
+    worker_count, seconds = (args + [4, 3][len(args) :])[:2]
+    asyncio.run(main(int(worker_count), seconds))
@@ -0,0 +1,119 @@
+# ============================================
+# Ascend AI - Shared Memory Table Benchmark
+# ============================================
+# Lookup latency of the host-level shared memory tier, alone and with
+# several processes hitting it at once, next to the per-process L1 cache.
+#
+# Usage (from backend/, with the usual environment variables set):
+#   python -m benchmarks.bench_shared_memory [processes] [operations]
+#
+# Each process runs a 90% get / 10% set mix over 10,000 keys with
+# token-cache-sized values (300 bytes) and times every operation. The
+# rate limiter row times SharedRateLimiter.check over the same key count.
+# ============================================
+
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from app.core.cache import LocalTTLCache
+from app.core.shared_memory import SharedMemoryTable
+from app.middleware.rate_limit_fallback import SharedRateLimiter
+
+KEYS = [f"token_cache:{i:064x}" for i in range(10_000)]
+VALUE = os.urandom(300)
+SLOTS, VALUE_SIZE = 16384, 512
+
+
+def _open(directory: str) -> SharedMemoryTable:
+    return SharedMemoryTable("bench", slots=SLOTS, value_size=VALUE_SIZE, directory=directory)
+
+
+def _time_ops(operation, operations: int) -> list[float]:
+    rng = random.Random(os.getpid())
+    latencies = []
+    for _ in range(operations):
+        key = rng.choice(KEYS)
+        write = rng.random() < 0.1
+        start = time.perf_counter_ns()
+        operation(key, write)
+        latencies.append((time.perf_counter_ns() - start) / 1000)
+    return latencies
+
+
+def _shared_worker(directory: str, operations: int, results) -> None:
+    table = _open(directory)
+
+    def operation(key: str, write: bool) -> None:
+        if write:
+            table.set(key, VALUE, 60)
+        else:
+            table.get(key)
+
+    results.put(_time_ops(operation, operations))
+    table.close()
+
+
+def _summary(latencies: list[float]) -> str:
+    quantiles = statistics.quantiles(latencies, n=100)
+    return f"{quantiles[49]:>9.2f}us{quantiles[98]:>9.2f}us"
+
+
+def main(processes: int, operations: int) -> None:
+    directory = tempfile.mkdtemp(dir="/dev/shm" if os.path.isdir("/dev/shm") else None)
+    print(f"{operations:,} operations per process, 90% get / 10% set\n")
+    print(f"{'tier':<34}{'p50':>11}{'p99':>11}")
+
+    local = LocalTTLCache(max_size=SLOTS, ttl_seconds=60)
+
+    def local_operation(key: str, write: bool) -> None:
+        if write:
+            local.set(key, VALUE)
+        else:
+            local.get(key)
+
+    for key in KEYS:
+        local.set(key, VALUE)
+    print(f"{'L1 (per process)':<34}{_summary(_time_ops(local_operation, operations))}")
+
+    table = _open(directory)
+    for key in KEYS:
+        table.set(key, VALUE, 60)
+
+    context = multiprocessing.get_context("fork")
+    for count in sorted({1, processes}):
+        results = context.Queue()
+        workers = [
+            context.Process(target=_shared_worker, args=(directory, operations, results))
+            for _ in range(count)
+        ]
+        for worker in workers:
+            worker.start()
+        latencies = [value for _ in workers for value in results.get()]
+        for worker in workers:
+            worker.join()
+        label = f"shared, {count} process{'es' if count > 1 else ''}"
+        print(f"{label:<34}{_summary(latencies)}")
+
+    limiter = SharedRateLimiter(
+        SharedMemoryTable("bench-limits", slots=SLOTS, value_size=8, directory=directory)
+    )
+    limiter_latencies = _time_ops(
+        lambda key, _write: limiter.check(key[-8:], limit=1_000_000, window=60), operations
+    )
+    print(f"{'shared rate limiter check':<34}{_summary(limiter_latencies)}")
+
+    table.close()
+    limiter.table.close()
+    for name in os.listdir(directory):
+        os.unlink(os.path.join(directory, name))
+    os.rmdir(directory)
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:3]]
+    main(*(args + [4, 100_000][len(args) :]))
@@ -53,6 +53,23 @@ async def setup_test_database():
     # For now, we'll keep test data for debugging
 
 
+@pytest.fixture(autouse=True)
+def clear_verified_claims():
+    """
+    Forget memoized JWT verifications between tests.
+
+    Tests patch jwt.decode or the secret and count verifications, so each
+    test starts with an empty memo.
+    """
+    from app.core.security import rejected_tokens, verified_claims
+
+    verified_claims.clear()
+    rejected_tokens.clear()
+    yield
+    verified_claims.clear()
+    rejected_tokens.clear()
+
+
 @pytest.fixture(scope="function")
 async def clear_rate_limits():
     """
@@ -73,10 +90,10 @@ async def clear_rate_limits():
             encoding="utf-8",
             decode_responses=True,
         )
-        # Clear all rate limit keys
-        keys = await redis_client.keys("rate_limit:*")
-        if keys:
-            await redis_client.delete(*keys)
+        # Clear all rate limit keys (SCAN, not KEYS: never blocks the server,
+        # and deletes one key at a time so it also works on a cluster)
+        async for key in redis_client.scan_iter(match="rate_limit:*", count=1000):
+            await redis_client.delete(key)
         yield
     except Exception:
         # If Redis is unavailable, just skip clearing
@@ -5,20 +5,35 @@
 # Story 1.4, Task 1.4.2, Sub-tasks 1.4.2.1 & 1.4.2.2
 # ============================================
 
+import asyncio
+import time
 import uuid
 from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from fastapi import HTTPException
 from fastapi.security import HTTPAuthorizationCredentials
-from jose import jwt
+from jose import JWTError, jwt
+from jose.exceptions import ExpiredSignatureError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.auth import get_current_user
+from app.core.auth import (
+    AuthenticatedPrincipal,
+    get_admin_principal,
+    get_current_principal,
+    get_current_user,
+)
+from app.core.cache import TokenCache
 from app.core.config import settings
 from app.core.security import (
+    MAX_VERIFIED_CLAIMS_AGE_SECONDS,
+    RejectedTokenCache,
+    VerifiedClaimsCache,
     decode_jwt_token,
     extract_user_id_from_token,
+    rejected_tokens,
+    verified_claims,
     verify_token_signature,
 )
 from app.db.models.user import User
@@ -142,6 +157,91 @@ class TestExtractUserIdFromToken:
         assert user_id is None
 
 
+class TestVerifiedClaimsMemo:
+    """Test suite for the verified-claims memo shared by the decode helpers."""
+
+    def test_helpers_share_one_verification(self, valid_jwt_token: str, test_user_id: str):
+        """Test that calling several helpers verifies the signature once."""
+        with patch("app.core.security.jwt.decode", wraps=jwt.decode) as decode:
+            assert verify_token_signature(valid_jwt_token) is True
+            assert extract_user_id_from_token(valid_jwt_token) == test_user_id
+            assert decode_jwt_token(valid_jwt_token)["sub"] == test_user_id
+
+        assert decode.call_count == 1
+
+    def test_memo_returns_copies(self, valid_jwt_token: str):
+        """Test that callers cannot corrupt the memoized claims."""
+        decode_jwt_token(valid_jwt_token)["sub"] = "tampered"
+
+        assert decode_jwt_token(valid_jwt_token)["sub"] != "tampered"
+
+    def test_exp_is_enforced_on_memo_hits(self, test_user_id: str):
+        """Test that a memoized token is rejected once it expires."""
+        payload = {"sub": test_user_id, "exp": datetime.utcnow() + timedelta(hours=1)}
+        token = jwt.encode(payload, settings.nextauth_secret, algorithm="HS256")
+        decode_jwt_token(token)
+
+        later = time.time() + 2 * 3600
+        with patch("app.core.security.time.time", return_value=later):
+            with pytest.raises(ExpiredSignatureError):
+                decode_jwt_token(token)
+
+        assert len(verified_claims) == 0
+
+    def test_failed_verifications_are_not_memoized(self, invalid_jwt_token: str):
+        """Test that only tokens passing full verification are stored."""
+        for _ in range(2):
+            with pytest.raises(JWTError):
+                decode_jwt_token(invalid_jwt_token)
+
+        assert len(verified_claims) == 0
+
+    def test_failed_verifications_are_rejected_without_reverifying(self, test_user_id: str):
+        """Test that retries of a bad token skip the HMAC check and keep the error type."""
+        payload = {"sub": test_user_id, "exp": datetime.utcnow() - timedelta(hours=1)}
+        expired = jwt.encode(payload, settings.nextauth_secret, algorithm="HS256")
+
+        with patch("app.core.security.jwt.decode", wraps=jwt.decode) as decode:
+            for _ in range(3):
+                with pytest.raises(ExpiredSignatureError):
+                    decode_jwt_token(expired)
+            assert extract_user_id_from_token(expired) is None
+
+        assert decode.call_count == 1
+        assert len(rejected_tokens) == 1
+
+    def test_rejections_expire(self, invalid_jwt_token: str):
+        """Test that a rejection is only remembered for its TTL."""
+        memo = RejectedTokenCache(max_size=10, ttl_seconds=30)
+        memo.add(invalid_jwt_token, JWTError("Signature verification failed."))
+
+        with pytest.raises(JWTError, match="Signature verification failed"):
+            memo.check(invalid_jwt_token)
+        later = time.monotonic() + 31
+        with patch("app.core.security.time.monotonic", return_value=later):
+            memo.check(invalid_jwt_token)
+        assert len(memo) == 0
+
+    def test_memo_is_bounded(self):
+        """Test that the least recently used tokens are evicted."""
+        memo = VerifiedClaimsCache(max_size=2)
+        for index in range(3):
+            memo.set(f"token-{index}", {"sub": str(index)})
+
+        assert len(memo) == 2
+        assert memo.get("token-0") is None
+        assert memo.get("token-2") == {"sub": "2"}
+
+    def test_entries_without_exp_are_reverified_periodically(self):
+        """Test that tokens without exp are only trusted for a bounded time."""
+        memo = VerifiedClaimsCache(max_size=10)
+        memo.set("token", {"sub": "1"})
+
+        later = time.time() + MAX_VERIFIED_CLAIMS_AGE_SECONDS + 1
+        with patch("app.core.security.time.time", return_value=later):
+            assert memo.get("token") is None
+
+
 # ============================================
 # Auth.py Tests (get_current_user Dependency)
 # ============================================
@@ -288,6 +388,246 @@ class TestGetCurrentUser:
         # assert hasattr(user, "interview_sessions")
 
 
+# ============================================
+# get_current_principal Tests (No-DB Hit Path)
+# ============================================
+class TestGetCurrentPrincipal:
+    """Test suite for the get_current_principal dependency."""
+
+    @pytest.mark.asyncio
+    async def test_cache_hit_never_opens_db_session(self, valid_jwt_token: str):
+        """Test that a cache hit returns a principal without touching the database."""
+        cached = {
+            "id": str(uuid.uuid4()),
+            "email": "test-principal@example.com",
+            "name": "Principal",
+            "oauth_provider": "github",
+        }
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=valid_jwt_token)
+
+        with (
+            patch("app.core.auth.token_cache.lookup_token", AsyncMock(return_value=(cached, None))),
+            patch("app.core.auth.AsyncSessionLocal") as session_factory,
+        ):
+            principal = await get_current_principal(credentials)
+
+        session_factory.assert_not_called()
+        assert isinstance(principal, AuthenticatedPrincipal)
+        assert principal.id == cached["id"]
+        assert principal.email == cached["email"]
+        assert principal.oauth_provider == "github"
+
+    @pytest.mark.asyncio
+    async def test_cache_miss_loads_user_with_lazy_session(
+        self, valid_jwt_token: str, test_user_id: str
+    ):
+        """Test that a cache miss opens a session, loads the user and caches it."""
+        user = MagicMock(spec=User)
+        user.id = test_user_id
+        user.email = "test-principal@example.com"
+        user.name = "Principal"
+        user.avatar_url = None
+        user.oauth_provider = "google"
+        user.oauth_id = "oauth"
+        user.created_at = datetime.now()
+        user.updated_at = datetime.now()
+
+        session = AsyncMock()
+        session.get = AsyncMock(return_value=user)
+        session_factory = MagicMock()
+        session_factory.return_value.__aenter__ = AsyncMock(return_value=session)
+        session_factory.return_value.__aexit__ = AsyncMock(return_value=False)
+
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=valid_jwt_token)
+
+        with (
+            patch("app.core.auth.token_cache.lookup_token", AsyncMock(return_value=(None, None))),
+            patch("app.core.auth.token_cache.get_user_profile", AsyncMock(return_value=None)),
+            patch("app.core.auth.token_cache.cache_user_data", AsyncMock()) as cache_user_data,
+            patch("app.core.auth.AsyncSessionLocal", session_factory),
+        ):
+            principal = await get_current_principal(credentials)
+
+        session_factory.assert_called_once()
+        session.get.assert_awaited_once_with(User, test_user_id)
+        cache_user_data.assert_awaited_once()
+        assert principal.id == test_user_id
+
+    @pytest.mark.asyncio
+    async def test_invalid_token_rejected_before_db(self, invalid_jwt_token: str):
+        """Test that an invalid token is rejected without opening a session."""
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=invalid_jwt_token)
+
+        with (
+            patch("app.core.auth.token_cache.lookup_token", AsyncMock(return_value=(None, None))),
+            patch("app.core.auth.AsyncSessionLocal") as session_factory,
+        ):
+            with pytest.raises(HTTPException) as exc_info:
+                await get_current_principal(credentials)
+
+        assert exc_info.value.status_code == 401
+        session_factory.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_load_user_once(self, valid_jwt_token: str, test_user_id: str):
+        """Test that parallel requests with the same uncached token share one load."""
+        user = MagicMock(spec=User)
+        user.id = test_user_id
+        user.email = "test-principal@example.com"
+        user.name = "Principal"
+        user.avatar_url = None
+        user.oauth_provider = "google"
+        user.oauth_id = "oauth"
+        user.created_at = datetime.now()
+        user.updated_at = datetime.now()
+
+        async def slow_get(*_args):
+            await asyncio.sleep(0.01)
+            return user
+
+        session = AsyncMock()
+        session.get = AsyncMock(side_effect=slow_get)
+        session_factory = MagicMock()
+        session_factory.return_value.__aenter__ = AsyncMock(return_value=session)
+        session_factory.return_value.__aexit__ = AsyncMock(return_value=False)
+
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=valid_jwt_token)
+
+        with (
+            patch("app.core.auth.token_cache.lookup_token", AsyncMock(return_value=(None, None))),
+            patch("app.core.auth.token_cache.get_user_profile", AsyncMock(return_value=None)),
+            patch("app.core.auth.token_cache.cache_user_data", AsyncMock()),
+            patch("app.core.auth.AsyncSessionLocal", session_factory),
+            patch("app.core.security.jwt.decode", wraps=jwt.decode) as decode,
+        ):
+            principals = await asyncio.gather(
+                *(get_current_principal(credentials) for _ in range(10))
+            )
+
+        assert {principal.id for principal in principals} == {test_user_id}
+        assert decode.call_count == 1
+        session_factory.assert_called_once()
+        session.get.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_new_token_with_cached_profile_skips_db(
+        self, valid_jwt_token: str, test_user_id: str
+    ):
+        """Test that the first request with a new token reuses the written-through profile."""
+        profile = {
+            "id": test_user_id,
+            "email": "test-principal@example.com",
+            "name": "Principal",
+            "oauth_provider": "google",
+        }
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=valid_jwt_token)
+
+        with (
+            patch("app.core.auth.token_cache.lookup_token", AsyncMock(return_value=(None, None))),
+            patch(
+                "app.core.auth.token_cache.get_user_profile", AsyncMock(return_value=profile)
+            ) as get_user_profile,
+            patch("app.core.auth.token_cache.cache_token_reference", AsyncMock()) as cache_ref,
+            patch("app.core.auth.AsyncSessionLocal") as session_factory,
+        ):
+            principal = await get_current_principal(credentials)
+
+        session_factory.assert_not_called()
+        get_user_profile.assert_awaited_once_with(test_user_id)
+        expires_at = jwt.get_unverified_claims(valid_jwt_token)["exp"]
+        cache_ref.assert_awaited_once_with(valid_jwt_token, profile, expires_at=expires_at)
+        assert principal.id == test_user_id
+
+    @pytest.mark.asyncio
+    async def test_rejected_token_is_served_from_negative_cache(self, invalid_jwt_token: str):
+        """Test that retrying a bad token is rejected without re-verifying it."""
+        cache = TokenCache()
+        cache._initialized = True
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=invalid_jwt_token)
+
+        with (
+            patch("app.core.auth.token_cache", cache),
+            patch("app.core.cache.redis_manager.get_client", AsyncMock(return_value=None)),
+            patch("app.core.security.jwt.decode", wraps=jwt.decode) as decode,
+        ):
+            details = []
+            for _ in range(3):
+                with pytest.raises(HTTPException) as exc_info:
+                    await get_current_principal(credentials)
+                assert exc_info.value.status_code == 401
+                details.append(exc_info.value.detail)
+
+        assert decode.call_count == 1
+        assert len(set(details)) == 1
+        assert cache.metrics.counters["negative_l1_hits"].value == 2
+
+    @pytest.mark.asyncio
+    async def test_not_yet_valid_token_is_not_negatively_cached(self, test_user_id: str):
+        """Test that claim errors such as nbf are re-checked on every request."""
+        cache = TokenCache()
+        cache._initialized = True
+        payload = {
+            "sub": test_user_id,
+            "nbf": datetime.utcnow() + timedelta(minutes=5),
+            "exp": datetime.utcnow() + timedelta(hours=1),
+        }
+        token = jwt.encode(payload, settings.nextauth_secret, algorithm="HS256")
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+        with (
+            patch("app.core.auth.token_cache", cache),
+            patch("app.core.cache.redis_manager.get_client", AsyncMock(return_value=None)),
+        ):
+            with pytest.raises(HTTPException):
+                await get_current_principal(credentials)
+
+        assert len(cache.negative_cache) == 0
+
+    def test_principal_is_immutable(self):
+        """Test that principals cannot be modified after creation."""
+        principal = AuthenticatedPrincipal(
+            id="123", email="a@example.com", name=None, oauth_provider="google"
+        )
+
+        with pytest.raises(AttributeError):
+            principal.email = "b@example.com"
+        with pytest.raises(AttributeError):
+            principal.is_admin = True
+        assert not hasattr(principal, "__dict__")
+
+
+# ============================================
+# get_admin_principal Tests
+# ============================================
+class TestGetAdminPrincipal:
+    """Test suite for the admin-only dependency."""
+
+    @staticmethod
+    def _principal(email: str) -> AuthenticatedPrincipal:
+        return AuthenticatedPrincipal(str(uuid.uuid4()), email, "Admin", "google")
+
+    @pytest.mark.asyncio
+    async def test_admin_email_is_admitted(self):
+        """Test that listed emails pass (case-insensitively)."""
+        principal = self._principal("Ops@Example.com")
+
+        with patch.object(settings, "admin_emails", "ops@example.com, other@example.com"):
+            assert await get_admin_principal(principal) is principal
+
+    @pytest.mark.asyncio
+    async def test_non_admin_is_forbidden(self):
+        """Test that unlisted users get 403, and nobody is admin by default."""
+        principal = self._principal("user@example.com")
+
+        for admin_emails in ("ops@example.com", ""):
+            with (
+                patch.object(settings, "admin_emails", admin_emails),
+                pytest.raises(HTTPException) as exc_info,
+            ):
+                await get_admin_principal(principal)
+            assert exc_info.value.status_code == 403
+
+
 # ============================================
 # Integration Tests
 # ============================================
@@ -5,11 +5,24 @@
 # ============================================
 
 import json
-from unittest.mock import AsyncMock, patch
+import time
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 
-from app.core.cache import TokenCache
+from app.core.cache import LocalTTLCache, TokenCache, _worker_id
+from app.core.config import settings
+from app.core.serialization import decode_user_reference, encode_user_reference
+
+
+def _mock_pipeline(mock_redis: AsyncMock, execute_result=None) -> AsyncMock:
+    """Attach a synchronous pipeline() returning a mock with an async execute()."""
+    mock_pipeline = AsyncMock()
+    for command in ("set", "setex", "sadd", "expire", "smembers", "delete", "hset"):
+        setattr(mock_pipeline, command, Mock())
+    mock_pipeline.execute = AsyncMock(return_value=execute_result)
+    mock_redis.pipeline = Mock(return_value=mock_pipeline)
+    return mock_pipeline
 
 
 @pytest.mark.asyncio
@@ -52,7 +65,7 @@ async def test_cache_user_data_and_retrieval():
     # Mock Redis client
     mock_redis = AsyncMock()
     mock_redis.ping = AsyncMock(return_value=True)
-    mock_redis.setex = AsyncMock(return_value=True)
+    mock_pipeline = _mock_pipeline(mock_redis, [True, 1, True, False])
 
     user_data = {"id": "123", "email": "test@example.com", "name": "Test User"}
 
@@ -64,6 +77,7 @@ async def test_cache_user_data_and_retrieval():
     # Cache the data
     result = await cache.cache_user_data("fake-token", user_data, ttl_seconds=900)
     assert result is True
+    mock_pipeline.execute.assert_awaited_once()
 
     # Retrieve the data
     cached_data = await cache.get_user_from_cache("fake-token")
@@ -106,25 +120,33 @@ async def test_invalidate_token():
 
 
 @pytest.mark.asyncio
-async def test_invalidate_user_tokens():
-    """Test invalidating all tokens for a user."""
+async def test_cache_user_data_records_token_in_user_index():
+    """Test that caching adds the token hash to the per-user index with a TTL."""
     cache = TokenCache()
     cache._initialized = True
 
-    # Mock Redis client
     mock_redis = AsyncMock()
+    mock_pipeline = _mock_pipeline(mock_redis, [True, 1, True, False])
+    cache.redis_client = mock_redis
 
-    # Mock scan_iter to return some keys
-    async def mock_scan_iter(*args, **kwargs):
-        keys = [
-            "token_cache:user:123:token1",
-            "token_cache:user:123:token2",
-            "token_cache:user:123:token3",
-        ]
-        for key in keys:
-            yield key
+    await cache.cache_user_data("fake-token", {"id": "123"}, ttl_seconds=600)
+
+    token_hash = cache._get_cache_key("fake-token").removeprefix("token_cache:")
+    mock_pipeline.sadd.assert_called_once_with("token_cache:user:{123}", token_hash)
+    mock_pipeline.expire.assert_any_call("token_cache:user:{123}", 600, nx=True)
+    mock_pipeline.expire.assert_any_call("token_cache:user:{123}", 600, gt=True)
+    mock_redis.scan_iter.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_invalidate_user_tokens():
+    """Test invalidating all tokens for a user via the per-user index."""
+    cache = TokenCache()
+    cache._initialized = True
 
-    mock_redis.scan_iter = mock_scan_iter
+    # Mock Redis client
+    mock_redis = AsyncMock()
+    mock_pipeline = _mock_pipeline(mock_redis, [{"hash1", "hash2", "hash3"}, 1])
     mock_redis.delete = AsyncMock(return_value=3)  # 3 keys deleted
 
     cache.redis_client = mock_redis
@@ -132,6 +154,15 @@ async def test_invalidate_user_tokens():
     count = await cache.invalidate_user_tokens("123")
     assert count == 3
 
+    mock_pipeline.smembers.assert_called_once_with("token_cache:user:{123}")
+    mock_pipeline.delete.assert_called_once_with("token_cache:user:{123}", "user:{123}")
+    assert sorted(mock_redis.delete.await_args.args) == [
+        "token_cache:hash1",
+        "token_cache:hash2",
+        "token_cache:hash3",
+    ]
+    mock_redis.scan_iter.assert_not_called()
+
 
 @pytest.mark.asyncio
 async def test_invalidate_user_tokens_no_keys():
@@ -139,19 +170,15 @@ async def test_invalidate_user_tokens_no_keys():
     cache = TokenCache()
     cache._initialized = True
 
-    # Mock Redis client with empty scan
+    # Mock Redis client with an empty index
     mock_redis = AsyncMock()
-
-    async def mock_scan_iter(*args, **kwargs):
-        return
-        yield  # Make it a generator but yield nothing
-
-    mock_redis.scan_iter = mock_scan_iter
+    _mock_pipeline(mock_redis, [set(), 0])
 
     cache.redis_client = mock_redis
 
     count = await cache.invalidate_user_tokens("123")
     assert count == 0
+    mock_redis.delete.assert_not_called()
 
 
 def test_get_cache_key_is_consistent():
@@ -181,34 +208,48 @@ def test_get_cache_key_different_for_different_tokens():
 
 @pytest.mark.asyncio
 async def test_get_cache_stats_when_unavailable():
-    """Test getting cache stats when Redis is unavailable."""
+    """Test that stats still report this worker's metrics without Redis."""
     cache = TokenCache()
     cache._initialized = True
     cache.redis_client = None
+    cache.metrics.counters["misses"].inc()
+
+    with patch("app.core.cache.redis_manager.get_client", AsyncMock(return_value=None)):
+        stats = await cache.get_cache_stats()
 
-    stats = await cache.get_cache_stats()
     assert stats["status"] == "unavailable"
+    assert stats["worker"]["misses"] == 1
+    assert "cluster" not in stats
 
 
 @pytest.mark.asyncio
-async def test_get_cache_stats_when_available():
-    """Test getting cache stats when Redis is available."""
+async def test_get_cache_stats_counts_own_hits_and_misses():
+    """Test that hits and misses come from the cache itself, not Redis INFO."""
     cache = TokenCache()
     cache._initialized = True
 
-    # Mock Redis info response
     mock_redis = AsyncMock()
-    mock_redis.info = AsyncMock(return_value={"keyspace_hits": 1000, "keyspace_misses": 100})
+    mock_redis.get = AsyncMock(side_effect=[json.dumps({"id": "1"}).encode(), None])
+    mock_redis.hgetall = AsyncMock(return_value={})
     cache.redis_client = mock_redis
 
+    await cache.get_user_from_cache("token-a")  # Redis hit
+    await cache.get_user_from_cache("token-a")  # L1 hit
+    await cache.get_user_from_cache("token-b")  # miss
+
     stats = await cache.get_cache_stats()
 
+    mock_redis.info.assert_not_called()
+    worker = stats["worker"]
     assert stats["status"] == "available"
-    assert stats["hits"] == 1000
-    assert stats["misses"] == 100
-    assert stats["total_requests"] == 1100
-    # Hit rate should be 1000/1100 * 100 = 90.91%
-    assert stats["hit_rate_percent"] == pytest.approx(90.91, rel=0.01)
+    assert worker["redis_hits"] == 1
+    assert worker["l1_hits"] == 1
+    assert worker["hits"] == 2
+    assert worker["misses"] == 1
+    assert worker["total_requests"] == 3
+    assert worker["hit_rate_percent"] == pytest.approx(66.67, rel=0.01)
+    # Only Redis round trips are timed
+    assert worker["histograms"]["get_latency_ms"]["count"] == 2
 
 
 @pytest.mark.asyncio
@@ -217,14 +258,98 @@ async def test_get_cache_stats_handles_zero_requests():
     cache = TokenCache()
     cache._initialized = True
 
-    # Mock Redis info with zero hits/misses
     mock_redis = AsyncMock()
-    mock_redis.info = AsyncMock(return_value={"keyspace_hits": 0, "keyspace_misses": 0})
+    mock_redis.hgetall = AsyncMock(return_value={})
     cache.redis_client = mock_redis
 
     stats = await cache.get_cache_stats()
 
-    assert stats["hit_rate_percent"] == 0
+    assert stats["worker"]["hit_rate_percent"] == 0
+    assert stats["cluster"]["hit_rate_percent"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cache_user_data_records_set_metrics():
+    """Test that writes record latency and payload size."""
+    cache = TokenCache()
+    cache._initialized = True
+    mock_redis = AsyncMock()
+    _mock_pipeline(mock_redis)
+    cache.redis_client = mock_redis
+
+    await cache.cache_user_data("token", {"id": "123", "email": "a@example.com"})
+
+    snapshot = cache.metrics.snapshot()
+    assert snapshot["counters"]["sets"] == 1
+    assert snapshot["histograms"]["set_latency_ms"]["count"] == 1
+    assert snapshot["histograms"]["payload_bytes"]["sum"] > 0
+
+
+@pytest.mark.asyncio
+async def test_redis_errors_are_counted():
+    """Test that failed Redis operations increment the error counter."""
+    cache = TokenCache()
+    cache._initialized = True
+    mock_redis = AsyncMock()
+    mock_redis.get = AsyncMock(side_effect=RuntimeError("boom"))
+    cache.redis_client = mock_redis
+
+    assert await cache.get_user_from_cache("token") is None
+    assert cache.metrics.counters["errors"].value == 1
+    assert cache.metrics.counters["misses"].value == 0
+
+
+@pytest.mark.asyncio
+async def test_report_metrics_writes_worker_snapshot():
+    """Test that a worker stores its snapshot in the shared metrics hash."""
+    cache = TokenCache()
+    cache._initialized = True
+    cache.metrics.counters["misses"].inc(3)
+    mock_redis = AsyncMock()
+    mock_pipeline = _mock_pipeline(mock_redis)
+    cache.redis_client = mock_redis
+
+    assert await cache.report_metrics() is True
+
+    key, worker_id, raw_report = mock_pipeline.hset.call_args.args
+    assert key == "token_cache:metrics"
+    assert worker_id == _worker_id()
+    assert json.loads(raw_report)["metrics"]["counters"]["misses"] == 3
+    mock_pipeline.expire.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_get_cache_stats_aggregates_workers_and_drops_stale():
+    """Test that live worker reports are merged and stale ones removed."""
+    cache = TokenCache()
+    cache._initialized = True
+    cache.metrics.counters["l1_hits"].inc(5)
+
+    other = TokenCache()
+    other.metrics.counters["redis_hits"].inc(4)
+    other.metrics.counters["misses"].inc(1)
+    other.metrics.histograms["get_latency_ms"].observe(0.3)
+
+    now = time.time()
+    mock_redis = AsyncMock()
+    mock_redis.hgetall = AsyncMock(
+        return_value={
+            b"other:1": json.dumps({"reported_at": now, "metrics": other.metrics.snapshot()}),
+            b"dead:2": json.dumps({"reported_at": now - 3600, "metrics": {}}),
+            # This worker's own (older) report is replaced by its live counters
+            _worker_id().encode(): json.dumps({"reported_at": now, "metrics": {}}),
+        }
+    )
+    cache.redis_client = mock_redis
+
+    stats = await cache.get_cache_stats()
+
+    mock_redis.hdel.assert_awaited_once_with("token_cache:metrics", "dead:2")
+    assert stats["workers"] == 2
+    assert stats["cluster"]["hits"] == 9
+    assert stats["cluster"]["misses"] == 1
+    assert stats["cluster"]["histograms"]["get_latency_ms"]["count"] == 1
+    assert stats["worker"]["hits"] == 5
 
 
 @pytest.mark.asyncio
@@ -235,7 +360,8 @@ async def test_cache_handles_serialization_error():
 
     # Mock Redis client
     mock_redis = AsyncMock()
-    mock_redis.setex = AsyncMock(side_effect=TypeError("Not JSON serializable"))
+    mock_pipeline = _mock_pipeline(mock_redis)
+    mock_pipeline.execute = AsyncMock(side_effect=TypeError("Not JSON serializable"))
     cache.redis_client = mock_redis
 
     # Try to cache data with non-serializable object
@@ -265,18 +391,556 @@ async def test_cache_handles_deserialization_error():
 
 @pytest.mark.asyncio
 async def test_ensure_connection_only_runs_once():
-    """Test that Redis connection is only initialized once."""
+    """Test that the shared client is fetched once and then reused."""
     cache = TokenCache()
 
-    with patch("app.core.cache.aioredis.from_url") as mock_from_url:
-        mock_redis = AsyncMock()
-        mock_redis.ping = AsyncMock(return_value=True)
-        mock_from_url.return_value = mock_redis
-
+    mock_redis = AsyncMock()
+    with patch(
+        "app.core.cache.redis_manager.get_client", AsyncMock(return_value=mock_redis)
+    ) as mock_get_client:
         # Call twice
         await cache._ensure_connection()
         await cache._ensure_connection()
 
         # Should only be called once
-        assert mock_from_url.call_count == 1
+        assert mock_get_client.await_count == 1
+        assert cache.redis_client is mock_redis
         assert cache._initialized is True
+
+
+@pytest.mark.asyncio
+async def test_connection_error_releases_client_for_reconnect():
+    """Test that a dropped connection is reported and re-fetched on the next call."""
+    from redis.exceptions import ConnectionError as RedisConnectionError
+
+    cache = TokenCache()
+    broken = AsyncMock()
+    broken.get = AsyncMock(side_effect=RedisConnectionError("reset by peer"))
+    cache.redis_client = broken
+
+    with (
+        patch("app.core.cache.redis_manager.report_failure") as report_failure,
+        patch("app.core.cache.redis_manager.get_client", AsyncMock(return_value=None)),
+    ):
+        assert await cache.get_user_from_cache("fake-token") is None
+        report_failure.assert_called_once()
+        assert cache.redis_client is None
+
+        # Next lookup asks the manager again instead of giving up for good
+        assert await cache.get_user_from_cache("fake-token") is None
+
+
+@pytest.mark.asyncio
+async def test_pool_exhaustion_keeps_the_shared_client():
+    """Test that a full connection pool is a miss, not a reason to drop the client."""
+    from redis.exceptions import MaxConnectionsError
+
+    cache = TokenCache()
+    busy = AsyncMock()
+    busy.get = AsyncMock(side_effect=MaxConnectionsError("No connection available"))
+    cache.redis_client = busy
+
+    with patch("app.core.cache.redis_manager.report_failure") as report_failure:
+        assert await cache.get_user_from_cache("fake-token") is None
+
+    report_failure.assert_not_called()
+    assert cache.redis_client is busy
+
+
+# ============================================
+# L1 (In-Process) Cache Tests
+# ============================================
+def test_local_cache_evicts_least_recently_used():
+    """Test that the L1 cache evicts by size, oldest access first."""
+    local = LocalTTLCache(max_size=2, ttl_seconds=60)
+    local.set("a", 1)
+    local.set("b", 2)
+    assert local.get("a") == 1  # "a" is now most recently used
+
+    local.set("c", 3)
+
+    assert local.get("b") is None
+    assert local.get("a") == 1
+    assert local.get("c") == 3
+    assert len(local) == 2
+
+
+def test_local_cache_expires_entries():
+    """Test that L1 entries are dropped once their TTL elapses."""
+    local = LocalTTLCache(max_size=10, ttl_seconds=60)
+
+    with patch("app.core.cache.time.monotonic", return_value=1000.0):
+        local.set("a", 1, ttl_seconds=5)
+
+    with patch("app.core.cache.time.monotonic", return_value=1004.0):
+        assert local.get("a") == 1
+
+    with patch("app.core.cache.time.monotonic", return_value=1005.0):
+        assert local.get("a") is None
+    assert len(local) == 0
+
+
+def test_local_cache_ttl_is_capped_at_default():
+    """Test that a long Redis TTL does not extend the L1 lifetime."""
+    local = LocalTTLCache(max_size=10, ttl_seconds=30)
+
+    with patch("app.core.cache.time.monotonic", return_value=0.0):
+        local.set("a", 1, ttl_seconds=900)
+
+    with patch("app.core.cache.time.monotonic", return_value=31.0):
+        assert local.get("a") is None
+
+
+@pytest.mark.asyncio
+async def test_l1_hit_skips_redis():
+    """Test that a token cached in L1 is served without a Redis call."""
+    cache = TokenCache()
+    cache._initialized = True
+
+    mock_redis = AsyncMock()
+    _mock_pipeline(mock_redis)
+    cache.redis_client = mock_redis
+
+    user_data = {"id": "123", "email": "test@example.com"}
+    await cache.cache_user_data("fake-token", user_data)
+
+    cached_data = await cache.get_user_from_cache("fake-token")
+
+    assert cached_data == user_data
+    mock_redis.get.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_l1_returns_copies():
+    """Test that callers mutating a cached dict do not corrupt the L1 entry."""
+    cache = TokenCache()
+    cache._initialized = True
+    cache.redis_client = AsyncMock()
+    _mock_pipeline(cache.redis_client)
+
+    await cache.cache_user_data("fake-token", {"id": "123", "name": "Test"})
+
+    first = await cache.get_user_from_cache("fake-token")
+    first["name"] = "Mutated"
+
+    second = await cache.get_user_from_cache("fake-token")
+    assert second["name"] == "Test"
+
+
+@pytest.mark.asyncio
+async def test_redis_hit_populates_l1():
+    """Test that a Redis hit is promoted into the L1 tier."""
+    cache = TokenCache()
+    cache._initialized = True
+
+    user_data = {"id": "123", "email": "test@example.com"}
+    mock_redis = AsyncMock()
+    mock_redis.get = AsyncMock(return_value=json.dumps(user_data))
+    cache.redis_client = mock_redis
+
+    await cache.get_user_from_cache("fake-token")
+    await cache.get_user_from_cache("fake-token")
+
+    assert mock_redis.get.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_shared_memory_tier_is_shared_between_workers(tmp_path):
+    """Test that a Redis hit in one worker is served to another from shared memory."""
+    with (
+        patch.object(settings, "shared_memory_enabled", True),
+        patch.object(settings, "shared_memory_dir", str(tmp_path)),
+    ):
+        workers = [TokenCache(), TokenCache()]
+
+    user_data = {"id": "123", "email": "test@example.com"}
+    for worker in workers:
+        worker._initialized = True
+        worker.redis_client = AsyncMock()
+        worker.redis_client.get = AsyncMock(return_value=json.dumps(user_data))
+
+    assert await workers[0].get_user_from_cache("fake-token") == user_data
+    assert await workers[1].get_user_from_cache("fake-token") == user_data
+
+    workers[1].redis_client.get.assert_not_called()
+    assert workers[1].metrics.counters["shared_hits"].value == 1
+
+    # Evicting the user in one worker removes the host-wide copy
+    workers[0]._evict_local_user("123")
+    assert workers[1].shared_cache.get(workers[1]._get_cache_key("fake-token")) is None
+
+    for worker in workers:
+        worker.shared_cache.close()
+
+
+@pytest.mark.asyncio
+async def test_invalidate_token_evicts_l1_and_publishes():
+    """Test that invalidating a token clears L1 and notifies other workers."""
+    cache = TokenCache()
+    cache._initialized = True
+
+    mock_redis = AsyncMock()
+    mock_redis.delete = AsyncMock(return_value=1)
+    mock_redis.get = AsyncMock(return_value=None)
+    _mock_pipeline(mock_redis)
+    cache.redis_client = mock_redis
+
+    await cache.cache_user_data("fake-token", {"id": "123"})
+    await cache.invalidate_token("fake-token")
+
+    assert await cache.get_user_from_cache("fake-token") is None
+    channel, payload = mock_redis.publish.await_args.args
+    assert channel == "token_cache:invalidate"
+    assert json.loads(payload) == {"scope": "token", "key": cache._get_cache_key("fake-token")}
+
+
+@pytest.mark.asyncio
+async def test_invalidation_message_evicts_l1_entries():
+    """Test that pub/sub messages from other workers evict local entries."""
+    cache = TokenCache()
+    cache._initialized = True
+    mock_redis = AsyncMock()
+    mock_redis.get = AsyncMock(return_value=None)
+    _mock_pipeline(mock_redis)
+    cache.redis_client = mock_redis
+
+    await cache.cache_user_data("token-a", {"id": "user-1"})
+    await cache.cache_user_data("token-b", {"id": "user-1"})
+    await cache.cache_user_data("token-c", {"id": "user-2"})
+
+    cache._handle_invalidation(json.dumps({"scope": "user", "user_id": "user-1"}))
+
+    assert await cache.get_user_from_cache("token-a") is None
+    assert await cache.get_user_from_cache("token-b") is None
+    assert await cache.get_user_from_cache("token-c") == {"id": "user-2"}
+
+    key_c = cache._get_cache_key("token-c")
+    cache._handle_invalidation(json.dumps({"scope": "token", "key": key_c}))
+    assert await cache.get_user_from_cache("token-c") is None
+
+
+def test_invalidation_message_ignores_garbage():
+    """Test that malformed pub/sub payloads are ignored."""
+    cache = TokenCache()
+    cache._handle_invalidation("not json {{{")
+
+
+# ============================================
+# Fill Lock Tests
+# ============================================
+@pytest.mark.asyncio
+async def test_acquire_fill_lock_uses_set_nx():
+    """Test that the fill lock is a SET NX PX on a per-token key."""
+    cache = TokenCache()
+    cache._initialized = True
+    mock_redis = AsyncMock()
+    mock_redis.set = AsyncMock(side_effect=[True, None])
+    cache.redis_client = mock_redis
+
+    assert await cache.acquire_fill_lock("fake-token", ttl_ms=2000) is True
+    assert await cache.acquire_fill_lock("fake-token", ttl_ms=2000) is False
+
+    key = mock_redis.set.await_args.args[0]
+    assert key.startswith("token_cache:lock:")
+    assert mock_redis.set.await_args.kwargs == {"nx": True, "px": 2000}
+
+
+@pytest.mark.asyncio
+async def test_acquire_fill_lock_without_redis_lets_caller_load():
+    """Test that an unavailable Redis never blocks the loader."""
+    cache = TokenCache()
+    cache._initialized = True
+    cache.redis_client = None
+
+    assert await cache.acquire_fill_lock("fake-token", ttl_ms=2000) is True
+
+
+@pytest.mark.asyncio
+async def test_wait_for_fill_returns_data_once_cached():
+    """Test that waiters pick up the value written by the lock holder."""
+    cache = TokenCache()
+    cache._initialized = True
+    mock_redis = AsyncMock()
+    mock_redis.get = AsyncMock(side_effect=[None, json.dumps({"id": "123"})])
+    cache.redis_client = mock_redis
+
+    user_data = await cache.wait_for_fill("fake-token", timeout_seconds=1, poll_interval=0)
+
+    assert user_data == {"id": "123"}
+
+
+@pytest.mark.asyncio
+async def test_cache_user_data_writes_binary_user_records():
+    """Test that full user records are stored in the compact binary format."""
+    import uuid
+    from datetime import UTC, datetime
+
+    cache = TokenCache()
+    cache._initialized = True
+    mock_redis = AsyncMock()
+    mock_pipeline = _mock_pipeline(mock_redis)
+    cache.redis_client = mock_redis
+
+    now = datetime.now(UTC)
+    user_data = {
+        "id": uuid.uuid4(),
+        "email": "test@example.com",
+        "name": "Test User",
+        "avatar_url": None,
+        "oauth_provider": "google",
+        "oauth_id": "oauth_123",
+        "created_at": now,
+        "updated_at": now,
+    }
+    await cache.cache_user_data("fake-token", user_data)
+
+    profile_key, stored = mock_pipeline.set.call_args.args
+    assert profile_key == f"user:{{{user_data['id']}}}"
+    assert isinstance(stored, bytes)
+    assert stored[0] == 1
+    reference = mock_pipeline.setex.call_args.args[2]
+
+    # A fresh worker (empty L1) resolves the reference and decodes the profile
+    reader = TokenCache()
+    reader._initialized = True
+    reader.redis_client = AsyncMock()
+    reader.redis_client.get = AsyncMock(side_effect=[reference, stored])
+    decoded = await reader.get_user_from_cache("fake-token")
+    assert decoded["id"] == str(user_data["id"])
+    assert decoded["created_at"] == now
+
+
+@pytest.mark.asyncio
+async def test_cache_rejection_sets_short_lived_marker_without_overwriting():
+    """Test that rejections are stored with NX and the negative TTL."""
+    cache = TokenCache()
+    cache._initialized = True
+    mock_redis = AsyncMock()
+    cache.redis_client = mock_redis
+
+    assert await cache.cache_rejection("bad-token", "Invalid authentication token") is True
+
+    args, kwargs = mock_redis.set.call_args
+    assert args == (cache._get_cache_key("bad-token"), b"\x00Invalid authentication token")
+    assert kwargs == {"ex": settings.token_cache_negative_ttl_seconds, "nx": True}
+
+
+@pytest.mark.asyncio
+async def test_is_rejected_locally_reads_the_negative_l1():
+    """Test the I/O-free check used by the rate limiter."""
+    cache = TokenCache()
+    cache._initialized = True
+    cache.redis_client = AsyncMock()
+    assert not cache.is_rejected_locally("bad-token")
+
+    await cache.cache_rejection("bad-token", "Invalid token")
+
+    assert cache.is_rejected_locally("bad-token")
+    assert not cache.is_rejected_locally("other-token")
+
+
+@pytest.mark.asyncio
+async def test_negative_l1_hit_skips_redis():
+    """Test that a locally rejected token never reaches Redis."""
+    cache = TokenCache()
+    cache._initialized = True
+    mock_redis = AsyncMock()
+    cache.redis_client = mock_redis
+    await cache.cache_rejection("bad-token", "nope")
+    mock_redis.reset_mock()
+
+    assert await cache.lookup_token("bad-token") == (None, "nope")
+    assert await cache.get_user_from_cache("bad-token") is None
+
+    mock_redis.get.assert_not_called()
+    assert cache.metrics.counters["negative_l1_hits"].value == 2
+
+
+@pytest.mark.asyncio
+async def test_negative_redis_hit_is_one_lookup_and_populates_l1():
+    """Test that a rejection cached by another worker is found with one GET."""
+    cache = TokenCache()
+    cache._initialized = True
+    mock_redis = AsyncMock()
+    mock_redis.get = AsyncMock(return_value=b"\x00Invalid authentication token: expired")
+    cache.redis_client = mock_redis
+
+    first = await cache.lookup_token("bad-token")
+    second = await cache.lookup_token("bad-token")
+
+    assert first == second == (None, "Invalid authentication token: expired")
+    mock_redis.get.assert_awaited_once()
+    counters = cache.metrics.counters
+    assert counters["negative_redis_hits"].value == 1
+    assert counters["negative_l1_hits"].value == 1
+    assert counters["misses"].value == 0
+
+
+@pytest.mark.asyncio
+async def test_negative_cache_does_not_evict_valid_users():
+    """Test that rejected tokens live in their own bounded L1 tier."""
+    cache = TokenCache()
+    cache._initialized = True
+    cache.redis_client = None
+    cache.local_cache = LocalTTLCache(max_size=10, ttl_seconds=30)
+    cache.negative_cache = LocalTTLCache(max_size=2, ttl_seconds=30)
+    cache.local_cache.set(cache._get_cache_key("good"), {"id": "1"})
+
+    with patch("app.core.cache.redis_manager.get_client", AsyncMock(return_value=None)):
+        for index in range(5):
+            await cache.cache_rejection(f"bad-{index}", "nope")
+
+        assert len(cache.negative_cache) == 2
+        assert await cache.get_user_from_cache("good") == {"id": "1"}
+
+
+@pytest.mark.asyncio
+async def test_negative_cache_disabled():
+    """Test that rejections are not stored when the negative cache is off."""
+    with patch.object(settings, "token_cache_negative_enabled", False):
+        cache = TokenCache()
+
+    mock_redis = AsyncMock()
+    cache.redis_client = mock_redis
+
+    assert cache.negative_cache is None
+    assert await cache.cache_rejection("bad-token", "nope") is False
+    mock_redis.set.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_token_entries_reference_one_shared_profile():
+    """Test that a token resolves through its reference to the shared profile."""
+    cache = TokenCache()
+    cache._initialized = True
+    mock_redis = AsyncMock()
+    profile = json.dumps({"id": "user-1", "email": "a@example.com"}).encode()
+    mock_redis.get = AsyncMock(side_effect=[encode_user_reference("user-1", None), profile])
+    cache.redis_client = mock_redis
+
+    cached = await cache.get_user_from_cache("token-a")
+
+    assert cached == {"id": "user-1", "email": "a@example.com"}
+    keys = [call.args[0] for call in mock_redis.get.await_args_list]
+    assert keys == [cache._get_cache_key("token-a"), "user:{user-1}"]
+
+
+@pytest.mark.asyncio
+async def test_reference_without_profile_is_a_miss():
+    """Test that an expired profile makes the token fall back to validation."""
+    cache = TokenCache()
+    cache._initialized = True
+    mock_redis = AsyncMock()
+    mock_redis.get = AsyncMock(side_effect=[encode_user_reference("user-1", None), None])
+    cache.redis_client = mock_redis
+
+    assert await cache.lookup_token("token-a") == (None, None)
+    assert cache.metrics.counters["misses"].value == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_user_data_ttl_is_bound_to_token_expiry():
+    """Test that the token entry never outlives the JWT exp claim."""
+    cache = TokenCache()
+    cache._initialized = True
+    mock_redis = AsyncMock()
+    mock_pipeline = _mock_pipeline(mock_redis)
+    cache.redis_client = mock_redis
+    expires_at = int(time.time()) + 120
+
+    await cache.cache_user_data("token", {"id": "user-1"}, ttl_seconds=900, expires_at=expires_at)
+
+    key, ttl, reference = mock_pipeline.setex.call_args.args
+    assert key == cache._get_cache_key("token")
+    assert 110 <= ttl <= 120
+    assert decode_user_reference(reference) == ("user-1", expires_at)
+    _, kwargs = mock_pipeline.set.call_args
+    assert kwargs == {"ex": settings.token_cache_profile_ttl_seconds}
+
+
+@pytest.mark.asyncio
+async def test_cache_user_data_skips_expired_tokens():
+    """Test that tokens already past exp are not cached at all."""
+    cache = TokenCache()
+    cache._initialized = True
+    mock_redis = AsyncMock()
+    _mock_pipeline(mock_redis)
+    cache.redis_client = mock_redis
+
+    cached = await cache.cache_user_data("token", {"id": "1"}, expires_at=int(time.time()) - 5)
+
+    assert cached is False
+    mock_redis.pipeline.assert_not_called()
+    assert len(cache.local_cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_cache_token_reference_writes_only_the_reference():
+    """Test that a token for an already-cached profile stores just the pointer."""
+    cache = TokenCache()
+    cache._initialized = True
+    mock_redis = AsyncMock()
+    mock_pipeline = _mock_pipeline(mock_redis)
+    cache.redis_client = mock_redis
+
+    assert await cache.cache_token_reference("token", {"id": "user-1"}) is True
+
+    mock_pipeline.set.assert_not_called()
+    mock_pipeline.sadd.assert_called_once()
+    assert decode_user_reference(mock_pipeline.setex.call_args.args[2])[0] == "user-1"
+
+
+@pytest.mark.asyncio
+async def test_cache_user_profile_writes_through_and_evicts_l1():
+    """Test that a profile update replaces the shared entry and drops stale L1 copies."""
+    cache = TokenCache()
+    cache._initialized = True
+    mock_redis = AsyncMock()
+    cache.redis_client = mock_redis
+    cache.local_cache.set(cache._get_cache_key("token-a"), {"id": "user-1", "name": "Old"})
+
+    assert await cache.cache_user_profile({"id": "user-1", "name": "New"}) is True
+
+    key, value = mock_redis.set.call_args.args
+    assert key == "user:{user-1}"
+    assert json.loads(value) == {"id": "user-1", "name": "New"}
+    assert mock_redis.set.call_args.kwargs["get"] is True
+    assert len(cache.local_cache) == 0
+    channel, message = mock_redis.publish.call_args.args
+    assert json.loads(message) == {"scope": "user", "user_id": "user-1"}
+
+
+@pytest.mark.asyncio
+async def test_cache_user_profile_skips_invalidation_when_unchanged():
+    """Test that re-writing an identical profile (every login) evicts and publishes nothing."""
+    cache = TokenCache()
+    cache._initialized = True
+    mock_redis = AsyncMock()
+    cache.redis_client = mock_redis
+    profile = {"id": "user-1", "name": "Same"}
+    mock_redis.set = AsyncMock(return_value=cache.serializer.dumps(profile))
+    cache.local_cache.set(cache._get_cache_key("token-a"), dict(profile))
+
+    with patch.object(cache, "_evict_local_user") as evict:
+        assert await cache.cache_user_profile(profile) is True
+
+    evict.assert_not_called()
+    mock_redis.publish.assert_not_called()
+    assert len(cache.local_cache) == 1
+
+
+@pytest.mark.asyncio
+async def test_get_user_profile_counts_hits_and_misses():
+    """Test that profile lookups are tracked separately from token lookups."""
+    cache = TokenCache()
+    cache._initialized = True
+    mock_redis = AsyncMock()
+    mock_redis.get = AsyncMock(side_effect=[json.dumps({"id": "user-1"}).encode(), None])
+    cache.redis_client = mock_redis
+
+    assert await cache.get_user_profile("user-1") == {"id": "user-1"}
+    assert await cache.get_user_profile("user-2") is None
+
+    counters = cache.metrics.counters
+    assert counters["profile_hits"].value == 1
+    assert counters["profile_misses"].value == 1
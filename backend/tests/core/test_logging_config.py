@@ -0,0 +1,114 @@
+# ============================================
+# Ascend AI - Logging Configuration Tests
+# ============================================
+# Tests for the JSON formatter and queued (background thread) logging
+# ============================================
+
+import json
+import logging
+import sys
+import threading
+
+import pytest
+
+from app.core.logging_config import (
+    JSONFormatter,
+    LazyQueueHandler,
+    configure_logging,
+    stop_logging,
+)
+
+
+@pytest.fixture
+def restore_root_logger():
+    """Put the root logger back the way the test runner configured it."""
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    yield
+    stop_logging()
+    root.handlers[:] = handlers
+    root.setLevel(level)
+
+
+def _record(msg: str, *args, **extra) -> logging.LogRecord:
+    record = logging.LogRecord("app.test", logging.WARNING, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_json_formatter_writes_extra_fields():
+    """Test that ``extra`` fields become JSON fields next to the message."""
+    record = _record("%s %s - Status: %d", "GET", "/items/{item_id}", 404, status=404)
+    record.route = "/items/{item_id}"
+    record.duration_ms = 1.25
+
+    entry = json.loads(JSONFormatter().format(record))
+
+    assert entry["message"] == "GET /items/{item_id} - Status: 404"
+    assert entry["level"] == "WARNING"
+    assert entry["logger"] == "app.test"
+    assert entry["status"] == 404
+    assert entry["route"] == "/items/{item_id}"
+    assert entry["duration_ms"] == 1.25
+    assert entry["ts"].endswith("+00:00")
+    assert "args" not in entry and "msecs" not in entry
+
+
+def test_json_formatter_includes_traceback():
+    """Test that exceptions are written under ``exc``."""
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = logging.LogRecord(
+            "app.test", logging.ERROR, __file__, 1, "failed", None, sys.exc_info()
+        )
+
+    entry = json.loads(JSONFormatter().format(record))
+    assert "ValueError: boom" in entry["exc"]
+
+
+def test_queue_handler_leaves_formatting_to_the_listener():
+    """Test that the caller only enqueues; interpolation happens later."""
+    record = _record("%s", "value")
+    prepared = LazyQueueHandler(None).prepare(record)
+
+    assert prepared is record
+    assert prepared.msg == "%s" and prepared.args == ("value",)
+
+
+def test_queued_logging_writes_from_a_background_thread(restore_root_logger, capsys):
+    """Test queued JSON logging end to end, flushed by stop_logging()."""
+    emitted_by = []
+
+    class RecordThread(logging.Filter):
+        def filter(self, record):
+            emitted_by.append(threading.current_thread().name)
+            return True
+
+    configure_logging("INFO", fmt="json", queued=True, force=True)
+    logging.getLogger().handlers[0].addFilter(RecordThread())
+    logging.getLogger("app.test").info("hello %s", "world", extra={"route": "/test"})
+    logging.getLogger("app.test").debug("below the level")
+    stop_logging()
+
+    lines = capsys.readouterr().err.splitlines()
+    assert len(lines) == 1
+    entry = json.loads(lines[0])
+    assert entry["message"] == "hello world"
+    assert entry["route"] == "/test"
+    # The handler filter runs on the caller thread; the write does not
+    assert emitted_by == [threading.current_thread().name]
+
+
+def test_configure_logging_keeps_foreign_handlers(restore_root_logger):
+    """Test that, like basicConfig, handlers set up by others are left alone."""
+    root = logging.getLogger()
+    foreign = logging.NullHandler()
+    root.handlers[:] = [foreign]
+
+    configure_logging("INFO")
+    assert root.handlers == [foreign]
+
+    configure_logging("INFO", force=True)
+    assert len(root.handlers) == 1
+    assert isinstance(root.handlers[0], LazyQueueHandler)
@@ -0,0 +1,129 @@
+# ============================================
+# Ascend AI - In-Process Metrics Tests
+# ============================================
+# Tests for counters, histograms and cross-worker snapshot merging
+# ============================================
+
+import pytest
+
+from app.core.metrics import (
+    Gauge,
+    Histogram,
+    MetricGroup,
+    Timer,
+    merge_snapshots,
+    summarize_histogram,
+)
+
+
+def test_histogram_buckets_observations():
+    """Test that values land in the first bucket with a bound >= value."""
+    histogram = Histogram((1, 10, 100))
+
+    for value in (0.5, 1, 5, 50, 500):
+        histogram.observe(value)
+
+    assert histogram.counts == [2, 1, 1, 1]
+    assert histogram.count == 5
+    assert histogram.sum == pytest.approx(556.5)
+
+
+def test_gauge_goes_up_and_down():
+    """Test that a gauge tracks increments, decrements and explicit values."""
+    gauge = Gauge()
+
+    gauge.inc()
+    gauge.inc(2)
+    gauge.dec()
+    assert gauge.value == 2
+
+    gauge.set(0.5)
+    assert gauge.value == 0.5
+
+
+def test_timer_records_milliseconds():
+    """Test that Timer records one observation per block."""
+    histogram = Histogram((1000,))
+
+    with Timer(histogram):
+        pass
+
+    assert histogram.count == 1
+    assert 0 <= histogram.sum < 1000
+
+
+def test_metric_group_snapshot_and_reset():
+    """Test that snapshots are detached copies and reset zeroes everything."""
+    metrics = MetricGroup(counters=("hits",), histograms={"latency": (1, 2)})
+    metrics.counters["hits"].inc(2)
+    metrics.histograms["latency"].observe(1.5)
+
+    snapshot = metrics.snapshot()
+    metrics.reset()
+
+    assert snapshot["counters"] == {"hits": 2}
+    assert snapshot["histograms"]["latency"]["counts"] == [0, 1, 0]
+    assert metrics.snapshot()["counters"] == {"hits": 0}
+    assert metrics.snapshot()["histograms"]["latency"]["count"] == 0
+
+
+def test_merge_snapshots_sums_workers():
+    """Test that counters and matching histograms are summed across workers."""
+    first = MetricGroup(counters=("hits",), histograms={"latency": (1, 2)})
+    second = MetricGroup(counters=("hits", "errors"), histograms={"latency": (1, 2)})
+    first.counters["hits"].inc(3)
+    second.counters["hits"].inc(4)
+    second.counters["errors"].inc()
+    first.histograms["latency"].observe(0.5)
+    second.histograms["latency"].observe(5)
+
+    merged = merge_snapshots([first.snapshot(), second.snapshot()])
+
+    assert merged["counters"] == {"hits": 7, "errors": 1}
+    assert merged["histograms"]["latency"]["counts"] == [1, 0, 1]
+    assert merged["histograms"]["latency"]["count"] == 2
+
+
+def test_merge_snapshots_skips_mismatched_buckets():
+    """Test that histograms with a different layout are not mixed in."""
+    first = MetricGroup(counters=(), histograms={"latency": (1, 2)})
+    second = MetricGroup(counters=(), histograms={"latency": (1, 2, 4)})
+    first.histograms["latency"].observe(1)
+    second.histograms["latency"].observe(1)
+
+    merged = merge_snapshots([first.snapshot(), second.snapshot()])
+
+    assert merged["histograms"]["latency"]["count"] == 1
+
+
+def test_summarize_histogram_estimates_quantiles():
+    """Test that quantiles report the upper bound of their bucket."""
+    histogram = Histogram((1, 10, 100))
+    for _ in range(90):
+        histogram.observe(0.5)
+    for _ in range(9):
+        histogram.observe(5)
+    histogram.observe(1000)
+
+    summary = summarize_histogram(histogram.snapshot())
+
+    assert summary["p50"] == 1
+    assert summary["p95"] == 10
+    assert summary["p99"] == 10
+    assert summary["mean"] == pytest.approx((45 + 45 + 1000) / 100)
+
+
+def test_summarize_histogram_overflow_reports_largest_bound():
+    """Test that quantiles in the overflow bucket report the largest finite bound."""
+    histogram = Histogram((1, 10, 100))
+    histogram.observe(1000)
+
+    assert summarize_histogram(histogram.snapshot())["p50"] == 100
+
+
+def test_summarize_empty_histogram():
+    """Test that an empty histogram summarizes to zeros."""
+    summary = summarize_histogram(Histogram((1,)).snapshot())
+
+    assert summary["mean"] == 0.0
+    assert summary["p99"] == 0.0
@@ -0,0 +1,185 @@
+# ============================================
+# Ascend AI - Prometheus Metrics Tests
+# ============================================
+# Tests for the registry, exposition format and multi-worker collection
+# ============================================
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from app.core.prometheus import (
+    ARCHIVE_FILE,
+    FileCollector,
+    MetricsRegistry,
+    render_text,
+    series_key,
+)
+
+
+def _exited_pid() -> int:
+    """Pid of a process that has already exited."""
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def _worker_snapshot(pid: int, requests: int, in_flight: float) -> dict:
+    registry = MetricsRegistry()
+    registry.describe("http_requests_total", "counter", "Requests")
+    registry.describe("http_requests_in_flight", "gauge", "In flight")
+    registry.counter("http_requests_total", route="/users").inc(requests)
+    registry.gauge("http_requests_in_flight").set(in_flight)
+    registry.histogram("latency_seconds", (0.1, 1)).observe(0.5)
+    return {**registry.snapshot(), "pid": pid}
+
+
+def test_series_key_escapes_label_values():
+    """Test label rendering and escaping of quotes, backslashes and newlines."""
+    assert series_key("up") == "up"
+    assert series_key("x", {"route": "/a", "v": 'q"\\\n'}) == 'x{route="/a",v="q\\"\\\\\\n"}'
+
+
+def test_render_text_exposition_format():
+    """Test HELP/TYPE lines, label merging and cumulative histogram buckets."""
+    registry = MetricsRegistry()
+    registry.describe("requests_total", "counter", "Requests")
+    registry.describe("latency_seconds", "histogram", "Latency")
+    registry.counter("requests_total", status="2xx").inc(3)
+    latency = registry.histogram("latency_seconds", (0.1, 1), route="/a")
+    for value in (0.05, 0.5, 0.7, 5):
+        latency.observe(value)
+
+    text = render_text(registry.snapshot())
+
+    assert text.splitlines() == [
+        "# HELP latency_seconds Latency",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{route="/a",le="0.1"} 1',
+        'latency_seconds_bucket{route="/a",le="1.0"} 3',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 4',
+        'latency_seconds_sum{route="/a"} 6.25',
+        'latency_seconds_count{route="/a"} 4',
+        "# HELP requests_total Requests",
+        "# TYPE requests_total counter",
+        'requests_total{status="2xx"} 3',
+    ]
+
+
+def test_collectors_run_before_each_snapshot():
+    """Test that collectors copy in external values, and a failing one is skipped."""
+    registry = MetricsRegistry()
+    pool = {"in_use": 2}
+    registry.add_collector(lambda r: r.gauge("pool_in_use").set(pool["in_use"]))
+    registry.add_collector(lambda _r: 1 / 0)
+
+    assert registry.snapshot()["gauges"] == {"pool_in_use": 2}
+    pool["in_use"] = 4
+    assert registry.snapshot()["gauges"] == {"pool_in_use": 4}
+
+
+def test_file_collector_merges_workers_and_archives_exited_ones(tmp_path):
+    """Test multi-worker totals: counters survive a worker exiting, gauges don't."""
+    collector = FileCollector(str(tmp_path))
+    collector.write(_worker_snapshot(os.getpid(), requests=5, in_flight=2))
+    dead_pid = _exited_pid()
+    (tmp_path / f"{dead_pid}.json").write_text(
+        json.dumps(_worker_snapshot(dead_pid, requests=7, in_flight=3))
+    )
+
+    merged = collector.collect()
+    assert merged["counters"] == {'http_requests_total{route="/users"}': 12}
+    assert merged["gauges"] == {"http_requests_in_flight": 2}
+    assert merged["histograms"]["latency_seconds"]["count"] == 2
+    assert merged["families"]["http_requests_total"] == ["counter", "Requests"]
+
+    # The exited worker was folded into the archive exactly once
+    assert not (tmp_path / f"{dead_pid}.json").exists()
+    assert (tmp_path / ARCHIVE_FILE).exists()
+    assert collector.collect()["counters"] == {'http_requests_total{route="/users"}': 12}
+
+
+def test_file_collector_aggregates_state_gauges_without_summing(tmp_path):
+    """Test that per-worker state gauges are not multiplied by the worker count."""
+
+    def snapshot(pid: int, redis_up: int, in_flight: int) -> dict:
+        registry = MetricsRegistry()
+        registry.describe("http_requests_in_flight", "gauge", "In flight")
+        registry.describe("redis_up", "gauge", "Redis up", "min")
+        registry.describe("worker_rss_bytes", "gauge", "RSS", "liveall")
+        registry.gauge("http_requests_in_flight").set(in_flight)
+        registry.gauge("redis_up", role="cache").set(redis_up)
+        registry.gauge("worker_rss_bytes").set(pid)
+        return {**registry.snapshot(), "pid": pid}
+
+    # Two live workers: this process and its parent
+    collector = FileCollector(str(tmp_path))
+    other_pid = os.getppid()
+    collector.write(snapshot(os.getpid(), redis_up=1, in_flight=2))
+    (tmp_path / f"{other_pid}.json").write_text(json.dumps(snapshot(other_pid, 1, 3)))
+
+    gauges = collector.collect()["gauges"]
+    assert gauges["http_requests_in_flight"] == 5
+    assert gauges['redis_up{role="cache"}'] == 1
+    assert gauges[f'worker_rss_bytes{{pid="{os.getpid()}"}}'] == os.getpid()
+    assert gauges[f'worker_rss_bytes{{pid="{other_pid}"}}'] == other_pid
+
+    # One worker losing Redis shows up, however many others are fine
+    collector.write(snapshot(os.getpid(), redis_up=0, in_flight=2))
+    assert collector.collect()["gauges"]['redis_up{role="cache"}'] == 0
+
+
+def test_describe_rejects_unknown_aggregations():
+    """Test that only gauges take an aggregation, and only a known one."""
+    registry = MetricsRegistry()
+    with pytest.raises(ValueError):
+        registry.describe("up", "gauge", "Up", "avg")
+    with pytest.raises(ValueError):
+        registry.describe("requests_total", "counter", "Requests", "max")
+
+
+def test_file_collector_ignores_unreadable_files(tmp_path):
+    """Test that stray or corrupt files never break a scrape."""
+    collector = FileCollector(str(tmp_path))
+    collector.write(_worker_snapshot(os.getpid(), requests=1, in_flight=0))
+    (tmp_path / "notes.txt").write_text("hello")
+    (tmp_path / f"{os.getpid()}.json.tmp").write_text("{")
+
+    assert collector.collect()["counters"] == {'http_requests_total{route="/users"}': 1}
+
+
+@pytest.mark.asyncio
+async def test_registry_render_uses_shared_directory(tmp_path):
+    """Test start/render/stop against a metrics directory."""
+    registry = MetricsRegistry()
+    registry.describe("requests_total", "counter", "Requests")
+    registry.counter("requests_total").inc()
+    await registry.start(str(tmp_path), write_interval=60)
+
+    try:
+        other_pid = _exited_pid()
+        (tmp_path / f"{other_pid}.json").write_text(
+            json.dumps({**registry.snapshot(), "pid": other_pid})
+        )
+        assert "requests_total 2\n" in await registry.render()
+    finally:
+        await registry.stop()
+
+    assert (tmp_path / f"{os.getpid()}.json").exists()
+
+
+@pytest.mark.asyncio
+async def test_registry_without_directory_reports_this_worker(tmp_path):
+    """Test that an unusable directory degrades to single-worker metrics."""
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    registry = MetricsRegistry()
+    registry.counter("requests_total").inc()
+
+    await registry.start(str(blocker / "metrics"), write_interval=60)
+
+    assert "requests_total 1" in await registry.render()
+    await registry.stop()
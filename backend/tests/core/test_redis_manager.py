@@ -0,0 +1,212 @@
+# ============================================
+# Ascend AI - Redis Manager Tests
+# ============================================
+# Tests for shared Redis pools, health checks and reconnect backoff
+# ============================================
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import MaxConnectionsError
+
+from app.core.redis_manager import (
+    RedisConnection,
+    RedisManager,
+    _BoundedWaitPool,
+    is_connection_failure,
+)
+
+
+def _connection(**kwargs) -> RedisConnection:
+    defaults = {
+        "name": "test",
+        "url": "redis://localhost:6379/0",
+        "max_connections": 10,
+        "initial_backoff": 1.0,
+        "max_backoff": 8.0,
+    }
+    defaults.update(kwargs)
+    return RedisConnection(**defaults)
+
+
+def _mock_client(ping_side_effect=None) -> AsyncMock:
+    client = AsyncMock()
+    client.ping = AsyncMock(return_value=True, side_effect=ping_side_effect)
+    return client
+
+
+@pytest.mark.asyncio
+async def test_get_connects_lazily():
+    """Test that the first get() builds the pool and pings it."""
+    connection = _connection()
+    client = _mock_client()
+
+    with patch("app.core.redis_manager.aioredis.Redis.from_pool", return_value=client):
+        assert await connection.get() is client
+        assert await connection.get() is client
+
+    client.ping.assert_awaited_once()
+    assert connection.is_healthy
+
+
+@pytest.mark.asyncio
+async def test_failed_connect_backs_off_instead_of_giving_up():
+    """Test that a failed connect is retried after the backoff, not abandoned."""
+    connection = _connection()
+    down = _mock_client(ping_side_effect=ConnectionError("refused"))
+    up = _mock_client()
+
+    with (
+        patch("app.core.redis_manager.aioredis.Redis.from_pool", side_effect=[down, up]),
+        patch("app.core.redis_manager.random.uniform", return_value=1.0),
+        patch("app.core.redis_manager.time.monotonic", return_value=100.0),
+    ):
+        assert await connection.get() is None
+        # Within the backoff window: no new connection attempt
+        assert await connection.get() is None
+
+    with (
+        patch("app.core.redis_manager.aioredis.Redis.from_pool", side_effect=[up]),
+        patch("app.core.redis_manager.time.monotonic", return_value=101.5),
+    ):
+        assert await connection.get() is up
+
+
+@pytest.mark.asyncio
+async def test_backoff_doubles_up_to_maximum():
+    """Test exponential backoff growth and its cap."""
+    connection = _connection(initial_backoff=1.0, max_backoff=4.0)
+
+    with patch("app.core.redis_manager.random.uniform", return_value=1.0):
+        delays = []
+        for _ in range(5):
+            before = connection._backoff
+            connection._schedule_retry()
+            delays.append(before)
+
+    assert delays == [1.0, 2.0, 4.0, 4.0, 4.0]
+
+
+@pytest.mark.asyncio
+async def test_mark_failed_drops_client_and_health_check_recovers():
+    """Test that a lost connection is dropped and re-established by check()."""
+    connection = _connection()
+    first = _mock_client()
+    second = _mock_client()
+
+    with patch("app.core.redis_manager.aioredis.Redis.from_pool", side_effect=[first, second]):
+        await connection.get()
+        connection.mark_failed(ConnectionError("reset"))
+        assert not connection.is_healthy
+
+        connection._next_attempt = 0.0
+        await connection.check()
+
+    assert connection.client is second
+
+
+@pytest.mark.asyncio
+async def test_check_marks_failed_when_ping_fails():
+    """Test that the health check detects a dead server."""
+    connection = _connection()
+    client = _mock_client()
+
+    with patch("app.core.redis_manager.aioredis.Redis.from_pool", return_value=client):
+        await connection.get()
+
+    client.ping = AsyncMock(side_effect=ConnectionError("gone"))
+    await connection.check()
+
+    assert not connection.is_healthy
+
+
+def test_roles_share_one_pool_by_default():
+    """Test that cache and rate limiting share a pool on the same server."""
+    manager = RedisManager()
+
+    with (
+        patch("app.core.redis_manager.settings.redis_separate_pools", False),
+        patch("app.core.redis_manager.settings.redis_cache_url", None),
+        patch("app.core.redis_manager.settings.redis_rate_limit_url", None),
+    ):
+        assert manager.connection("cache") is manager.connection("rate_limit")
+
+
+def test_roles_get_separate_pools_when_configured():
+    """Test REDIS_SEPARATE_POOLS and per-role URLs."""
+    manager = RedisManager()
+
+    with (
+        patch("app.core.redis_manager.settings.redis_separate_pools", False),
+        patch("app.core.redis_manager.settings.redis_cache_url", "redis://cache:6379/0"),
+        patch("app.core.redis_manager.settings.redis_rate_limit_url", None),
+    ):
+        cache = manager.connection("cache")
+        rate_limit = manager.connection("rate_limit")
+
+    assert cache is not rate_limit
+    assert cache.url == "redis://cache:6379/0"
+
+    manager = RedisManager()
+    with (
+        patch("app.core.redis_manager.settings.redis_separate_pools", True),
+        patch("app.core.redis_manager.settings.redis_cache_url", None),
+        patch("app.core.redis_manager.settings.redis_rate_limit_url", None),
+    ):
+        assert manager.connection("cache") is not manager.connection("rate_limit")
+
+
+@pytest.mark.asyncio
+async def test_stop_closes_pools():
+    """Test that stop() closes every connected pool once."""
+    manager = RedisManager()
+    client = _mock_client()
+
+    with (
+        patch("app.core.redis_manager.settings.redis_separate_pools", False),
+        patch("app.core.redis_manager.settings.redis_cache_url", None),
+        patch("app.core.redis_manager.settings.redis_rate_limit_url", None),
+        patch("app.core.redis_manager.aioredis.Redis.from_pool", return_value=client),
+    ):
+        await manager.start()
+        await manager.stop()
+
+    client.aclose.assert_awaited_once()
+    assert not manager.connection("cache").is_healthy
+
+
+@pytest.mark.asyncio
+async def test_sharded_topology_builds_one_client_per_shard():
+    """Test REDIS_TOPOLOGY=sharded: one pool per shard behind one client."""
+    from app.core.redis_sharding import ShardedRedis
+
+    shards = [_mock_client(), _mock_client()]
+    with (
+        patch("app.core.redis_manager.settings.redis_topology", "sharded"),
+        patch(
+            "app.core.redis_manager.settings.redis_shard_urls",
+            "redis://shard-1:6379/0, redis://shard-2:6379/0",
+        ),
+        patch("app.core.redis_manager.aioredis.Redis.from_pool", side_effect=shards),
+    ):
+        client = await _connection().get()
+
+    assert isinstance(client, ShardedRedis)
+    assert client.clients == shards
+    for shard in shards:
+        shard.ping.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_exhausted_pool_waits_then_raises_max_connections():
+    """Test that a full pool is reported as exhaustion, not as an outage."""
+    pool = _BoundedWaitPool(max_connections=1, timeout=0.01)
+    pool._in_use_connections.add(object())
+
+    with pytest.raises(MaxConnectionsError) as raised:
+        await pool.get_connection()
+
+    assert not is_connection_failure(raised.value)
+    assert is_connection_failure(RedisConnectionError("refused"))
+    assert is_connection_failure(OSError("unreachable"))
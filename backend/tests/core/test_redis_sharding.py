@@ -0,0 +1,143 @@
+# ============================================
+# Ascend AI - Redis Sharding Tests
+# ============================================
+# Tests for hash tags, the consistent-hash ring and the sharded client
+# ============================================
+
+import pytest
+from redis.crc import key_slot
+
+from app.core.cache import TokenCache
+from app.core.redis_sharding import ConsistentHashRing, ShardedRedis, hash_tag
+
+
+class FakeShard:
+    """Just enough of a Redis client to see which shard got which command."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.data: dict = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, **_):
+        self.data[key] = value
+        return True
+
+    async def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    def pipeline(self, transaction: bool = True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, shard: FakeShard):
+        self.shard = shard
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def set(self, key, value, **_):
+        self.commands.append((key, value))
+
+    def get(self, key):
+        self.commands.append((key, None))
+
+    async def execute(self):
+        results = []
+        for key, value in self.commands:
+            if value is not None:
+                self.shard.data[key] = value
+            results.append(f"{self.shard.name}:{key}")
+        return results
+
+
+@pytest.mark.parametrize(
+    "key",
+    [
+        "user:{42}",
+        "token_cache:user:{42}",
+        "rate_limit:gcra:{10.0.0.1}:GET:/api/v1/sessions/{session_id}",
+        "token_cache:3f2a",
+        "foo{}{bar}",
+        "foo{bar",
+    ],
+)
+def test_hash_tag_matches_redis_cluster(key: str):
+    """Test that placement uses exactly the part Redis Cluster hashes."""
+    assert key_slot(key.encode()) == key_slot(hash_tag(key))
+
+
+def test_key_layout_is_cluster_safe():
+    """Test that keys used together share a slot and route braces are never the tag."""
+    assert key_slot(TokenCache._get_profile_key("42").encode()) == key_slot(
+        TokenCache._get_user_index_key("42").encode()
+    )
+    assert hash_tag("rate_limit:gcra:{10.0.0.1}:GET:/api/v1/sessions/{session_id}") == (b"10.0.0.1")
+
+
+def test_ring_spreads_keys_and_moves_few_on_resize():
+    """Test balance across shards and minimal movement when a shard is added."""
+    keys = [f"token_cache:{i}" for i in range(30000)]
+    three = ConsistentHashRing(["redis://a", "redis://b", "redis://c"])
+    four = ConsistentHashRing(["redis://a", "redis://b", "redis://c", "redis://d"])
+
+    placement = [three.shard_for(key) for key in keys]
+    for shard in range(3):
+        assert abs(placement.count(shard) / len(keys) - 1 / 3) < 0.03
+
+    moved = sum(three.shard_for(key) != four.shard_for(key) for key in keys)
+    assert 0.2 < moved / len(keys) < 0.3
+
+
+@pytest.mark.asyncio
+async def test_sharded_client_routes_by_hash_tag():
+    """Test commands, DEL and pipelines across shards."""
+    shards = [FakeShard("a"), FakeShard("b"), FakeShard("c")]
+    client = ShardedRedis(shards, names=["redis://a", "redis://b", "redis://c"])
+
+    await client.set("user:{42}", b"profile")
+    owner = client.node_for("token_cache:user:{42}")
+    assert owner.data == {"user:{42}": b"profile"}
+    assert await client.get("user:{42}") == b"profile"
+
+    keys = [f"token_cache:{i}" for i in range(20)]
+    for key in keys:
+        await client.set(key, b"x")
+    assert len({client.ring.shard_for(key) for key in keys}) > 1
+    assert await client.delete(*keys) == 20
+
+    pipe = client.pipeline(transaction=False)
+    for key in keys:
+        pipe.set(key, b"y")
+    results = await pipe.execute()
+    assert [result.split(":", 1)[1] for result in results] == keys
+    assert all(
+        result.startswith(client.node_for(key).name)
+        for key, result in zip(keys, results, strict=True)
+    )
+
+
+@pytest.mark.asyncio
+async def test_sharded_transactions_must_stay_on_one_shard():
+    """Test that a multi-shard transaction is refused rather than half-applied."""
+    shards = [FakeShard("a"), FakeShard("b")]
+    client = ShardedRedis(shards, names=["redis://a", "redis://b"])
+
+    pipe = client.pipeline(transaction=True)
+    pipe.set("user:{42}", b"1")
+    pipe.set("token_cache:user:{42}", b"2")
+    assert len(await pipe.execute()) == 2
+
+    keys = [f"token_cache:{i}" for i in range(20)]
+    pipe = client.pipeline(transaction=True)
+    for key in keys:
+        pipe.set(key, b"x")
+    with pytest.raises(ValueError, match="several shards"):
+        await pipe.execute()
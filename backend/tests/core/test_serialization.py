@@ -0,0 +1,149 @@
+# ============================================
+# Ascend AI - Cache Serialization Tests
+# ============================================
+# Tests for the binary and JSON token cache encoders
+# ============================================
+
+import json
+import uuid
+from datetime import UTC, datetime
+
+import pytest
+
+from app.core.serialization import (
+    BINARY_FORMAT_VERSION,
+    USER_REFERENCE_PREFIX,
+    BinaryUserSerializer,
+    JSONCacheSerializer,
+    decode_user_reference,
+    encode_user_reference,
+    get_cache_serializer,
+)
+
+
+@pytest.fixture
+def user_record() -> dict:
+    return {
+        "id": uuid.uuid4(),
+        "email": "test@example.com",
+        "name": "Tëst Üser",
+        "avatar_url": None,
+        "oauth_provider": "google",
+        "oauth_id": "oauth_123",
+        "created_at": datetime(2025, 11, 20, 15, 30, 0, 123456, tzinfo=UTC),
+        "updated_at": datetime(2025, 11, 21, 8, 0, 0, tzinfo=UTC),
+    }
+
+
+def test_binary_round_trip(user_record: dict):
+    """Test that a user record survives encode/decode with native types."""
+    serializer = BinaryUserSerializer()
+
+    raw = serializer.dumps(user_record)
+    decoded = serializer.loads(raw)
+
+    assert raw[0] == BINARY_FORMAT_VERSION
+    assert decoded == {**user_record, "id": str(user_record["id"])}
+    assert isinstance(decoded["created_at"], datetime)
+
+
+def test_binary_preserves_naive_timestamps(user_record: dict):
+    """Test that naive timestamps decode as naive, not shifted to UTC."""
+    user_record["created_at"] = datetime(2025, 1, 1, 12, 0)
+    user_record["updated_at"] = datetime(2025, 1, 2, 12, 0)
+
+    decoded = BinaryUserSerializer().loads(BinaryUserSerializer().dumps(user_record))
+
+    assert decoded["created_at"] == datetime(2025, 1, 1, 12, 0)
+    assert decoded["created_at"].tzinfo is None
+
+
+def test_binary_accepts_iso_strings(user_record: dict):
+    """Test that ISO-8601 timestamps are accepted on encode."""
+    expected = user_record["created_at"]
+    user_record["created_at"] = expected.isoformat()
+    user_record["updated_at"] = user_record["updated_at"].isoformat()
+
+    decoded = BinaryUserSerializer().loads(BinaryUserSerializer().dumps(user_record))
+
+    assert decoded["created_at"] == expected
+
+
+def test_binary_is_smaller_than_json(user_record: dict):
+    """Test that the binary format is more compact than JSON."""
+    binary = BinaryUserSerializer().dumps(user_record)
+    legacy = JSONCacheSerializer().dumps(user_record)
+
+    assert len(binary) < len(legacy)
+
+
+def test_binary_falls_back_to_json_for_other_shapes():
+    """Test that non-user values (or non-UUID ids) are stored as JSON."""
+    serializer = BinaryUserSerializer()
+    data = {"id": "123", "email": "test@example.com"}
+
+    raw = serializer.dumps(data)
+
+    assert raw.startswith(b"{")
+    assert serializer.loads(raw) == data
+
+
+def test_every_serializer_reads_every_format(user_record: dict):
+    """Test that switching serializers keeps existing entries readable."""
+    binary_raw = BinaryUserSerializer().dumps(user_record)
+    json_raw = JSONCacheSerializer().dumps(user_record)
+
+    assert JSONCacheSerializer().loads(binary_raw)["email"] == user_record["email"]
+    assert BinaryUserSerializer().loads(json_raw)["email"] == user_record["email"]
+    assert BinaryUserSerializer().loads(json_raw.decode())["email"] == user_record["email"]
+
+
+def test_unknown_version_is_rejected(user_record: dict):
+    """Test that a payload with an unknown version byte is not misread."""
+    raw = bytearray(BinaryUserSerializer().dumps(user_record))
+    raw[0] = 0x7F
+
+    with pytest.raises(ValueError, match="version"):
+        BinaryUserSerializer().loads(bytes(raw))
+
+
+def test_truncated_payload_is_rejected(user_record: dict):
+    """Test that corrupt binary payloads raise ValueError."""
+    raw = BinaryUserSerializer().dumps(user_record)
+
+    with pytest.raises(ValueError):
+        BinaryUserSerializer().loads(raw[:-3])
+    with pytest.raises(ValueError):
+        BinaryUserSerializer().loads(raw + b"x")
+
+
+def test_get_cache_serializer():
+    """Test serializer lookup by name."""
+    assert isinstance(get_cache_serializer("binary"), BinaryUserSerializer)
+    assert isinstance(get_cache_serializer("json"), JSONCacheSerializer)
+    with pytest.raises(ValueError, match="Unknown cache serializer"):
+        get_cache_serializer("pickle")
+
+
+def test_json_serializer_matches_legacy_format(user_record: dict):
+    """Test that the JSON serializer writes what the cache always wrote."""
+    raw = JSONCacheSerializer().dumps(user_record)
+
+    assert json.loads(raw) == json.loads(json.dumps(user_record, default=str))
+
+
+def test_user_reference_round_trip():
+    """Test that token -> user references keep the id and expiry."""
+    raw = encode_user_reference("user-1", 1_700_000_000)
+
+    assert raw[:1] == USER_REFERENCE_PREFIX
+    assert decode_user_reference(raw) == ("user-1", 1_700_000_000)
+    assert decode_user_reference(encode_user_reference("user-1", None)) == ("user-1", None)
+
+
+def test_user_reference_rejects_garbage():
+    """Test that corrupt references raise ValueError."""
+    with pytest.raises(ValueError):
+        decode_user_reference(b"\xfe")
+    with pytest.raises(ValueError):
+        decode_user_reference(encode_user_reference("", None))
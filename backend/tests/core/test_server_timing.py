@@ -0,0 +1,112 @@
+# ============================================
+# Ascend AI - Server-Timing Tests
+# ============================================
+# Tests for phase accounting, debug tokens, SQL timing and TimedAPIRoute
+# ============================================
+
+import time
+
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+from sqlalchemy import create_engine, text
+
+from app.core.server_timing import (
+    TimedAPIRoute,
+    current_timing,
+    measure_request,
+    sign_debug_token,
+    time_sqlalchemy,
+    timed,
+    verify_debug_token,
+)
+
+SECRET = "server-timing-test-secret"
+
+
+def test_timed_accumulates_phases_in_header_order():
+    """Test that repeated phases add up and the header lists known phases in order."""
+    with measure_request() as timing:
+        with timed("db"):
+            time.sleep(0.002)
+        with timed("ratelimit"):
+            pass
+        with timed("db"):
+            time.sleep(0.002)
+
+    assert timing.durations["db"] >= 0.004
+    header = timing.header_value()
+    assert [entry.split(";")[0] for entry in header.split(", ")] == ["ratelimit", "db", "total"]
+    assert current_timing() is None
+
+
+def test_timed_is_a_no_op_outside_timed_requests():
+    """Test that marks outside measure_request record nothing."""
+    with timed("jwt"):
+        pass
+    assert current_timing() is None
+
+
+def test_debug_tokens():
+    """Test signature, tampering, wrong secret and expiry."""
+    token = sign_debug_token(SECRET)
+    assert verify_debug_token(SECRET, token)
+
+    expires_at, signature = token.split(".")
+    assert not verify_debug_token("another-secret", token)
+    assert not verify_debug_token(SECRET, f"{int(expires_at) + 60}.{signature}")
+    assert not verify_debug_token(SECRET, sign_debug_token(SECRET, ttl_seconds=-1))
+    assert not verify_debug_token(SECRET, "garbage")
+    # Digits int() can't parse must be refused, not raise
+    assert not verify_debug_token(SECRET, f"\u00b2.{signature}")
+    assert not verify_debug_token(SECRET, f"{'9' * 5000}.{signature}")
+
+
+def test_time_sqlalchemy_adds_statement_time_to_db():
+    """Test that only statements run inside a timed request are counted."""
+    engine = create_engine("sqlite://")
+    time_sqlalchemy(engine)
+
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        with measure_request() as timing:
+            connection.execute(text("SELECT 2"))
+
+    assert timing.durations["db"] > 0
+
+
+class Item(BaseModel):
+    id: str
+
+
+def test_timed_api_route_reports_handler_and_serialize():
+    """Test handler and serialize phases for async and sync endpoints."""
+    router = APIRouter(route_class=TimedAPIRoute)
+    recorded = []
+
+    @router.get("/items/{item_id}", response_model=Item)
+    async def get_item(item_id: str):
+        return {"id": item_id}
+
+    @router.get("/sync")
+    def get_sync():
+        return {"id": "sync"}
+
+    app = FastAPI()
+    app.include_router(router)
+
+    @app.middleware("http")
+    async def capture(request, call_next):
+        with measure_request() as timing:
+            response = await call_next(request)
+        recorded.append(timing)
+        return response
+
+    client = TestClient(app)
+    assert client.get("/items/42").json() == {"id": "42"}
+    assert client.get("/sync").json() == {"id": "sync"}
+
+    for timing in recorded:
+        assert set(timing.durations) == {"handler", "serialize"}
+    # Path parameters and the route name still come from the endpoint itself
+    assert app.url_path_for("get_item", item_id="7") == "/items/7"
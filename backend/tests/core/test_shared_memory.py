@@ -0,0 +1,158 @@
+# ============================================
+# Ascend AI - Shared Memory Table Tests
+# ============================================
+# Tests for the host-level table shared between worker processes
+# ============================================
+
+import multiprocessing
+import struct
+from unittest.mock import patch
+
+import pytest
+
+from app.core.shared_memory import SharedMemoryTable, open_shared_table, tag_for
+
+CLOCK = "app.core.shared_memory.time.time"
+
+
+@pytest.fixture
+def table(tmp_path):
+    table = SharedMemoryTable("test", slots=64, value_size=32, directory=str(tmp_path), stripes=4)
+    yield table
+    table.close()
+
+
+def test_set_get_delete(table: SharedMemoryTable):
+    """Test the basic round trip and TTL reporting."""
+    with patch(CLOCK, return_value=1000.0):
+        assert table.set("a", b"hello", ttl_seconds=10)
+        assert table.get("a") == (b"hello", 10.0)
+        assert table.set("a", b"bye", ttl_seconds=10)
+        assert table.get("a") == (b"bye", 10.0)
+        assert len(table) == 1
+
+        assert table.delete("a") is True
+        assert table.delete("a") is False
+        assert table.get("a") is None
+
+
+def test_entries_expire(table: SharedMemoryTable):
+    """Test that expired entries read as missing."""
+    with patch(CLOCK, return_value=1000.0):
+        table.set("a", b"x", ttl_seconds=5)
+    with patch(CLOCK, return_value=1005.0):
+        assert table.get("a") is None
+
+
+def test_oversized_values_are_refused(table: SharedMemoryTable):
+    """Test that values larger than a slot are not stored."""
+    assert table.set("a", b"x" * 33, ttl_seconds=5) is False
+    assert table.get("a") is None
+
+
+def test_full_set_evicts_the_entry_closest_to_expiry(tmp_path):
+    """Test eviction within one set (a single set of 8 ways)."""
+    table = SharedMemoryTable("one-set", slots=8, value_size=8, directory=str(tmp_path))
+    with patch(CLOCK, return_value=1000.0):
+        for i in range(8):
+            table.set(f"k{i}", b"v", ttl_seconds=100 + i)
+        table.set("new", b"v", ttl_seconds=50)
+
+        assert table.get("k0") is None
+        assert table.get("new") is not None
+        assert all(table.get(f"k{i}") is not None for i in range(1, 8))
+    table.close()
+
+
+def test_torn_slot_reads_as_empty(table: SharedMemoryTable):
+    """Test that a slot whose checksum doesn't match is ignored and reused."""
+    table.set("a", b"hello", ttl_seconds=10)
+    offset = next(o for o in table._slot_offsets() if table._read_slot(o) is not None)
+    # Simulate a writer killed halfway through the value
+    table._mm[offset + 40] ^= 0xFF
+
+    assert table.get("a") is None
+    assert table.set("a", b"again", ttl_seconds=10)
+    assert table.get("a")[0] == b"again"
+
+
+def test_update_is_a_read_modify_write(table: SharedMemoryTable):
+    """Test update() sees the current value and can leave it unchanged."""
+    counter = struct.Struct("<q")
+
+    def increment(current):
+        value = counter.unpack(current)[0] + 1 if current else 1
+        return counter.pack(value), 10, value
+
+    assert [table.update("n", increment) for _ in range(3)] == [1, 2, 3]
+    assert table.update("n", lambda current: (None, 0, current)) == counter.pack(3)
+
+
+def test_delete_tagged_and_clear(table: SharedMemoryTable):
+    """Test removing a group of entries and the whole table."""
+    table.set("a", b"1", ttl_seconds=10, tag=tag_for("user-1"))
+    table.set("b", b"2", ttl_seconds=10, tag=tag_for("user-1"))
+    table.set("c", b"3", ttl_seconds=10, tag=tag_for("user-2"))
+
+    assert table.delete_tagged(tag_for("user-1")) == 2
+    assert table.get("a") is None
+    assert table.get("c") is not None
+
+    table.clear()
+    assert len(table) == 0
+
+
+def test_delete_tagged_visits_only_indexed_slots(tmp_path):
+    """Test that tagged deletes use the tag index, and scan only after it overflows."""
+    table = SharedMemoryTable("tags", slots=256, value_size=64, directory=str(tmp_path))
+    try:
+        # 64-byte values leave room for three digests per index entry
+        for key in ("a", "b", "a"):
+            table.set(key, b"1", ttl_seconds=10, tag=tag_for("user-1"))
+        table.set("c", b"3", ttl_seconds=10, tag=tag_for("user-2"))
+
+        with patch.object(table, "_scan_delete_tagged") as scan:
+            assert table.delete_tagged(tag_for("user-1")) == 2
+            # The index went with them: repeating the delete is free
+            assert table.delete_tagged(tag_for("user-1")) == 0
+        scan.assert_not_called()
+        assert table.get("a") is None
+        assert table.get("c") is not None
+
+        for index in range(5):
+            table.set(f"t{index}", b"1", ttl_seconds=10, tag=tag_for("user-3"))
+        assert table.delete_tagged(tag_for("user-3")) == 5
+        assert all(table.get(f"t{index}") is None for index in range(5))
+    finally:
+        table.close()
+
+
+def _increment_in_child(directory: str, times: int) -> None:
+    table = SharedMemoryTable("test", slots=64, value_size=32, directory=directory, stripes=4)
+    counter = struct.Struct("<q")
+    for _ in range(times):
+        table.update("n", lambda current: (counter.pack(counter.unpack(current)[0] + 1), 60, None))
+    table.close()
+
+
+def test_processes_share_entries_and_updates(table: SharedMemoryTable, tmp_path):
+    """Test that separate processes see one table and never lose an update."""
+    table.set("n", struct.pack("<q", 0), ttl_seconds=60)
+
+    context = multiprocessing.get_context("fork")
+    workers = [
+        context.Process(target=_increment_in_child, args=(str(tmp_path), 200)) for _ in range(4)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=30)
+        assert worker.exitcode == 0
+
+    assert struct.unpack("<q", table.get("n")[0])[0] == 800
+
+
+def test_open_shared_table_returns_none_on_error(tmp_path):
+    """Test that an unusable directory means no shared tier rather than a crash."""
+    missing = str(tmp_path / "missing")
+    assert open_shared_table("test", slots=8, value_size=8, directory=missing, stripes=1) is None
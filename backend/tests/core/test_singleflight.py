@@ -0,0 +1,114 @@
+# ============================================
+# Ascend AI - Single-Flight Tests
+# ============================================
+# Tests for concurrent call coalescing
+# ============================================
+
+import asyncio
+
+import pytest
+
+from app.core.singleflight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_execution():
+    """Test that concurrent callers for one key run the function once."""
+    flight = SingleFlight()
+    calls = 0
+    release = asyncio.Event()
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return "value"
+
+    tasks = [asyncio.create_task(flight.do("key", load)) for _ in range(10)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*tasks)
+
+    assert calls == 1
+    assert [value for value, _ in results] == ["value"] * 10
+    assert sum(1 for _, shared in results if not shared) == 1
+    assert len(flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_different_keys_run_independently():
+    """Test that calls for different keys are not coalesced."""
+    flight = SingleFlight()
+    calls = []
+
+    async def load(key):
+        calls.append(key)
+        await asyncio.sleep(0)
+        return key
+
+    results = await asyncio.gather(
+        flight.do("a", lambda: load("a")), flight.do("b", lambda: load("b"))
+    )
+
+    assert sorted(calls) == ["a", "b"]
+    assert results == [("a", False), ("b", False)]
+
+
+@pytest.mark.asyncio
+async def test_leader_exception_propagates_to_waiters():
+    """Test that every waiter sees the leader's exception."""
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def load():
+        await release.wait()
+        raise ValueError("boom")
+
+    tasks = [asyncio.create_task(flight.do("key", load)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert len(flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_results_are_not_cached_after_completion():
+    """Test that a finished call does not serve later callers."""
+    flight = SingleFlight()
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        return calls
+
+    assert await flight.do("key", load) == (1, False)
+    assert await flight.do("key", load) == (2, False)
+
+
+@pytest.mark.asyncio
+async def test_waiter_takes_over_when_leader_is_cancelled():
+    """Test that cancelling the leader does not cancel its waiters."""
+    flight = SingleFlight()
+    calls = 0
+    release = asyncio.Event()
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return calls
+
+    leader = asyncio.create_task(flight.do("key", load))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(flight.do("key", load))
+    await asyncio.sleep(0)
+
+    leader.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await waiter == (2, False)
+    assert leader.cancelled()
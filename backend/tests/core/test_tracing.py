@@ -0,0 +1,218 @@
+# ============================================
+# Ascend AI - Request Tracing Tests
+# ============================================
+# Tests for span nesting, sampling, propagation, export and the DB, Redis
+# and HTTP instrumentation
+# ============================================
+
+import json
+
+import httpx
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.core.tracing import (
+    MAX_SPANS_PER_TRACE,
+    TracingTransport,
+    _TraceRecord,
+    current_trace_id,
+    extract,
+    inject,
+    instrument_redis,
+    instrument_sqlalchemy,
+    parse_traceparent,
+    span,
+    start_trace,
+    tracer,
+)
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+
+@pytest.fixture
+def exported(monkeypatch):
+    """Enable tracing and capture exported root spans instead of writing them."""
+    roots = []
+    monkeypatch.setattr(tracer, "enabled", True)
+    monkeypatch.setattr(tracer, "sample_rate", 1.0)
+    monkeypatch.setattr(tracer, "export", roots.append)
+    return roots
+
+
+def span_names(root):
+    return [child.name for child in root.trace.spans if child is not root]
+
+
+# ============================================
+# Propagation
+# ============================================
+def test_parse_traceparent():
+    """Test that valid headers are read and malformed ones ignored."""
+    assert parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-01") == (TRACE_ID, PARENT_ID)
+    assert parse_traceparent(None) is None
+    assert parse_traceparent("garbage") is None
+    assert parse_traceparent(f"00-{'0' * 32}-{PARENT_ID}-01") is None
+    assert parse_traceparent(f"00-{TRACE_ID.upper()}-{PARENT_ID}-01") is None
+
+
+def test_inject_continues_the_current_trace(exported):
+    """Test that injected headers carry the trace id and current span id."""
+    assert inject({}) == {}
+
+    with start_trace("root", f"00-{TRACE_ID}-{PARENT_ID}-01") as root:
+        assert current_trace_id() == TRACE_ID
+        assert root.parent_id == PARENT_ID
+        with span("child") as child:
+            headers = inject({})
+
+    assert headers == {"traceparent": f"00-{TRACE_ID}-{child.span_id}-01"}
+    assert extract(headers) == headers["traceparent"]
+    assert current_trace_id() is None
+
+
+# ============================================
+# Spans and Sampling
+# ============================================
+def test_spans_nest_under_their_parent(exported):
+    """Test parent ids, attributes and error recording."""
+    with start_trace("root") as root:
+        with span("outer", key="value") as outer:
+            with span("inner"):
+                pass
+        with pytest.raises(ValueError), span("failing"):
+            raise ValueError("boom")
+
+    assert exported == [root]
+    spans = {child.name: child for child in root.trace.spans}
+    assert spans["outer"].parent_id == root.span_id
+    assert spans["outer"].attributes == {"key": "value"}
+    assert spans["inner"].parent_id == outer.span_id
+    assert spans["failing"].error == "ValueError: boom"
+
+    record = json.loads(str(_TraceRecord(root)))
+    assert record["trace_id"] == root.trace_id
+    assert [child["name"] for child in record["spans"]] == ["inner", "outer", "failing"]
+
+
+def test_unsampled_traces_record_nothing(exported, monkeypatch):
+    """Test that requests outside the sample still get a trace id but no spans."""
+    monkeypatch.setattr(tracer, "sample_rate", 0.0)
+
+    with start_trace("root") as root:
+        with span("child") as child:
+            assert child is None
+        assert current_trace_id() == root.trace_id
+
+    assert root.trace.spans == []
+    assert exported == []
+
+
+def test_spans_per_trace_are_capped(exported):
+    """Test that a query loop cannot grow a trace without bound."""
+    with start_trace("root") as root:
+        for _ in range(MAX_SPANS_PER_TRACE + 10):
+            with span("db.query"):
+                pass
+
+    assert len(root.trace.spans) == MAX_SPANS_PER_TRACE
+
+
+def test_file_exporter_writes_one_line_per_trace(tmp_path):
+    """Test that the file exporter writes each trace as one JSON line."""
+    path = tmp_path / "traces.jsonl"
+    tracer.configure(True, exporter="file", path=str(path))
+    try:
+        with start_trace("GET /items", user="anonymous"), span("auth.jwt_decode"):
+            pass
+    finally:
+        tracer.shutdown()
+        tracer.configure(False)
+
+    (line,) = path.read_text().splitlines()
+    record = json.loads(line)
+    assert record["name"] == "GET /items"
+    assert record["attributes"] == {"user": "anonymous"}
+    assert [child["name"] for child in record["spans"]] == ["auth.jwt_decode"]
+
+
+# ============================================
+# Instrumentation
+# ============================================
+def test_instrument_sqlalchemy_records_statements(exported):
+    """Test one span per SQL statement, with the statement text."""
+    engine = create_engine("sqlite://")
+    instrument_sqlalchemy(engine)
+
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        with start_trace("root") as root:
+            connection.execute(text("SELECT 2"))
+            with pytest.raises(OperationalError):
+                connection.execute(text("SELECT * FROM missing"))
+
+    queries = [child for child in root.trace.spans if child.name == "db.query"]
+    assert [query.attributes["statement"] for query in queries] == [
+        "SELECT 2",
+        "SELECT * FROM missing",
+    ]
+    assert queries[0].error is None
+    assert "no such table" in queries[1].error
+
+
+class FakePipeline:
+    def __init__(self):
+        self.commands = []
+
+    def __len__(self):
+        return len(self.commands)
+
+    def incr(self, key):
+        self.commands.append(("INCR", key))
+        return self
+
+    async def execute(self):
+        return [1] * len(self.commands)
+
+
+class FakeRedis:
+    async def execute_command(self, *args, **options):
+        return "OK"
+
+    def pipeline(self, transaction=True):
+        return FakePipeline()
+
+
+async def test_instrument_redis_records_commands_and_pipelines(exported):
+    """Test spans named after the command, and pipeline sizes."""
+    client = instrument_redis(FakeRedis())
+
+    assert await client.execute_command("GET", "outside") == "OK"
+    with start_trace("root") as root:
+        assert await client.execute_command("GET", "key") == "OK"
+        pipe = client.pipeline()
+        pipe.incr("a").incr("b")
+        assert await pipe.execute() == [1, 1]
+
+    assert span_names(root) == ["redis.get", "redis.pipeline"]
+    assert root.trace.spans[1].attributes == {"commands": 2}
+
+
+async def test_tracing_transport_propagates_and_records(exported):
+    """Test outbound requests carry traceparent and get an http.client span."""
+    received = []
+
+    def handler(request):
+        received.append(request.headers.get("traceparent"))
+        return httpx.Response(204)
+
+    transport = TracingTransport(httpx.MockTransport(handler))
+    async with httpx.AsyncClient(transport=transport) as client:
+        with start_trace("root") as root:
+            await client.get("https://api.example.com/v1/models")
+
+    (client_span,) = root.trace.spans[:-1]
+    assert client_span.name == "http.client"
+    assert client_span.attributes == {"method": "GET", "host": "api.example.com", "status": 204}
+    assert received == [f"00-{root.trace_id}-{client_span.span_id}-01"]
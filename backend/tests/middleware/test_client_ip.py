@@ -0,0 +1,82 @@
+# ============================================
+# Ascend AI - Client IP Resolution Tests
+# ============================================
+# Tests for trusted-proxy parsing and CIDR allow/deny/exempt rules
+# ============================================
+
+import ipaddress
+
+import pytest
+
+from app.middleware.client_ip import CIDRTree, ClientIPResolver, parse_cidrs
+
+
+def test_cidr_tree_longest_prefix_wins():
+    """Test that the most specific network decides, per address family."""
+    tree: CIDRTree[str] = CIDRTree()
+    for network, value in [
+        ("0.0.0.0/0", "any"),
+        ("10.0.0.0/8", "ten"),
+        ("10.1.0.0/16", "ten-one"),
+        ("10.1.2.3/32", "host"),
+        ("2001:db8::/32", "doc6"),
+    ]:
+        tree.insert(ipaddress.ip_network(network), value)
+
+    def lookup(address: str) -> str | None:
+        return tree.lookup(ipaddress.ip_address(address))
+
+    assert lookup("10.1.2.3") == "host"
+    assert lookup("10.1.9.9") == "ten-one"
+    assert lookup("10.200.0.1") == "ten"
+    assert lookup("8.8.8.8") == "any"
+    assert lookup("::ffff:10.1.2.3") == "host"  # IPv4-mapped
+    assert lookup("2001:db8::1") == "doc6"
+    assert lookup("2001:db9::1") is None
+
+
+def test_parse_cidrs_rejects_garbage():
+    """Test that a bad entry names the setting it came from."""
+    assert [str(n) for n in parse_cidrs(" 10.0.0.1/8, ,::1 ", "X")] == ["10.0.0.0/8", "::1/128"]
+    with pytest.raises(ValueError, match="Invalid TRUSTED_PROXIES"):
+        ClientIPResolver("10.0.0.0/8,not-an-ip")
+
+
+@pytest.mark.parametrize(
+    ("peer", "forwarded_for", "expected"),
+    [
+        # Direct client: the header is ignored, whatever it says
+        ("203.0.113.7", "1.1.1.1", "203.0.113.7"),
+        # Through one trusted proxy
+        ("10.0.0.2", "203.0.113.7", "203.0.113.7"),
+        # Client-supplied entries left of the real client are ignored
+        ("10.0.0.2", "1.1.1.1, 203.0.113.7", "203.0.113.7"),
+        # Several trusted hops are skipped
+        ("10.0.0.2", "203.0.113.7, 10.0.0.9, 10.0.0.3", "203.0.113.7"),
+        # Every hop trusted: the leftmost is the best answer
+        ("10.0.0.2", "10.0.0.9", "10.0.0.9"),
+        # Garbage stops the walk at the last address a proxy vouched for
+        ("10.0.0.2", "203.0.113.7, junk, 10.0.0.9", "10.0.0.9"),
+        ("10.0.0.2", None, "10.0.0.2"),
+        (None, "203.0.113.7", "unknown"),
+        ("testclient", "203.0.113.7", "testclient"),
+    ],
+)
+def test_resolve_client_behind_trusted_proxies(peer, forwarded_for, expected):
+    """Test X-Forwarded-For handling with 10.0.0.0/8 as the trusted proxies."""
+    resolver = ClientIPResolver("10.0.0.0/8")
+    assert resolver.resolve(peer, forwarded_for) == expected
+
+
+def test_classify_applies_most_specific_rule():
+    """Test deny, allow-inside-deny, exempt and the default."""
+    resolver = ClientIPResolver(
+        "", allow="203.0.113.9", deny="203.0.113.0/24, 2001:db8::/32", exempt="10.0.0.0/8"
+    )
+
+    assert resolver.classify("203.0.113.50") == "deny"
+    assert resolver.classify("2001:db8::5") == "deny"
+    assert resolver.classify("203.0.113.9") == "allow"
+    assert resolver.classify("10.4.4.4") == "exempt"
+    assert resolver.classify("198.51.100.1") == "allow"
+    assert resolver.classify("unknown") == "allow"
@@ -0,0 +1,64 @@
+# ============================================
+# Ascend AI - Request Log Sampling Tests
+# ============================================
+# Tests for sample rate parsing, sampling decisions and suppressed counts
+# ============================================
+
+from unittest.mock import patch
+
+import pytest
+
+from app.middleware.log_sampling import LogSampler, load_sample_rates
+
+
+def test_load_sample_rates():
+    """Test parsing of LOG_SAMPLE_RATES."""
+    assert load_sample_rates("") == {}
+    assert load_sample_rates('{"/health": 0, "/api/v1/items/{item_id}": 0.25}') == {
+        "/health": 0.0,
+        "/api/v1/items/{item_id}": 0.25,
+    }
+
+
+@pytest.mark.parametrize("raw", ['{"/health": 1.5}', '{"/health": -1}', "[0.5]", "{"])
+def test_load_sample_rates_rejects_invalid_values(raw: str):
+    """Test that bad settings fail loudly at startup."""
+    with pytest.raises(ValueError, match="Invalid LOG_SAMPLE_RATES"):
+        load_sample_rates(raw)
+
+
+def test_sampler_uses_route_overrides():
+    """Test the default rate, per-route overrides and the 0/1 shortcuts."""
+    sampler = LogSampler(1.0, {"/health": 0.0, "/items/{item_id}": 0.3}, summary_interval=60)
+
+    assert sampler.sample("/users")
+    assert not sampler.sample("/health")
+    with patch("app.middleware.log_sampling.random.random", side_effect=[0.2, 0.4]):
+        assert sampler.sample("/items/{item_id}")
+        assert not sampler.sample("/items/{item_id}")
+
+
+def test_sampler_rate_is_respected_on_average():
+    """Test that roughly ``rate`` of the requests are logged."""
+    sampler = LogSampler(0.1, {}, summary_interval=60)
+    logged = sum(sampler.sample("/users") for _ in range(20000))
+    assert 1700 < logged < 2300
+
+
+def test_sampler_summary_once_per_interval():
+    """Test that suppressed counts are handed out once per interval, then reset."""
+    with patch("app.middleware.log_sampling.time.monotonic", return_value=100.0):
+        sampler = LogSampler(0.0, {}, summary_interval=60)
+        sampler.record_suppressed("GET", "/users")
+        sampler.record_suppressed("GET", "/users")
+        sampler.record_suppressed("POST", "/users")
+        assert sampler.take_summary() is None
+
+    with patch("app.middleware.log_sampling.time.monotonic", return_value=161.0):
+        assert sampler.take_summary() == ({"GET /users": 2, "POST /users": 1}, 61.0)
+        assert sampler.take_summary() is None
+
+    # Nothing suppressed: no summary, but the window still moves on
+    with patch("app.middleware.log_sampling.time.monotonic", return_value=230.0):
+        assert sampler.take_summary() is None
+        assert sampler._window_start == 230.0
@@ -5,11 +5,14 @@
 # ============================================
 
 import logging
+from unittest.mock import patch
 
 import pytest
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.testclient import TestClient
 
+from app.middleware.log_sampling import LogSampler
 from app.middleware.logging import RequestLoggingMiddleware, get_client_ip
 
 
@@ -77,6 +80,47 @@ def test_logging_middleware_logs_client_ip(client, caplog):
     assert any("Client:" in msg for msg in log_messages)
 
 
+def test_logging_middleware_logs_route_template(caplog):
+    """Test that per-resource paths are logged under their route template."""
+    app = FastAPI()
+    app.add_middleware(RequestLoggingMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: str):
+        return {"id": item_id}
+
+    with caplog.at_level(logging.INFO):
+        response = TestClient(app).get("/items/abc123")
+
+    assert response.status_code == 200
+    log_messages = [
+        record.message for record in caplog.records if record.name == "app.middleware.logging"
+    ]
+    assert any("GET /items/{item_id}" in msg for msg in log_messages)
+    assert not any("abc123" in msg for msg in log_messages)
+
+
+def test_logging_middleware_passes_streaming_responses_through(caplog):
+    """Test that streamed bodies are not buffered and the status is logged."""
+    app = FastAPI()
+    app.add_middleware(RequestLoggingMiddleware)
+
+    @app.get("/stream")
+    async def stream_endpoint():
+        async def chunks():
+            for i in range(3):
+                yield f"chunk-{i};"
+
+        return StreamingResponse(chunks(), status_code=206, media_type="text/plain")
+
+    with caplog.at_level(logging.INFO):
+        with TestClient(app).stream("GET", "/stream") as response:
+            body = "".join(response.iter_text())
+
+    assert body == "chunk-0;chunk-1;chunk-2;"
+    assert any("Status: 206" in record.message for record in caplog.records)
+
+
 def test_logging_middleware_warns_on_4xx_errors(client, caplog):
     """Test that 4xx errors are logged with WARNING level."""
     with caplog.at_level(logging.WARNING):
@@ -124,15 +168,19 @@ def test_get_client_ip_returns_forwarded_ip(app_with_logging):
 
     from fastapi import Request
 
-    # Mock request with X-Forwarded-For header
+    # Mock request from a trusted (loopback) proxy: the client is the last
+    # untrusted hop, whatever it wrote further left
     request = Mock(spec=Request)
-    request.headers.get = Mock(return_value="203.0.113.1, 198.51.100.1")
-    request.client = Mock(host="192.168.1.100")
+    request.headers.get = Mock(return_value="1.2.3.4, 203.0.113.1, 127.0.0.2")
+    request.client = Mock(host="127.0.0.1")
 
     ip = get_client_ip(request)
-    # Should return the first IP in the chain
     assert ip == "203.0.113.1"
 
+    # Not sent through a trusted proxy: the header is ignored
+    request.client = Mock(host="198.51.100.7")
+    assert get_client_ip(request) == "198.51.100.7"
+
 
 def test_get_client_ip_handles_no_client(app_with_logging):
     """Test that get_client_ip handles missing client gracefully."""
@@ -165,3 +213,103 @@ def test_logging_middleware_logs_auth_status(client, caplog):
     # Should have logs showing auth status
     assert any("Auth: No" in msg for msg in log_messages)
     assert any("Auth: Yes" in msg for msg in log_messages)
+
+
+def test_logging_middleware_records_structured_fields(caplog):
+    """Test that records carry route, status, duration and client as fields."""
+    app = FastAPI()
+    app.add_middleware(RequestLoggingMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: str):
+        return {"id": item_id}
+
+    with caplog.at_level(logging.INFO):
+        TestClient(app).get("/items/abc123")
+
+    response_log = next(
+        record for record in caplog.records if getattr(record, "event", None) == "response"
+    )
+    assert response_log.route == "/items/{item_id}"
+    assert response_log.method == "GET"
+    assert response_log.status == 200
+    assert response_log.duration_ms >= 0
+    assert response_log.client == "testclient"
+    assert response_log.authenticated is False
+    # Arguments stay separate until a handler formats the record
+    assert "%s" in response_log.msg
+
+
+def _sampled_app(sampler: LogSampler) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(RequestLoggingMiddleware, sampler=sampler)
+
+    @app.get("/test")
+    async def test_endpoint():
+        return {"message": "success"}
+
+    @app.get("/missing")
+    async def missing_endpoint():
+        return JSONResponse({"detail": "Not Found"}, status_code=404)
+
+    return app
+
+
+def _request_logs(caplog) -> list[logging.LogRecord]:
+    return [record for record in caplog.records if record.name == "app.middleware.logging"]
+
+
+def test_logging_middleware_samples_successes_but_keeps_errors(caplog):
+    """Test that sampled-out successes are counted, and errors are still logged."""
+    sampler = LogSampler(0.0, {}, summary_interval=3600)
+    client = TestClient(_sampled_app(sampler))
+
+    with caplog.at_level(logging.INFO):
+        for _ in range(3):
+            assert client.get("/test").status_code == 200
+        assert client.get("/missing").status_code == 404
+
+    messages = [record.message for record in _request_logs(caplog)]
+    assert not any("/test" in message for message in messages)
+    # The error is logged even though its request was not sampled
+    assert any("GET /missing - Status: 404" in message for message in messages)
+    assert sampler.suppressed == {"GET /test": 3}
+
+
+def test_logging_middleware_always_logs_slow_requests(caplog):
+    """Test that a request over LOG_SLOW_REQUEST_MS is logged as a warning."""
+    middleware_app = _sampled_app(LogSampler(0.0, {}, summary_interval=3600))
+
+    with (
+        patch("app.middleware.logging.settings.log_slow_request_ms", 0),
+        caplog.at_level(logging.INFO),
+    ):
+        TestClient(middleware_app).get("/test")
+
+    [response_log] = _request_logs(caplog)
+    assert response_log.levelno == logging.WARNING
+    assert response_log.slow is True
+    assert response_log.sampled is False
+    assert "Status: 200" in response_log.message
+
+
+def test_logging_middleware_reports_suppressed_counts(caplog):
+    """Test the periodic summary of unlogged requests."""
+    sampler = LogSampler(1.0, {"/test": 0.0}, summary_interval=60)
+    client = TestClient(_sampled_app(sampler))
+
+    with caplog.at_level(logging.INFO):
+        client.get("/test")
+        client.get("/test")
+        with patch(
+            "app.middleware.log_sampling.time.monotonic",
+            return_value=sampler._window_start + 61,
+        ):
+            client.get("/test")
+
+    [summary] = [
+        record for record in _request_logs(caplog) if record.message.startswith("[SAMPLING]")
+    ]
+    assert summary.suppressed == {"GET /test": 3}
+    assert "GET /test x3" in summary.message
+    assert not sampler.suppressed
@@ -0,0 +1,86 @@
+# ============================================
+# Ascend AI - Request Metrics Middleware Tests
+# ============================================
+# Tests for per-route request counts, latency and in-flight gauges
+# ============================================
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.prometheus import MetricsRegistry, render_text
+from app.middleware.metrics import MetricsMiddleware
+
+
+@pytest.fixture
+def registry():
+    """A registry of its own per test."""
+    return MetricsRegistry()
+
+
+@pytest.fixture
+def client(registry):
+    """Test client for an app with metrics middleware."""
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware, registry=registry)
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: str):
+        return {"id": item_id}
+
+    @app.get("/error")
+    async def error_endpoint():
+        raise ValueError("Test error")
+
+    return TestClient(app, raise_server_exceptions=False)
+
+
+def test_metrics_are_keyed_by_route_template_and_status_class(client, registry):
+    """Test that per-resource paths aggregate under their template."""
+    client.get("/items/a")
+    client.get("/items/b")
+    client.get("/nowhere")
+
+    counters = registry.snapshot()["counters"]
+    assert counters == {
+        'http_requests_total{method="GET",route="/items/{item_id}",status="2xx"}': 2,
+        'http_requests_total{method="GET",route="<unmatched>",status="4xx"}': 1,
+    }
+    latency = registry.histograms[
+        'http_request_duration_seconds{method="GET",route="/items/{item_id}",status="2xx"}'
+    ]
+    assert latency.count == 2
+    assert latency.sum > 0
+
+
+def test_metrics_count_exceptions_as_5xx(client, registry):
+    """Test that a request that raised is recorded, and in-flight returns to zero."""
+    assert client.get("/error").status_code == 500
+
+    snapshot = registry.snapshot()
+    assert snapshot["counters"] == {
+        'http_requests_total{method="GET",route="/error",status="5xx"}': 1
+    }
+    assert snapshot["gauges"] == {'http_requests_in_flight{method="GET",route="/error"}': 0}
+
+
+def test_metrics_bound_unknown_methods(client, registry):
+    """Test that arbitrary methods don't create new series."""
+    client.request("PROPFIND", "/items/a")
+
+    assert list(registry.snapshot()["counters"]) == [
+        'http_requests_total{method="OTHER",route="/items/{item_id}",status="4xx"}'
+    ]
+
+
+def test_metrics_render_as_prometheus_text(client, registry):
+    """Test the exposition of a recorded request."""
+    registry.describe("http_requests_total", "counter", "HTTP requests")
+    client.get("/items/a")
+
+    text = render_text(registry.snapshot())
+    assert "# TYPE http_requests_total counter" in text
+    assert (
+        'http_request_duration_seconds_bucket{method="GET",route="/items/{item_id}",'
+        'status="2xx",le="+Inf"} 1'
+    ) in text
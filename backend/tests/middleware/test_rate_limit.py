@@ -4,13 +4,19 @@
 # Tests for Redis-based rate limiting functionality
 # ============================================
 
+import asyncio
+import logging
 from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
 from fastapi.testclient import TestClient
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import MaxConnectionsError, NoScriptError
 
-from app.middleware.rate_limit import RateLimitMiddleware
+from app.middleware.rate_limit import RateLimitMiddleware, RateLimitResult
+from app.middleware.rate_limit_policy import RateLimitPolicy
 
 
 @pytest.fixture
@@ -61,44 +67,39 @@ async def test_rate_limit_blocks_requests_over_limit():
     middleware = RateLimitMiddleware(app)
     middleware._initialized = True
 
-    # Mock Redis client
+    # Mock Redis client: the script returns {allowed, remaining, reset_after_ms}
     mock_redis = AsyncMock()
     mock_redis.ping = AsyncMock(return_value=True)
-    mock_redis.pipeline = Mock()
-
-    # Create mock pipeline
-    mock_pipeline = AsyncMock()
-    mock_pipeline.zremrangebyscore = Mock()
-    mock_pipeline.zcard = Mock()
-    mock_pipeline.zadd = Mock()
-    mock_pipeline.expire = Mock()
-
-    # First 5 requests succeed, 6th fails
-    mock_pipeline.execute = AsyncMock(
+    mock_script = AsyncMock(
         side_effect=[
-            [None, 0, None, None],  # Request 1
-            [None, 1, None, None],  # Request 2
-            [None, 2, None, None],  # Request 3
-            [None, 3, None, None],  # Request 4
-            [None, 4, None, None],  # Request 5
-            [None, 5, None, None],  # Request 6 - should be blocked
+            [1, 4, 60000],  # Request 1
+            [1, 3, 59000],  # Request 2
+            [1, 2, 58000],  # Request 3
+            [1, 1, 57000],  # Request 4
+            [1, 0, 56000],  # Request 5
+            [0, 0, 55000],  # Request 6 - should be blocked
         ]
     )
-
-    mock_redis.pipeline.return_value = mock_pipeline
+    mock_script.registered_client = mock_redis
+    mock_redis.register_script = Mock(return_value=mock_script)
     middleware.redis_client = mock_redis
 
     # Test the check_rate_limit method directly
     results = []
     for i in range(6):
-        allowed = await middleware._check_rate_limit(
-            client_ip="192.168.1.100", endpoint="GET:/api/v1/auth/test", limit=5, window=60
+        result = await middleware._check_rate_limit(
+            client_id="192.168.1.100", endpoint="GET:/api/v1/auth/test", limit=5, window=60
         )
-        results.append(allowed)
+        results.append(result.allowed)
 
     # First 5 should be allowed, 6th should be blocked
     assert results == [True, True, True, True, True, False]
 
+    # One script registration, one round trip per request
+    mock_redis.register_script.assert_called_once()
+    assert mock_script.await_count == 6
+    assert mock_redis.pipeline.call_count == 0
+
 
 @pytest.mark.asyncio
 async def test_rate_limit_health_check_bypass(client):
@@ -116,22 +117,19 @@ async def test_rate_limit_different_limits_for_auth():
     app = FastAPI()
     middleware = RateLimitMiddleware(app)
 
-    # Test rate limit configuration
-    auth_limit, auth_window = middleware._get_rate_limit("/api/v1/auth/login", "POST")
-    api_limit, api_window = middleware._get_rate_limit("/api/v1/resumes", "GET")
-    default_limit, default_window = middleware._get_rate_limit("/other", "GET")
+    # The policy table __call__ resolves limits with
+    auth = middleware.policies.match("/api/v1/auth/login", "POST")
+    api = middleware.policies.match("/api/v1/resumes", "GET")
+    default = middleware.policies.match("/other", "GET")
 
-    # Auth endpoints should have strictest limits
-    assert auth_limit == 5
-    assert auth_window == 60
+    # Auth endpoints should have strictest limits, per client IP
+    assert (auth.limit, auth.window, auth.identity) == (5, 60, "ip")
 
-    # API endpoints should have moderate limits
-    assert api_limit == 60
-    assert api_window == 60
+    # API endpoints should have moderate limits, per user
+    assert (api.limit, api.window, api.identity) == (60, 60, "user")
 
     # Default endpoints should have generous limits
-    assert default_limit == 100
-    assert default_window == 60
+    assert (default.limit, default.window) == (100, 60)
 
 
 def test_get_client_ip_from_request():
@@ -140,56 +138,121 @@ def test_get_client_ip_from_request():
 
     from fastapi import Request
 
-    app = FastAPI()
-    middleware = RateLimitMiddleware(app)
+    from app.middleware.client_ip import get_client_ip
 
     # Test direct IP
     request = Mock(spec=Request)
     request.headers.get = Mock(return_value=None)
     request.client = Mock(host="192.168.1.100")
 
-    ip = middleware._get_client_ip(request)
+    ip = get_client_ip(request)
     assert ip == "192.168.1.100"
 
-    # Test X-Forwarded-For
+    # Private peers are not trusted by default: X-Forwarded-For is ignored
     request.headers.get = Mock(return_value="203.0.113.1, 198.51.100.1")
-    ip = middleware._get_client_ip(request)
-    assert ip == "203.0.113.1"
+    ip = get_client_ip(request)
+    assert ip == "192.168.1.100"
+
+    # Test X-Forwarded-For through a trusted proxy (loopback by default)
+    request.client = Mock(host="127.0.0.1")
+    ip = get_client_ip(request)
+    assert ip == "198.51.100.1"
+
+
+@pytest.mark.asyncio
+async def test_denied_and_exempt_clients_skip_redis():
+    """Test that IP rules are applied before any Redis call."""
+    from app.middleware.client_ip import ClientIPResolver
+
+    app = FastAPI()
+
+    @app.get("/test")
+    async def test_endpoint():
+        return {"ok": True}
+
+    app.add_middleware(RateLimitMiddleware)
+    resolver = ClientIPResolver(
+        "10.0.0.0/8", deny="203.0.113.0/24", allow="203.0.113.9", exempt="198.51.100.0/24"
+    )
+    get_client = AsyncMock(return_value=None)
+
+    with (
+        patch("app.middleware.rate_limit.client_ip_resolver", resolver),
+        patch("app.middleware.rate_limit.get_client_ip", side_effect=lambda r: r.headers["x-ip"]),
+        patch("app.middleware.rate_limit.redis_manager.get_client", get_client),
+    ):
+        client = TestClient(app)
+        denied = client.get("/test", headers={"x-ip": "203.0.113.50"})
+        exempt = client.get("/test", headers={"x-ip": "198.51.100.1"})
+        allowed = client.get("/test", headers={"x-ip": "203.0.113.9"})
+
+    assert denied.status_code == 403
+    assert exempt.status_code == 200
+    assert "X-RateLimit-Limit" not in exempt.headers
+    # Only the allow-listed client inside the denied range is rate limited
+    assert allowed.status_code == 200
+    assert get_client.await_count == 1
 
 
 @pytest.mark.asyncio
 async def test_rate_limit_adds_headers_to_response():
     """Test that rate limit headers are added to responses."""
     app = FastAPI()
-    middleware = RateLimitMiddleware(app)
-    middleware._initialized = True
+    app.add_middleware(RateLimitMiddleware)
 
-    # Mock Redis for successful check
+    # Mock Redis for successful check: 45 of 100 used after this request
     mock_redis = AsyncMock()
     mock_redis.ping = AsyncMock(return_value=True)
-    mock_redis.zcount = AsyncMock(return_value=5)  # 5 requests used
+    mock_script = AsyncMock(return_value=[1, 55, 42000])
+    mock_script.registered_client = mock_redis
+    mock_redis.register_script = Mock(return_value=mock_script)
 
-    mock_pipeline = AsyncMock()
-    mock_pipeline.zremrangebyscore = Mock()
-    mock_pipeline.zcard = Mock()
-    mock_pipeline.zadd = Mock()
-    mock_pipeline.expire = Mock()
-    mock_pipeline.execute = AsyncMock(return_value=[None, 5, None, None])
+    @app.get("/test")
+    async def test_endpoint():
+        return {"message": "success"}
 
-    mock_redis.pipeline.return_value = mock_pipeline
-    middleware.redis_client = mock_redis
+    with patch(
+        "app.middleware.rate_limit.redis_manager.get_client", AsyncMock(return_value=mock_redis)
+    ):
+        client = TestClient(app)
+        response = client.get("/test")
+
+    assert response.status_code == 200
+    assert response.headers["x-ratelimit-limit"] == "100"
+    assert response.headers["x-ratelimit-remaining"] == "55"
+    assert "x-ratelimit-reset" in response.headers
+    # Headers come from the script result - no second Redis call
+    assert mock_script.await_count == 1
+    mock_redis.zcount.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_rejection_returns_429_with_retry_after():
+    """Test that a rejected request gets a 429 with script-derived headers."""
+    app = FastAPI()
+    app.add_middleware(RateLimitMiddleware)
+    calls = []
+
+    mock_redis = AsyncMock()
+    mock_script = AsyncMock(return_value=[0, 0, 12300])
+    mock_script.registered_client = mock_redis
+    mock_redis.register_script = Mock(return_value=mock_script)
 
-    # Create a test endpoint
     @app.get("/test")
     async def test_endpoint():
+        calls.append(1)
         return {"message": "success"}
 
-    client = TestClient(app)
-    response = client.get("/test")
+    with patch(
+        "app.middleware.rate_limit.redis_manager.get_client", AsyncMock(return_value=mock_redis)
+    ):
+        client = TestClient(app, raise_server_exceptions=False)
+        response = client.get("/test")
 
-    # Check if rate limit headers are present (if Redis is available)
-    if response.status_code == 200 and middleware.redis_client:
-        assert "x-ratelimit-limit" in response.headers or response.status_code == 200
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "13"
+    assert response.headers["x-ratelimit-remaining"] == "0"
+    assert calls == []
 
 
 @pytest.mark.asyncio
@@ -217,40 +280,594 @@ async def test_rate_limit_fails_open_on_redis_error():
 
 
 @pytest.mark.asyncio
-async def test_get_remaining_requests():
-    """Test getting remaining requests in rate limit window."""
+async def test_check_rate_limit_uses_unique_members():
+    """Test that each request is recorded under its own sorted-set member."""
     app = FastAPI()
-    middleware = RateLimitMiddleware(app)
-    middleware._initialized = True
+    middleware = RateLimitMiddleware(app, algorithm="sliding_window")
+
+    mock_redis = AsyncMock()
+    mock_script = AsyncMock(return_value=[1, 10, 60000])
+    mock_script.registered_client = mock_redis
+    mock_redis.register_script = Mock(return_value=mock_script)
+    middleware.redis_client = mock_redis
+
+    for _ in range(2):
+        await middleware._check_rate_limit(
+            client_id="192.168.1.100", endpoint="GET:/api/v1/test", limit=60, window=60
+        )
+
+    first, second = (call.kwargs for call in mock_script.await_args_list)
+    assert first["keys"] == ["rate_limit:{192.168.1.100}:GET:/api/v1/test"]
+    assert first["args"][:2] == [60, 60000]
+    assert first["args"][2] != second["args"][2]
+
+
+@pytest.mark.asyncio
+async def test_check_rate_limit_gcra_keeps_one_value_per_key():
+    """Test that GCRA uses its own key namespace and no per-request member."""
+    app = FastAPI()
+    middleware = RateLimitMiddleware(app, algorithm="gcra")
 
-    # Mock Redis
     mock_redis = AsyncMock()
-    mock_redis.zcount = AsyncMock(return_value=35)  # 35 requests used
+    mock_script = AsyncMock(return_value=[1, 4, 12000])
+    mock_script.registered_client = mock_redis
+    mock_redis.register_script = Mock(return_value=mock_script)
     middleware.redis_client = mock_redis
 
-    remaining = await middleware._get_remaining_requests(
-        client_ip="192.168.1.100", endpoint="GET:/api/v1/test", limit=60, window=60
+    result = await middleware._check_rate_limit(
+        client_id="192.168.1.100", endpoint="POST:/api/v1/auth/login", limit=5, window=60
     )
 
-    # Should have 25 remaining (60 - 35)
-    assert remaining == 25
+    assert mock_script.await_args.kwargs == {
+        "keys": ["rate_limit:gcra:{192.168.1.100}:POST:/api/v1/auth/login"],
+        "args": [5, 60000],
+    }
+    assert "GET" in mock_redis.register_script.call_args.args[0]
+    assert result == RateLimitResult(allowed=True, limit=5, remaining=4, reset_after=12.0)
+
+
+def test_rate_limit_algorithm_selection():
+    """Test that the algorithm defaults to settings and rejects unknown names."""
+    app = FastAPI()
+
+    with patch("app.middleware.rate_limit.settings.rate_limit_algorithm", "sliding_window"):
+        assert RateLimitMiddleware(app).algorithm == "sliding_window"
+
+    assert RateLimitMiddleware(app, algorithm="gcra").algorithm == "gcra"
+    with pytest.raises(ValueError, match="Unknown rate limit algorithm"):
+        RateLimitMiddleware(app, algorithm="fixed_window")
 
 
 @pytest.mark.asyncio
-async def test_get_remaining_requests_never_negative():
-    """Test that remaining requests never goes negative."""
+async def test_check_rate_limit_result_never_negative():
+    """Test that the remaining count is clamped and Retry-After is at least 1s."""
     app = FastAPI()
     middleware = RateLimitMiddleware(app)
-    middleware._initialized = True
 
-    # Mock Redis showing more requests than limit
     mock_redis = AsyncMock()
-    mock_redis.zcount = AsyncMock(return_value=75)  # 75 requests (over limit of 60)
+    mock_script = AsyncMock(return_value=[0, -3, 200])
+    mock_script.registered_client = mock_redis
+    mock_redis.register_script = Mock(return_value=mock_script)
     middleware.redis_client = mock_redis
 
-    remaining = await middleware._get_remaining_requests(
-        client_ip="192.168.1.100", endpoint="GET:/api/v1/test", limit=60, window=60
+    result = await middleware._check_rate_limit(
+        client_id="192.168.1.100", endpoint="GET:/api/v1/test", limit=60, window=60
     )
 
-    # Should be 0, not negative
-    assert remaining == 0
+    assert result.allowed is False
+    assert result.remaining == 0
+    assert result.retry_after == 1
+
+
+@pytest.mark.asyncio
+async def test_script_is_reregistered_for_a_new_client():
+    """Test that a reconnected client gets the script bound to it."""
+    app = FastAPI()
+    middleware = RateLimitMiddleware(app)
+
+    clients = []
+    for _ in range(2):
+        mock_redis = AsyncMock()
+        mock_script = AsyncMock(return_value=[1, 59, 60000])
+        mock_script.registered_client = mock_redis
+        mock_redis.register_script = Mock(return_value=mock_script)
+        clients.append(mock_redis)
+
+    for mock_redis in (clients[0], clients[0], clients[1]):
+        middleware.redis_client = mock_redis
+        await middleware._check_rate_limit(
+            client_id="192.168.1.100", endpoint="GET:/api/v1/test", limit=60, window=60
+        )
+
+    clients[0].register_script.assert_called_once()
+    clients[1].register_script.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_keys_use_route_templates():
+    """Test that requests for different resources share one endpoint bucket."""
+    app = FastAPI()
+    app.add_middleware(RateLimitMiddleware, algorithm="gcra")
+
+    mock_redis = AsyncMock()
+    mock_script = AsyncMock(return_value=[1, 59, 1000])
+    mock_script.registered_client = mock_redis
+    mock_redis.register_script = Mock(return_value=mock_script)
+
+    @app.get("/api/v1/sessions/{session_id}")
+    async def get_session(session_id: str):
+        return {"id": session_id}
+
+    with patch(
+        "app.middleware.rate_limit.redis_manager.get_client", AsyncMock(return_value=mock_redis)
+    ):
+        client = TestClient(app)
+        client.get("/api/v1/sessions/11111111-aaaa")
+        client.get("/api/v1/sessions/22222222-bbbb")
+        client.get("/wp-admin/setup.php")
+        client.get("/.env")
+
+    keys = [call.kwargs["keys"][0] for call in mock_script.await_args_list]
+    assert keys == [
+        "rate_limit:gcra:{testclient}:GET:/api/v1/sessions/{session_id}",
+        "rate_limit:gcra:{testclient}:GET:/api/v1/sessions/{session_id}",
+        "rate_limit:gcra:{testclient}:GET:<unmatched>",
+        "rate_limit:gcra:{testclient}:GET:<unmatched>",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_identity_uses_verified_subject():
+    """Test that per-user policies key on the verified JWT subject."""
+    app = FastAPI()
+    middleware = RateLimitMiddleware(
+        app,
+        policies=[
+            RateLimitPolicy(path="/api", limit=60, window=60, identity="user"),
+            RateLimitPolicy(path="/api/v1/uploads", limit=5, window=60, identity="both"),
+        ],
+    )
+    user_policy = middleware.policies.match("/api/v1/resumes", "GET")
+    both_policy = middleware.policies.match("/api/v1/uploads", "POST")
+
+    request = Mock(spec=Request)
+    request.headers = {"authorization": "Bearer good-token"}
+    with patch(
+        "app.middleware.rate_limit.extract_user_id_from_token", return_value="user-1"
+    ) as mock_extract:
+        assert middleware._get_client_identity(request, "10.0.0.1", user_policy) == "user:user-1"
+        assert (
+            middleware._get_client_identity(request, "10.0.0.1", both_policy)
+            == "10.0.0.1:user:user-1"
+        )
+    mock_extract.assert_called_with("good-token")
+
+    # Invalid or missing tokens fall back to the client IP
+    with patch("app.middleware.rate_limit.extract_user_id_from_token", return_value=None):
+        assert middleware._get_client_identity(request, "10.0.0.1", user_policy) == "10.0.0.1"
+    request.headers = {}
+    assert middleware._get_client_identity(request, "10.0.0.1", user_policy) == "10.0.0.1"
+
+
+def test_rate_limit_identity_skips_tokens_rejected_by_auth():
+    """Test that a token in the negative cache is not verified again by the middleware."""
+    app = FastAPI()
+    middleware = RateLimitMiddleware(
+        app, policies=[RateLimitPolicy(path="/api", limit=60, window=60, identity="user")]
+    )
+    policy = middleware.policies.match("/api/v1/resumes", "GET")
+    request = Mock(spec=Request)
+    request.headers = {"authorization": "Bearer forged-token"}
+
+    with (
+        patch(
+            "app.middleware.rate_limit.token_cache.is_rejected_locally", return_value=True
+        ) as mock_rejected,
+        patch("app.middleware.rate_limit.extract_user_id_from_token") as mock_extract,
+    ):
+        assert middleware._get_client_identity(request, "10.0.0.1", policy) == "10.0.0.1"
+
+    mock_rejected.assert_called_once_with("forged-token")
+    mock_extract.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_passes_policy_burst_to_gcra():
+    """Test that a policy's burst reaches the GCRA script."""
+    app = FastAPI()
+    app.add_middleware(
+        RateLimitMiddleware,
+        algorithm="gcra",
+        policies=[RateLimitPolicy(path="/", limit=60, window=60, burst=10)],
+    )
+
+    mock_redis = AsyncMock()
+    mock_script = AsyncMock(return_value=[1, 9, 1000])
+    mock_script.registered_client = mock_redis
+    mock_redis.register_script = Mock(return_value=mock_script)
+
+    @app.get("/test")
+    async def test_endpoint():
+        return {"message": "success"}
+
+    with patch(
+        "app.middleware.rate_limit.redis_manager.get_client", AsyncMock(return_value=mock_redis)
+    ):
+        response = TestClient(app).get("/test")
+
+    assert response.headers["x-ratelimit-remaining"] == "9"
+    assert mock_script.await_args.kwargs["args"] == [60, 60000, 10]
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_skips_paths_without_policy():
+    """Test that requests matching no policy never reach Redis."""
+    app = FastAPI()
+    app.add_middleware(
+        RateLimitMiddleware, policies=[RateLimitPolicy(path="/api", limit=60, window=60)]
+    )
+
+    mock_redis = AsyncMock()
+    mock_redis.register_script = Mock()
+
+    @app.get("/public")
+    async def public_endpoint():
+        return {"message": "success"}
+
+    with patch(
+        "app.middleware.rate_limit.redis_manager.get_client", AsyncMock(return_value=mock_redis)
+    ):
+        response = TestClient(app).get("/public")
+
+    assert response.status_code == 200
+    assert "x-ratelimit-limit" not in response.headers
+    mock_redis.register_script.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_skipped_paths_do_no_work():
+    """Test that health checks never touch Redis, the client IP or the policy table."""
+    app = FastAPI()
+    app.add_middleware(RateLimitMiddleware)
+
+    @app.get("/health")
+    async def health_endpoint():
+        return {"status": "healthy"}
+
+    with (
+        patch("app.middleware.rate_limit.redis_manager.get_client", AsyncMock()) as mock_get_client,
+        patch("app.middleware.rate_limit.get_client_ip") as mock_get_client_ip,
+        patch("app.middleware.rate_limit.route_resolver") as mock_route_resolver,
+    ):
+        response = TestClient(app).get("/health")
+
+    assert response.status_code == 200
+    mock_get_client.assert_not_awaited()
+    mock_get_client_ip.assert_not_called()
+    mock_route_resolver.route_for.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_passes_streaming_responses_through():
+    """Test that streamed bodies arrive intact with rate limit headers added."""
+    app = FastAPI()
+    app.add_middleware(RateLimitMiddleware)
+
+    mock_redis = AsyncMock()
+    mock_script = AsyncMock(return_value=[1, 99, 600])
+    mock_script.registered_client = mock_redis
+    mock_redis.register_script = Mock(return_value=mock_script)
+
+    @app.get("/stream")
+    async def stream_endpoint():
+        async def chunks():
+            for i in range(3):
+                yield f"chunk-{i};"
+
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    with patch(
+        "app.middleware.rate_limit.redis_manager.get_client", AsyncMock(return_value=mock_redis)
+    ):
+        with TestClient(app).stream("GET", "/stream") as response:
+            body = "".join(response.iter_text())
+
+    assert body == "chunk-0;chunk-1;chunk-2;"
+    assert response.headers["x-ratelimit-remaining"] == "99"
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_uses_local_fallback_when_redis_is_down(caplog):
+    """Test that limits are still enforced in-process while Redis is down."""
+    app = FastAPI()
+    app.add_middleware(
+        RateLimitMiddleware, policies=[RateLimitPolicy(path="/", limit=2, window=60)]
+    )
+
+    @app.get("/test")
+    async def test_endpoint():
+        return {"message": "success"}
+
+    with (
+        patch(
+            "app.middleware.rate_limit.redis_manager.get_client", AsyncMock(return_value=None)
+        ) as mock_get_client,
+        caplog.at_level(logging.WARNING),
+    ):
+        client = TestClient(app)
+        statuses = [client.get("/test").status_code for _ in range(3)]
+
+    assert statuses == [200, 200, 429]
+    # The outage is logged once, and Redis isn't retried on every request
+    outage_logs = [r for r in caplog.records if "fallback limiter" in r.message]
+    assert len(outage_logs) == 1
+    assert mock_get_client.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_breaker_opens_after_repeated_errors(caplog):
+    """Test that repeated Redis errors switch to degraded mode and stop calling Redis."""
+    app = FastAPI()
+    middleware = RateLimitMiddleware(app)
+    mock_redis = AsyncMock()
+    mock_script = AsyncMock(side_effect=RedisConnectionError("connection refused"))
+    mock_script.registered_client = mock_redis
+    mock_redis.register_script = Mock(return_value=mock_script)
+
+    with (
+        patch(
+            "app.middleware.rate_limit.redis_manager.get_client",
+            AsyncMock(return_value=mock_redis),
+        ),
+        patch("app.middleware.rate_limit.redis_manager.report_failure"),
+        patch.object(middleware, "_probe_redis", AsyncMock()),
+    ):
+        middleware.breaker.failure_threshold = 3
+        for _ in range(5):
+            result = await middleware._check_with_fallback(
+                client_id="10.0.0.1", endpoint="GET:/test", limit=100, window=60, burst=None
+            )
+            assert result.allowed
+
+    assert middleware.breaker.is_open
+    assert mock_script.await_count == 3
+    error_logs = [r for r in caplog.records if r.levelname == "ERROR"]
+    assert len(error_logs) == 3  # two errors, then the transition - nothing after
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_pool_exhaustion_is_not_an_outage():
+    """Test that a burst exhausting the pool keeps the client and the breaker closed."""
+    app = FastAPI()
+    middleware = RateLimitMiddleware(app)
+    mock_redis = AsyncMock()
+    mock_script = AsyncMock(side_effect=MaxConnectionsError("No connection available"))
+    mock_script.registered_client = mock_redis
+    mock_redis.register_script = Mock(return_value=mock_script)
+
+    with (
+        patch(
+            "app.middleware.rate_limit.redis_manager.get_client",
+            AsyncMock(return_value=mock_redis),
+        ),
+        patch("app.middleware.rate_limit.redis_manager.report_failure") as mock_report,
+    ):
+        middleware.breaker.failure_threshold = 3
+        for _ in range(5):
+            result = await middleware._check_with_fallback(
+                client_id="10.0.0.1", endpoint="GET:/test", limit=100, window=60, burst=None
+            )
+            assert result.allowed
+
+    assert not middleware.breaker.is_open
+    assert middleware.redis_client is mock_redis
+    assert mock_script.await_count == 5
+    mock_report.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_probe_restores_redis(caplog):
+    """Test that the background probe switches back once Redis answers."""
+    app = FastAPI()
+    middleware = RateLimitMiddleware(app)
+    middleware.breaker.trip()
+    middleware.local_limiter.check("10.0.0.1:GET:/test", 10, 60)
+
+    mock_redis = AsyncMock()
+    mock_redis.ping = AsyncMock(side_effect=[RedisConnectionError("still down"), True])
+
+    with (
+        patch(
+            "app.middleware.rate_limit.redis_manager.get_client",
+            AsyncMock(side_effect=[None, mock_redis, mock_redis]),
+        ),
+        patch("app.middleware.rate_limit.redis_manager.report_failure") as mock_report,
+        patch("app.middleware.rate_limit.asyncio.sleep", AsyncMock()),
+        caplog.at_level(logging.INFO),
+    ):
+        await middleware._probe_redis()
+
+    assert not middleware.breaker.is_open
+    assert middleware.redis_client is mock_redis
+    assert len(middleware.local_limiter) == 0
+    mock_report.assert_called_once()
+    assert sum("restored" in r.message for r in caplog.records) == 1
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_fails_open_when_fallback_disabled():
+    """Test the old fail-open behaviour when the local fallback is disabled."""
+    app = FastAPI()
+    with patch("app.middleware.rate_limit.settings.rate_limit_fallback_enabled", False):
+        app.add_middleware(
+            RateLimitMiddleware, policies=[RateLimitPolicy(path="/", limit=1, window=60)]
+        )
+
+        @app.get("/test")
+        async def test_endpoint():
+            return {"message": "success"}
+
+        with patch(
+            "app.middleware.rate_limit.redis_manager.get_client", AsyncMock(return_value=None)
+        ):
+            client = TestClient(app)
+            statuses = [client.get("/test").status_code for _ in range(3)]
+
+    assert statuses == [200, 200, 200]
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_batching_answers_locally_and_flushes():
+    """Test hybrid mode: one Redis check, local decisions, then a forced batch flush."""
+    app = FastAPI()
+    with patch("app.middleware.rate_limit.settings.rate_limit_batching_enabled", True):
+        middleware = RateLimitMiddleware(app, algorithm="gcra")
+
+    mock_redis = Mock()
+    mock_script = AsyncMock(return_value=[1, 99, 600])
+    mock_script.registered_client = mock_redis
+    mock_redis.register_script = Mock(return_value=mock_script)
+    mock_pipe = AsyncMock()
+    mock_pipe.execute = AsyncMock(return_value=[[1, 94, 3600]])
+    mock_redis.pipeline = Mock(return_value=mock_pipe)
+    mock_pipe.__aenter__.return_value = mock_pipe
+    middleware.redis_client = mock_redis
+
+    with patch.object(middleware, "_flush_periodically", AsyncMock()):
+        results = [
+            await middleware._check_with_fallback("10.0.0.1", "GET:/test", 100, 60, None)
+            for _ in range(6)
+        ]
+
+    assert all(result.allowed for result in results)
+    assert [result.remaining for result in results] == [99, 98, 97, 96, 95, 94]
+    assert mock_script.await_count == 1  # only the first request went to Redis
+
+    await middleware.flush_pending()
+
+    key = "rate_limit:gcra:{10.0.0.1}:GET:/test"
+    assert mock_script.await_args.kwargs == {
+        "keys": [key],
+        "args": [100, 60000, 100, 5, 1],  # 5 requests, recorded even over the limit
+        "client": mock_pipe,
+    }
+    assert middleware.pre_limiter._keys[key].remaining == 94
+
+
+@pytest.mark.asyncio
+async def test_background_flush_stays_out_of_the_request_trace(monkeypatch):
+    """Test that the flusher started by a request does not inherit its trace or timing."""
+    from app.core.server_timing import current_timing, measure_request
+    from app.core.tracing import current_trace_id, span, start_trace, tracer
+
+    monkeypatch.setattr(tracer, "enabled", True)
+    monkeypatch.setattr(tracer, "sample_rate", 1.0)
+    monkeypatch.setattr(tracer, "export", lambda _root: None)
+
+    app = FastAPI()
+    with patch("app.middleware.rate_limit.settings.rate_limit_batching_enabled", True):
+        middleware = RateLimitMiddleware(app, algorithm="gcra")
+    middleware.pre_limiter.sync_interval = 0.01
+
+    mock_redis = Mock()
+    mock_script = AsyncMock(return_value=[1, 99, 600])
+    mock_script.registered_client = mock_redis
+    mock_redis.register_script = Mock(return_value=mock_script)
+    middleware.redis_client = mock_redis
+
+    flushed = asyncio.Event()
+    flush_contexts = []
+
+    async def run_pipelined(calls):
+        with span("redis.pipeline"):
+            flush_contexts.append((current_trace_id(), current_timing()))
+        flushed.set()
+        return [[1, 94, 3600] for _ in calls]
+
+    monkeypatch.setattr(middleware, "_run_pipelined", run_pipelined)
+
+    with measure_request(), start_trace("GET /test") as root:
+        for _ in range(3):
+            await middleware._check_with_fallback("10.0.0.1", "GET:/test", 100, 60, None)
+    spans_at_end = len(root.trace.spans)
+
+    try:
+        await asyncio.wait_for(flushed.wait(), timeout=2)
+    finally:
+        middleware._flush_task.cancel()
+
+    assert flush_contexts[0] == (None, None)
+    assert len(root.trace.spans) == spans_at_end
+
+
+@pytest.mark.asyncio
+async def test_pipelined_scripts_are_loaded_on_noscript():
+    """Test that a pipeline hitting NOSCRIPT (cluster/sharded) loads the script and retries."""
+    app = FastAPI()
+    middleware = RateLimitMiddleware(app, algorithm="gcra")
+
+    mock_redis = Mock()
+    mock_script = AsyncMock()
+    mock_script.registered_client = mock_redis
+    mock_script.script = "-- gcra"
+    mock_redis.register_script = Mock(return_value=mock_script)
+    mock_redis.script_load = AsyncMock()
+    mock_pipe = AsyncMock()
+    mock_pipe.execute = AsyncMock(side_effect=[NoScriptError("NOSCRIPT"), [[1, 9, 100]]])
+    mock_redis.pipeline = Mock(return_value=mock_pipe)
+    mock_pipe.__aenter__.return_value = mock_pipe
+    middleware.redis_client = mock_redis
+
+    responses = await middleware._run_pipelined([("rate_limit:gcra:{c}:GET:/x", [10, 60000])])
+
+    assert responses == [[1, 9, 100]]
+    mock_redis.script_load.assert_awaited_once_with("-- gcra")
+    assert mock_pipe.execute.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_error_does_not_run_endpoint_twice():
+    """Test that failing open never re-executes an endpoint that raised."""
+    app = FastAPI()
+    app.add_middleware(RateLimitMiddleware)
+    calls = []
+
+    mock_redis = AsyncMock()
+    mock_script = AsyncMock(return_value=[1, 59, 60000])
+    mock_script.registered_client = mock_redis
+    mock_redis.register_script = Mock(return_value=mock_script)
+
+    @app.get("/boom")
+    async def boom_endpoint():
+        calls.append(1)
+        raise RuntimeError("endpoint failure")
+
+    with patch(
+        "app.middleware.rate_limit.redis_manager.get_client", AsyncMock(return_value=mock_redis)
+    ):
+        client = TestClient(app, raise_server_exceptions=False)
+        response = client.get("/boom")
+
+    assert response.status_code == 500
+    assert calls == [1]
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_reconnects_after_redis_failure():
+    """Test that a missing client is re-requested from the shared manager."""
+    app = FastAPI()
+    middleware = RateLimitMiddleware(app)
+    mock_redis = AsyncMock()
+
+    with patch(
+        "app.middleware.rate_limit.redis_manager.get_client",
+        AsyncMock(side_effect=[None, mock_redis]),
+    ) as mock_get_client:
+        # Redis down at first use - no client, but not disabled for good
+        await middleware._ensure_redis_connection()
+        assert middleware.redis_client is None
+
+        # Redis back - the next request picks up the reconnected client
+        await middleware._ensure_redis_connection()
+        assert middleware.redis_client is mock_redis
+        assert mock_get_client.await_count == 2
@@ -0,0 +1,79 @@
+# ============================================
+# Ascend AI - Batching Pre-Limiter Tests
+# ============================================
+# Tests for local decisions, headroom and batched flushes
+# ============================================
+
+from unittest.mock import patch
+
+import pytest
+
+from app.middleware.rate_limit_batching import LocalPreLimiter
+
+CLOCK = "app.middleware.rate_limit_batching.time.monotonic"
+
+
+@pytest.fixture
+def pre_limiter() -> LocalPreLimiter:
+    return LocalPreLimiter(sync_interval=0.25, max_pending=20, sync_threshold=0.8, max_keys=100)
+
+
+def test_unknown_keys_go_to_redis(pre_limiter: LocalPreLimiter):
+    """Test that a key must be synced before it can be answered locally."""
+    assert pre_limiter.try_acquire("k", limit=100) is None
+
+
+def test_local_decisions_stop_at_headroom(pre_limiter: LocalPreLimiter):
+    """Test that the last 20% of the quota is always checked synchronously."""
+    with patch(CLOCK, return_value=100.0):
+        pre_limiter.record("k", remaining=30, reset_after=6.0, limit=100, window=60)
+        local = [pre_limiter.try_acquire("k", limit=100) for _ in range(12)]
+
+    # 30 remaining, headroom 20: ten local decisions, then Redis
+    assert [result[0] for result in local[:10]] == list(range(29, 19, -1))
+    assert local[10:] == [None, None]
+    assert pre_limiter.take_pending("k") == 10
+    assert pre_limiter.take_pending("k") == 0
+
+
+def test_stale_or_full_keys_go_to_redis(pre_limiter: LocalPreLimiter):
+    """Test the sync interval and max_pending bounds."""
+    with patch(CLOCK, return_value=100.0):
+        pre_limiter.record("k", remaining=1000, reset_after=1.0, limit=1000, window=60)
+        allowed = [pre_limiter.try_acquire("k", limit=1000) for _ in range(21)]
+    assert sum(result is not None for result in allowed) == 20
+
+    pre_limiter.take_pending("k")
+    with patch(CLOCK, return_value=100.3):
+        assert pre_limiter.try_acquire("k", limit=1000) is None
+
+
+def test_drain_and_refresh(pre_limiter: LocalPreLimiter):
+    """Test that a flush takes every pending count and keeps newer ones."""
+    with patch(CLOCK, return_value=100.0):
+        pre_limiter.record("a", remaining=90, reset_after=1.0, limit=100, window=60, burst=None)
+        pre_limiter.record("b", remaining=90, reset_after=1.0, limit=100, window=60, burst=50)
+        for _ in range(3):
+            pre_limiter.try_acquire("a", limit=100)
+        pre_limiter.try_acquire("b", limit=100, burst=50)
+
+        batch = pre_limiter.drain()
+        assert batch == [("a", 3, 100, 60, None), ("b", 1, 100, 60, 50)]
+        assert pre_limiter.drain() == []
+
+        # A failed flush is put back
+        pre_limiter.add_pending("a", 3)
+        assert pre_limiter.take_pending("a") == 3
+
+
+def test_evicted_keys_keep_their_pending_counts():
+    """Test that LRU eviction never drops requests Redis hasn't seen."""
+    pre_limiter = LocalPreLimiter(sync_interval=1, max_pending=20, sync_threshold=0.8, max_keys=1)
+
+    with patch(CLOCK, return_value=100.0):
+        pre_limiter.record("a", remaining=90, reset_after=1.0, limit=100, window=60)
+        pre_limiter.try_acquire("a", limit=100)
+        pre_limiter.record("b", remaining=90, reset_after=1.0, limit=100, window=60)
+
+    assert len(pre_limiter) == 1
+    assert pre_limiter.drain() == [("a", 1, 100, 60, None)]
@@ -0,0 +1,104 @@
+# ============================================
+# Ascend AI - Rate Limiting Fallback Tests
+# ============================================
+# Tests for the circuit breaker and in-process fallback limiter
+# ============================================
+
+from unittest.mock import patch
+
+import pytest
+
+from app.core.shared_memory import SharedMemoryTable
+from app.middleware.rate_limit_fallback import CircuitBreaker, LocalRateLimiter, SharedRateLimiter
+
+
+def test_breaker_opens_after_consecutive_failures():
+    """Test that only consecutive failures open the breaker."""
+    breaker = CircuitBreaker(failure_threshold=3)
+
+    assert breaker.record_failure() is False
+    assert breaker.record_failure() is False
+    assert breaker.record_success() is False  # still closed - resets the count
+    assert breaker.record_failure() is False
+    assert breaker.record_failure() is False
+    assert breaker.record_failure() is True
+    assert breaker.is_open
+
+    # Further failures don't report the transition again
+    assert breaker.record_failure() is False
+
+
+def test_breaker_trip_and_recovery():
+    """Test that trip() opens immediately and a success closes it once."""
+    breaker = CircuitBreaker(failure_threshold=5)
+
+    assert breaker.trip() is True
+    assert breaker.trip() is False
+    assert breaker.is_open
+
+    assert breaker.record_success() is True
+    assert not breaker.is_open
+    assert breaker.record_success() is False
+
+
+def test_local_limiter_allows_burst_then_rejects():
+    """Test GCRA semantics: a full burst, then one request per interval."""
+    limiter = LocalRateLimiter(max_keys=100)
+
+    with patch("app.middleware.rate_limit_fallback.time.monotonic", return_value=1000.0):
+        results = [limiter.check("k", limit=5, window=60) for _ in range(6)]
+
+    assert [allowed for allowed, _, _ in results] == [True] * 5 + [False]
+    assert [remaining for _, remaining, _ in results[:5]] == [4, 3, 2, 1, 0]
+    assert results[5][2] == 12.0  # retry once one interval has passed
+
+    with patch("app.middleware.rate_limit_fallback.time.monotonic", return_value=1012.0):
+        assert limiter.check("k", limit=5, window=60)[0] is True
+        assert limiter.check("k", limit=5, window=60)[0] is False
+
+
+def test_local_limiter_burst_and_keys_are_independent():
+    """Test burst sizing and that keys don't share a bucket."""
+    limiter = LocalRateLimiter(max_keys=100)
+
+    with patch("app.middleware.rate_limit_fallback.time.monotonic", return_value=0.0):
+        burst = [limiter.check("a", limit=60, window=60, burst=2)[0] for _ in range(3)]
+        other = limiter.check("b", limit=60, window=60, burst=2)[0]
+
+    assert burst == [True, True, False]
+    assert other is True
+
+
+def test_local_limiter_is_bounded():
+    """Test that the least recently used keys are evicted."""
+    limiter = LocalRateLimiter(max_keys=2)
+
+    for key in ("a", "b", "a", "c"):
+        limiter.check(key, limit=10, window=60)
+
+    assert len(limiter) == 2
+    assert set(limiter._tat) == {"a", "c"}
+
+    limiter.clear()
+    assert len(limiter) == 0
+
+
+def test_shared_limiter_is_shared_between_instances(tmp_path):
+    """Test that limiters on the same table (one per worker) share one budget."""
+    tables = [
+        SharedMemoryTable("limits", slots=64, value_size=8, directory=str(tmp_path))
+        for _ in range(2)
+    ]
+    workers = [SharedRateLimiter(table) for table in tables]
+
+    with patch("app.middleware.rate_limit_fallback.time.time", return_value=1000.0):
+        results = [workers[i % 2].check("k", limit=4, window=60) for i in range(5)]
+
+    assert [allowed for allowed, _, _ in results] == [True, True, True, True, False]
+    assert [remaining for _, remaining, _ in results[:4]] == [3, 2, 1, 0]
+    assert results[4][2] == pytest.approx(15.0)
+
+    workers[0].clear()
+    assert len(workers[1]) == 0
+    for table in tables:
+        table.close()
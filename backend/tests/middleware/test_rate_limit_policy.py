@@ -0,0 +1,108 @@
+# ============================================
+# Ascend AI - Rate Limit Policy Tests
+# ============================================
+# Tests for policy parsing and the compiled trie matcher
+# ============================================
+
+import pytest
+
+from app.middleware.rate_limit_policy import (
+    DEFAULT_RATE_LIMIT_POLICIES,
+    PolicyMatcher,
+    RateLimitPolicy,
+    load_policies,
+)
+
+
+def _matcher(*rules: dict) -> PolicyMatcher:
+    return PolicyMatcher([RateLimitPolicy(**rule) for rule in rules])
+
+
+def test_most_specific_prefix_wins():
+    """Test that the deepest matching rule applies to a path and its children."""
+    matcher = PolicyMatcher(load_policies(""))
+
+    assert matcher.match("/api/v1/auth/verify", "POST").limit == 5
+    assert matcher.match("/api/v1/resumes/123", "GET").limit == 60
+    assert matcher.match("/api/v1/resumes/123", "GET").identity == "user"
+    assert matcher.match("/other", "GET").limit == 100
+    # Prefixes match whole segments, not substrings
+    assert matcher.match("/api/v1/authors", "GET").limit == 60
+
+
+def test_method_specific_rules():
+    """Test that a method-specific rule beats an any-method rule on the same path."""
+    matcher = _matcher(
+        {"path": "/api/v1/resumes", "limit": 60, "window": 60},
+        {"path": "/api/v1/resumes", "methods": ["post"], "limit": 10, "window": 3600},
+    )
+
+    assert matcher.match("/api/v1/resumes", "POST").limit == 10
+    assert matcher.match("/api/v1/resumes", "GET").limit == 60
+    # A deeper path inherits the method-specific rule from its prefix
+    assert matcher.match("/api/v1/resumes/upload", "POST").limit == 10
+
+
+def test_wildcard_segments():
+    """Test that {param} and * segments match one path segment."""
+    matcher = _matcher(
+        {"path": "/api", "limit": 60, "window": 60},
+        {"path": "/api/v1/sessions/{session_id}/answers", "limit": 20, "window": 60},
+        {"path": "/api/v1/sessions/active", "limit": 30, "window": 60},
+    )
+
+    assert matcher.match("/api/v1/sessions/abc/answers", "POST").limit == 20
+    assert matcher.match("/api/v1/sessions/abc/answers/1", "POST").limit == 20
+    assert matcher.match("/api/v1/sessions/abc", "GET").limit == 60
+    # Literal segments take precedence over wildcards
+    assert matcher.match("/api/v1/sessions/active", "GET").limit == 30
+
+
+def test_wildcard_rule_applies_when_literal_branch_has_no_match():
+    """Test backtracking from a literal prefix to an overlapping wildcard rule."""
+    matcher = _matcher(
+        {"path": "/api/v1/sessions/active/summary", "limit": 30, "window": 60},
+        {"path": "/api/v1/sessions/{session_id}/answers", "limit": 20, "window": 60},
+    )
+
+    # "active" is a literal child, but only the wildcard rule covers ".../answers"
+    assert matcher.match("/api/v1/sessions/active/answers", "POST").limit == 20
+    assert matcher.match("/api/v1/sessions/active/summary", "GET").limit == 30
+    assert matcher.match("/api/v1/sessions/active", "GET") is None
+
+
+def test_no_matching_rule():
+    """Test that paths outside every rule are not limited."""
+    matcher = _matcher({"path": "/api", "limit": 60, "window": 60})
+
+    assert matcher.match("/static/app.js", "GET") is None
+    assert matcher.match("/api", "GET").limit == 60
+
+
+def test_load_policies_from_json():
+    """Test parsing RATE_LIMIT_POLICIES JSON."""
+    policies = load_policies(
+        '[{"path": "/api", "limit": 60, "window": 60, "burst": 20, "identity": "both"}]'
+    )
+
+    assert policies == [
+        RateLimitPolicy(path="/api", limit=60, window=60, burst=20, identity="both")
+    ]
+    assert len(load_policies("  ")) == len(DEFAULT_RATE_LIMIT_POLICIES)
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        "not json",
+        '{"path": "/api"}',
+        '[{"path": "api", "limit": 1, "window": 1}]',
+        '[{"path": "/api", "limit": 0, "window": 60}]',
+        '[{"path": "/api", "limit": 5, "window": 60, "identity": "session"}]',
+        '[{"path": "/api", "limit": 5, "window": 60, "typo": true}]',
+    ],
+)
+def test_load_policies_rejects_invalid_rules(raw: str):
+    """Test that bad configuration fails loudly at startup."""
+    with pytest.raises(ValueError, match="Invalid RATE_LIMIT_POLICIES"):
+        load_policies(raw)
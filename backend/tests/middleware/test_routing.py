@@ -0,0 +1,107 @@
+# ============================================
+# Ascend AI - Route Template Resolution Tests
+# ============================================
+# Tests for mapping raw request paths to route templates
+# ============================================
+
+from fastapi import APIRouter, FastAPI
+
+from app.middleware.routing import UNMATCHED_ROUTE, RouteResolver
+
+
+def _build_app() -> FastAPI:
+    app = FastAPI()
+    router = APIRouter(prefix="/sessions")
+
+    @router.get("/active")
+    async def active_sessions():
+        return []
+
+    @router.get("/{session_id}")
+    async def get_session(session_id: str):
+        return {}
+
+    @router.delete("/{session_id}/questions/{question_id:int}")
+    async def delete_question(session_id: str, question_id: int):
+        return {}
+
+    app.include_router(router, prefix="/api/v1")
+
+    @app.get("/health")
+    async def health():
+        return {}
+
+    return app
+
+
+def test_resolves_dynamic_paths_to_templates():
+    """Test that per-resource paths collapse onto their route template."""
+    app = _build_app()
+    resolver = RouteResolver()
+
+    assert resolver.resolve(app.router, "/api/v1/sessions/3f2a9c") == (
+        "/api/v1/sessions/{session_id}"
+    )
+    assert resolver.resolve(app.router, "/api/v1/sessions/other-id") == (
+        "/api/v1/sessions/{session_id}"
+    )
+    assert resolver.resolve(app.router, "/api/v1/sessions/abc/questions/7") == (
+        "/api/v1/sessions/{session_id}/questions/{question_id}"
+    )
+
+
+def test_resolves_static_paths_and_misses():
+    """Test static routes, convertor mismatches and unknown paths."""
+    app = _build_app()
+    resolver = RouteResolver()
+
+    assert resolver.resolve(app.router, "/health") == "/health"
+    assert resolver.resolve(app.router, "/api/v1/sessions/active") == "/api/v1/sessions/active"
+    # {question_id} is an int - a non-numeric segment matches nothing
+    assert resolver.resolve(app.router, "/api/v1/sessions/abc/questions/x") is None
+    assert resolver.resolve(app.router, "/wp-login.php") is None
+
+
+def test_declaration_order_is_respected():
+    """Test that an earlier dynamic route shadows a later static one."""
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: str):
+        return {}
+
+    @app.get("/items/latest")
+    async def latest_item():
+        return {}
+
+    assert RouteResolver().resolve(app.router, "/items/latest") == "/items/{item_id}"
+
+
+def test_table_is_compiled_once_and_rebuilt_when_routes_change():
+    """Test that the route table is cached per router."""
+    app = _build_app()
+    resolver = RouteResolver()
+
+    resolver.resolve(app.router, "/health")
+    table = resolver._tables[id(app.router)][1]
+    resolver.resolve(app.router, "/api/v1/sessions/1")
+    assert resolver._tables[id(app.router)][1] is table
+
+    @app.get("/late/{name}")
+    async def late(name: str):
+        return {}
+
+    assert resolver.resolve(app.router, "/late/x") == "/late/{name}"
+    assert resolver._tables[id(app.router)][1] is not table
+
+
+def test_route_for_request():
+    """Test resolving directly from a request scope."""
+    app = _build_app()
+    resolver = RouteResolver()
+
+    assert resolver.route_for({"app": app, "path": "/api/v1/sessions/42"}) == (
+        "/api/v1/sessions/{session_id}"
+    )
+    assert resolver.route_for({"app": app, "path": "/nope"}) == UNMATCHED_ROUTE
+    assert resolver.route_for({"path": "/api/v1/sessions/42"}) == UNMATCHED_ROUTE
@@ -0,0 +1,104 @@
+# ============================================
+# Ascend AI - Server-Timing Middleware Tests
+# ============================================
+# Tests for when the Server-Timing header is added
+# ============================================
+
+from unittest.mock import AsyncMock, Mock, patch
+
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.server_timing import TimedAPIRoute, sign_debug_token, timed
+from app.middleware.rate_limit import RateLimitMiddleware
+from app.middleware.server_timing import ServerTimingMiddleware
+
+SECRET = "server-timing-test-secret"
+
+
+def make_client(**options) -> TestClient:
+    """Test client for an app with Server-Timing middleware."""
+    router = APIRouter(route_class=TimedAPIRoute)
+
+    @router.get("/test")
+    async def test_endpoint():
+        with timed("jwt"):
+            pass
+        return {"message": "success"}
+
+    app = FastAPI()
+    app.include_router(router)
+    app.add_middleware(ServerTimingMiddleware, **options)
+    return TestClient(app)
+
+
+def phases(response) -> list[str]:
+    return [entry.split(";")[0] for entry in response.headers["Server-Timing"].split(", ")]
+
+
+def test_header_is_added_when_enabled():
+    """Test the header of an environment with timing enabled."""
+    response = make_client(enabled=True, secret="").get("/test")
+
+    assert phases(response) == ["jwt", "handler", "serialize", "total"]
+
+
+def test_header_is_absent_when_disabled():
+    """Test that requests without a token are not timed."""
+    response = make_client(enabled=False, secret=SECRET).get("/test")
+
+    assert response.status_code == 200
+    assert "Server-Timing" not in response.headers
+
+
+def test_signed_debug_header_enables_timing():
+    """Test that a valid token enables the header and an invalid one does not."""
+    client = make_client(enabled=False, secret=SECRET)
+
+    valid = client.get("/test", headers={"X-Server-Timing-Token": sign_debug_token(SECRET)})
+    forged = client.get("/test", headers={"X-Server-Timing-Token": sign_debug_token("guess")})
+
+    assert "total" in phases(valid)
+    assert "Server-Timing" not in forged.headers
+
+
+def test_debug_header_is_ignored_without_a_secret():
+    """Test that tokens are refused when no secret is configured."""
+    client = make_client(enabled=False, secret="")
+
+    response = client.get("/test", headers={"X-Server-Timing-Token": sign_debug_token("")})
+
+    assert "Server-Timing" not in response.headers
+
+
+def test_malformed_debug_header_is_ignored():
+    """Test that a token with non-ASCII digits is refused instead of failing the request."""
+    client = make_client(enabled=False, secret=SECRET)
+
+    response = client.get("/test", headers={"X-Server-Timing-Token": b"\xb2.abc"})
+
+    assert response.status_code == 200
+    assert "Server-Timing" not in response.headers
+
+
+def test_rate_limit_check_is_reported():
+    """Test the ratelimit phase with the middleware order of main.py."""
+    app = FastAPI()
+    app.add_middleware(RateLimitMiddleware)
+    app.add_middleware(ServerTimingMiddleware, enabled=True)
+
+    @app.get("/test")
+    async def test_endpoint():
+        return {"message": "success"}
+
+    mock_redis = AsyncMock()
+    mock_script = AsyncMock(return_value=[1, 55, 42000])
+    mock_script.registered_client = mock_redis
+    mock_redis.register_script = Mock(return_value=mock_script)
+
+    with patch(
+        "app.middleware.rate_limit.redis_manager.get_client", AsyncMock(return_value=mock_redis)
+    ):
+        response = TestClient(app).get("/test")
+
+    assert phases(response) == ["ratelimit", "total"]
@@ -0,0 +1,74 @@
+# ============================================
+# Ascend AI - Request Tracing Middleware Tests
+# ============================================
+# Tests for root spans per request and trace propagation into the logs
+# ============================================
+
+import logging
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.tracing import current_trace_id, span, tracer
+from app.middleware.logging import RequestLoggingMiddleware
+from app.middleware.tracing import TracingMiddleware
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+
+
+@pytest.fixture
+def exported(monkeypatch):
+    """Enable tracing and capture exported root spans."""
+    roots = []
+    monkeypatch.setattr(tracer, "enabled", True)
+    monkeypatch.setattr(tracer, "sample_rate", 1.0)
+    monkeypatch.setattr(tracer, "export", roots.append)
+    return roots
+
+
+@pytest.fixture
+def client():
+    """Test client for an app with logging inside tracing, as in main.py."""
+    app = FastAPI()
+    app.add_middleware(RequestLoggingMiddleware)
+    app.add_middleware(TracingMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: str):
+        with span("load_item"):
+            return {"id": item_id, "trace_id": current_trace_id()}
+
+    return TestClient(app)
+
+
+def test_root_span_is_named_after_the_route(client, exported):
+    """Test the root span name, status and the handler's child span."""
+    response = client.get("/items/42")
+
+    (root,) = exported
+    assert root.name == "GET /items/{item_id}"
+    assert root.attributes == {"status": 200}
+    assert root.parent_id is None
+    assert [child.name for child in root.trace.spans] == ["load_item", root.name]
+    assert response.json()["trace_id"] == root.trace_id
+
+
+def test_incoming_traceparent_is_continued(client, exported):
+    """Test that the caller's trace id and span id are kept."""
+    client.get("/items/42", headers={"traceparent": f"00-{TRACE_ID}-00f067aa0ba902b7-01"})
+
+    (root,) = exported
+    assert root.trace_id == TRACE_ID
+    assert root.parent_id == "00f067aa0ba902b7"
+
+
+def test_request_id_in_logs_is_the_trace_id(client, caplog):
+    """Test that log lines can be joined with exported traces (tracing disabled)."""
+    with caplog.at_level(logging.INFO):
+        response = client.get("/items/42")
+
+    request_ids = {
+        record.request_id for record in caplog.records if record.name == "app.middleware.logging"
+    }
+    assert request_ids == {response.json()["trace_id"]}
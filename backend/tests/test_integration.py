@@ -5,11 +5,13 @@
 # ============================================
 
 import time
+from unittest.mock import patch
 
 import pytest
 from fastapi.testclient import TestClient
 
 from app.main import app
+from app.middleware.client_ip import CIDRTree, parse_cidrs
 
 
 @pytest.fixture
@@ -165,3 +167,41 @@ def test_docs_endpoint_accessible(client):
 
     # Docs endpoint should return HTML (200) or redirect
     assert response.status_code in [200, 307]
+
+
+def test_metrics_endpoint_reports_requests():
+    """Test that /metrics exposes per-route series and runtime gauges."""
+    client = TestClient(app, client=("127.0.0.1", 50000))
+    client.get("/health")
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'http_requests_total{method="GET",route="/health",status="2xx"}' in response.text
+    assert "# TYPE http_request_duration_seconds histogram" in response.text
+    assert "db_pool_size 5" in response.text
+    assert 'redis_up{role="cache"}' in response.text
+    assert 'token_cache_events_total{event="l1_hits"}' in response.text
+    # Scrapes are not rate limited
+    assert "x-ratelimit-limit" not in response.headers
+
+
+def test_metrics_endpoint_refuses_untrusted_clients():
+    """Test that /metrics is only served to trusted proxies and allowed scrapers."""
+    remote = TestClient(app, client=("203.0.113.7", 50000))
+    # A forwarded header from an untrusted peer changes nothing
+    response = remote.get("/metrics", headers={"X-Forwarded-For": "127.0.0.1"})
+    assert response.status_code == 403
+    assert "http_requests_total" not in response.text
+
+    # Reaching a trusted proxy from outside is refused too
+    proxied = TestClient(app, client=("127.0.0.1", 50000))
+    response = proxied.get("/metrics", headers={"X-Forwarded-For": "203.0.113.7"})
+    assert response.status_code == 403
+
+    # Unless the client is an allowed scraper
+    scrapers = CIDRTree()
+    for network in parse_cidrs("203.0.113.0/28", "METRICS_ALLOWED_CIDRS"):
+        scrapers.insert(network, True)
+    with patch("app.main.metrics_scrapers", scrapers):
+        assert remote.get("/metrics").status_code == 200